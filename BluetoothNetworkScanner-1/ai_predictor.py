@@ -1,17 +1,44 @@
 import os
-from typing import Dict, List, Any
-import warnings
+import time
+from typing import Dict, List, Any, Optional, Tuple, Union
 import json
+import logging
 from datetime import datetime
-from openai import OpenAI
+from gpt_analysis import GPTAnalyzer, default_analysis, get_openai_client
+
+logger = logging.getLogger(__name__)
 
 class NetworkAIPredictor:
-    def __init__(self, model_path: str = 'modele_ia.h5'):
+    # Seuils (dBm) de qualité du signal par type de réseau
+    SIGNAL_THRESHOLDS = {
+        'wifi': {'excellent': -50, 'poor': -80},
+        'bluetooth': {'excellent': -60, 'poor': -90},
+        'lte': {'excellent': -70, 'poor': -100},
+        'esim': {'excellent': -70, 'poor': -100}
+    }
+    DEFAULT_SIGNAL_THRESHOLD = {'excellent': -50, 'poor': -100}
+    # Seuils RSRP (dBm) des connexions cellulaires échantillonnées (cellular_sampler)
+    RSRP_THRESHOLD = {'excellent': -80, 'poor': -110}
+    # Bornes de couverture (dBm): Excellente, Bonne, Moyenne au-delà de chaque seuil
+    COVERAGE_CUTS = {'rssi': (-70, -85, -100), 'rsrp': (-80, -90, -100)}
+    # Écarts types (dB) au-delà desquels la stabilité perd un, puis deux niveaux
+    STABILITY_STDDEV = (4.0, 8.0)
+
+    def __init__(self, model_path: str = 'modele_ia.npz'):
         """Initialisation du prédicteur IA avec mode dégradé si le modèle n'est pas disponible"""
         self.model = None
         self.model_path = model_path
         self.is_fallback_mode = True
+        self._model_loaded = False
         self.stats_file = 'network_stats.json'
+        self.stats_retention = 100
+        self._stats_store = None
+        self._stats_rollups = None
+        # Présence des appareils d'un scan à l'autre (secondes d'absence tolérées)
+        self.device_ttl = 300
+        self.max_devices = 10000
+        self._device_registry = None
+        self._rogue_detector = None
         self.network_types = {
             'wifi': [],
             'bluetooth': [],
@@ -21,11 +48,56 @@ class NetworkAIPredictor:
             'vpn': []
         }
 
-        # Initialisation du client OpenAI pour l'analyse avancée
-        self.openai_client = OpenAI()
+        # Client OpenAI pour l'analyse avancée: partagé et créé au premier appel GPT
+        self._openai_client = None
+        # Mode ('concurrent' ou 'batch'), parallélisme et délais via GPT_ANALYSIS_MODE,
+        # GPT_MAX_CONCURRENCY, GPT_TIMEOUT et GPT_BATCH_SIZE
+        self.gpt_analyzer = GPTAnalyzer(lambda: self.openai_client)
+        # Analyses GPT conservées tant que l'appareil ne change pas (GPT_CACHE_TTL secondes)
+        self.gpt_cache_ttl = float(os.environ.get('GPT_CACHE_TTL', 24 * 3600))
+        # Purge des analyses périmées d'appareils qui ne sont plus revus (secondes)
+        self.gpt_cache_purge_interval = float(os.environ.get('GPT_CACHE_PURGE_INTERVAL', 3600))
+        self._gpt_cache = None
+        self._gpt_cache_purged: Optional[float] = None
+        # Analyse incrémentale entre scans successifs (seuls les appareils modifiés
+        # sont recalculés); tolérance de variation du signal en dBm
+        self.incremental_analysis = os.environ.get('INCREMENTAL_ANALYSIS') == 'true'
+        self.signal_tolerance = float(os.environ.get('INCREMENTAL_SIGNAL_TOLERANCE', 0))
+        self._incremental = None
+        # Échantillonneur résident du modem (CellularSampler): ses fenêtres de
+        # mesures sont jointes aux connexions cellulaires analysées
+        self.cellular_sampler = None
+        # Relecture d'archive (scan_archive.replay_into): analyse seule, sans
+        # appel GPT, sans alertes ni écriture de l'historique, des agrégats et du registre
+        self.replay_mode = False
+
+    @property
+    def gpt_enabled(self) -> bool:
+        """Analyse GPT des appareils: clé API présente et hors relecture"""
+        return 'OPENAI_API_KEY' in os.environ and not self.replay_mode
+
+    @property
+    def openai_client(self):
+        if self._openai_client is not None:
+            return self._openai_client
+        return get_openai_client()
+
+    @openai_client.setter
+    def openai_client(self, client) -> None:
+        self._openai_client = client
 
     def analyze_device_details(self, device_info: Dict[str, Any]) -> Dict[str, Any]:
         """Analyser en détail un appareil spécifique avec plus de précision"""
+        analysis = self._build_device_analysis(device_info)
+
+        # Analyse avancée avec GPT pour les recommandations en français
+        if self.gpt_enabled:
+            self._add_gpt_analyses([analysis], [device_info])
+
+        return analysis
+
+    def _build_device_analysis(self, device_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyse locale d'un appareil, sans appel GPT"""
         device_type = self.classify_network(device_info)
         analysis = {
             'type': device_type,
@@ -47,64 +119,75 @@ class NetworkAIPredictor:
             analysis['details'] = self._analyze_cellular_connection(device_info)
             analysis['performances'] = self._analyze_cellular_performance(device_info)
 
-        # Analyse avancée avec GPT pour les recommandations en français
-        if 'OPENAI_API_KEY' in os.environ:
-            try:
-                prompt = f"""Analyser en détail les aspects suivants pour cette connexion réseau:
-                1. Risques de sécurité potentiels
-                2. Recommandations d'optimisation
-                3. Bonnes pratiques spécifiques
-                4. Points d'attention particuliers
-
-                Données de connexion: {json.dumps(analysis['details'])}"""
-
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "Vous êtes un expert en sécurité et optimisation réseau."},
-                        {"role": "user", "content": prompt}
-                    ]
-                )
-                ai_analysis = response.choices[0].message.content
-                analysis['analyse_ia'] = ai_analysis
-            except Exception as e:
-                warnings.warn(f"Erreur lors de l'analyse GPT: {str(e)}")
-                # Ajouter des recommandations par défaut en français selon le type de réseau
-                default_analysis = {
-                    'wifi': """
-                    Recommandations par défaut pour le réseau WiFi:
-                    1. Vérifiez régulièrement les mises à jour de sécurité
-                    2. Utilisez un mot de passe fort et unique
-                    3. Activez le filtrage MAC si disponible
-                    4. Surveillez les appareils connectés inconnus
-                    """,
-                    'bluetooth': """
-                    Recommandations par défaut pour la connexion Bluetooth:
-                    1. Désactivez le Bluetooth quand il n'est pas utilisé
-                    2. Évitez l'appairage dans les lieux publics
-                    3. Mettez à jour le firmware des appareils
-                    4. Utilisez le mode "non découvrable" par défaut
-                    """,
-                    'lte': """
-                    Recommandations par défaut pour la connexion cellulaire:
-                    1. Activez le chiffrement des données
-                    2. Évitez les réseaux cellulaires inconnus
-                    3. Utilisez un VPN sur les réseaux publics
-                    4. Surveillez votre consommation de données
-                    """,
-                    'esim': """
-                    Recommandations par défaut pour la connexion eSIM:
-                    1. Vérifiez la compatibilité des opérateurs
-                    2. Sauvegardez vos profils eSIM
-                    3. Maintenez votre appareil à jour
-                    4. Activez l'authentification forte
-                    """
-                }
-                analysis['analyse_ia'] = default_analysis.get(device_type, 
-                    "Analyse IA non disponible. Veuillez réessayer plus tard.")
-
         return analysis
 
+    def _add_gpt_analyses(self, analyses: List[Dict[str, Any]],
+                          devices: Optional[List[Dict[str, Any]]] = None,
+                          stats: Optional[Dict[str, Any]] = None) -> None:
+        """Ajouter l'analyse GPT (ou l'analyse par défaut en cas d'échec) à chaque analyse.
+
+        Les appareils dont l'empreinte n'a pas changé reprennent l'analyse en
+        cache sans appel GPT; le taux de succès est ajouté à `stats`.
+        """
+        from gpt_cache import analysis_key, fingerprint
+
+        self._purge_gpt_cache()
+        devices = devices if devices is not None else [None] * len(analyses)
+        keys = [analysis_key(analysis, device, position)
+                for position, (analysis, device) in enumerate(zip(analyses, devices))]
+        fingerprints = [fingerprint(analysis) for analysis in analyses]
+        try:
+            cached = self.gpt_cache.get_many(zip(keys, fingerprints))
+        except Exception as e:
+            logger.warning("Erreur de lecture du cache des analyses GPT: %s", e)
+            cached = {}
+        # get_many valide chaque clé contre une seule empreinte, la dernière si
+        # la clé revient dans le scan (même BSSID vu deux fois, même SSID sur le
+        # même canal): une occurrence d'empreinte différente est réanalysée
+        wanted = dict(zip(keys, fingerprints))
+
+        pending = []
+        for i, analysis in enumerate(analyses):
+            if keys[i] in cached and wanted[keys[i]] == fingerprints[i]:
+                analysis['analyse_ia'] = cached[keys[i]]
+            else:
+                pending.append(i)
+        self.gpt_analyzer.analyze([analyses[i] for i in pending])
+
+        # Les analyses par défaut (échec ou délai dépassé) ne sont pas conservées
+        fresh = [(keys[i], fingerprints[i], analyses[i]['analyse_ia']) for i in pending
+                 if analyses[i]['analyse_ia'] != default_analysis(analyses[i]['type'])]
+        try:
+            self.gpt_cache.put_many(fresh)
+        except Exception as e:
+            logger.warning("Erreur d'écriture du cache des analyses GPT: %s", e)
+
+        if stats is not None:
+            hits = len(analyses) - len(pending)
+            stats['gpt_cache'] = {
+                'hits': hits,
+                'misses': len(pending),
+                'hit_rate': round(hits / len(analyses), 4) if analyses else 0.0,
+            }
+
+    def _purge_gpt_cache(self) -> None:
+        """Supprimer les analyses périmées, au plus une fois par `gpt_cache_purge_interval`.
+
+        get_many n'invalide que les appareils revus: sans purge, les entrées
+        des appareils disparus resteraient dans la base partagée.
+        """
+        now = time.monotonic()
+        if self._gpt_cache_purged is not None and now - self._gpt_cache_purged < self.gpt_cache_purge_interval:
+            return
+        self._gpt_cache_purged = now
+        try:
+            purged = self.gpt_cache.purge()
+        except Exception as e:
+            logger.warning("Erreur lors de la purge du cache des analyses GPT: %s", e)
+            return
+        if purged:
+            logger.info("%d analyse(s) GPT périmée(s) supprimée(s) du cache", purged)
+
     def _analyze_wifi_performance(self, network: Dict[str, Any]) -> Dict[str, Any]:
         """Analyse détaillée des performances WiFi"""
         return {
@@ -162,6 +245,9 @@ class NetworkAIPredictor:
     def _detect_interference_level(self, network: Dict[str, Any]) -> str:
         """Détection du niveau d'interférence"""
         noise_level = network.get('noise', -90)
+        # Puissance reçue des réseaux voisins sur le même canal (channel_model)
+        if network.get('interference_dbm') is not None:
+            noise_level = max(noise_level, network['interference_dbm'])
         if noise_level > -70:
             return "Élevé"
         elif noise_level > -80:
@@ -222,7 +308,7 @@ class NetworkAIPredictor:
     def _detect_bluetooth_interference(self, device: Dict[str, Any]) -> str:
         """Détection des interférences Bluetooth"""
         # Analyse basée sur le nombre d'appareils à proximité et la qualité du signal
-        nearby_devices = len(device.get('nearby_devices', []))
+        nearby_devices = device.get('nearby_count', len(device.get('nearby_devices', [])))
         if nearby_devices > 10:
             return "Risque élevé d'interférences"
         elif nearby_devices > 5:
@@ -248,19 +334,42 @@ class NetworkAIPredictor:
             return "Moyenne (30-50ms)"
         return "Élevée (>50ms)"
 
+    def _signal_window_metric(self, connection: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Mesure échantillonnée de la connexion (`signal_window`): RSRP de préférence, sinon RSSI"""
+        window = connection.get('signal_window')
+        if not window:
+            return None
+        for metric in ('rsrp', 'rssi'):
+            if (window.get(metric) or {}).get('count'):
+                return metric, window[metric]
+        return None
+
     def _evaluate_cellular_stability(self, connection: Dict[str, Any]) -> str:
-        """Évaluation de la stabilité cellulaire"""
-        signal_quality = self._calculate_signal_quality(
-            float(str(connection.get('signal', '-100')).split()[0]), 
-            'lte'
-        )
-        if signal_quality > 0.8:
-            return "Excellente"
-        elif signal_quality > 0.6:
-            return "Bonne"
-        elif signal_quality > 0.4:
-            return "Moyenne"
-        return "Faible"
+        """Évaluation de la stabilité cellulaire.
+
+        Avec une fenêtre de mesures (`signal_window`), le 10e centile remplace
+        la lecture unique et un écart type élevé dégrade le niveau.
+        """
+        labels = ("Faible", "Moyenne", "Bonne", "Excellente")
+        sampled = self._signal_window_metric(connection)
+        if sampled is None:
+            signal_quality = self._calculate_signal_quality(
+                float(str(connection.get('signal', '-100')).split()[0]),
+                'lte'
+            )
+            stddev = 0.0
+        else:
+            metric, window = sampled
+            if metric == 'rsrp':
+                threshold = self.RSRP_THRESHOLD
+                signal_quality = min(1.0, max(0.0, (window['p10'] - threshold['poor']) /
+                                              (threshold['excellent'] - threshold['poor'])))
+            else:
+                signal_quality = self._calculate_signal_quality(window['p10'], 'lte')
+            stddev = window['stddev']
+        level = 3 if signal_quality > 0.8 else 2 if signal_quality > 0.6 else 1 if signal_quality > 0.4 else 0
+        level -= sum(stddev >= limit for limit in self.STABILITY_STDDEV)
+        return labels[max(level, 0)]
 
     def _evaluate_qos(self, connection: Dict[str, Any]) -> Dict[str, Any]:
         """Évaluation de la qualité de service"""
@@ -272,13 +381,18 @@ class NetworkAIPredictor:
         }
 
     def _analyze_coverage(self, connection: Dict[str, Any]) -> str:
-        """Analyse de la couverture réseau"""
-        signal_strength = float(str(connection.get('signal', '-100')).split()[0])
-        if signal_strength > -70:
+        """Analyse de la couverture réseau (médiane de la fenêtre de mesures si disponible)"""
+        sampled = self._signal_window_metric(connection)
+        if sampled is None:
+            metric, signal_strength = 'rssi', float(str(connection.get('signal', '-100')).split()[0])
+        else:
+            metric, signal_strength = sampled[0], sampled[1]['p50']
+        excellent, good, fair = self.COVERAGE_CUTS[metric]
+        if signal_strength > excellent:
             return "Excellente"
-        elif signal_strength > -85:
+        elif signal_strength > good:
             return "Bonne"
-        elif signal_strength > -100:
+        elif signal_strength > fair:
             return "Moyenne"
         return "Faible"
 
@@ -330,15 +444,18 @@ class NetworkAIPredictor:
         return 'Autre'
 
     def _detect_manufacturer(self, mac_address: str) -> str:
-        """Détecter le fabricant à partir de l'adresse MAC"""
-        # Implémentation basique - à enrichir avec une base de données OUI
-        manufacturers = {
-            '00:11:22': 'Apple',
-            'AA:BB:CC': 'Samsung',
-            '12:34:56': 'Google'
-        }
-        prefix = mac_address[:8]
-        return manufacturers.get(prefix, 'Inconnu')
+        """Détecter le fabricant à partir de l'adresse MAC (registre IEEE MA-L/MA-M/MA-S).
+
+        L'index binaire est désigné par OUI_INDEX (défaut oui.bin, construit avec
+        `python oui_index.py build`); les adresses locales/aléatoires sont signalées.
+        """
+        import oui_index
+        return oui_index.describe(mac_address)
+
+    def _detect_manufacturers(self, mac_addresses: List[str]) -> List[str]:
+        """Version par lot de _detect_manufacturer"""
+        import oui_index
+        return oui_index.describe_many(mac_addresses)
 
     def _evaluate_connection_stability(self, network: Dict[str, Any]) -> str:
         """Évaluer la stabilité de la connexion"""
@@ -366,14 +483,7 @@ class NetworkAIPredictor:
 
     def _calculate_signal_quality(self, signal_strength: float, network_type: str) -> float:
         """Calculate quality score based on signal strength and network type"""
-        thresholds = {
-            'wifi': {'excellent': -50, 'poor': -80},
-            'bluetooth': {'excellent': -60, 'poor': -90},
-            'lte': {'excellent': -70, 'poor': -100},
-            'esim': {'excellent': -70, 'poor': -100}
-        }
-
-        threshold = thresholds.get(network_type, {'excellent': -50, 'poor': -100})
+        threshold = self.SIGNAL_THRESHOLDS.get(network_type, self.DEFAULT_SIGNAL_THRESHOLD)
 
         if signal_strength >= threshold['excellent']:
             return 1.0
@@ -429,8 +539,28 @@ class NetworkAIPredictor:
             'roaming': connection.get('roaming', False)
         }
 
-    def analyze_networks(self, networks_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Analyser une liste de réseaux et générer des statistiques"""
+    def _attach_signal_window(self, devices: List[Dict[str, Any]],
+                              stats: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Joindre les fenêtres de l'échantillonneur aux connexions cellulaires
+        mesurées par le modem (copies; les mesures fournies par l'appelant priment)"""
+        window = self.cellular_sampler.stats()
+        if not window.get('samples'):
+            return devices
+        stats['cellular_signal'] = window
+        return [
+            dict(device, signal_window=window)
+            if 'signal' in device and 'signal_window' not in device
+            and self.classify_network(device) in ('lte', 'esim') else device
+            for device in devices
+        ]
+
+    def analyze_networks(self, networks_data: List[Dict[str, Any]],
+                         timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """Analyser une liste de réseaux et générer des statistiques.
+
+        `timestamp` (ISO 8601) date le scan, par exemple lors d'une relecture
+        d'archive; par défaut l'heure courante.
+        """
         stats = {
             'total_networks': len(networks_data),
             'network_types': {t: 0 for t in self.network_types.keys()},
@@ -439,12 +569,47 @@ class NetworkAIPredictor:
                 'encrypted': 0,
                 'open': 0
             },
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp or datetime.now().isoformat(),
             'detailed_analysis': []
         }
 
+        # Charge des canaux et interférences calculées sur l'ensemble du scan
+        from channel_model import ChannelModel
+        channel_model = ChannelModel(networks_data)
+        stats['channel_congestion'] = channel_model.congestion_table()
+        devices = networks_data
+        if self.cellular_sampler is not None:
+            devices = self._attach_signal_window(devices, stats)
+
+        if self.incremental_analysis:
+            # Comparaison sur les lectures brutes: les mesures du scan, qui
+            # varient avec les voisins, sont appliquées après coup
+            self.incremental_analyzer.analyze(devices, stats, channel_model.metrics())
+        else:
+            devices = channel_model.annotate(devices)
+            try:
+                from batch_analysis import BatchAnalyzer
+            except ImportError:
+                # NumPy indisponible: analyse appareil par appareil
+                self._analyze_networks_scalar(devices, stats)
+            else:
+                BatchAnalyzer(self).analyze(devices, stats)
+
+        if self.replay_mode:
+            return stats
+
+        self._record_presence(networks_data, stats)
+        self._check_rogue_aps(networks_data, stats)
+
+        # Sauvegarder les statistiques
+        self._save_stats(stats)
+        self._record_rollups(networks_data, stats)
+        return stats
+
+    def _analyze_networks_scalar(self, networks_data: List[Dict[str, Any]], stats: Dict[str, Any]) -> None:
+        """Remplir `stats` en analysant chaque appareil séparément (chemin de référence)"""
         for network in networks_data:
-            detailed_analysis = self.analyze_device_details(network)
+            detailed_analysis = self._build_device_analysis(network)
             stats['detailed_analysis'].append(detailed_analysis)
             network_type = self.classify_network(network)
             stats['network_types'][network_type] += 1
@@ -463,63 +628,172 @@ class NetworkAIPredictor:
                 else:
                     stats['security_stats']['open'] += 1
 
+        # Analyses GPT de tous les appareils en une seule vague
+        if self.gpt_enabled:
+            self._add_gpt_analyses(stats['detailed_analysis'], networks_data, stats)
+
         # Calcul des moyennes
         for net_type, signals in stats['average_signal'].items():
             if signals:
                 stats['average_signal'][net_type] = sum(signals) / len(signals)
 
-        # Sauvegarder les statistiques
-        self._save_stats(stats)
-        return stats
+    @property
+    def incremental_analyzer(self) -> 'IncrementalAnalyzer':
+        """État conservé entre scans pour l'analyse incrémentale"""
+        if self._incremental is None:
+            from incremental_analysis import IncrementalAnalyzer
+            self._incremental = IncrementalAnalyzer(self, self.signal_tolerance)
+        self._incremental.signal_tolerance = self.signal_tolerance
+        return self._incremental
+
+    @property
+    def stats_db(self) -> str:
+        """Base SQLite de l'historique, à côté de `stats_file` (extension .db)"""
+        return os.path.splitext(self.stats_file)[0] + '.db'
+
+    @property
+    def stats_store(self) -> 'StatsStore':
+        """Historique SQLite associé à `stats_file` (ouvert au premier usage).
+
+        L'ancien fichier JSON n'est plus réécrit: il est importé une fois dans
+        la base.
+        """
+        if self._stats_store is None or self._stats_store.path != self.stats_db:
+            from stats_store import StatsStore
+            self._stats_store = StatsStore(self.stats_db, max_entries=self.stats_retention,
+                                           legacy_json=self.stats_file)
+        return self._stats_store
+
+    @property
+    def gpt_cache(self) -> 'AnalysisCache':
+        """Cache des analyses GPT, dans la base de l'historique (partagé entre processus)"""
+        if self._gpt_cache is None or self._gpt_cache.path != self.stats_db:
+            from gpt_cache import AnalysisCache
+            self._gpt_cache = AnalysisCache(self.stats_db, ttl=self.gpt_cache_ttl)
+        return self._gpt_cache
+
+    @property
+    def stats_rollups(self) -> 'RollupStore':
+        """Agrégats 1m/1h/1d stockés dans la même base que l'historique"""
+        if self._stats_rollups is None or self._stats_rollups.path != self.stats_db:
+            from stats_rollups import RollupStore
+            self._stats_rollups = RollupStore(self.stats_db)
+        return self._stats_rollups
+
+    def _record_rollups(self, networks_data: List[Dict[str, Any]], stats: Dict[str, Any]) -> None:
+        """Mettre à jour les agrégats temporels avec le scan courant"""
+        def observations():
+            for network, analysis in zip(networks_data, stats['detailed_analysis']):
+                network_type = analysis['type']
+                signal = float(str(network['signal']).split()[0]) if 'signal' in network else None
+                encrypted = None
+                if network_type == 'wifi':
+                    encrypted = bool(network.get('encryption')) and network['encryption'].lower() != 'none'
+                yield network_type, network.get('ssid'), signal, encrypted
 
-    def _save_stats(self, stats: Dict[str, Any]) -> None:
-        """Sauvegarder les statistiques dans un fichier JSON"""
         try:
-            # Charger l'historique existant
-            history = []
-            if os.path.exists(self.stats_file):
-                with open(self.stats_file, 'r') as f:
-                    history = json.load(f)
+            self.stats_rollups.record_scan(stats['timestamp'], observations())
+        except Exception as e:
+            logger.warning("Erreur lors de la mise à jour des agrégats: %s", e)
+
+    @property
+    def device_registry(self) -> 'DeviceRegistry':
+        """Registre de présence des appareils, persisté dans la base de l'historique"""
+        if self._device_registry is None or self._device_registry.path != self.stats_db:
+            from device_registry import DeviceRegistry
+            self._device_registry = DeviceRegistry(self.stats_db, ttl=self.device_ttl,
+                                                   max_devices=self.max_devices)
+        return self._device_registry
+
+    def _record_presence(self, networks_data: List[Dict[str, Any]], stats: Dict[str, Any]) -> None:
+        """Mettre à jour le registre et ajouter les appareils apparus/disparus à `stats`"""
+        from device_registry import device_key
+
+        def observations():
+            for network, analysis in zip(networks_data, stats['detailed_analysis']):
+                key = device_key(network)
+                if key is None:
+                    continue
+                signal = float(str(network['signal']).split()[0]) if 'signal' in network else None
+                yield key, analysis['type'], network.get('ssid') or network.get('name'), signal
 
-            # Ajouter les nouvelles stats
-            history.append(stats)
+        try:
+            stats['presence'] = self.device_registry.update(stats['timestamp'], observations())
+        except Exception as e:
+            logger.warning("Erreur lors de la mise à jour du registre des appareils: %s", e)
+
+    @property
+    def rogue_detector(self) -> 'RogueAPDetector':
+        """Détecteur de points d'accès pirates, persisté dans la base de l'historique"""
+        if self._rogue_detector is None or self._rogue_detector.path != self.stats_db:
+            from rogue_ap import RogueAPDetector
+            self._rogue_detector = RogueAPDetector(self.stats_db)
+        return self._rogue_detector
+
+    def _check_rogue_aps(self, networks_data: List[Dict[str, Any]], stats: Dict[str, Any]) -> None:
+        """Comparer les réseaux WiFi du scan aux SSID connus et ajouter les alertes à `stats`"""
+        observations = ((network.get('ssid'), network.get('bssid'), network.get('encryption'))
+                        for network in networks_data if 'ssid' in network)
+        try:
+            detector = self.rogue_detector
+            stats['rogue_ap'] = {
+                'alerts': detector.check(stats['timestamp'], observations),
+                'active': detector.active_count(),
+            }
+        except Exception as e:
+            logger.warning("Erreur lors de la détection des points d'accès pirates: %s", e)
+
+    def get_devices(self, device_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Appareils actuellement présents, du plus récent au plus ancien"""
+        return self.device_registry.devices(device_type)
 
-            # Garder seulement les 100 dernières entrées
-            history = history[-100:]
+    def get_network_rollups(self, resolution: str = '1h',
+                            start: Optional[Union[str, datetime]] = None,
+                            end: Optional[Union[str, datetime]] = None) -> List[Dict[str, Any]]:
+        """Agrégats par type de réseau et par SSID à la résolution '1m', '1h' ou '1d'"""
+        return self.stats_rollups.query(resolution, start=start, end=end)
 
-            # Sauvegarder
-            with open(self.stats_file, 'w') as f:
-                json.dump(history, f, indent=2)
+    def _save_stats(self, stats: Dict[str, Any]) -> None:
+        """Ajouter les statistiques d'un scan à l'historique"""
+        try:
+            self.stats_store.append(stats)
         except Exception as e:
-            warnings.warn(f"Erreur lors de la sauvegarde des stats: {str(e)}")
+            logger.warning("Erreur lors de la sauvegarde des stats: %s", e)
 
-    def get_network_stats(self) -> List[Dict[str, Any]]:
-        """Récupérer l'historique des statistiques"""
+    def get_network_stats(self, start: Optional[Union[str, datetime]] = None,
+                          end: Optional[Union[str, datetime]] = None,
+                          limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """Récupérer l'historique des statistiques, filtré par période et paginé"""
         try:
-            if os.path.exists(self.stats_file):
-                with open(self.stats_file, 'r') as f:
-                    return json.load(f)
+            return self.stats_store.query(start=start, end=end, limit=limit, offset=offset)
         except Exception as e:
-            warnings.warn(f"Erreur lors de la lecture des stats: {str(e)}")
+            logger.warning("Erreur lors de la lecture des stats: %s", e)
         return []
 
+    def _load_model(self) -> None:
+        """Charger le modèle local au premier usage; l'heuristique reste le repli"""
+        if self._model_loaded:
+            return
+        self._model_loaded = True
+        if not os.path.exists(self.model_path):
+            return
+        try:
+            from quality_model import QualityModel
+            self.model = QualityModel.load(self.model_path)
+            self.is_fallback_mode = False
+        except Exception as e:
+            logger.warning("Modèle %s inutilisable, mode dégradé: %s", self.model_path, e)
+
     def predict_network_quality(self, network_data: Dict[str, Any]) -> Dict[str, float]:
         """Prédire la qualité du réseau en utilisant soit le modèle AI soit l'heuristique"""
         try:
+            self._load_model()
             if not self.is_fallback_mode and self.model is not None:
-                import numpy as np
-                features = []
-                for net_type, info in network_data.items():
-                    if isinstance(info, dict) and 'signal' in info:
-                        signal = float(str(info['signal']).split()[0])
-                        quality = self._calculate_signal_quality(signal, net_type)
-                        features.append(quality)
-                    else:
-                        features.append(0.0)
-
-                prediction = self.model.predict(np.array([features]), verbose=0)
+                from quality_model import build_features
+                features = build_features(network_data, self._calculate_signal_quality)
+                prediction = self.model.predict(features[None, :])
                 return {
-                    "quality_score": float(prediction[0][0]),
+                    "quality_score": float(prediction[0]),
                     "reliability": 0.95
                 }
 
@@ -545,7 +819,7 @@ class NetworkAIPredictor:
             }
 
         except Exception as e:
-            print(f"Erreur lors de la prédiction: {str(e)}")
+            logger.error("Erreur lors de la prédiction: %s", e)
             return {
                 "quality_score": 0.0,
                 "reliability": 0.0
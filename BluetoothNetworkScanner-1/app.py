@@ -1,14 +1,11 @@
 import logging
 import os
 import socket
-import traceback
 from flask import Flask, render_template, jsonify
+from log_config import setup_logging
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configuration du logging asynchrone (lignes JSON, file bornée)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 logger.debug("Démarrage de l'application...")
@@ -32,7 +29,7 @@ try:
         try:
             return render_template('index.html')
         except Exception as e:
-            logger.error(f"Erreur lors du rendu du template: {str(e)}")
+            logger.error("Erreur lors du rendu du template: %s", e)
             return str(e), 500
 
     @app.route('/api/network_status')
@@ -53,7 +50,7 @@ try:
             }
             return jsonify(status)
         except Exception as e:
-            logger.error(f"Erreur lors de la génération du statut: {str(e)}")
+            logger.error("Erreur lors de la génération du statut: %s", e)
             return jsonify({'error': str(e)}), 500
 
     if __name__ == '__main__':
@@ -65,11 +62,9 @@ try:
                 debug=False  # Désactivé pour éviter les conflits
             )
         except Exception as e:
-            logger.error(f"Erreur au démarrage du serveur: {str(e)}")
-            logger.error(f"Traceback:\n{traceback.format_exc()}")
+            logger.exception("Erreur au démarrage du serveur: %s", e)
             raise
 
 except Exception as e:
-    logger.error(f"Erreur: {str(e)}")
-    logger.error(f"Traceback:\n{traceback.format_exc()}")
+    logger.exception("Erreur: %s", e)
     raise
\ No newline at end of file
@@ -0,0 +1,240 @@
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+# Codes des types de réseau dans les colonnes du scan
+TYPE_NAMES = ('wifi', 'bluetooth', 'lte', 'esim', 'unknown')
+WIFI, BLUETOOTH, LTE, ESIM, UNKNOWN = range(len(TYPE_NAMES))
+_TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
+
+# Signal utilisé par l'analyse détaillée quand l'appareil n'en fournit pas (dBm)
+_DEFAULT_SIGNAL = {WIFI: -100.0, BLUETOOTH: -90.0, LTE: -100.0, ESIM: -100.0, UNKNOWN: -100.0}
+
+# Libellés par tranche, du meilleur au moins bon (qualité > 0.8, > 0.6, > 0.4, sinon)
+QUALITY_CUTS = (0.8, 0.6, 0.4)
+LATENCY_LABELS = ("Excellente (<10ms)", "Bonne (10-30ms)", "Moyenne (30-50ms)", "Élevée (>50ms)")
+WIFI_STABILITY_LABELS = ('Excellente', 'Bonne', 'Moyenne', 'Faible')
+BANDWIDTH_LABELS = (">100 Mbps", "50-100 Mbps", "20-50 Mbps", "<20 Mbps")
+BLUETOOTH_STABILITY_LABELS = ("Très stable", "Stable", "Variable", "Instable")
+CELLULAR_STABILITY_LABELS = ("Excellente", "Bonne", "Moyenne", "Faible")
+
+# Libellés par tranche de signal brut (dBm)
+BLUETOOTH_RANGE_CUTS = (-60, -70, -80)
+BLUETOOTH_RANGE_LABELS = ("Excellente (>10m)", "Bonne (5-10m)", "Moyenne (2-5m)", "Faible (<2m)")
+COVERAGE_CUTS = (-70, -85, -100)
+COVERAGE_LABELS = ("Excellente", "Bonne", "Moyenne", "Faible")
+
+
+def parse_signal(value: Any) -> float:
+    """Convertir une valeur de signal ('-65', '-65 dBm', -65) en float"""
+    return float(str(value).split()[0])
+
+
+def signal_quality(signal: np.ndarray, excellent: np.ndarray, poor: np.ndarray) -> np.ndarray:
+    """Version vectorisée de NetworkAIPredictor._calculate_signal_quality"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        linear = (signal - poor) / (excellent - poor)
+    return np.where(signal >= excellent, 1.0, np.where(signal <= poor, 0.0, linear))
+
+
+def bucket(values: np.ndarray, cuts: Sequence[float]) -> np.ndarray:
+    """Indice de tranche (0 = meilleure) pour des seuils stricts décroissants"""
+    index = np.full(values.shape, len(cuts), dtype=np.int8)
+    for cut in cuts:
+        index -= values > cut
+    return index
+
+
+class ScanColumns:
+    """Scan décodé une seule fois en colonnes typées"""
+
+    def __init__(self, types: np.ndarray, signal: np.ndarray,
+                 has_signal: np.ndarray, encrypted: np.ndarray):
+        self.types = types
+        self.signal = signal
+        self.has_signal = has_signal
+        self.encrypted = encrypted
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    @classmethod
+    def from_devices(cls, predictor, devices: List[Dict[str, Any]]) -> 'ScanColumns':
+        types, signal, has_signal, encrypted = [], [], [], []
+        for device in devices:
+            code = _TYPE_CODES[predictor.classify_network(device)]
+            types.append(code)
+            if 'signal' in device:
+                signal.append(parse_signal(device['signal']))
+                has_signal.append(True)
+            else:
+                signal.append(_DEFAULT_SIGNAL[code])
+                has_signal.append(False)
+            encryption = device.get('encryption') if code == WIFI else None
+            encrypted.append(bool(encryption) and encryption.lower() != 'none')
+        return cls(np.array(types, dtype=np.int8),
+                   np.array(signal, dtype=np.float64),
+                   np.array(has_signal, dtype=bool),
+                   np.array(encrypted, dtype=bool))
+
+
+class BatchAnalyzer:
+    """Analyse d'un scan complet en une passe vectorisée.
+
+    Produit exactement les mêmes `detailed_analysis` et agrégats que
+    `NetworkAIPredictor._analyze_networks_scalar`, mais chaque signal n'est
+    décodé qu'une fois et les qualités/tranches sont calculées avec NumPy.
+    """
+
+    def __init__(self, predictor):
+        self.predictor = predictor
+        thresholds = [predictor.SIGNAL_THRESHOLDS.get(name, predictor.DEFAULT_SIGNAL_THRESHOLD)
+                      for name in TYPE_NAMES]
+        self._excellent = np.array([t['excellent'] for t in thresholds], dtype=np.float64)
+        self._poor = np.array([t['poor'] for t in thresholds], dtype=np.float64)
+        lte = predictor.SIGNAL_THRESHOLDS.get('lte', predictor.DEFAULT_SIGNAL_THRESHOLD)
+        self._lte_threshold = (float(lte['excellent']), float(lte['poor']))
+
+    def compute(self, columns: ScanColumns) -> Dict[str, np.ndarray]:
+        """Qualités et tranches de tous les appareils du scan"""
+        types, signal = columns.types, columns.signal
+        quality = signal_quality(signal, self._excellent[types], self._poor[types])
+        # La stabilité cellulaire est toujours évaluée avec les seuils LTE
+        lte_excellent, lte_poor = self._lte_threshold
+        cellular_quality = signal_quality(signal, lte_excellent, lte_poor)
+        return {
+            'quality': quality,
+            'quality_bucket': bucket(quality, QUALITY_CUTS),
+            'cellular_bucket': bucket(cellular_quality, QUALITY_CUTS),
+            'range_bucket': bucket(signal, BLUETOOTH_RANGE_CUTS),
+            'coverage_bucket': bucket(signal, COVERAGE_CUTS),
+        }
+
+    def build_analyses(self, devices: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Analyses détaillées (sans GPT ni agrégats) d'une liste d'appareils"""
+        columns = ScanColumns.from_devices(self.predictor, devices)
+        return self._build_analyses(devices, columns, self.compute(columns))
+
+    def analyze(self, devices: List[Dict[str, Any]], stats: Dict[str, Any]) -> None:
+        """Remplir `stats` (detailed_analysis et agrégats) pour tout le scan"""
+        columns = ScanColumns.from_devices(self.predictor, devices)
+        computed = self.compute(columns)
+
+        stats['detailed_analysis'].extend(self._build_analyses(devices, columns, computed))
+        if self.predictor.gpt_enabled:
+            self.predictor._add_gpt_analyses(stats['detailed_analysis'], devices, stats)
+
+        self._aggregate(columns, stats)
+
+    def _build_analyses(self, devices: List[Dict[str, Any]], columns: ScanColumns,
+                        computed: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        p = self.predictor
+        quality = computed['quality'].tolist()
+        quality_bucket = computed['quality_bucket'].tolist()
+        cellular_bucket = computed['cellular_bucket'].tolist()
+        range_bucket = computed['range_bucket'].tolist()
+        coverage_bucket = computed['coverage_bucket'].tolist()
+        bluetooth_rows = np.flatnonzero(columns.types == BLUETOOTH).tolist()
+        manufacturers = dict(zip(bluetooth_rows, p._detect_manufacturers(
+            [devices[i].get('address', '') for i in bluetooth_rows])))
+
+        analyses = []
+        for i, (device, code) in enumerate(zip(devices, columns.types.tolist())):
+            analysis = {
+                'type': TYPE_NAMES[code],
+                'details': {},
+                'risques': [],
+                'recommandations': [],
+                'historique_connexions': [],
+                'qualite_service': {},
+                'performances': {}
+            }
+            q, b = quality[i], quality_bucket[i]
+
+            if code == WIFI:
+                details = {
+                    'ssid': device.get('ssid', 'Unknown'),
+                    'security_level': p._evaluate_wifi_security(device),
+                    'signal_quality': q,
+                    'band': p._detect_wifi_band(device),
+                    'connection_stability': WIFI_STABILITY_LABELS[b]
+                }
+                if device.get('encryption'):
+                    details['encryption_details'] = {
+                        'type': device['encryption'],
+                        'strength': p._evaluate_encryption_strength(device['encryption'])
+                    }
+                analysis['details'] = details
+                analysis['performances'] = {
+                    'latence': LATENCY_LABELS[b],
+                    'stabilite': WIFI_STABILITY_LABELS[b],
+                    'interferences': p._detect_interference_level(device),
+                    'qualite_signal': q,
+                    'bande_passante_estimee': (f"{device['bandwidth']} Mbps" if 'bandwidth' in device
+                                               else BANDWIDTH_LABELS[b]),
+                    'congestion': p._evaluate_congestion(device)
+                }
+            elif code == BLUETOOTH:
+                analysis['details'] = {
+                    'device_class': p._detect_bluetooth_class(device),
+                    'pairing_status': device.get('paired', False),
+                    'signal_strength': q,
+                    'services': device.get('services', []),
+                    'manufacturer': manufacturers[i]
+                }
+                analysis['performances'] = {
+                    'portee_estimee': BLUETOOTH_RANGE_LABELS[range_bucket[i]],
+                    'stabilite_connexion': BLUETOOTH_STABILITY_LABELS[b],
+                    'qualite_signal': q,
+                    'interferences': p._detect_bluetooth_interference(device),
+                    'compatibilite': p._check_bluetooth_compatibility(device)
+                }
+            elif code in (LTE, ESIM):
+                latency = p._estimate_cellular_latency(device)
+                if 'signal_window' in device:
+                    # Fenêtre de mesures (cellular_sampler): centiles plutôt que la lecture
+                    stability = p._evaluate_cellular_stability(device)
+                    coverage = p._analyze_coverage(device)
+                else:
+                    stability = CELLULAR_STABILITY_LABELS[cellular_bucket[i]]
+                    coverage = COVERAGE_LABELS[coverage_bucket[i]]
+                analysis['details'] = {
+                    'operator': device.get('operator', 'Unknown'),
+                    'technology': device.get('technology', 'Unknown'),
+                    'signal_strength': q,
+                    'band': device.get('band', 'Unknown'),
+                    'roaming': device.get('roaming', False)
+                }
+                analysis['performances'] = {
+                    'force_signal': q,
+                    'latence_reseau': latency,
+                    'stabilite': stability,
+                    'qualite_service': {
+                        'latence': latency,
+                        'stabilite': stability,
+                        'couverture': coverage,
+                        'type_reseau': device.get('technology', 'Inconnu')
+                    },
+                    'couverture': coverage
+                }
+            analyses.append(analysis)
+        return analyses
+
+    def _aggregate(self, columns: ScanColumns, stats: Dict[str, Any]) -> None:
+        """Compteurs par type, signal moyen par type et statistiques de sécurité"""
+        counts = np.bincount(columns.types, minlength=len(TYPE_NAMES))
+        for code in np.flatnonzero(counts).tolist():
+            stats['network_types'][TYPE_NAMES[code]] += int(counts[code])
+
+        # Moyennes dans l'ordre de première apparition, comme le chemin scalaire
+        signal_types = columns.types[columns.has_signal]
+        signals = columns.signal[columns.has_signal]
+        codes, first_seen = np.unique(signal_types, return_index=True)
+        for code in codes[np.argsort(first_seen)].tolist():
+            values = signals[signal_types == code].tolist()
+            stats['average_signal'][TYPE_NAMES[code]] = sum(values) / len(values)
+
+        wifi = columns.types == WIFI
+        encrypted = int(np.count_nonzero(columns.encrypted & wifi))
+        stats['security_stats']['encrypted'] += encrypted
+        stats['security_stats']['open'] += int(np.count_nonzero(wifi)) - encrypted
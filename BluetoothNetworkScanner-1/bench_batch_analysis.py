@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+import random
+import argparse
+from typing import Any, Dict, List
+
+from ai_predictor import NetworkAIPredictor
+from batch_analysis import BatchAnalyzer
+
+
+def generate_devices(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Génère un scan synthétique mélangeant WiFi, Bluetooth et cellulaire"""
+    rng = random.Random(seed)
+    devices = []
+    for i in range(count):
+        roll = rng.random()
+        signal = f"{rng.randint(-105, -35)}"
+        if roll < 0.6:
+            devices.append({
+                'ssid': f'AP-{i}',
+                'signal': signal,
+                'encryption': rng.choice(['WPA2', 'WPA3', 'none']),
+                'frequency': rng.choice([2412, 5180]),
+            })
+        elif roll < 0.9:
+            devices.append({
+                'device_type': 'peripheral',
+                'signal': signal,
+                'address': f'AA:BB:CC:{i % 256:02X}:00:00',
+            })
+        else:
+            devices.append({
+                'operator': 'Op',
+                'technology': rng.choice(['LTE', '5G']),
+                'signal': signal,
+            })
+    return devices
+
+
+def _empty_stats(predictor: NetworkAIPredictor) -> Dict[str, Any]:
+    return {
+        'network_types': {t: 0 for t in predictor.network_types.keys()},
+        'average_signal': {},
+        'security_stats': {'encrypted': 0, 'open': 0},
+        'detailed_analysis': []
+    }
+
+
+def _time(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de l'analyse par lots")
+    parser.add_argument('sizes', nargs='*', type=int, default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--scalar-limit', type=int, default=100_000,
+                        help="taille maximale pour laquelle le chemin scalaire est mesuré")
+    args = parser.parse_args()
+
+    # Sans clé, aucun appel GPT n'a lieu pendant la mesure
+    os.environ.pop('OPENAI_API_KEY', None)
+    predictor = NetworkAIPredictor()
+    analyzer = BatchAnalyzer(predictor)
+
+    print(f"{'appareils':>10} {'scalaire (s)':>13} {'lots (s)':>10} {'gain':>6} {'µs/appareil':>12}")
+    for size in args.sizes:
+        devices = generate_devices(size)
+        batch = _time(analyzer.analyze, devices, _empty_stats(predictor))
+        if size <= args.scalar_limit:
+            scalar = _time(predictor._analyze_networks_scalar, devices, _empty_stats(predictor))
+            scalar_col, gain_col = f"{scalar:13.3f}", f"{scalar / batch:5.1f}x"
+        else:
+            scalar_col, gain_col = f"{'-':>13}", f"{'-':>6}"
+        print(f"{size:>10} {scalar_col} {batch:10.3f} {gain_col} {batch / size * 1e6:12.2f}")
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
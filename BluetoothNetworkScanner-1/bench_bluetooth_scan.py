@@ -0,0 +1,66 @@
+import time
+import random
+import argparse
+
+from bluetooth_scan import coalesce, parse_stream
+
+
+def generate_btmon_capture(advertisements: int, devices: int = 300, seed: int = 0) -> str:
+    """Capture `btmon` synthétique: annonces LE de `devices` appareils, ~20 par seconde chacun"""
+    rng = random.Random(seed)
+    population = []
+    for i in range(devices):
+        mac = f"{rng.getrandbits(48):012X}"
+        population.append((':'.join(mac[j:j + 2] for j in range(0, 12, 2)), f"Appareil-{i}",
+                           rng.randint(-95, -40), rng.random() < 0.3))
+    out = ['Bluetooth monitor ver 5.66\n']
+    clock = 1.0
+    for n in range(advertisements):
+        clock += rng.expovariate(20.0 * devices)
+        address, name, level, named = rng.choice(population)
+        out.append(f"> HCI Event: LE Meta Event (0x3e) plen 43{' ' * 26}#{n + 2} [hci0] {clock:.6f}\n")
+        out.append("      LE Advertising Report (0x02)\n")
+        out.append("        Num reports: 1\n")
+        out.append("        Event type: Connectable undirected - ADV_IND (0x00)\n")
+        out.append("        Address type: Public (0x00)\n")
+        out.append(f"        Address: {address} (OUI)\n")
+        out.append("        Data length: 31\n")
+        out.append("        Flags: 0x06\n")
+        out.append("          LE General Discoverable Mode\n")
+        if named:
+            out.append(f"        Name (complete): {name}\n")
+            out.append("        16-bit Service UUIDs (complete): 1 entry\n")
+            out.append("          Battery Service (0x180f)\n")
+        out.append(f"        RSSI: {level + rng.randint(-6, 6)} dBm (0x00)\n")
+    return ''.join(out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de l'analyse et du regroupement des annonces btmon")
+    parser.add_argument('--advertisements', type=int, default=100_000)
+    parser.add_argument('--devices', type=int, default=300)
+    parser.add_argument('--window', type=float, default=1.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    capture = generate_btmon_capture(args.advertisements, args.devices)
+    lines = capture.splitlines(True)
+    print(f"capture: {args.advertisements} annonces, {len(lines)} lignes, {len(capture) / 1024:.0f} Kio")
+
+    best_parse = best_total = float('inf')
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        observations = list(parse_stream(lines))
+        best_parse = min(best_parse, time.perf_counter() - start)
+        start = time.perf_counter()
+        records = list(coalesce(parse_stream(lines), args.window))
+        best_total = min(best_total, time.perf_counter() - start)
+    assert len(observations) == args.advertisements
+    assert sum(record['advertisements'] for record in records) == args.advertisements
+    print(f"analyse: {best_parse * 1e3:.1f} ms ({args.advertisements / best_parse / 1e3:.0f} k annonces/s)")
+    print(f"analyse + regroupement ({args.window:g} s): {best_total * 1e3:.1f} ms, "
+          f"{len(records)} enregistrements ({args.advertisements / len(records):.1f} annonces/enregistrement)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import os
+import time
+import random
+import argparse
+import tempfile
+
+import numpy as np
+
+from oui_index import OUIIndex, build_index, parse_macs
+
+
+def generate_registry(seed: int = 0):
+    """Registre synthétique de la taille du registre IEEE (~38k MA-L, ~6k MA-M/MA-S)"""
+    rng = random.Random(seed)
+    entries = {}
+    for bits, count in ((24, 38_000), (28, 6_000), (36, 6_500)):
+        for _ in range(count):
+            # Préfixes universellement administrés (bit U/L à zéro)
+            prefix = rng.getrandbits(bits) & ~(0x02 << (bits - 8))
+            entries.setdefault((bits, prefix), f'Organisation {rng.randrange(30_000)}')
+    return entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de l'index OUI mappé en mémoire")
+    parser.add_argument('--addresses', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'oui.bin')
+        start = time.perf_counter()
+        build_index(generate_registry(), path)
+        print(f"construction: {time.perf_counter() - start:.2f} s, {os.path.getsize(path) / 1024:.0f} Kio")
+
+        start = time.perf_counter()
+        index = OUIIndex(path)
+        print(f"ouverture: {(time.perf_counter() - start) * 1e3:.3f} ms ({len(index)} préfixes)")
+
+        rng = np.random.default_rng(0)
+        values = rng.integers(0, 1 << 48, args.addresses, dtype=np.uint64)
+        macs = [':'.join(f'{v:012x}'[i:i + 2] for i in range(0, 12, 2)) for v in values[:100_000].tolist()]
+
+        start = time.perf_counter()
+        for mac in macs:
+            index.lookup(mac)
+        single = time.perf_counter() - start
+        print(f"unitaire: {len(macs) / single / 1e3:.0f} k adresses/s")
+
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            index.lookup_many(values)
+            best = min(best, time.perf_counter() - start)
+        print(f"lot (entiers): {args.addresses / best / 1e6:.1f} M adresses/s")
+
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            parsed, _ = parse_macs(macs)
+            index.lookup_many(parsed)
+            best = min(best, time.perf_counter() - start)
+        print(f"lot (texte): {len(macs) / best / 1e6:.1f} M adresses/s")
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+import time
+import argparse
+
+import numpy as np
+
+from quality_model import QualityModel, FEATURE_NAMES
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark d'inférence du modèle local de qualité")
+    parser.add_argument('sizes', nargs='*', type=int, default=[1, 1_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    model = QualityModel(rng.normal(size=len(FEATURE_NAMES)), 0.1)
+
+    print(f"{'échantillons':>12} {'lot (ms)':>10} {'µs/échantillon':>15}")
+    for size in args.sizes:
+        features = rng.random((size, len(FEATURE_NAMES)))
+        model.predict(features)
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            model.predict(features)
+            best = min(best, time.perf_counter() - start)
+        print(f"{size:>12} {best * 1e3:10.3f} {best / size * 1e6:15.4f}")
+
+
+if __name__ == '__main__':
+    main()
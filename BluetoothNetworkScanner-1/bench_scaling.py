@@ -0,0 +1,170 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from synthetic_env import PRESETS, generate_environment
+
+# Métriques de durée (comparées à la référence); les autres sont informatives
+TIMING_METRICS = (
+    'analyze_networks_s', 'save_stats_s',
+    'status_cold_ms', 'status_warm_ms', 'wifi_warm_ms', 'wifi_304_ms', 'wifi_topk_ms',
+)
+MEMORY_METRICS = ('analyze_peak_mb',)
+
+
+def _median_ms(call: Callable[[], Any], repeat: int) -> float:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        durations.append(time.perf_counter() - start)
+    return round(statistics.median(durations) * 1e3, 3)
+
+
+def run_scale(aps: int, ble: int, cells: int, workdir: str, seed: int = 0,
+              repeat: int = 20, memory: bool = True) -> Dict[str, Any]:
+    """Mesures d'un environnement synthétique: analyse, historique, API et mémoire"""
+    import server
+    from ai_predictor import NetworkAIPredictor
+    from wifi_scan import write_results
+
+    os.environ.pop('OPENAI_API_KEY', None)
+    os.makedirs(workdir, exist_ok=True)
+    env = generate_environment(aps, ble, cells, seed)
+    devices = env['devices']
+    metrics: Dict[str, float] = {}
+
+    predictor = NetworkAIPredictor()
+    predictor.stats_file = os.path.join(workdir, 'network_stats.json')
+    # Premier appel hors mesure: imports paresseux et ouverture des bases
+    predictor.analyze_networks(devices[:1])
+    start = time.perf_counter()
+    stats = predictor.analyze_networks(devices)
+    metrics['analyze_networks_s'] = round(time.perf_counter() - start, 4)
+    start = time.perf_counter()
+    predictor._save_stats(stats)
+    metrics['save_stats_s'] = round(time.perf_counter() - start, 4)
+
+    if memory:
+        tracemalloc.start()
+        predictor.analyze_networks(devices)
+        metrics['analyze_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+        tracemalloc.stop()
+
+    results_file = os.path.join(workdir, 'wifi_results.json')
+    write_results(env['wifi_results'], results_file)
+    server.WIFI_RESULTS_FILE = results_file
+    client = server.app.test_client()
+    metrics['status_cold_ms'] = _median_ms(lambda: client.get('/api/network_status'), 1)
+    metrics['status_warm_ms'] = _median_ms(lambda: client.get('/api/network_status'), repeat)
+    metrics['wifi_warm_ms'] = _median_ms(lambda: client.get('/api/wifi'), repeat)
+    etag = client.get('/api/wifi').headers.get('ETag', '')
+    metrics['wifi_304_ms'] = _median_ms(lambda: client.get('/api/wifi', headers={'If-None-Match': etag}), repeat)
+    metrics['wifi_topk_ms'] = _median_ms(lambda: client.get('/api/wifi?sort=-rssi&limit=20'), repeat)
+
+    return {
+        'aps': aps,
+        'ble': ble,
+        'cells': cells,
+        'devices': len(devices),
+        'metrics': metrics,
+    }
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25,
+            min_delta_ms: float = 1.0) -> List[str]:
+    """Régressions de `current` par rapport à `baseline` (mêmes environnements).
+
+    Une durée est en régression si elle dépasse la référence de plus de
+    `tolerance` (en proportion) et de plus de `min_delta_ms`, pour ignorer
+    le bruit des mesures très courtes.
+    """
+    reference = {entry['env']: entry['metrics'] for entry in baseline.get('results', [])}
+    regressions = []
+    for entry in current.get('results', []):
+        previous = reference.get(entry['env'])
+        if previous is None:
+            continue
+        for name in TIMING_METRICS + MEMORY_METRICS:
+            if name not in previous or name not in entry['metrics']:
+                continue
+            old, new = previous[name], entry['metrics'][name]
+            delta_ms = (new - old) * (1e3 if name.endswith('_s') else 1)
+            if name in TIMING_METRICS and delta_ms <= min_delta_ms:
+                continue
+            if new > old * (1 + tolerance):
+                regressions.append(f"{entry['env']}/{name}: {old} -> {new} (+{(new / old - 1) * 100:.0f}%)"
+                                   if old else f"{entry['env']}/{name}: {old} -> {new}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de montée en charge sur environnements synthétiques")
+    parser.add_argument('--envs', default='maison,bureau,entrepot,stade',
+                        help=f"environnements à mesurer parmi {', '.join(PRESETS)}")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=20, help="requêtes par mesure de latence")
+    parser.add_argument('--no-memory', action='store_true', help="ne pas mesurer le pic mémoire (tracemalloc)")
+    parser.add_argument('-o', '--output', default='bench_scaling.json')
+    parser.add_argument('--compare', help="résultats de référence; code de sortie 1 en cas de régression")
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    envs = [name.strip() for name in args.envs.split(',') if name.strip()]
+    unknown = [name for name in envs if name not in PRESETS]
+    if unknown:
+        parser.error(f"environnement inconnu: {', '.join(unknown)}")
+
+    report = {
+        'meta': {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'commit': _commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+        },
+        'results': [],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in envs:
+            entry = run_scale(*PRESETS[name], workdir=os.path.join(tmp, name), seed=args.seed,
+                              repeat=args.repeat, memory=not args.no_memory)
+            entry = dict(env=name, **entry)
+            report['results'].append(entry)
+            print(f"{name:>9} ({entry['devices']} appareils): "
+                  + ', '.join(f"{key}={value}" for key, value in entry['metrics'].items()))
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"résultats écrits dans {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"RÉGRESSION {line}")
+        if regressions:
+            return 1
+        print("aucune régression")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
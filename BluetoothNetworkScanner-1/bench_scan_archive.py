@@ -0,0 +1,59 @@
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+from scan_archive import ArchiveReader, ArchiveWriter
+
+
+def generate_history(snapshots: int, aps: int, seed: int = 0):
+    """Scans successifs d'un même site: mêmes SSID/BSSID, signal variable"""
+    rng = random.Random(seed)
+    sites = [{'ssid': f'Bureau-{i % 40}', 'bssid': ':'.join(f'{rng.randrange(256):02X}' for _ in range(6)),
+              'encryption': rng.choice(['WPA2', 'WPA3', 'none']), 'frequency': rng.choice([2437, 5180]),
+              'channel': rng.choice([1, 6, 11, 36])} for i in range(aps)]
+    start = datetime(2024, 1, 1)
+    for n in range(snapshots):
+        devices = [dict(site, signal=float(rng.randint(-90, -35))) for site in sites if rng.random() < 0.9]
+        yield (start + timedelta(seconds=30 * n)).isoformat(), devices
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de l'archive binaire des scans")
+    parser.add_argument('--snapshots', type=int, default=5000)
+    parser.add_argument('--aps', type=int, default=50)
+    args = parser.parse_args()
+
+    history = list(generate_history(args.snapshots, args.aps))
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'history.json')
+        archive_path = os.path.join(tmp, 'history.scna')
+
+        start = time.perf_counter()
+        with open(json_path, 'w') as f:
+            json.dump([{'timestamp': ts, 'devices': devices} for ts, devices in history], f)
+        print(f"JSON: {os.path.getsize(json_path) / 1e6:.1f} Mo, écriture {time.perf_counter() - start:.2f} s")
+
+        start = time.perf_counter()
+        with ArchiveWriter(archive_path) as writer:
+            for timestamp, devices in history:
+                writer.append(timestamp, devices)
+        print(f"archive: {os.path.getsize(archive_path) / 1e6:.1f} Mo, écriture {time.perf_counter() - start:.2f} s")
+
+        start = time.perf_counter()
+        with open(json_path) as f:
+            data = json.load(f)
+        window = [s for s in data if '2024-01-01T12:00' <= s['timestamp'] < '2024-01-01T13:00']
+        print(f"JSON, une heure: {(time.perf_counter() - start) * 1e3:.0f} ms ({len(window)} instantanés)")
+
+        start = time.perf_counter()
+        with ArchiveReader(archive_path) as reader:
+            window = list(reader.replay('2024-01-01T12:00:00', '2024-01-01T12:59:59.999'))
+        print(f"archive, une heure: {(time.perf_counter() - start) * 1e3:.0f} ms ({len(window)} instantanés)")
+
+
+if __name__ == '__main__':
+    main()
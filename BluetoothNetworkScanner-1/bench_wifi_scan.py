@@ -0,0 +1,62 @@
+import os
+import time
+import random
+import argparse
+import tempfile
+
+from wifi_scan import parse_scan, write_results
+
+
+def generate_iwlist_capture(cells: int, seed: int = 0) -> str:
+    """Capture `iwlist scan` synthétique d'un site dense"""
+    rng = random.Random(seed)
+    out = ['wlan0     Scan completed :\n']
+    for i in range(1, cells + 1):
+        channel = rng.choice([1, 6, 11, 36, 40, 44, 149])
+        mhz = 2407 + 5 * channel if channel <= 14 else 5000 + 5 * channel
+        secured = rng.random() < 0.85
+        mac = f"{rng.getrandbits(48):012X}"
+        out.append(f"          Cell {i:02d} - Address: {':'.join(mac[j:j + 2] for j in range(0, 12, 2))}\n")
+        out.append(f"                    Channel:{channel}\n")
+        out.append(f"                    Frequency:{mhz / 1000:g} GHz (Channel {channel})\n")
+        level = rng.randint(-95, -35)
+        out.append(f"                    Quality={min(70, level + 110)}/70  Signal level={level} dBm  \n")
+        out.append(f"                    Encryption key:{'on' if secured else 'off'}\n")
+        out.append(f'                    ESSID:"AP-{i}"\n')
+        out.append("                    Bit Rates:1 Mb/s; 2 Mb/s; 5.5 Mb/s; 11 Mb/s; 6 Mb/s\n")
+        out.append("                    Mode:Master\n")
+        out.append("                    Extra: Last beacon: 100ms ago\n")
+        if secured:
+            out.append("                    IE: IEEE 802.11i/WPA2 Version 1\n")
+            out.append("                        Group Cipher : CCMP\n")
+            out.append("                        Pairwise Ciphers (1) : CCMP\n")
+            out.append(f"                        Authentication Suites (1) : {rng.choice(['PSK', 'SAE'])}\n")
+    return ''.join(out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de l'analyse des captures iwlist")
+    parser.add_argument('--cells', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    capture = generate_iwlist_capture(args.cells)
+    lines = capture.splitlines(True)
+    print(f"capture: {args.cells} cellules, {len(lines)} lignes, {len(capture) / 1024:.0f} Kio")
+
+    best = float('inf')
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        records = list(parse_scan(lines))
+        best = min(best, time.perf_counter() - start)
+    assert len(records) == args.cells
+    print(f"analyse: {best * 1e3:.1f} ms ({args.cells / best / 1e3:.0f} k cellules/s)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        write_results(records, os.path.join(tmp, 'wifi_results.json'))
+        print(f"écriture atomique: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -19,7 +19,8 @@ send_notification() {
             log_bluetooth "${JAUNE}Aucun numéro de téléphone configuré pour les notifications${NEUTRE}"
             return
         fi
-        python3 notify.py "$device_info" "${NOTIFICATION_PHONE}"
+        # Le démon regroupe les envois; à défaut, envoi direct
+        enqueue_notification bluetooth "$device_info" || python3 notify.py "$device_info" "${NOTIFICATION_PHONE}"
     fi
 }
 
@@ -77,6 +78,23 @@ EOF
     else
         # Mode réel - lecture des périphériques Bluetooth
         log_bluetooth "${VERT}Scan des périphériques Bluetooth...${NEUTRE}"
+        if command -v bluetoothctl >/dev/null 2>&1; then
+            # Annonces regroupées par appareil (RSSI min/max/moyen) et écriture
+            # atomique de bluetooth_results.json en un seul processus
+            local scan_summary
+            if scan_summary=$(bluetoothctl --timeout "${SCAN_TIMEOUT:-10}" scan on 2>/dev/null \
+                              | python3 bluetooth_scan.py - --format bluetoothctl --summary \
+                                        -o "${INSTALL_DIR}/bluetooth_results.json") \
+               && [ -n "$scan_summary" ]; then
+                while IFS= read -r device_info; do
+                    echo -e "  ${device_info}"
+                    log_bluetooth "Appareil détecté - ${device_info}"
+                    send_notification "${device_info}"
+                done <<< "$scan_summary"
+                return 0
+            fi
+            log_bluetooth "${ROUGE}Aucun appareil analysé via bluetoothctl, lecture de /sys/class/bluetooth${NEUTRE}"
+        fi
         for dev in /sys/class/bluetooth/*; do
             if [ -d "$dev" ]; then
                 device_info="Périphérique: $(basename $dev)"
@@ -0,0 +1,421 @@
+import os
+import re
+import sys
+import json
+import argparse
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+
+from wifi_scan import write_results
+
+DEFAULT_RESULTS_FILE = os.path.join(os.path.expanduser('~/.network_detect'), 'bluetooth_results.json')
+
+# Fenêtre de regroupement par défaut des annonces d'un même appareil (secondes)
+DEFAULT_WINDOW = 1.0
+
+# Classe majeure (bits 8-12 du Class of Device); les libellés contiennent les
+# mots-clés reconnus par NetworkAIPredictor._detect_bluetooth_class
+MAJOR_CLASSES = {
+    0: 'misc', 1: 'computer', 2: 'phone', 3: 'network', 4: 'audio-video',
+    5: 'peripheral', 6: 'imaging', 7: 'wearable', 8: 'toy', 9: 'health',
+}
+# Suffixe de l'UUID de base Bluetooth: 0000xxxx-0000-1000-8000-00805f9b34fb -> 0xxxxx
+_BASE_UUID_SUFFIX = '-0000-1000-8000-00805f9b34fb'
+
+_MAC = r'([0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5})'
+_BT_DEVICE = re.compile(r'Device ' + _MAC + r'(?: (.*))?')
+_BT_RSSI = re.compile(r'(?:\(|^)(-?\d+)\)?$')
+_MAC_START = re.compile(_MAC + r'(?:\s+(.*))?$')
+_ANSI = re.compile(r'\x1b\[[0-9;]*m|\x01|\x02')
+# btmon signale 127 dBm quand le contrôleur ne fournit pas le RSSI
+_RSSI_UNAVAILABLE = 127.0
+
+
+def class_name(class_of_device: int) -> str:
+    """Libellé de la classe majeure d'un Class of Device (ex. 0x240404 -> 'audio-video')"""
+    return MAJOR_CLASSES.get((class_of_device >> 8) & 0x1f, 'uncategorized')
+
+
+def short_uuid(value: str) -> str:
+    """UUID de service normalisé: forme courte '0x110b' pour les UUID de la base
+    Bluetooth, UUID 128 bits en minuscules sinon. Accepte 'Audio Sink (0x110b)'"""
+    value = value.strip().lower()
+    if value.endswith(')') and '(' in value:
+        value = value[value.rindex('(') + 1:-1].strip()
+    if value.startswith('0x'):
+        return f"0x{int(value, 16):04x}"
+    if len(value) == 36 and value.startswith('0000') and value.endswith(_BASE_UUID_SUFFIX):
+        return '0x' + value[4:8]
+    return value
+
+
+def _new_observation(address: str, time: Optional[float] = None,
+                     advertisement: bool = True) -> Dict[str, Any]:
+    return {'address': address.upper(), 'time': time, 'advertisement': advertisement}
+
+
+def _add_service(observation: Dict[str, Any], value: str) -> None:
+    try:
+        uuid = short_uuid(value)
+    except ValueError:
+        return
+    services = observation.setdefault('services', [])
+    if uuid not in services:
+        services.append(uuid)
+
+
+def parse_bluetoothctl(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Analyse en flux de `bluetoothctl scan on` ([NEW]/[CHG] Device ...).
+
+    bluetoothctl n'horodate pas ses lignes: les observations ont un temps None.
+    Les lignes [NEW] et RSSI correspondent à une annonce reçue, les autres
+    (Name, Class, Icon, UUIDs, Paired) complètent seulement l'appareil.
+    """
+    for raw in lines:
+        position = raw.find('Device ')
+        if position < 0:
+            continue
+        if '\x1b' in raw:
+            raw = _ANSI.sub('', raw)
+            position = raw.find('Device ')
+        match = _BT_DEVICE.match(raw, position)
+        if not match:
+            continue
+        head = raw[:position]
+        if '[DEL]' in head:
+            continue
+        address, rest = match.group(1), (match.group(2) or '').strip()
+        if '[CHG]' not in head:
+            # [NEW] Device <adresse> <nom>, ou liste `bluetoothctl devices`
+            observation = _new_observation(address, advertisement='[NEW]' in head)
+            if rest and rest.replace('-', ':').upper() != address.upper():
+                observation['name'] = rest
+            yield observation
+            continue
+        key, _, value = rest.partition(': ')
+        if key == 'RSSI':
+            # "RSSI: -60" ou, selon la version de BlueZ, "RSSI: 0xffffffc4 (-60)"
+            rssi = _BT_RSSI.search(value.strip())
+            if not rssi:
+                continue
+            observation = _new_observation(address)
+            observation['rssi'] = float(rssi.group(1))
+        elif key in ('Name', 'Alias'):
+            if not value or value.replace('-', ':').upper() == address.upper():
+                continue
+            observation = _new_observation(address, advertisement=False)
+            observation['name'] = value
+        elif key == 'Class':
+            observation = _new_observation(address, advertisement=False)
+            try:
+                observation['class_of_device'] = int(value, 16)
+            except ValueError:
+                continue
+        elif key == 'Icon':
+            observation = _new_observation(address, advertisement=False)
+            observation['icon'] = value
+        elif key == 'UUIDs':
+            observation = _new_observation(address, advertisement=False)
+            _add_service(observation, value.split()[0] if value else '')
+            if 'services' not in observation:
+                continue
+        elif key == 'Paired':
+            observation = _new_observation(address, advertisement=False)
+            observation['paired'] = value.strip() == 'yes'
+        else:
+            continue
+        yield observation
+
+
+def parse_hcitool(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Analyse en flux de `hcitool lescan` / `hcitool scan` (une annonce par ligne, sans RSSI)"""
+    for raw in lines:
+        match = _MAC_START.match(raw.strip())
+        if not match:
+            continue
+        observation = _new_observation(match.group(1))
+        name = (match.group(2) or '').strip()
+        if name and name != '(unknown)':
+            observation['name'] = name
+        yield observation
+
+
+def _header_time(line: str) -> Optional[float]:
+    """Horodatage en fin d'en-tête btmon: secondes depuis le début (défaut) ou
+    heure du jour avec `btmon -t` (HH:MM:SS.ffffff)"""
+    token = line.rstrip().rpartition(' ')[2]
+    try:
+        if ':' in token:
+            hours, minutes, seconds = token.split(':')
+            return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+        return float(token)
+    except ValueError:
+        return None
+
+
+def parse_btmon(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Analyse en flux de `btmon`: rapports LE Advertising (classiques et
+    étendus) et résultats d'inquiry, une observation par rapport.
+
+    Un paquet commence par une ligne non indentée ('> HCI Event: ...'); chaque
+    ligne 'Address:' ouvre un nouveau rapport (un événement peut en contenir
+    plusieurs), clos au rapport suivant ou au paquet suivant.
+    """
+    observation = None
+    in_event = False
+    time = None
+    services_indent = -1
+    for raw in lines:
+        first = raw[:1]
+        if first != ' ' and first != '\t':
+            if observation is not None:
+                yield observation
+                observation = None
+            in_event = raw.startswith('> HCI Event')
+            if in_event:
+                time = _header_time(raw)
+            services_indent = -1
+            continue
+        if not in_event:
+            continue
+        line = raw.strip()
+        if services_indent >= 0:
+            if len(raw) - len(raw.lstrip()) > services_indent:
+                if observation is not None:
+                    _add_service(observation, line)
+                continue
+            services_indent = -1
+        if line.startswith('Address: '):
+            if observation is not None:
+                yield observation
+            observation = _new_observation(line[9:26], time)
+        elif observation is None:
+            continue
+        elif line.startswith('RSSI: '):
+            rssi = float(line[6:].split(None, 1)[0])
+            if rssi != _RSSI_UNAVAILABLE:
+                observation['rssi'] = rssi
+        elif line.startswith('Name ('):
+            observation['name'] = line.partition(': ')[2]
+        elif line.startswith('Class: '):
+            try:
+                observation['class_of_device'] = int(line[7:].split(None, 1)[0], 16)
+            except ValueError:
+                pass
+        elif 'Service UUIDs' in line:
+            services_indent = len(raw) - len(raw.lstrip())
+    if observation is not None:
+        yield observation
+
+
+def parse_stream(lines: Iterable[str], fmt: str = 'auto') -> Iterator[Dict[str, Any]]:
+    """Analyse d'une sortie bluetoothctl, hcitool ou btmon, format détecté sur la première ligne utile"""
+    lines = iter(lines)
+    if fmt == 'auto':
+        head = []
+        for line in lines:
+            head.append(line)
+            if line.startswith(('Bluetooth monitor', '> HCI', '< HCI', '@ MGMT', '= ')):
+                fmt = 'btmon'
+                break
+            if 'Device ' in line or 'Discovery started' in line or 'Controller ' in line:
+                fmt = 'bluetoothctl'
+                break
+            stripped = line.strip()
+            if stripped.startswith(('LE Scan', 'Scanning')) or _MAC_START.match(stripped):
+                fmt = 'hcitool'
+                break
+        lines = _chain(head, lines)
+    parser = {'btmon': parse_btmon, 'hcitool': parse_hcitool}.get(fmt, parse_bluetoothctl)
+    return parser(lines)
+
+
+def _chain(head: List[str], rest: Iterator[str]) -> Iterator[str]:
+    yield from head
+    yield from rest
+
+
+class _Window:
+    """Annonces d'un appareil regroupées dans une fenêtre"""
+
+    __slots__ = ('address', 'first', 'last', 'count', 'rssi_sum', 'rssi_count', 'rssi_min', 'rssi_max')
+
+    def __init__(self, address: str, time: Optional[float]):
+        self.address = address
+        self.first = self.last = time
+        self.count = 0
+        self.rssi_sum = 0.0
+        self.rssi_count = 0
+        self.rssi_min = self.rssi_max = None
+
+
+class Coalescer:
+    """Regroupement des annonces répétées d'un même appareil.
+
+    Les observations d'une adresse reçues moins de `window` secondes après la
+    première de sa fenêtre forment un seul enregistrement (RSSI min/max/moyen,
+    nombre d'annonces). Une fenêtre est émise dès qu'une observation plus
+    récente la dépasse: les fenêtres ouvertes sont rangées par date
+    d'ouverture, l'expiration ne parcourt que la tête. `window=None` regroupe
+    toute la capture par appareil.
+
+    Le temps d'une observation est celui de la capture; à défaut, `clock()`
+    (par exemple time.monotonic pour un flux en direct) s'il est fourni. Nom,
+    classe et services connus d'un appareil sont conservés d'une fenêtre à
+    l'autre: bluetoothctl ne les répète pas.
+    """
+
+    def __init__(self, window: Optional[float] = DEFAULT_WINDOW,
+                 clock: Optional[Callable[[], float]] = None):
+        self.window = window
+        self.clock = clock
+        self._open: Dict[str, _Window] = {}
+        self._known: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, observation: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Ajouter une observation; retourne les enregistrements des fenêtres closes"""
+        time = observation.get('time')
+        if time is None and self.clock is not None:
+            time = self.clock()
+        closed = self.expire(time) if time is not None else []
+
+        address = observation['address']
+        attributes = {key: value for key, value in observation.items()
+                      if key not in ('address', 'time', 'advertisement', 'rssi')}
+        if attributes:
+            known = self._known.setdefault(address, {})
+            services = attributes.pop('services', None)
+            known.update(attributes)
+            if services:
+                merged = known.setdefault('services', [])
+                merged.extend(uuid for uuid in services if uuid not in merged)
+
+        window = self._open.get(address)
+        if window is None:
+            window = self._open[address] = _Window(address, time)
+        elif time is not None:
+            window.last = time
+        if observation.get('advertisement', True):
+            window.count += 1
+        rssi = observation.get('rssi')
+        if rssi is not None:
+            window.rssi_sum += rssi
+            window.rssi_count += 1
+            if window.rssi_min is None or rssi < window.rssi_min:
+                window.rssi_min = rssi
+            if window.rssi_max is None or rssi > window.rssi_max:
+                window.rssi_max = rssi
+        return closed
+
+    def expire(self, now: float) -> List[Dict[str, Any]]:
+        """Émettre les fenêtres ouvertes depuis au moins `window` secondes"""
+        if self.window is None:
+            return []
+        closed = []
+        for window in self._open.values():
+            if window.first is None or window.first + self.window > now:
+                break
+            closed.append(window)
+        for window in closed:
+            del self._open[window.address]
+        return [self._record(window) for window in closed]
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Émettre toutes les fenêtres ouvertes (fin de capture)"""
+        records = [self._record(window) for window in self._open.values()]
+        self._open.clear()
+        return records
+
+    def _record(self, window: _Window) -> Dict[str, Any]:
+        """Enregistrement au format d'appareil de NetworkAIPredictor
+        (_analyze_bluetooth_device): signal = RSSI moyen de la fenêtre"""
+        record: Dict[str, Any] = {'device_type': 'bluetooth', 'address': window.address}
+        known = self._known.get(window.address)
+        if known:
+            if 'name' in known:
+                record['name'] = known['name']
+            if 'class_of_device' in known:
+                record['class'] = class_name(known['class_of_device'])
+                record['class_of_device'] = known['class_of_device']
+            elif 'icon' in known:
+                record['class'] = known['icon']
+            if 'services' in known:
+                record['services'] = list(known['services'])
+            if 'paired' in known:
+                record['paired'] = known['paired']
+        if window.rssi_count:
+            mean = round(window.rssi_sum / window.rssi_count, 1)
+            record['signal'] = mean
+            record['rssi_min'] = window.rssi_min
+            record['rssi_max'] = window.rssi_max
+            record['rssi_mean'] = mean
+        record['advertisements'] = window.count
+        if window.first is not None:
+            record['first_seen'] = window.first
+            record['last_seen'] = window.last
+        return record
+
+
+def coalesce(observations: Iterable[Dict[str, Any]], window: Optional[float] = DEFAULT_WINDOW,
+             clock: Optional[Callable[[], float]] = None) -> Iterator[Dict[str, Any]]:
+    """Enregistrements regroupés, émis au fil de la fermeture des fenêtres"""
+    coalescer = Coalescer(window, clock)
+    for observation in observations:
+        yield from coalescer.add(observation)
+    yield from coalescer.flush()
+
+
+def summary_line(record: Dict[str, Any]) -> str:
+    """Résumé d'un appareil sur une ligne, champs séparés par '\\n' littéraux (pour echo -e)"""
+    parts = [f"Adresse MAC : {record['address']}"]
+    if 'name' in record:
+        parts.append(f"Nom : {record['name']}")
+    if 'signal' in record:
+        parts.append(f"Signal : {record['signal']:g} dBm ({record['rssi_min']:g} à {record['rssi_max']:g})")
+    if 'class' in record:
+        parts.append(f"Classe : {record['class']}")
+    parts.append(f"Annonces : {record['advertisements']}")
+    return '\\n'.join(part.replace('\\', '\\\\').replace('\n', ' ') for part in parts)
+
+
+def main(argv: Optional[List[str]] = None, stdin: Optional[TextIO] = None,
+         stdout: Optional[TextIO] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Analyse de la sortie de bluetoothctl/hcitool/btmon et regroupement des annonces")
+    parser.add_argument('input', nargs='?', default='-', help="capture à analyser ('-' pour l'entrée standard)")
+    parser.add_argument('--format', choices=('auto', 'bluetoothctl', 'hcitool', 'btmon'), default='auto')
+    parser.add_argument('--window', type=float,
+                        help="fenêtre de regroupement en secondes (défaut: un enregistrement par appareil)")
+    parser.add_argument('-o', '--output', default=DEFAULT_RESULTS_FILE)
+    parser.add_argument('--ndjson', action='store_true',
+                        help="écrire chaque enregistrement sur la sortie standard dès la fermeture de sa fenêtre")
+    parser.add_argument('--summary', action='store_true', help="afficher un résumé par appareil")
+    args = parser.parse_args(argv)
+    stdout = stdout or sys.stdout
+
+    def run(lines: Iterable[str], clock: Optional[Callable[[], float]]) -> List[Dict[str, Any]]:
+        records = []
+        for record in coalesce(parse_stream(lines, args.format), args.window, clock):
+            if args.ndjson:
+                stdout.write(json.dumps(record, ensure_ascii=False) + '\n')
+                stdout.flush()
+            else:
+                records.append(record)
+        return records
+
+    if args.input == '-':
+        import time
+        # Flux en direct: horloge locale pour les lignes non horodatées (bluetoothctl, hcitool)
+        records = run(stdin or sys.stdin, time.monotonic if args.window is not None else None)
+    else:
+        with open(args.input, encoding='utf-8', errors='replace') as f:
+            records = run(f, None)
+    if args.ndjson:
+        return 0
+    write_results(records, args.output)
+    if args.summary:
+        stdout.writelines(summary_line(record) + '\n' for record in records)
+    return 0 if records else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,297 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import subprocess
+from array import array
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bornes des histogrammes par mesure (dBm pour RSSI/RSRP, dB pour RSRQ/SINR):
+# plages de report 3GPP, les valeurs hors plage sont rangées dans les classes extrêmes
+METRICS = {
+    'rssi': (-120.0, -20.0),
+    'rsrp': (-156.0, -31.0),
+    'rsrq': (-43.0, 20.0),
+    'sinr': (-23.0, 40.0),
+}
+# Largeur d'une classe d'histogramme (dB): précision des centiles
+RESOLUTION = 0.5
+PERCENTILES = (10, 50, 90)
+DEFAULT_INTERVAL = float(os.environ.get('CELLULAR_SAMPLE_INTERVAL', 1.0))
+DEFAULT_CAPACITY = int(os.environ.get('CELLULAR_SAMPLE_WINDOW', 600))
+# Ordre de préférence des technologies dans `mmcli --signal-get`, comme parse_mmcli_modem
+TECHNOLOGIES = ('lte', '5g', 'umts', 'gsm')
+# Nom mmcli -> nom de la mesure
+_MMCLI_FIELDS = {'rssi': 'rssi', 'rsrp': 'rsrp', 'rsrq': 'rsrq', 'snr': 'sinr', 'sinr': 'sinr'}
+
+
+class RollingWindow:
+    """Fenêtre glissante des `capacity` dernières valeurs d'une mesure.
+
+    Les valeurs sont dans un tampon circulaire de taille fixe (array('d')).
+    Somme et somme des carrés sont tenues à jour à chaque ajout (moyenne et
+    variance en O(1)) et recalculées depuis le tampon toutes les `capacity`
+    valeurs pour borner la dérive d'arrondi (O(1) amorti). Un histogramme à
+    classes de `resolution` dB donne les centiles en O(nombre de classes),
+    indépendamment de la taille de la fenêtre.
+    """
+
+    def __init__(self, capacity: int, low: float, high: float, resolution: float = RESOLUTION):
+        if capacity <= 0:
+            raise ValueError("La capacité de la fenêtre doit être positive")
+        self.capacity = capacity
+        self.low = low
+        self.resolution = resolution
+        self._values = array('d', bytes(8 * capacity))
+        self._bins = array('l', bytes(array('l').itemsize * (int((high - low) / resolution) + 1)))
+        self._next = 0
+        self._count = 0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._since_resum = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _bin(self, value: float) -> int:
+        index = int((value - self.low) / self.resolution)
+        return min(max(index, 0), len(self._bins) - 1)
+
+    def push(self, value: float) -> None:
+        if self._count == self.capacity:
+            old = self._values[self._next]
+            self._bins[self._bin(old)] -= 1
+            self._sum -= old
+            self._sumsq -= old * old
+        else:
+            self._count += 1
+        self._values[self._next] = value
+        self._bins[self._bin(value)] += 1
+        self._sum += value
+        self._sumsq += value * value
+        self._next = (self._next + 1) % self.capacity
+        self._since_resum += 1
+        if self._since_resum >= self.capacity:
+            self._resum()
+
+    def _resum(self) -> None:
+        values = self._values if self._count == self.capacity else self._values[:self._count]
+        self._sum = sum(values)
+        self._sumsq = sum(value * value for value in values)
+        self._since_resum = 0
+
+    def values(self) -> List[float]:
+        """Valeurs de la fenêtre, de la plus ancienne à la plus récente"""
+        if self._count < self.capacity:
+            return list(self._values[:self._count])
+        return list(self._values[self._next:]) + list(self._values[:self._next])
+
+    def mean(self) -> Optional[float]:
+        return self._sum / self._count if self._count else None
+
+    def variance(self) -> Optional[float]:
+        """Variance de la population des valeurs de la fenêtre"""
+        if not self._count:
+            return None
+        mean = self._sum / self._count
+        return max(0.0, self._sumsq / self._count - mean * mean)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Centile p (0-100), interpolé linéairement dans la classe qui le contient"""
+        if not self._count:
+            return None
+        rank = p / 100.0 * self._count
+        cumulative = 0
+        for index, count in enumerate(self._bins):
+            if count and cumulative + count >= rank:
+                return self.low + (index + (rank - cumulative) / count) * self.resolution
+            cumulative += count
+        return self.low + len(self._bins) * self.resolution
+
+    def summary(self) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {'count': self._count}
+        if self._count:
+            variance = self.variance()
+            summary['mean'] = round(self.mean(), 2)
+            summary['variance'] = round(variance, 2)
+            summary['stddev'] = round(variance ** 0.5, 2)
+            for p in PERCENTILES:
+                summary[f'p{p}'] = round(self.percentile(p), 2)
+        return summary
+
+
+def parse_signal_metrics(signal: Dict[str, Any]) -> Dict[str, float]:
+    """Mesures de `mmcli -m any --signal-get -J` pour la première technologie renseignée"""
+    technologies = signal.get('modem', {}).get('signal', {})
+    for tech in TECHNOLOGIES:
+        metrics = {}
+        for field, value in (technologies.get(tech) or {}).items():
+            if field in _MMCLI_FIELDS and value not in (None, '--', ''):
+                try:
+                    metrics[_MMCLI_FIELDS[field]] = float(value)
+                except (TypeError, ValueError):
+                    continue
+        if metrics:
+            return metrics
+    return {}
+
+
+class MmcliSource:
+    """Mesures du modem via ModemManager (`mmcli --signal-get`)"""
+
+    def __init__(self, modem: str = 'any', timeout: float = 5.0):
+        self.modem = modem
+        self.timeout = timeout
+
+    def setup(self, interval: float) -> None:
+        """Activer le relevé périodique du modem (au plus fréquent: 1 s)"""
+        rate = max(1, int(round(interval)))
+        subprocess.run(['mmcli', '-m', self.modem, f'--signal-setup={rate}'],
+                       capture_output=True, timeout=self.timeout, check=False)
+
+    def __call__(self) -> Optional[Dict[str, float]]:
+        result = subprocess.run(['mmcli', '-m', self.modem, '--signal-get', '-J'],
+                                capture_output=True, timeout=self.timeout, check=True)
+        return parse_signal_metrics(json.loads(result.stdout.decode('utf-8', errors='replace')))
+
+
+class FixtureSource:
+    """Mesures rejouées depuis une capture enregistrée (une sortie JSON de
+    `mmcli --signal-get -J`, ou un dictionnaire de mesures, par ligne)"""
+
+    def __init__(self, path: str, loop: bool = False):
+        self.path = path
+        self.loop = loop
+        with open(path, encoding='utf-8') as f:
+            self._samples = [self._parse(json.loads(line)) for line in f if line.strip()]
+        self._position = 0
+
+    @staticmethod
+    def _parse(sample: Dict[str, Any]) -> Dict[str, float]:
+        if 'modem' in sample:
+            return parse_signal_metrics(sample)
+        return {metric: float(value) for metric, value in sample.items() if metric in METRICS}
+
+    def setup(self, interval: float) -> None:
+        pass
+
+    def __call__(self) -> Optional[Dict[str, float]]:
+        """Mesure suivante; None en fin de capture (sauf en boucle)"""
+        if self._position >= len(self._samples):
+            if not self.loop or not self._samples:
+                return None
+            self._position = 0
+        sample = self._samples[self._position]
+        self._position += 1
+        return sample
+
+
+class CellularSampler:
+    """Échantillonneur résident des mesures radio du modem (RSSI, RSRP, RSRQ, SINR).
+
+    `source()` est interrogée toutes les `interval` secondes par un thread
+    (start/stop) ou à la demande (sample); chaque mesure alimente sa
+    RollingWindow. stats() retourne les centiles et la variance des
+    fenêtres, lus par NetworkAIPredictor pour juger une connexion sur la
+    durée plutôt que sur une lecture unique.
+    """
+
+    def __init__(self, source: Callable[[], Optional[Dict[str, float]]],
+                 interval: Optional[float] = None, capacity: Optional[int] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.source = source
+        self.interval = DEFAULT_INTERVAL if interval is None else interval
+        self.capacity = DEFAULT_CAPACITY if capacity is None else capacity
+        self.clock = clock
+        self.windows = {metric: RollingWindow(self.capacity, low, high)
+                        for metric, (low, high) in METRICS.items()}
+        self.samples = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self) -> bool:
+        """Un relevé; False quand la source est épuisée"""
+        try:
+            metrics = self.source()
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Relevé du signal cellulaire impossible: %s", e)
+            return True
+        if metrics is None:
+            return False
+        with self._lock:
+            for metric, value in metrics.items():
+                window = self.windows.get(metric)
+                if window is not None:
+                    window.push(float(value))
+            self.samples += 1
+        return True
+
+    def run(self) -> None:
+        """Boucle de relevé à cadence fixe jusqu'à stop() ou l'épuisement de la source"""
+        deadline = self.clock()
+        while not self._stop.is_set():
+            if not self.sample():
+                break
+            # Un relevé en retard ne déclenche pas de rafale de rattrapage
+            deadline = max(deadline + self.interval, self.clock())
+            self._stop.wait(max(0.0, deadline - self.clock()))
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        setup = getattr(self.source, 'setup', None)
+        if setup is not None:
+            try:
+                setup(self.interval)
+            except Exception as e:
+                logger.warning("Configuration du relevé périodique du modem impossible: %s", e)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name='cellular-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Résumé des fenêtres renseignées: nombre, moyenne, variance, écart type, centiles"""
+        with self._lock:
+            stats: Dict[str, Any] = {'samples': self.samples, 'interval': self.interval}
+            for metric, window in self.windows.items():
+                if len(window):
+                    stats[metric] = window.summary()
+        return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Relevé périodique du signal cellulaire (RSSI, RSRP, RSRQ, SINR)")
+    parser.add_argument('--fixture', help="rejouer une capture enregistrée au lieu d'interroger le modem")
+    parser.add_argument('--modem', default='any')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL, help="secondes entre deux relevés")
+    parser.add_argument('--window', type=int, default=DEFAULT_CAPACITY, help="nombre de relevés conservés")
+    parser.add_argument('--duration', type=float, default=10.0, help="durée du relevé (s)")
+    args = parser.parse_args(argv)
+
+    source = FixtureSource(args.fixture) if args.fixture else MmcliSource(args.modem)
+    sampler = CellularSampler(source, args.interval, args.window)
+    sampler.start()
+    try:
+        sampler._thread.join(args.duration)
+    finally:
+        sampler.stop()
+    print(json.dumps(sampler.stats(), ensure_ascii=False))
+    return 0 if sampler.samples else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,207 @@
+import math
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from network_query import band_of
+
+# Largeur par défaut d'un canal (MHz): masque DSSS/OFDM en 2,4 GHz, 20 MHz ailleurs
+DEFAULT_WIDTH = {'2.4': 22.0, '5': 20.0, '6': 20.0}
+# Pondération des voisins par RSSI: nulle sous -92 dBm, pleine au-delà de -62 dBm
+# (seuil de détection d'énergie), linéaire entre les deux
+WEIGHT_FLOOR = -92.0
+WEIGHT_FULL = -62.0
+# Temps d'antenne occupé par un voisin pleinement pondéré (utilisation = 1 - e^-charge)
+AIRTIME_PER_AP = 0.2
+# Bande Bluetooth LE (MHz) et signal au-delà duquel un appareil BLE est « à proximité »
+BLE_BAND = (2402.0, 2480.0)
+BLE_NEARBY_RSSI = -80.0
+# Puissance en deçà de laquelle l'interférence est considérée nulle (-150 dBm):
+# absorbe les résidus d'arrondi des sommes cumulées
+_MIN_POWER_MW = 1e-15
+
+
+def _signal(device: Dict[str, Any]) -> Optional[float]:
+    if 'signal' not in device:
+        return None
+    try:
+        return float(str(device['signal']).split()[0])
+    except ValueError:
+        return None
+
+
+def center_frequency(device: Dict[str, Any]) -> Optional[float]:
+    """Fréquence centrale (MHz): 'center_frequency', 'frequency', sinon le canal
+    (1-14: 2,4 GHz, au-delà: 5 GHz)"""
+    for field in ('center_frequency', 'frequency'):
+        value = device.get(field)
+        if value:
+            return float(value)
+    channel = device.get('channel')
+    if not channel:
+        return None
+    channel = int(channel)
+    if channel == 14:
+        return 2484.0
+    return 2407.0 + 5 * channel if channel < 14 else 5000.0 + 5 * channel
+
+
+def rssi_weight(rssi: float) -> float:
+    """Poids d'un voisin dans la charge du canal, entre 0 et 1"""
+    return min(1.0, max(0.0, (rssi - WEIGHT_FLOOR) / (WEIGHT_FULL - WEIGHT_FLOOR)))
+
+
+def _to_dbm(milliwatts: float) -> Optional[float]:
+    return round(10 * math.log10(milliwatts), 1) if milliwatts > _MIN_POWER_MW else None
+
+
+class _Spectrum:
+    """Densités spectrales cumulées d'un ensemble d'intervalles pondérés.
+
+    Chaque émetteur répartit uniformément sa puissance (mW) et son poids sur
+    son intervalle. Un balayage des bornes triées donne, pour chaque point de
+    rupture, l'intégrale des densités depuis -inf: la part reçue par un
+    intervalle quelconque s'obtient ensuite par deux recherches dichotomiques.
+    """
+
+    def __init__(self, intervals: Sequence[Tuple[float, float, float, float]]):
+        events: Dict[float, List[float]] = {}
+        for start, end, power, weight in intervals:
+            width = end - start
+            for x, sign in ((start, 1.0), (end, -1.0)):
+                delta = events.setdefault(x, [0.0, 0.0])
+                delta[0] += sign * power / width
+                delta[1] += sign * weight / width
+        self.points = sorted(events)
+        # Densités sur [points[k], points[k+1]) et intégrales en points[k]
+        self._density: List[Tuple[float, float]] = []
+        self._integral: List[Tuple[float, float]] = []
+        power_density = weight_density = power_total = weight_total = 0.0
+        previous = None
+        for x in self.points:
+            if previous is not None:
+                power_total += power_density * (x - previous)
+                weight_total += weight_density * (x - previous)
+            self._integral.append((power_total, weight_total))
+            power_density += events[x][0]
+            weight_density += events[x][1]
+            self._density.append((power_density, weight_density))
+            previous = x
+        self._starts = sorted(interval[0] for interval in intervals)
+        self._ends = sorted(interval[1] for interval in intervals)
+
+    def _at(self, x: float) -> Tuple[float, float]:
+        k = bisect_right(self.points, x) - 1
+        if k < 0:
+            return 0.0, 0.0
+        (power, weight), (power_density, weight_density) = self._integral[k], self._density[k]
+        return power + power_density * (x - self.points[k]), weight + weight_density * (x - self.points[k])
+
+    def received(self, start: float, end: float) -> Tuple[float, float]:
+        """Puissance (mW) et poids cumulés de tous les émetteurs dans [start, end]"""
+        power_end, weight_end = self._at(end)
+        power_start, weight_start = self._at(start)
+        return power_end - power_start, weight_end - weight_start
+
+    def overlapping(self, start: float, end: float) -> int:
+        """Nombre d'intervalles qui chevauchent ]start, end["""
+        return bisect_left(self._starts, end) - bisect_right(self._ends, start)
+
+
+class ChannelModel:
+    """Modèle de recouvrement des canaux WiFi d'un scan (2,4, 5 et 6 GHz).
+
+    Chaque point d'accès occupe [centre - largeur/2, centre + largeur/2].
+    L'interférence reçue par un réseau est la somme, sur ses voisins, de la
+    part de leur puissance qui tombe dans son canal: totale pour un voisin
+    co-canal, partielle pour un canal adjacent qui chevauche. La charge du
+    canal suit le même recouvrement avec un poids fonction du RSSI.
+
+    Construction en O(n log n) (tri des bornes), puis O(log n) par requête.
+    """
+
+    def __init__(self, devices: Sequence[Dict[str, Any]]):
+        self.devices = devices
+        # Position dans le scan -> (début, fin, puissance mW, poids, bande, canal)
+        self.wifi: Dict[int, Tuple[float, float, float, float, Optional[str], Optional[int]]] = {}
+        self.bluetooth: List[Tuple[int, Optional[float]]] = []
+        for position, device in enumerate(devices):
+            if 'ssid' in device:
+                center = center_frequency(device)
+                band = band_of(center)
+                if band is None:
+                    continue
+                width = float(device.get('channel_width') or DEFAULT_WIDTH[band])
+                rssi = _signal(device)
+                power = 10 ** (rssi / 10) if rssi is not None else 0.0
+                weight = rssi_weight(rssi) if rssi is not None else 0.0
+                channel = device.get('channel')
+                self.wifi[position] = (center - width / 2, center + width / 2, power, weight, band,
+                                       int(channel) if channel else None)
+            elif 'device_type' in device or 'bluetooth_address' in str(device):
+                self.bluetooth.append((position, _signal(device)))
+        self.spectrum = _Spectrum([entry[:4] for entry in self.wifi.values()])
+
+    def device_metrics(self, position: int) -> Dict[str, Any]:
+        """Mesures dérivées du scan pour l'appareil à cette position (vide si inconnu)"""
+        if position in self.wifi:
+            start, end, power, weight, _, _ = self.wifi[position]
+            received_power, load = self.spectrum.received(start, end)
+            # Sans l'appareil lui-même, entièrement contenu dans son intervalle
+            received_power = max(0.0, received_power - power)
+            load = max(0.0, load - weight)
+            return {
+                'channel_utilization': round(1 - math.exp(-AIRTIME_PER_AP * load), 4),
+                'interference_dbm': _to_dbm(received_power),
+                'overlapping_networks': self.spectrum.overlapping(start, end) - 1,
+            }
+        return {}
+
+    def bluetooth_metrics(self) -> Dict[int, Dict[str, Any]]:
+        """Appareils BLE voisins (au-delà de BLE_NEARBY_RSSI) et interférence WiFi 2,4 GHz"""
+        wifi_power, _ = self.spectrum.received(*BLE_BAND)
+        interference = _to_dbm(wifi_power)
+        near = [signal is not None and signal >= BLE_NEARBY_RSSI for _, signal in self.bluetooth]
+        total = sum(near)
+        return {
+            position: {'nearby_count': total - is_near, 'interference_dbm': interference}
+            for (position, _), is_near in zip(self.bluetooth, near)
+        }
+
+    def metrics(self) -> List[Dict[str, Any]]:
+        """Mesures dérivées du scan, par position (dictionnaire vide si aucune)"""
+        bluetooth = self.bluetooth_metrics()
+        return [bluetooth.get(position) or self.device_metrics(position)
+                for position in range(len(self.devices))]
+
+    def annotate(self, devices: Optional[Sequence[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """Copies des appareils complétées par les mesures du scan.
+
+        `devices` remplace les appareils du modèle (mêmes positions, par
+        exemple des copies enrichies). Les valeurs déjà fournies par le
+        scanner (par exemple `channel_utilization` lue dans l'élément BSS
+        Load) sont conservées.
+        """
+        devices = self.devices if devices is None else devices
+        return [dict(metrics, **device) if metrics else device
+                for metrics, device in zip(self.metrics(), devices)]
+
+    def congestion_table(self) -> List[Dict[str, Any]]:
+        """Congestion par canal primaire observé, trié par bande puis canal"""
+        channels: Dict[Tuple[str, int], List[float]] = {}
+        for start, end, _, _, band, channel in self.wifi.values():
+            if channel is None:
+                continue
+            entry = channels.setdefault((band, channel), [0, start, end])
+            entry[0] += 1
+        table = []
+        for (band, channel), (count, start, end) in sorted(channels.items(), key=lambda item: (float(item[0][0]), item[0][1])):
+            power, load = self.spectrum.received(start, end)
+            table.append({
+                'band': band,
+                'channel': channel,
+                'access_points': count,
+                'overlapping': self.spectrum.overlapping(start, end),
+                'power_dbm': _to_dbm(power),
+                'utilization': round(1 - math.exp(-AIRTIME_PER_AP * load), 4),
+            })
+        return table
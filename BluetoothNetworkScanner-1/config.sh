@@ -26,4 +26,22 @@ NOTIFICATION_PHONE=${NOTIFICATION_PHONE:-""}
 # Configuration des permissions de logs
 if [ -f "${LOG_FILE}" ]; then
     chmod 600 "${LOG_FILE}"
-fi
\ No newline at end of file
+fi
+
+# File d'attente du démon de notifications (python3 notify_daemon.py)
+NOTIFY_SPOOL=${NOTIFY_SPOOL:-"${INSTALL_DIR}/notifications"}
+
+# Dépose une notification dans la file du démon (source, texte).
+# Retourne 1 si le démon n'est pas actif: l'appelant envoie alors directement.
+enqueue_notification() {
+    local source=$1
+    local info=$2
+    local pid_file="${NOTIFY_SPOOL}/daemon.pid"
+    if [ ! -f "$pid_file" ] || ! kill -0 "$(cat "$pid_file")" 2>/dev/null; then
+        return 1
+    fi
+    local tmp
+    tmp=$(mktemp "${NOTIFY_SPOOL}/tmp/XXXXXXXX") || return 1
+    printf '%s\n%s\n%b' "${NOTIFICATION_PHONE}" "$source" "$info" > "$tmp"
+    mv "$tmp" "${NOTIFY_SPOOL}/new/"
+}
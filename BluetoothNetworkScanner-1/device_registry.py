@@ -0,0 +1,185 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from stats_rollups import TimePoint, to_epoch
+
+# Un appareil absent depuis plus de DEFAULT_TTL secondes est considéré disparu
+DEFAULT_TTL = 300.0
+DEFAULT_MAX_DEVICES = 10000
+# Poids de la dernière mesure dans la moyenne glissante (exponentielle) du RSSI
+DEFAULT_ALPHA = 0.3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (
+    key TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    name TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    scans INTEGER NOT NULL,
+    rssi_avg REAL
+) WITHOUT ROWID;
+"""
+
+_UPSERT = """
+INSERT INTO devices (key, type, name, first_seen, last_seen, scans, rssi_avg)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    type = excluded.type,
+    name = excluded.name,
+    last_seen = excluded.last_seen,
+    scans = excluded.scans,
+    rssi_avg = excluded.rssi_avg
+"""
+
+
+def device_key(device: Dict[str, Any]) -> Optional[str]:
+    """Identifiant stable d'un appareil: BSSID ou adresse Bluetooth normalisée"""
+    for field in ('bssid', 'address', 'mac'):
+        value = device.get(field)
+        if value:
+            return str(value).strip().upper().replace('-', ':')
+    return None
+
+
+def _iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+class DeviceRecord:
+    __slots__ = ('key', 'type', 'name', 'first_seen', 'last_seen', 'scans', 'rssi_avg', 'last_scan')
+
+    def __init__(self, key: str, device_type: str, name: Optional[str], first_seen: float,
+                 last_seen: Optional[float] = None, scans: int = 0, rssi_avg: Optional[float] = None):
+        self.key = key
+        self.type = device_type
+        self.name = name
+        self.first_seen = first_seen
+        self.last_seen = first_seen if last_seen is None else last_seen
+        self.scans = scans
+        self.rssi_avg = rssi_avg
+        self.last_scan = 0
+
+    def row(self) -> Tuple:
+        return (self.key, self.type, self.name, self.first_seen, self.last_seen, self.scans, self.rssi_avg)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'adresse': self.key,
+            'type': self.type,
+            'nom': self.name,
+            'premiere_vue': _iso(self.first_seen),
+            'derniere_vue': _iso(self.last_seen),
+            'scans': self.scans,
+            'rssi_moyen': self.rssi_avg,
+        }
+
+
+class DeviceRegistry:
+    """Registre de présence des appareils, d'un scan à l'autre.
+
+    Les appareils sont conservés dans un OrderedDict trié par dernière
+    observation: une observation coûte O(1) (accès + déplacement en fin), et
+    l'expiration retire les appareils les plus anciens en tête de liste.
+    La mémoire est bornée par `ttl` et `max_devices`. Avec `path`, l'état est
+    persisté dans la base SQLite de l'historique (lignes modifiées uniquement).
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = DEFAULT_TTL,
+                 max_devices: int = DEFAULT_MAX_DEVICES, alpha: float = DEFAULT_ALPHA):
+        self.path = path
+        self.ttl = ttl
+        self.max_devices = max_devices
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._scan = 0
+        self._devices: 'OrderedDict[str, DeviceRecord]' = OrderedDict()
+        self._conn = None
+        if path is not None:
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            with self._conn:
+                self._conn.executescript(_SCHEMA)
+            for row in self._conn.execute('SELECT key, type, name, first_seen, last_seen, scans, rssi_avg '
+                                          'FROM devices ORDER BY last_seen'):
+                self._devices[row[0]] = DeviceRecord(*row)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._devices
+
+    def update(self, timestamp: TimePoint,
+               observations: Iterable[Tuple[str, str, Optional[str], Optional[float]]]) -> Dict[str, Any]:
+        """Intégrer un scan et retourner les changements de présence.
+
+        `observations` contient un tuple (clé, type, nom, rssi) par appareil.
+        Retourne {'appeared': [...], 'disappeared': [...], 'active': n}.
+        """
+        now = to_epoch(timestamp)
+        with self._lock:
+            self._scan += 1
+            appeared: List[DeviceRecord] = []
+            touched: List[DeviceRecord] = []
+            for key, device_type, name, rssi in observations:
+                record = self._devices.get(key)
+                if record is None:
+                    record = self._devices[key] = DeviceRecord(key, device_type, name, now)
+                    appeared.append(record)
+                else:
+                    self._devices.move_to_end(key)
+                if record.last_scan != self._scan:
+                    # Une seule observation comptée par scan et par appareil
+                    record.last_scan = self._scan
+                    record.scans += 1
+                    touched.append(record)
+                record.last_seen = now
+                if name:
+                    record.name = name
+                if rssi is not None:
+                    record.rssi_avg = rssi if record.rssi_avg is None else \
+                        record.rssi_avg + self.alpha * (rssi - record.rssi_avg)
+
+            disappeared = self._expire(now)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.executemany(_UPSERT, [record.row() for record in touched])
+                    self._conn.executemany('DELETE FROM devices WHERE key = ?',
+                                           [(record.key,) for record in disappeared])
+
+            return {
+                'appeared': [record.to_dict() for record in appeared],
+                'disappeared': [record.to_dict() for record in disappeared],
+                'active': len(self._devices),
+            }
+
+    def _expire(self, now: float) -> List[DeviceRecord]:
+        expired = []
+        limit = now - self.ttl
+        while self._devices:
+            key, record = next(iter(self._devices.items()))
+            if record.last_seen >= limit and len(self._devices) <= self.max_devices:
+                break
+            del self._devices[key]
+            expired.append(record)
+        return expired
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        record = self._devices.get(key)
+        return record.to_dict() if record is not None else None
+
+    def devices(self, device_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Appareils présents, du plus récemment vu au plus ancien"""
+        with self._lock:
+            records = list(reversed(self._devices.values()))
+        return [r.to_dict() for r in records if device_type is None or r.type == device_type]
@@ -0,0 +1,56 @@
+import itertools
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class FakeTwilioError(Exception):
+    """Erreur simulée d'envoi (indisponibilité de l'API, limite de débit...)"""
+
+
+class _Message:
+    def __init__(self, sid: str):
+        self.sid = sid
+
+
+class _Messages:
+    def __init__(self, owner: 'FakeTwilioClient'):
+        self._owner = owner
+
+    def create(self, body: str, from_: str, to: str, **kwargs) -> _Message:
+        return self._owner._create(body=body, from_=from_, to=to)
+
+
+class FakeTwilioClient:
+    """Remplaçant local de twilio.rest.Client pour les tests et les essais.
+
+    Seul `client.messages.create(body=, from_=, to=)` est simulé. Les messages
+    envoyés sont conservés dans `sent`; `failures` provoque l'échec des N
+    prochains envois, `fail_always` celui de tous les envois.
+    """
+
+    def __init__(self, account_sid: str = 'ACtest', auth_token: str = 'test',
+                 failures: int = 0, fail_always: bool = False, echo: bool = False):
+        self.account_sid = account_sid
+        self.failures = failures
+        self.fail_always = fail_always
+        self.echo = echo
+        self.sent: List[Dict[str, Any]] = []
+        self.attempts = 0
+        self.messages = _Messages(self)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _create(self, body: str, from_: str, to: str) -> _Message:
+        with self._lock:
+            self.attempts += 1
+            if self.fail_always or self.failures > 0:
+                self.failures = max(0, self.failures - 1)
+                raise FakeTwilioError("Service SMS indisponible (simulation)")
+            sid = f"SM{next(self._ids):032d}"
+            self.sent.append({'sid': sid, 'body': body, 'from': from_, 'to': to})
+        if self.echo:
+            print(f"[SMS simulé {sid}] {from_} -> {to}\n{body}")
+        return _Message(sid)
+
+    def bodies(self, to: Optional[str] = None) -> List[str]:
+        return [m['body'] for m in self.sent if to is None or m['to'] == to]
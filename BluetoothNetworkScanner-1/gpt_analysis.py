@@ -0,0 +1,191 @@
+import os
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+GPT_MODEL = "gpt-3.5-turbo"
+SYSTEM_PROMPT = "Vous êtes un expert en sécurité et optimisation réseau."
+UNAVAILABLE_ANALYSIS = "Analyse IA non disponible. Veuillez réessayer plus tard."
+
+# Recommandations par défaut en français selon le type de réseau, utilisées
+# quand l'analyse GPT échoue ou dépasse son délai
+DEFAULT_AI_ANALYSIS = {
+    'wifi': """
+    Recommandations par défaut pour le réseau WiFi:
+    1. Vérifiez régulièrement les mises à jour de sécurité
+    2. Utilisez un mot de passe fort et unique
+    3. Activez le filtrage MAC si disponible
+    4. Surveillez les appareils connectés inconnus
+    """,
+    'bluetooth': """
+    Recommandations par défaut pour la connexion Bluetooth:
+    1. Désactivez le Bluetooth quand il n'est pas utilisé
+    2. Évitez l'appairage dans les lieux publics
+    3. Mettez à jour le firmware des appareils
+    4. Utilisez le mode "non découvrable" par défaut
+    """,
+    'lte': """
+    Recommandations par défaut pour la connexion cellulaire:
+    1. Activez le chiffrement des données
+    2. Évitez les réseaux cellulaires inconnus
+    3. Utilisez un VPN sur les réseaux publics
+    4. Surveillez votre consommation de données
+    """,
+    'esim': """
+    Recommandations par défaut pour la connexion eSIM:
+    1. Vérifiez la compatibilité des opérateurs
+    2. Sauvegardez vos profils eSIM
+    3. Maintenez votre appareil à jour
+    4. Activez l'authentification forte
+    """
+}
+
+MODES = ('concurrent', 'batch')
+
+_openai_client = None
+_openai_lock = threading.Lock()
+
+
+def get_openai_client():
+    """Client OpenAI partagé par le processus, créé au premier appel.
+
+    L'import du paquet openai (plusieurs centaines de ms) n'a lieu qu'ici.
+    """
+    global _openai_client
+    if _openai_client is None:
+        with _openai_lock:
+            if _openai_client is None:
+                from openai import OpenAI
+                _openai_client = OpenAI()
+    return _openai_client
+
+
+def default_analysis(device_type: str) -> str:
+    """Analyse par défaut pour un type d'appareil"""
+    return DEFAULT_AI_ANALYSIS.get(device_type, UNAVAILABLE_ANALYSIS)
+
+
+def build_device_prompt(details: Dict[str, Any]) -> str:
+    """Prompt d'analyse d'une seule connexion"""
+    return f"""Analyser en détail les aspects suivants pour cette connexion réseau:
+            1. Risques de sécurité potentiels
+            2. Recommandations d'optimisation
+            3. Bonnes pratiques spécifiques
+            4. Points d'attention particuliers
+
+            Données de connexion: {json.dumps(details)}"""
+
+
+def build_batch_prompt(devices: Dict[str, Dict[str, Any]]) -> str:
+    """Prompt regroupant plusieurs connexions, identifiées par leur id"""
+    payload = [{'id': device_id, 'type': item['type'], 'details': item['details']}
+               for device_id, item in devices.items()]
+    return f"""Pour chaque connexion réseau ci-dessous, analyser en détail:
+            1. Risques de sécurité potentiels
+            2. Recommandations d'optimisation
+            3. Bonnes pratiques spécifiques
+            4. Points d'attention particuliers
+
+            Répondre uniquement avec un JSON au format:
+            {{"analyses": [{{"id": "<id de la connexion>", "analyse": "<texte>"}}]}}
+
+            Connexions: {json.dumps(payload)}"""
+
+
+class GPTAnalyzer:
+    """Analyse GPT des appareils d'un scan, en parallèle ou par lots.
+
+    - mode 'concurrent': un appel par appareil, au plus `max_workers` à la fois;
+    - mode 'batch': `batch_size` appareils par appel, réponse JSON associée par id.
+
+    L'analyse du scan entier est limitée à `timeout` secondes, quel que soit
+    le nombre d'appels en attente dans le pool. Un appareil dont l'appel
+    échoue, n'a pas abouti dans ce délai ou dont l'id manque dans la réponse
+    reçoit l'analyse par défaut. Un mode inconnu est remplacé par 'concurrent'.
+    """
+
+    def __init__(self, client_factory=get_openai_client, mode: Optional[str] = None,
+                 max_workers: Optional[int] = None, timeout: Optional[float] = None,
+                 batch_size: Optional[int] = None):
+        self._client_factory = client_factory
+        self.mode = mode or os.environ.get('GPT_ANALYSIS_MODE', 'concurrent')
+        if self.mode not in MODES:
+            logger.warning("Mode d'analyse GPT inconnu: %s, utilisation de 'concurrent'", self.mode)
+            self.mode = 'concurrent'
+        self.max_workers = max_workers or int(os.environ.get('GPT_MAX_CONCURRENCY', 8))
+        self.timeout = timeout or float(os.environ.get('GPT_TIMEOUT', 30))
+        self.batch_size = batch_size or int(os.environ.get('GPT_BATCH_SIZE', 20))
+
+    @property
+    def client(self):
+        return self._client_factory()
+
+    def analyze(self, analyses: List[Dict[str, Any]]) -> None:
+        """Renseigner `analyse_ia` pour chaque analyse d'appareil"""
+        if not analyses:
+            return
+        if self.mode == 'batch' and len(analyses) > 1:
+            chunks = [analyses[i:i + self.batch_size]
+                      for i in range(0, len(analyses), self.batch_size)]
+            self._run(chunks, self._analyze_chunk)
+        else:
+            self._run([[analysis] for analysis in analyses], self._analyze_single)
+
+    def _run(self, jobs: List[List[Dict[str, Any]]], worker) -> None:
+        workers = min(self.max_workers, len(jobs))
+        # Délai global du scan: les appels encore en attente ou en cours à
+        # son expiration sont abandonnés (analyse par défaut)
+        deadline = self.timeout
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='gpt')
+        futures = {pool.submit(worker, job): job for job in jobs}
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                job = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    logger.warning("Erreur lors de l'analyse GPT: %s", e)
+                    results = {}
+                for device_id, analysis in enumerate(job):
+                    text = results.get(str(device_id))
+                    analysis['analyse_ia'] = text if text else default_analysis(analysis['type'])
+        except FuturesTimeout:
+            logger.warning("Délai d'analyse GPT dépassé (%.1fs)", deadline)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        for job in jobs:
+            for analysis in job:
+                analysis.setdefault('analyse_ia', default_analysis(analysis['type']))
+
+    def _create(self, prompt: str, **kwargs) -> str:
+        response = self.client.chat.completions.create(
+            model=GPT_MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            timeout=self.timeout,
+            **kwargs
+        )
+        return response.choices[0].message.content
+
+    def _analyze_single(self, job: List[Dict[str, Any]]) -> Dict[str, str]:
+        return {'0': self._create(build_device_prompt(job[0]['details']))}
+
+    def _analyze_chunk(self, job: List[Dict[str, Any]]) -> Dict[str, str]:
+        devices = {str(i): analysis for i, analysis in enumerate(job)}
+        content = self._create(build_batch_prompt(devices),
+                               response_format={"type": "json_object"})
+        results = {}
+        for item in json.loads(content).get('analyses', []):
+            if isinstance(item, dict) and str(item.get('id')) in devices and item.get('analyse'):
+                results[str(item['id'])] = str(item['analyse'])
+        missing = len(devices) - len(results)
+        if missing:
+            logger.warning("Analyse GPT par lot incomplète: %d appareil(s) sans réponse", missing)
+        return results
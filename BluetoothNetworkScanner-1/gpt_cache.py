@@ -0,0 +1,134 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from device_registry import device_key
+
+# Durée de validité d'une analyse GPT en cache (secondes)
+DEFAULT_TTL = 24 * 3600.0
+# Tranches de qualité du signal (mêmes seuils que Faible/Moyenne/Bonne/Excellente)
+SIGNAL_BUCKETS = (0.4, 0.6, 0.8)
+# Nombre maximal de paramètres par requête SQLite
+_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS gpt_analyses (
+    device TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    analysis TEXT NOT NULL,
+    created REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def signal_bucket(quality: Any) -> Optional[int]:
+    """Tranche (0 à 3) d'une qualité de signal entre 0 et 1"""
+    if not isinstance(quality, (int, float)):
+        return None
+    return bisect_right(SIGNAL_BUCKETS, quality)
+
+
+def fingerprint(analysis: Dict[str, Any]) -> str:
+    """Empreinte des attributs qui justifient une nouvelle analyse GPT.
+
+    Type, niveau de sécurité, bande et tranche de signal: une variation de
+    quelques dBm à l'intérieur d'une tranche garde la même empreinte.
+    """
+    details = analysis.get('details') or {}
+    security = details.get('security_level') or (details.get('encryption_details') or {}).get('type')
+    quality = details.get('signal_quality', details.get('signal_strength'))
+    material = [analysis.get('type'), security, details.get('band'), signal_bucket(quality)]
+    return hashlib.sha1(json.dumps(material).encode('utf-8')).hexdigest()
+
+
+def analysis_key(analysis: Dict[str, Any], device: Optional[Dict[str, Any]] = None,
+                 position: Optional[int] = None) -> str:
+    """Identifiant de l'appareil analysé: BSSID/adresse, sinon nom ou opérateur
+    complété par la fréquence, le canal ou la bande, à défaut par la position
+    dans le scan (deux points d'accès sans BSSID de même SSID restent distincts)"""
+    key = device_key(device) if device else None
+    if key is not None:
+        return key
+    details = analysis.get('details') or {}
+    name = details.get('ssid') or details.get('operator') or details.get('manufacturer')
+    where = None
+    if device:
+        name = device.get('ssid') or device.get('name') or device.get('operator') or name
+        for field in ('frequency', 'frequency_mhz', 'channel', 'band'):
+            if device.get(field):
+                where = f"{field}={device[field]}"
+                break
+    if where is None and position is not None:
+        where = f"#{position}"
+    return f"{analysis.get('type')}:{name}" + (f"@{where}" if where else '')
+
+
+class AnalysisCache:
+    """Analyses GPT (`analyse_ia`) par appareil, dans SQLite (mode WAL).
+
+    Une entrée n'est servie que si l'empreinte de l'appareil est inchangée et
+    qu'elle a moins de `ttl` secondes; sinon elle est supprimée. La base est
+    partagée entre processus et conservée d'un démarrage à l'autre.
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get_many(self, entries: Iterable[Tuple[str, str]], now: Optional[float] = None) -> Dict[str, str]:
+        """Analyses valides pour des couples (appareil, empreinte); les entrées
+        périmées ou dont l'empreinte a changé sont invalidées"""
+        now = time.time() if now is None else now
+        wanted = dict(entries)
+        found: Dict[str, str] = {}
+        stale: List[str] = []
+        devices = list(wanted)
+        with self._lock, self._conn:
+            for i in range(0, len(devices), _CHUNK):
+                chunk = devices[i:i + _CHUNK]
+                rows = self._conn.execute(
+                    'SELECT device, fingerprint, analysis, created FROM gpt_analyses '
+                    f'WHERE device IN ({",".join("?" * len(chunk))})', chunk)
+                for device, stored, analysis, created in rows:
+                    if stored == wanted[device] and now - created < self.ttl:
+                        found[device] = analysis
+                    else:
+                        stale.append(device)
+            self._conn.executemany('DELETE FROM gpt_analyses WHERE device = ?', ((d,) for d in stale))
+            self.hits += len(found)
+            self.misses += len(wanted) - len(found)
+        return found
+
+    def put_many(self, entries: Iterable[Tuple[str, str, str]], now: Optional[float] = None) -> None:
+        """Enregistrer des triplets (appareil, empreinte, analyse)"""
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO gpt_analyses (device, fingerprint, analysis, created) VALUES (?, ?, ?, ?)',
+                ((device, fp, analysis, now) for device, fp, analysis in entries))
+
+    def purge(self, now: Optional[float] = None) -> int:
+        """Supprimer les entrées périmées; retourne leur nombre"""
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            return self._conn.execute('DELETE FROM gpt_analyses WHERE created <= ?', (now - self.ttl,)).rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM gpt_analyses').fetchone()[0]
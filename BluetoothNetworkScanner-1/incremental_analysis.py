@@ -0,0 +1,218 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from device_registry import device_key
+
+
+def parse_signal(value: Any) -> float:
+    """Convertir une valeur de signal ('-65', '-65 dBm', -65) en float"""
+    return float(str(value).split()[0])
+
+
+def scan_key(device: Dict[str, Any]) -> str:
+    """Identifiant d'un appareil d'un scan à l'autre: BSSID/adresse, sinon ses
+    attributs hors signal (cellules, appareils sans adresse)"""
+    key = device_key(device)
+    if key is not None:
+        return key
+    return repr(sorted((field, repr(value)) for field, value in device.items()
+                       if field not in ('signal', 'signal_window')))
+
+
+class DeviceEntry:
+    """Dernier état connu d'un appareil et sa contribution aux agrégats"""
+    __slots__ = ('device', 'metrics', 'analysis', 'type', 'signal', 'encrypted')
+
+    def __init__(self, device: Dict[str, Any], analysis: Dict[str, Any], metrics: Dict[str, Any]):
+        self.device = device
+        self.metrics = metrics
+        self.analysis = analysis
+        self.type = analysis['type']
+        self.signal = parse_signal(device['signal']) if 'signal' in device else None
+        self.encrypted = None
+        if self.type == 'wifi':
+            encryption = device.get('encryption')
+            self.encrypted = bool(encryption) and encryption.lower() != 'none'
+
+    @property
+    def annotated(self) -> Dict[str, Any]:
+        """Lecture complétée par les mesures du scan, telle qu'analysée"""
+        return dict(self.metrics, **self.device) if self.metrics else self.device
+
+
+class IncrementalAnalyzer:
+    """Analyse de scans successifs ne recalculant que les appareils modifiés.
+
+    L'état du scan précédent (entrée, analyse détaillée, contribution aux
+    agrégats) est conservé par appareil. Un appareil identique au scan
+    précédent reprend son analyse; les autres sont analysés en un lot, et les
+    compteurs `network_types`, `average_signal` et `security_stats` sont
+    corrigés par ajout/retrait de leurs contributions.
+
+    Les appareils sont comparés sur leur lecture brute. Les mesures dérivées
+    du scan entier (`metrics`, voir ChannelModel.metrics) changent pour tous
+    les voisins d'un point d'accès modifié: pour un appareil inchangé, seuls
+    les indicateurs qui en dépendent (interférences, congestion) sont alors
+    réévalués.
+
+    Avec `signal_tolerance` > 0, un appareil dont seul le signal a varié d'au
+    plus cette valeur (dBm) garde sa lecture précédente: le résultat est alors
+    celui d'une analyse complète de ces lectures retenues. Avec la valeur par
+    défaut (0), il est identique à une analyse complète du scan.
+
+    Les analyses reprises partagent leurs sous-dictionnaires d'un scan à
+    l'autre et ne doivent pas être modifiées par l'appelant.
+    """
+
+    def __init__(self, predictor, signal_tolerance: float = 0.0):
+        self.predictor = predictor
+        self.signal_tolerance = signal_tolerance
+        self.reset()
+
+    def reset(self) -> None:
+        """Oublier l'état du scan précédent (le prochain scan est analysé en entier)"""
+        self._entries: Dict[str, DeviceEntry] = {}
+        self._counts: Dict[str, int] = {}
+        # Somme, nombre de signaux et nombre de signaux non entiers par type
+        self._signals: Dict[str, List[float]] = {}
+        self._encrypted = 0
+        self._open = 0
+        self.last_changes = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0, 'remeasured': 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _same_reading(self, previous: Dict[str, Any], device: Dict[str, Any]) -> bool:
+        if previous == device:
+            return True
+        if self.signal_tolerance <= 0 or 'signal' not in previous or 'signal' not in device:
+            return False
+        if {k: v for k, v in previous.items() if k != 'signal'} != {k: v for k, v in device.items() if k != 'signal'}:
+            return False
+        try:
+            return abs(parse_signal(previous['signal']) - parse_signal(device['signal'])) <= self.signal_tolerance
+        except ValueError:
+            return False
+
+    def _add(self, entry: DeviceEntry, sign: int) -> None:
+        self._counts[entry.type] = self._counts.get(entry.type, 0) + sign
+        if entry.signal is not None:
+            totals = self._signals.setdefault(entry.type, [0.0, 0, 0])
+            totals[0] += sign * entry.signal
+            totals[1] += sign
+            totals[2] += sign * (not entry.signal.is_integer())
+        if entry.encrypted is True:
+            self._encrypted += sign
+        elif entry.encrypted is False:
+            self._open += sign
+
+    def _build_analyses(self, devices: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not devices:
+            return []
+        try:
+            from batch_analysis import BatchAnalyzer
+        except ImportError:
+            return [self.predictor._build_device_analysis(device) for device in devices]
+        return BatchAnalyzer(self.predictor).build_analyses(devices)
+
+    def _remeasure(self, entry: DeviceEntry, metrics: Dict[str, Any]) -> DeviceEntry:
+        """Entrée d'un appareil inchangé dont seules les mesures du scan ont varié"""
+        p = self.predictor
+        device = dict(metrics, **entry.device)
+        performances = dict(entry.analysis['performances'])
+        if entry.type == 'wifi':
+            performances['interferences'] = p._detect_interference_level(device)
+            performances['congestion'] = p._evaluate_congestion(device)
+        elif entry.type == 'bluetooth':
+            performances['interferences'] = p._detect_bluetooth_interference(device)
+        return DeviceEntry(entry.device, dict(entry.analysis, performances=performances), metrics)
+
+    def analyze(self, devices: List[Dict[str, Any]], stats: Dict[str, Any],
+                metrics: Optional[Sequence[Dict[str, Any]]] = None) -> None:
+        """Remplir `stats` (detailed_analysis et agrégats) pour le scan.
+
+        `metrics`: mesures dérivées du scan par position, appliquées aux
+        appareils comme ChannelModel.annotate.
+        """
+        try:
+            scan = self._update(devices, metrics)
+        except Exception:
+            # État partiellement corrigé: repartir d'une analyse complète
+            self.reset()
+            raise
+
+        stats['detailed_analysis'].extend(dict(entry.analysis) for entry in scan)
+        if self.predictor.gpt_enabled:
+            self.predictor._add_gpt_analyses(stats['detailed_analysis'], [entry.annotated for entry in scan], stats)
+        self._aggregate(scan, stats)
+
+    def _update(self, devices: List[Dict[str, Any]],
+                metrics: Optional[Sequence[Dict[str, Any]]] = None) -> List[DeviceEntry]:
+        """Mettre l'état à jour avec le scan; retourne les entrées dans l'ordre du scan"""
+        previous, entries = self._entries, {}
+        order: List[str] = []
+        dirty: List[Tuple[str, Dict[str, Any], Dict[str, Any]]] = []
+        changed = remeasured = 0
+        for position, device in enumerate(devices):
+            device_metrics = metrics[position] if metrics is not None else {}
+            key = scan_key(device)
+            # Un même identifiant vu plusieurs fois dans le scan reste distinct
+            while key in entries:
+                key += '#'
+            entry = previous.pop(key, None)
+            if entry is not None and self._same_reading(entry.device, device):
+                if entry.metrics != device_metrics:
+                    entry = self._remeasure(entry, device_metrics)
+                    remeasured += 1
+                entries[key] = entry
+                order.append(key)
+                continue
+            if entry is not None:
+                self._add(entry, -1)
+                changed += 1
+            dirty.append((key, device, device_metrics))
+            order.append(key)
+            entries[key] = None  # réservé, analysé avec le lot
+
+        # Appareils disparus depuis le scan précédent
+        for entry in previous.values():
+            self._add(entry, -1)
+
+        annotated = [dict(device_metrics, **device) if device_metrics else device
+                     for _, device, device_metrics in dirty]
+        for (key, device, device_metrics), analysis in zip(dirty, self._build_analyses(annotated)):
+            # Copie: l'appelant peut réutiliser ses dictionnaires d'un scan à l'autre
+            entry = DeviceEntry(dict(device), analysis, device_metrics)
+            entries[key] = entry
+            self._add(entry, 1)
+
+        self.last_changes = {
+            'added': len(dirty) - changed,
+            'changed': changed,
+            'removed': len(previous),
+            'unchanged': len(devices) - len(dirty),
+            'remeasured': remeasured,
+        }
+        self._entries = entries
+        return [entries[key] for key in order]
+
+    def _aggregate(self, scan: List[DeviceEntry], stats: Dict[str, Any]) -> None:
+        for network_type, count in self._counts.items():
+            if count:
+                stats['network_types'][network_type] += count
+
+        # Moyennes dans l'ordre de première apparition, comme l'analyse complète
+        pending = {t for t, totals in self._signals.items() if totals[1]}
+        for entry in scan:
+            if not pending:
+                break
+            if entry.signal is None or entry.type not in pending:
+                continue
+            pending.discard(entry.type)
+            total, count, fractional = self._signals[entry.type]
+            if fractional:
+                # Somme séquentielle pour reproduire exactement les arrondis
+                total = sum(e.signal for e in scan if e.type == entry.type and e.signal is not None)
+            stats['average_signal'][entry.type] = total / count
+
+        stats['security_stats']['encrypted'] += self._encrypted
+        stats['security_stats']['open'] += self._open
@@ -57,13 +57,16 @@ if [ ${#missing_tools[@]} -ne 0 ]; then
 fi
 
 # Copie des fichiers avec les bonnes permissions
-cp wifi_detect.sh lte_detect.sh bluetooth_detect.sh esim_detect.sh notify.py config.sh "$install_dir/"
+cp wifi_detect.sh lte_detect.sh bluetooth_detect.sh esim_detect.sh notify.py notify_daemon.py log_config.py wifi_scan.py bluetooth_scan.py config.sh "$install_dir/"
 chmod 700 "$install_dir/wifi_detect.sh"
 chmod 700 "$install_dir/lte_detect.sh"
 chmod 700 "$install_dir/bluetooth_detect.sh"
 chmod 700 "$install_dir/esim_detect.sh"
 chmod 600 "$install_dir/config.sh"
 chmod 600 "$install_dir/notify.py"
+chmod 600 "$install_dir/notify_daemon.py"
+chmod 600 "$install_dir/wifi_scan.py"
+chmod 600 "$install_dir/bluetooth_scan.py"
 
 # Détection de l'environnement Replit
 is_replit_env() {
@@ -0,0 +1,199 @@
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, TextIO
+
+# Attributs standards d'un LogRecord, exclus des champs "extra" du JSON
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formate chaque enregistrement en une ligne JSON structurée"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        # Champs passés via extra={...}
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Échantillonnage par logger des messages à haute fréquence.
+
+    `rates` associe un nom de logger (ou un parent) à une fraction entre 0 et 1.
+    Avec un taux de 0.1, un message sur dix est conservé. Les niveaux WARNING et
+    au-delà ne sont jamais échantillonnés.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = dict(rates)
+        self._periods: Dict[str, int] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _period_for(self, name: str) -> int:
+        period = self._periods.get(name)
+        if period is None:
+            rate = 1.0
+            # Recherche du logger ou de son plus proche parent configuré
+            candidate = name
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    break
+                candidate = candidate.rpartition('.')[0]
+            period = 0 if rate <= 0 else max(1, round(1 / min(rate, 1.0)))
+            self._periods[name] = period
+        return period
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        period = self._period_for(record.name)
+        if period == 1:
+            return True
+        if period == 0:
+            return False
+        with self._lock:
+            count = self._counters.get(record.name, 0)
+            self._counters[record.name] = count + 1
+        return count % period == 0
+
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler non bloquant: au-delà de la capacité, les enregistrements
+    sont abandonnés et comptés au lieu de bloquer le thread de requête.
+
+    Le formatage du message est différé au thread d'écriture (formatage paresseux).
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._drop_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Seules les traces d'exception doivent être figées dans le thread appelant
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+
+
+class _DrainingListener(QueueListener):
+    """QueueListener dont l'arrêt attend une place dans la file pleine"""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+_state_lock = threading.Lock()
+_handler: Optional[BoundedQueueHandler] = None
+_listener: Optional[_DrainingListener] = None
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Lit une spécification 'logger=taux,logger2=taux' (ex: LOG_SAMPLE_RATES)"""
+    rates = {}
+    for item in spec.split(','):
+        name, sep, rate = item.strip().partition('=')
+        if not sep:
+            continue
+        try:
+            rates[name.strip()] = float(rate)
+        except ValueError:
+            continue
+    return rates
+
+
+def setup_logging(level: Optional[str] = None,
+                  queue_size: int = 10000,
+                  sample_rates: Optional[Dict[str, float]] = None,
+                  stream: Optional[TextIO] = None) -> BoundedQueueHandler:
+    """Configurer le logging asynchrone en lignes JSON.
+
+    Les enregistrements passent par une file bornée vers un thread d'écriture
+    dédié. Le niveau et les taux d'échantillonnage peuvent venir de LOG_LEVEL et
+    LOG_SAMPLE_RATES. Les appels répétés renvoient le handler déjà installé.
+    """
+    global _handler, _listener
+    with _state_lock:
+        if _handler is not None:
+            return _handler
+
+        level = level or os.environ.get('LOG_LEVEL', 'INFO')
+        if sample_rates is None:
+            sample_rates = parse_sample_rates(os.environ.get('LOG_SAMPLE_RATES', ''))
+
+        writer = logging.StreamHandler(stream or sys.stderr)
+        writer.setFormatter(JsonFormatter())
+
+        handler = BoundedQueueHandler(queue.Queue(maxsize=queue_size))
+        if sample_rates:
+            handler.addFilter(SamplingFilter(sample_rates))
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(level.upper() if isinstance(level, str) else level)
+
+        listener = _DrainingListener(handler.queue, writer, respect_handler_level=True)
+        listener.start()
+
+        _handler, _listener = handler, listener
+        atexit.register(shutdown_logging)
+        return handler
+
+
+def get_dropped_count() -> int:
+    """Nombre d'enregistrements abandonnés faute de place dans la file"""
+    return _handler.dropped if _handler is not None else 0
+
+
+def shutdown_logging() -> None:
+    """Vider la file et arrêter le thread d'écriture"""
+    global _handler, _listener
+    with _state_lock:
+        if _listener is None:
+            return
+        handler, listener = _handler, _listener
+        _handler = _listener = None
+    logging.getLogger().removeHandler(handler)
+    try:
+        listener.stop()
+    finally:
+        if handler.dropped:
+            sys.stderr.write(json.dumps({
+                'level': 'WARNING',
+                'logger': __name__,
+                'message': 'Enregistrements de log abandonnés',
+                'dropped': handler.dropped,
+            }) + '\n')
@@ -25,7 +25,8 @@ send_notification() {
             log_lte "${JAUNE}Aucun numéro de téléphone configuré pour les notifications${NEUTRE}"
             return
         fi
-        python3 notify.py "$network_info" "${NOTIFICATION_PHONE}"
+        # Le démon regroupe les envois; à défaut, envoi direct
+        enqueue_notification lte "$network_info" || python3 notify.py "$network_info" "${NOTIFICATION_PHONE}"
     fi
 }
 
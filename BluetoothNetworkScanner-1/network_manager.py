@@ -1,40 +1,51 @@
-import json
 import os
 from typing import List, Dict, Optional
 
+from network_query import rssi_of
+from network_selector import BestNetworkSelector
+from snapshot_cache import FileSnapshotCache, Snapshot
+
 class NetworkDataManager:
     def __init__(self):
         self.config_dir = os.path.expanduser("~/.network_detect")
         self.wifi_results_file = os.path.join(self.config_dir, "wifi_results.json")
-        
+        self._cache: Optional[FileSnapshotCache] = None
+        self._selector: Optional[BestNetworkSelector] = None
+
+    def _snapshot(self) -> Snapshot:
+        """Version courante du fichier, relue seulement si elle a changé"""
+        if self._cache is None or self._cache.path != self.wifi_results_file:
+            self._cache = FileSnapshotCache(self.wifi_results_file)
+            self._selector = BestNetworkSelector(self.score_network)
+        return self._cache.get()
+
     def load_wifi_data(self) -> List[Dict]:
         """Charge les données WiFi à partir du fichier JSON"""
-        if not os.path.exists(self.wifi_results_file):
-            return []
-        
-        try:
-            with open(self.wifi_results_file, "r") as file:
-                return json.load(file)
-        except json.JSONDecodeError:
-            return []
+        snapshot = self._snapshot()
+        return [] if snapshot.error else snapshot.data
 
     def score_network(self, network: Dict) -> float:
-        """Calcule un score pour un réseau basé sur le RSSI et la sécurité"""
-        signal_score = max(-float(network.get("rssi", -100)), 0)
+        """Calcule un score pour un réseau basé sur le RSSI et la sécurité
+        (plus le signal est fort, plus le score est élevé)"""
+        signal_score = max(rssi_of(network) + 100, 0)
         security_score = 20 if "WPA" in str(network.get("ssid", "")) else 0
         return signal_score + security_score
 
+    def _best_network(self, snapshot: Snapshot) -> Optional[Dict]:
+        if snapshot.error or not snapshot.data:
+            return None
+        # Classement tenu d'une version du fichier à l'autre (RSSI lissé, hystérésis)
+        return snapshot.response('best_network', lambda s: self._selector.update(s.data))
+
     def get_best_network(self) -> Optional[Dict]:
         """Retourne le meilleur réseau disponible"""
-        wifi_data = self.load_wifi_data()
-        if not wifi_data:
-            return None
-        return max(wifi_data, key=self.score_network)
+        return self._best_network(self._snapshot())
 
     def get_network_status(self) -> Dict:
         """Retourne le statut actuel de tous les réseaux"""
-        wifi_data = self.load_wifi_data()
-        best_network = self.get_best_network()
+        snapshot = self._snapshot()
+        wifi_data = [] if snapshot.error else snapshot.data
+        best_network = self._best_network(snapshot)
         
         return {
             'wifi': {
@@ -49,6 +60,6 @@ class NetworkDataManager:
         """Calcule la qualité du signal sur une échelle de 0 à 1"""
         if not network:
             return 0
-        rssi = float(network.get("rssi", -100))
+        rssi = rssi_of(network)
         # Convertit RSSI (-100 à -50) en score (0 à 1)
         return max(0, min(1, (rssi + 100) / 50))
@@ -0,0 +1,201 @@
+import json
+import heapq
+import base64
+import binascii
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+# Paramètres reconnus par NetworkQuery.from_args
+QUERY_PARAMS = ('sort', 'limit', 'cursor', 'band', 'encryption', 'rssi_min', 'rssi_max', 'fields')
+
+# Valeur utilisée pour trier un réseau sans RSSI (même défaut que score_network)
+DEFAULT_RSSI = -100.0
+BANDS = ('2.4', '5', '6')
+
+
+def band_of(frequency_mhz: Optional[float]) -> Optional[str]:
+    """Bande WiFi ('2.4', '5' ou '6') d'une fréquence en MHz"""
+    if not frequency_mhz:
+        return None
+    if frequency_mhz < 3000:
+        return '2.4'
+    if frequency_mhz < 5925:
+        return '5'
+    return '6'
+
+
+def rssi_of(network: Dict[str, Any]) -> float:
+    """RSSI d'un réseau en dBm; DEFAULT_RSSI quand le scanner n'en donne pas"""
+    rssi = network.get('rssi')
+    return DEFAULT_RSSI if rssi is None else float(rssi)
+
+
+def _split(value: Optional[str]) -> Optional[List[str]]:
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+class NetworkIndex:
+    """Index des réseaux d'une version du fichier de résultats.
+
+    Construit une fois par snapshot: positions par bande et par chiffrement,
+    RSSI trié pour les plages, et clés de tri calculées à la demande.
+    """
+
+    def __init__(self, networks: Sequence[Dict[str, Any]], score: Callable[[Dict[str, Any]], float]):
+        self.networks = networks
+        self.by_band: Dict[str, List[int]] = {}
+        self.by_encryption: Dict[str, List[int]] = {}
+        for position, network in enumerate(networks):
+            self.by_band.setdefault(band_of(network.get('frequency_mhz')), []).append(position)
+            encryption = str(network.get('encryption') or 'inconnu').lower()
+            self.by_encryption.setdefault(encryption, []).append(position)
+        order = sorted(range(len(networks)), key=lambda i: rssi_of(networks[i]))
+        self._rssi_positions = order
+        self._rssi_values = [rssi_of(networks[i]) for i in order]
+        self._extractors: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            'rssi': rssi_of,
+            'ssid': lambda n: str(n.get('ssid') or ''),
+            'frequency_mhz': lambda n: n.get('frequency_mhz') or 0,
+            'channel': lambda n: n.get('channel') or 0,
+            'score': score,
+        }
+        self._keys: Dict[Optional[str], List[Tuple[Any, ...]]] = {}
+
+    @property
+    def sort_fields(self) -> Tuple[str, ...]:
+        return tuple(self._extractors)
+
+    def keys(self, field: Optional[str]) -> List[Tuple[Any, ...]]:
+        """Clés de tri (valeur, bssid, position), ordre total même à valeurs égales"""
+        if field in self._keys:
+            return self._keys[field]
+        if field is None:
+            self._keys[field] = [(position,) for position in range(len(self.networks))]
+        else:
+            extract = self._extractors[field]
+            self._keys[field] = [(extract(network), str(network.get('bssid') or ''), position)
+                                 for position, network in enumerate(self.networks)]
+        return self._keys[field]
+
+    def rssi_range(self, low: Optional[float], high: Optional[float]) -> List[int]:
+        start = 0 if low is None else bisect_left(self._rssi_values, low)
+        end = len(self._rssi_values) if high is None else bisect_right(self._rssi_values, high)
+        return self._rssi_positions[start:end]
+
+
+class NetworkQuery:
+    """Tri, filtres, projection et pagination par curseur d'une liste de réseaux"""
+
+    def __init__(self, sort: Optional[str] = None, limit: Optional[int] = None,
+                 cursor: Optional[str] = None, bands: Optional[List[str]] = None,
+                 encryptions: Optional[List[str]] = None, rssi_min: Optional[float] = None,
+                 rssi_max: Optional[float] = None, fields: Optional[List[str]] = None):
+        self.descending = bool(sort and sort.startswith('-'))
+        self.sort = sort.lstrip('-') if sort else None
+        self.limit = limit
+        self.cursor = cursor
+        self.bands = bands
+        self.encryptions = [e.lower() for e in encryptions] if encryptions is not None else None
+        self.rssi_min = rssi_min
+        self.rssi_max = rssi_max
+        self.fields = fields
+
+        if self.bands is not None and not set(self.bands) <= set(BANDS):
+            raise ValueError(f"Bande inconnue (valeurs possibles: {', '.join(BANDS)})")
+        if self.limit is not None and self.limit < 1:
+            raise ValueError("limit doit être un entier positif")
+        if self.cursor is not None and self.limit is None:
+            raise ValueError("cursor nécessite limit")
+
+    @classmethod
+    def from_args(cls, args: Mapping[str, str]) -> 'NetworkQuery':
+        """Construire la requête depuis les paramètres d'URL (ValueError si invalides)"""
+        def number(name: str, convert: Callable[[str], Any]) -> Any:
+            value = args.get(name)
+            if value is None or value == '':
+                return None
+            try:
+                return convert(value)
+            except ValueError:
+                raise ValueError(f"Valeur invalide pour {name}: {value}") from None
+
+        return cls(
+            sort=args.get('sort') or None,
+            limit=number('limit', int),
+            cursor=args.get('cursor') or None,
+            bands=_split(args.get('band')),
+            encryptions=_split(args.get('encryption')),
+            rssi_min=number('rssi_min', float),
+            rssi_max=number('rssi_max', float),
+            fields=_split(args.get('fields')),
+        )
+
+    def _encode_cursor(self, key: Tuple[Any, ...]) -> str:
+        raw = json.dumps([self.sort, self.descending, list(key)], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def _decode_cursor(self) -> Tuple[Any, ...]:
+        try:
+            padded = self.cursor + '=' * (-len(self.cursor) % 4)
+            sort, descending, key = json.loads(base64.urlsafe_b64decode(padded))
+        except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+            raise ValueError("Curseur invalide") from None
+        if sort != self.sort or descending != self.descending:
+            raise ValueError("Curseur obtenu avec un autre tri")
+        return tuple(key)
+
+    def _candidates(self, index: NetworkIndex) -> List[int]:
+        selected = None
+        for table, wanted in ((index.by_band, self.bands), (index.by_encryption, self.encryptions)):
+            if wanted is None:
+                continue
+            positions = set()
+            for value in wanted:
+                positions.update(table.get(value, ()))
+            selected = positions if selected is None else selected & positions
+        if self.rssi_min is not None or self.rssi_max is not None:
+            in_range = index.rssi_range(self.rssi_min, self.rssi_max)
+            selected = set(in_range) if selected is None else selected.intersection(in_range)
+        return list(range(len(index.networks))) if selected is None else list(selected)
+
+    def run(self, index: NetworkIndex) -> Dict[str, Any]:
+        """Réseaux sélectionnés, nombre de correspondances et curseur de la page suivante"""
+        if self.sort is not None and self.sort not in index.sort_fields:
+            raise ValueError(f"Tri inconnu (valeurs possibles: {', '.join(index.sort_fields)})")
+        keys = index.keys(self.sort)
+        candidates = self._candidates(index)
+        matched = len(candidates)
+
+        if self.cursor is not None:
+            after = self._decode_cursor()
+            if keys and len(after) != len(keys[0]):
+                raise ValueError("Curseur invalide")
+            try:
+                if self.descending:
+                    candidates = [i for i in candidates if keys[i] < after]
+                else:
+                    candidates = [i for i in candidates if keys[i] > after]
+            except TypeError:
+                raise ValueError("Curseur invalide") from None
+
+        next_cursor = None
+        if self.limit is None:
+            selected = sorted(candidates, key=keys.__getitem__, reverse=self.descending)
+        else:
+            # Sélection par tas: O(n log k) au lieu d'un tri complet
+            select = heapq.nlargest if self.descending else heapq.nsmallest
+            selected = select(self.limit + 1, candidates, key=keys.__getitem__)
+            if len(selected) > self.limit:
+                selected = selected[:self.limit]
+                next_cursor = self._encode_cursor(keys[selected[-1]])
+
+        networks = [index.networks[i] for i in selected]
+        if self.fields is not None:
+            networks = [{field: network.get(field) for field in self.fields} for network in networks]
+        return {
+            'reseaux': networks,
+            'correspondants': matched,
+            'curseur_suivant': next_cursor,
+        }
@@ -0,0 +1,160 @@
+import os
+import time
+import heapq
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from network_query import rssi_of
+
+# Lissage exponentiel du RSSI (poids de la nouvelle lecture, 1: pas de lissage)
+DEFAULT_SMOOTHING = float(os.environ.get('BEST_NETWORK_SMOOTHING', 0.3))
+# Avance de score nécessaire à un concurrent, et durée pendant laquelle il doit la garder (s)
+DEFAULT_MARGIN = float(os.environ.get('BEST_NETWORK_MARGIN', 5.0))
+DEFAULT_HOLD = float(os.environ.get('BEST_NETWORK_HOLD', 30.0))
+# Écart (dB) en deçà duquel le RSSI lissé rejoint la lecture
+_CONVERGED = 0.05
+
+
+def network_key(network: Dict[str, Any]) -> str:
+    """Identifiant d'un réseau d'un scan à l'autre: BSSID, sinon SSID"""
+    bssid = network.get('bssid')
+    if bssid:
+        return str(bssid).upper()
+    return f"ssid:{network.get('ssid') or ''}"
+
+
+class _Entry:
+    __slots__ = ('key', 'network', 'rssi', 'smoothed', 'score', 'order', 'version')
+
+    def __init__(self, key: str, network: Dict[str, Any], rssi: float, order: int):
+        self.key = key
+        self.network = network
+        self.rssi = rssi
+        self.smoothed = rssi
+        self.score: Optional[float] = None
+        self.order = order
+        self.version = -1
+
+
+class BestNetworkSelector:
+    """Meilleur réseau d'un scan à l'autre, avec RSSI lissé et hystérésis.
+
+    Les réseaux sont classés dans un tas max paresseux sur le score du RSSI
+    lissé: un réseau dont le score change y est réinséré (O(log n)) et son
+    ancienne entrée, périmée, est écartée quand elle remonte en tête. Un
+    réseau stable ne coûte aucune opération sur le tas. Le tas est
+    reconstruit lorsque les entrées périmées dépassent les entrées valides.
+
+    Le réseau retenu (`best`, lu en O(1)) ne change que si le premier du
+    classement le dépasse d'au moins `margin` pendant au moins `hold`
+    secondes, ou immédiatement s'il disparaît du scan. À score égal, le
+    réseau vu le premier l'emporte, comme max() sur l'ordre du scan.
+    """
+
+    def __init__(self, score: Callable[[Dict[str, Any]], float], smoothing: Optional[float] = None,
+                 margin: Optional[float] = None, hold: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.score = score
+        self.smoothing = DEFAULT_SMOOTHING if smoothing is None else smoothing
+        self.margin = DEFAULT_MARGIN if margin is None else margin
+        self.hold = DEFAULT_HOLD if hold is None else hold
+        self.clock = clock
+        if not 0 < self.smoothing <= 1:
+            raise ValueError("Le lissage doit être compris entre 0 (exclu) et 1")
+        self.switches = 0
+        self._entries: Dict[str, _Entry] = {}
+        # (-score, ordre d'apparition, version, clé)
+        self._heap: List[Tuple[float, int, int, str]] = []
+        self._counter = 0
+        self._incumbent: Optional[_Entry] = None
+        self._challenger: Optional[str] = None
+        self._since = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def best(self) -> Optional[Dict[str, Any]]:
+        """Réseau retenu (dernière lecture reçue)"""
+        incumbent = self._incumbent
+        return incumbent.network if incumbent is not None else None
+
+    @property
+    def leader(self) -> Optional[Dict[str, Any]]:
+        """Premier du classement au dernier scan, retenu ou non"""
+        return self._entries[self._heap[0][3]].network if self._heap else None
+
+    def smoothed_rssi(self, network: Dict[str, Any]) -> Optional[float]:
+        entry = self._entries.get(network_key(network))
+        return entry.smoothed if entry is not None else None
+
+    def _valid(self, item: Tuple[float, int, int, str]) -> bool:
+        entry = self._entries.get(item[3])
+        return entry is not None and entry.version == item[2]
+
+    def _push(self, entry: _Entry) -> None:
+        self._counter += 1
+        entry.version = self._counter
+        heapq.heappush(self._heap, (-entry.score, entry.order, entry.version, entry.key))
+
+    def _settle(self) -> None:
+        """Écarter les entrées périmées de la tête; reconstruire si elles dominent"""
+        if len(self._heap) > 2 * len(self._entries) + 32:
+            self._heap = [(-e.score, e.order, e.version, e.key) for e in self._entries.values()]
+            heapq.heapify(self._heap)
+        while self._heap and not self._valid(self._heap[0]):
+            heapq.heappop(self._heap)
+
+    def update(self, networks: Iterable[Dict[str, Any]], now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Appliquer un scan complet; retourne le réseau retenu"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            seen = set()
+            for network in networks:
+                key = network_key(network)
+                if key in seen:
+                    continue
+                seen.add(key)
+                rssi = rssi_of(network)
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._entries[key] = _Entry(key, network, rssi, self._counter)
+                    self._counter += 1
+                else:
+                    entry.smoothed += self.smoothing * (rssi - entry.smoothed)
+                    if abs(entry.smoothed - rssi) < _CONVERGED:
+                        entry.smoothed = rssi
+                    entry.rssi = rssi
+                entry.network = network
+                score = self.score(dict(network, rssi=entry.smoothed))
+                if score != entry.score:
+                    entry.score = score
+                    self._push(entry)
+            for key in [key for key in self._entries if key not in seen]:
+                del self._entries[key]
+            self._settle()
+            self._select(now)
+            return self.best
+
+    def _select(self, now: float) -> None:
+        leader = self._entries[self._heap[0][3]] if self._heap else None
+        incumbent = self._incumbent
+        if incumbent is not None and self._entries.get(incumbent.key) is not incumbent:
+            # Le réseau retenu a disparu du scan: remplacement immédiat
+            incumbent = None
+            self.switches += leader is not None
+        if leader is None or incumbent is None or leader is incumbent:
+            self._incumbent = leader if incumbent is None else incumbent
+            self._challenger = None
+            return
+        if leader.score - incumbent.score < self.margin:
+            self._challenger = None
+            return
+        if self._challenger != leader.key:
+            self._challenger = leader.key
+            self._since = now
+        if now - self._since >= self.hold:
+            self._incumbent = leader
+            self._challenger = None
+            self.switches += 1
@@ -1,5 +1,16 @@
 import os
-from twilio.rest import Client
+import sys
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4)
+def get_twilio_client(account_sid: str, auth_token: str):
+    """
+    Client Twilio réutilisé entre les envois; twilio n'est importé qu'au premier SMS
+    """
+    from twilio.rest import Client
+    return Client(account_sid, auth_token)
+
 
 def send_wifi_notification(network_info: str, to_phone: str) -> None:
     """
@@ -14,7 +25,7 @@ def send_wifi_notification(network_info: str, to_phone: str) -> None:
         return
 
     try:
-        client = Client(account_sid, auth_token)
+        client = get_twilio_client(account_sid, auth_token)
         message = client.messages.create(
             body=f"Nouveau réseau WiFi détecté:\n{network_info}",
             from_=from_phone,
@@ -22,4 +33,12 @@ def send_wifi_notification(network_info: str, to_phone: str) -> None:
         )
         print(f"Notification SMS envoyée (SID: {message.sid})")
     except Exception as e:
-        print(f"Erreur lors de l'envoi du SMS: {str(e)}")
\ No newline at end of file
+        print(f"Erreur lors de l'envoi du SMS: {str(e)}")
+
+
+if __name__ == '__main__':
+    # Appelé par les scripts de détection: python3 notify.py "<info>" "<téléphone>"
+    if len(sys.argv) != 3:
+        print("Usage: notify.py <info_reseau> <telephone>")
+        sys.exit(1)
+    send_wifi_notification(sys.argv[1], sys.argv[2])
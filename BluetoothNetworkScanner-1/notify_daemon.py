@@ -0,0 +1,332 @@
+import os
+import sys
+import time
+import random
+import signal
+import logging
+import argparse
+import threading
+import tempfile
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPOOL = os.path.expanduser('~/.network_detect/notifications')
+# Longueur maximale d'un message accepté par Twilio
+SMS_MAX_LENGTH = 1600
+SOURCE_LABELS = {
+    'wifi': 'Nouveau réseau WiFi',
+    'bluetooth': 'Nouvel appareil Bluetooth',
+    'lte': 'Nouveau réseau cellulaire',
+    'esim': 'Nouveau profil eSIM',
+}
+
+
+def _normalize(text: str) -> str:
+    return ' '.join(text.split())
+
+
+def enqueue(spool_dir: str, info: str, phone: str, source: str = 'wifi') -> str:
+    """Déposer une notification dans la file (écriture atomique tmp/ puis new/).
+
+    Format du fichier: téléphone, source, puis le texte sur les lignes suivantes.
+    """
+    for sub in ('tmp', 'new'):
+        os.makedirs(os.path.join(spool_dir, sub), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.join(spool_dir, 'tmp'))
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(f"{phone}\n{source}\n{info}")
+    path = os.path.join(spool_dir, 'new', os.path.basename(tmp))
+    os.replace(tmp, path)
+    return path
+
+
+class NotificationEvent:
+    __slots__ = ('path', 'phone', 'source', 'text', 'received')
+
+    def __init__(self, path: Optional[str], phone: str, source: str, text: str, received: float):
+        self.path = path
+        self.phone = phone
+        self.source = source
+        self.text = text
+        self.received = received
+
+
+class _Digest:
+    """Événements en attente pour un destinataire"""
+    __slots__ = ('events', 'keys', 'attempts', 'next_try')
+
+    def __init__(self):
+        self.events: List[NotificationEvent] = []
+        self.keys = set()
+        self.attempts = 0
+        self.next_try = 0.0
+
+
+class TokenBucket:
+    """Limiteur de débit: `rate` envois par seconde, rafales de `burst` au plus"""
+
+    def __init__(self, rate: float, burst: int, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, now: float) -> bool:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class NotificationDispatcher:
+    """Démon de notifications SMS alimenté par un répertoire de file d'attente.
+
+    Les scripts de détection déposent un fichier par événement dans
+    `<spool>/new/`. Le démon regroupe les événements d'un même destinataire
+    pendant `digest_delay` secondes en un seul SMS récapitulatif, ignore les
+    doublons vus dans les `dedup_window` dernières secondes, limite le débit
+    d'envoi, réutilise un seul client Twilio et réessaie avec un délai
+    exponentiel. Un fichier n'est supprimé qu'une fois son SMS envoyé; après
+    `max_attempts` échecs il est déplacé dans `<spool>/failed/`.
+    """
+
+    def __init__(self, spool_dir: str = DEFAULT_SPOOL, client_factory: Optional[Callable] = None,
+                 from_phone: Optional[str] = None, digest_delay: float = 30.0,
+                 max_digest: int = 10, dedup_window: float = 3600.0,
+                 rate_per_minute: float = 6.0, burst: int = 3, max_attempts: int = 5,
+                 backoff: float = 2.0, max_backoff: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.spool_dir = spool_dir
+        self.new_dir = os.path.join(spool_dir, 'new')
+        self.failed_dir = os.path.join(spool_dir, 'failed')
+        for path in (os.path.join(spool_dir, 'tmp'), self.new_dir, self.failed_dir):
+            os.makedirs(path, exist_ok=True)
+
+        self._client_factory = client_factory or _default_client
+        self._client = None
+        self.from_phone = from_phone or os.environ.get('TWILIO_PHONE_NUMBER')
+        self.digest_delay = digest_delay
+        self.max_digest = max_digest
+        self.dedup_window = dedup_window
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.bucket = TokenBucket(rate_per_minute / 60.0, burst, clock())
+
+        self._pending: Dict[str, _Digest] = {}
+        self._seen_files = set()
+        # (téléphone, texte normalisé) -> instant d'envoi, du plus ancien au plus récent
+        self._recent: 'OrderedDict[tuple, float]' = OrderedDict()
+        self.sent = 0
+        self.dropped_duplicates = 0
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self._client_factory()
+        return self._client
+
+    def ingest(self) -> int:
+        """Lire les nouveaux fichiers de la file; retourne le nombre d'événements retenus"""
+        now = self.clock()
+        self._forget_recent(now)
+        try:
+            names = sorted(os.listdir(self.new_dir),
+                           key=lambda n: os.stat(os.path.join(self.new_dir, n)).st_mtime_ns)
+        except FileNotFoundError:
+            return 0
+
+        accepted = 0
+        for name in names:
+            path = os.path.join(self.new_dir, name)
+            if path in self._seen_files:
+                continue
+            try:
+                with open(path, encoding='utf-8', errors='replace') as f:
+                    phone, source, text = (f.read().split('\n', 2) + ['', ''])[:3]
+            except FileNotFoundError:
+                continue
+            phone, source, text = phone.strip(), source.strip() or 'wifi', text.strip()
+            key = (phone, _normalize(text))
+            digest = self._pending.get(phone)
+            if not phone or not text or key in self._recent or (digest is not None and key in digest.keys):
+                self.dropped_duplicates += 1
+                self._remove(path)
+                continue
+
+            if digest is None:
+                digest = self._pending[phone] = _Digest()
+            digest.events.append(NotificationEvent(path, phone, source, text, now))
+            digest.keys.add(key)
+            self._seen_files.add(path)
+            accepted += 1
+        return accepted
+
+    def flush(self, force: bool = False) -> int:
+        """Envoyer les récapitulatifs dus; retourne le nombre de SMS envoyés"""
+        sent = 0
+        for phone in list(self._pending):
+            digest = self._pending[phone]
+            while digest.events:
+                now = self.clock()
+                due = force or now - digest.events[0].received >= self.digest_delay \
+                    or len(digest.events) >= self.max_digest
+                if not due or now < digest.next_try or not self.bucket.take(now):
+                    break
+                batch = self._take_batch(digest)
+                if self._send(phone, batch, digest):
+                    sent += 1
+                else:
+                    break
+            if not digest.events:
+                del self._pending[phone]
+        self.sent += sent
+        return sent
+
+    def step(self) -> int:
+        self.ingest()
+        return self.flush()
+
+    def pending_count(self) -> int:
+        return sum(len(d.events) for d in self._pending.values())
+
+    def _take_batch(self, digest: _Digest) -> List[NotificationEvent]:
+        batch, length = [], 0
+        for event in digest.events[:self.max_digest]:
+            length += len(event.text) + 4
+            if batch and length > SMS_MAX_LENGTH - 80:
+                break
+            batch.append(event)
+        return batch
+
+    def _send(self, phone: str, batch: List[NotificationEvent], digest: _Digest) -> bool:
+        body = format_digest(batch)
+        try:
+            message = self.client.messages.create(body=body, from_=self.from_phone, to=phone)
+        except Exception as e:
+            digest.attempts += 1
+            if digest.attempts >= self.max_attempts:
+                logger.error("Échec définitif de l'envoi à %s après %d tentatives: %s",
+                             phone, digest.attempts, e)
+                self._finish(digest, batch, failed=True)
+            else:
+                delay = min(self.max_backoff, self.backoff * 2 ** (digest.attempts - 1))
+                digest.next_try = self.clock() + delay * random.uniform(0.8, 1.2)
+                logger.warning("Erreur lors de l'envoi du SMS à %s (tentative %d, nouvel essai dans %.0fs): %s",
+                               phone, digest.attempts, delay, e)
+            return False
+
+        logger.info("Récapitulatif envoyé à %s: %d événement(s) (SID: %s)", phone, len(batch), message.sid)
+        now = self.clock()
+        for event in batch:
+            self._recent[(phone, _normalize(event.text))] = now
+        self._finish(digest, batch, failed=False)
+        return True
+
+    def _finish(self, digest: _Digest, batch: List[NotificationEvent], failed: bool) -> None:
+        del digest.events[:len(batch)]
+        digest.attempts = 0
+        digest.next_try = 0.0
+        for event in batch:
+            digest.keys.discard((event.phone, _normalize(event.text)))
+            self._seen_files.discard(event.path)
+            if failed:
+                try:
+                    os.replace(event.path, os.path.join(self.failed_dir, os.path.basename(event.path)))
+                except OSError:
+                    pass
+            else:
+                self._remove(event.path)
+
+    def _forget_recent(self, now: float) -> None:
+        while self._recent:
+            key, sent_at = next(iter(self._recent.items()))
+            if now - sent_at < self.dedup_window:
+                break
+            del self._recent[key]
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def run(self, poll_interval: float = 1.0, stop: Optional[threading.Event] = None) -> None:
+        """Boucle principale; les événements en attente sont envoyés à l'arrêt"""
+        stop = stop or threading.Event()
+        pid_file = os.path.join(self.spool_dir, 'daemon.pid')
+        with open(pid_file, 'w') as f:
+            f.write(str(os.getpid()))
+        logger.info("Démon de notifications démarré (file: %s)", self.spool_dir)
+        try:
+            while not stop.is_set():
+                try:
+                    self.step()
+                except Exception as e:
+                    logger.exception("Erreur du démon de notifications: %s", e)
+                stop.wait(poll_interval)
+            self.ingest()
+            self.flush(force=True)
+        finally:
+            self._remove(pid_file)
+            logger.info("Démon de notifications arrêté (%d SMS envoyés)", self.sent)
+
+
+def format_digest(events: List[NotificationEvent]) -> str:
+    """Corps du SMS: un événement tel quel, plusieurs sous forme de récapitulatif"""
+    if len(events) == 1:
+        event = events[0]
+        return f"{SOURCE_LABELS.get(event.source, 'Nouveau réseau')} détecté:\n{event.text}"
+    lines = [f"{len(events)} nouvelles détections:"]
+    for event in events:
+        lines.append(f"- {_normalize(event.text)}")
+    return '\n'.join(lines)
+
+
+def _default_client():
+    from notify import get_twilio_client
+
+    account_sid = os.environ.get('TWILIO_ACCOUNT_SID')
+    auth_token = os.environ.get('TWILIO_AUTH_TOKEN')
+    if not (account_sid and auth_token):
+        raise RuntimeError("Configuration Twilio manquante (TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)")
+    return get_twilio_client(account_sid, auth_token)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from log_config import setup_logging
+
+    parser = argparse.ArgumentParser(description="Démon d'envoi groupé des notifications SMS")
+    parser.add_argument('--spool', default=os.environ.get('NOTIFY_SPOOL', DEFAULT_SPOOL))
+    parser.add_argument('--digest-delay', type=float, default=float(os.environ.get('NOTIFY_DIGEST_DELAY', 30)))
+    parser.add_argument('--dedup-window', type=float, default=float(os.environ.get('NOTIFY_DEDUP_WINDOW', 3600)))
+    parser.add_argument('--rate', type=float, default=float(os.environ.get('NOTIFY_RATE_PER_MINUTE', 6)),
+                        help="SMS par minute au plus")
+    parser.add_argument('--poll', type=float, default=1.0)
+    parser.add_argument('--fake', action='store_true', help="simuler Twilio (affiche les SMS)")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    client_factory = None
+    if args.fake:
+        from fake_twilio import FakeTwilioClient
+        client_factory = lambda: FakeTwilioClient(echo=True)
+    from_phone = os.environ.get('TWILIO_PHONE_NUMBER') or ('+10000000000' if args.fake else None)
+    dispatcher = NotificationDispatcher(args.spool, client_factory=client_factory, from_phone=from_phone,
+                                        digest_delay=args.digest_delay, dedup_window=args.dedup_window,
+                                        rate_per_minute=args.rate)
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    dispatcher.run(poll_interval=args.poll, stop=stop)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,346 @@
+import os
+import sys
+import csv
+import mmap
+import struct
+import logging
+import argparse
+import threading
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Registres IEEE, du préfixe le plus long au plus court pour la recherche
+# du plus long préfixe: MA-S (36 bits), MA-M (28 bits), MA-L (24 bits)
+REGISTRIES = (('MA-S', 36), ('MA-M', 28), ('MA-L', 24))
+PREFIX_BITS = tuple(bits for _, bits in REGISTRIES)
+
+MAGIC = b'OUIX'
+VERSION = 1
+# magic, version, nombre d'entrées par registre, nombre de noms
+HEADER = struct.Struct('<4sI3II')
+
+UNKNOWN = -1
+LOCAL = -2
+UNKNOWN_LABEL = 'Inconnu'
+LOCAL_LABEL = 'Adresse aléatoire (locale)'
+
+logger = logging.getLogger(__name__)
+
+_default_index = None
+_default_loaded = False
+_default_lock = threading.Lock()
+
+IEEE_SOURCES = (
+    'https://standards-oui.ieee.org/oui/oui.csv',
+    'https://standards-oui.ieee.org/oui28/mam.csv',
+    'https://standards-oui.ieee.org/oui36/oui36.csv',
+)
+
+
+def mac_to_int(mac: str) -> Optional[int]:
+    """Adresse MAC (séparateurs ':', '-' ou '.', ou aucun) vers entier 48 bits"""
+    digits = mac.strip().replace(':', '').replace('-', '').replace('.', '')
+    if len(digits) != 12:
+        return None
+    try:
+        return int(digits, 16)
+    except ValueError:
+        return None
+
+
+def is_locally_administered(value: int) -> bool:
+    """Bit U/L du premier octet: adresse locale, le plus souvent aléatoire"""
+    return bool((value >> 40) & 0x02)
+
+
+def read_registry_csv(paths: Iterable[str]) -> Dict[Tuple[int, int], str]:
+    """Lire les CSV IEEE (Registry,Assignment,Organization Name,...).
+
+    La longueur de l'attribution (6, 7 ou 9 chiffres hexadécimaux) détermine
+    le registre; en cas de doublon la première organisation lue est conservée.
+    """
+    bits_by_length = {bits // 4: bits for bits in PREFIX_BITS}
+    entries = {}
+    for path in paths:
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                assignment = (row.get('Assignment') or '').strip()
+                name = ' '.join((row.get('Organization Name') or '').split())
+                bits = bits_by_length.get(len(assignment))
+                if bits is None or not name:
+                    continue
+                try:
+                    key = (bits, int(assignment, 16))
+                except ValueError:
+                    continue
+                entries.setdefault(key, name)
+    return entries
+
+
+def build_index(entries: Dict[Tuple[int, int], str], output: str) -> None:
+    """Écrire la table binaire triée: clés u64 puis identifiants de nom u32
+    par registre, puis les noms dédupliqués (décalages u32 + UTF-8)."""
+    names: Dict[str, int] = {}
+    tables = []
+    for _, bits in REGISTRIES:
+        prefixes = sorted((prefix, name) for (b, prefix), name in entries.items() if b == bits)
+        tables.append([(prefix, names.setdefault(name, len(names))) for prefix, name in prefixes])
+
+    blobs = [name.encode('utf-8') for name in names]
+    offsets = [0]
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+
+    tmp = output + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, *(len(t) for t in tables), len(blobs)))
+        for table in tables:
+            f.write(struct.pack(f'<{len(table)}Q', *(prefix for prefix, _ in table)))
+        for table in tables:
+            f.write(struct.pack(f'<{len(table)}I', *(name_id for _, name_id in table)))
+        f.write(struct.pack(f'<{len(offsets)}I', *offsets))
+        f.write(b''.join(blobs))
+    os.replace(tmp, output)
+
+
+class OUIIndex:
+    """Index OUI mappé en mémoire, recherche par bissection du plus long préfixe.
+
+    Le fichier n'est pas copié en mémoire: seules les pages touchées par les
+    recherches sont chargées. `lookup` n'utilise que la bibliothèque standard;
+    `lookup_many` traite des lots d'adresses avec NumPy.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, *counts, name_count = HEADER.unpack_from(self._mm)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"Index OUI incompatible: {path}")
+
+        self._counts = counts
+        offset = HEADER.size
+        self._key_offsets = []
+        for count in counts:
+            self._key_offsets.append(offset)
+            offset += 8 * count
+        self._id_offsets = []
+        for count in counts:
+            self._id_offsets.append(offset)
+            offset += 4 * count
+        self._blob_offset = offset + 4 * (name_count + 1)
+
+        # Le format est petit-boutiste, comme les architectures visées
+        self._view = view = memoryview(self._mm)
+        self._keys = [view[o:o + 8 * c].cast('Q') for o, c in zip(self._key_offsets, counts)]
+        self._ids = [view[o:o + 4 * c].cast('I') for o, c in zip(self._id_offsets, counts)]
+        self._name_bounds = view[offset:self._blob_offset].cast('I')
+        self._name_cache: Dict[int, str] = {}
+        self._arrays = None
+
+    def __len__(self) -> int:
+        return sum(self._counts)
+
+    def name(self, name_id: int) -> str:
+        name = self._name_cache.get(name_id)
+        if name is None:
+            start = self._blob_offset + self._name_bounds[name_id]
+            end = self._blob_offset + self._name_bounds[name_id + 1]
+            name = self._name_cache[name_id] = self._mm[start:end].decode('utf-8')
+        return name
+
+    def lookup_id(self, value: int) -> int:
+        """Identifiant de nom pour une adresse 48 bits, UNKNOWN ou LOCAL"""
+        if is_locally_administered(value):
+            return LOCAL
+        for bits, keys, ids in zip(PREFIX_BITS, self._keys, self._ids):
+            prefix = value >> (48 - bits)
+            i = bisect_left(keys, prefix)
+            if i < len(keys) and keys[i] == prefix:
+                return ids[i]
+        return UNKNOWN
+
+    def lookup(self, mac: str) -> Optional[str]:
+        """Organisation enregistrée pour une adresse MAC, None si inconnue"""
+        value = mac_to_int(mac)
+        if value is None:
+            return None
+        name_id = self.lookup_id(value)
+        return self.name(name_id) if name_id >= 0 else None
+
+    def describe(self, mac: str) -> str:
+        """Fabricant, libellé d'adresse locale ou 'Inconnu'"""
+        value = mac_to_int(mac)
+        return _label(self, self.lookup_id(value) if value is not None else UNKNOWN)
+
+    def _numpy_tables(self):
+        if self._arrays is None:
+            import numpy as np
+            self._arrays = [
+                (bits,
+                 np.frombuffer(self._mm, dtype='<u8', count=count, offset=key_offset),
+                 np.frombuffer(self._mm, dtype='<u4', count=count, offset=id_offset))
+                for bits, count, key_offset, id_offset
+                in zip(PREFIX_BITS, self._counts, self._key_offsets, self._id_offsets)
+            ]
+        return self._arrays
+
+    def lookup_many(self, values) -> 'np.ndarray':
+        """Identifiants de nom (int64) pour un tableau d'adresses 48 bits"""
+        import numpy as np
+
+        values = np.asarray(values, dtype=np.uint64)
+        result = np.full(values.shape, UNKNOWN, dtype=np.int64)
+        local = ((values >> np.uint64(40)) & np.uint64(0x02)) != 0
+        result[local] = LOCAL
+        pending = ~local
+        for bits, keys, ids in self._numpy_tables():
+            if not len(keys) or not pending.any():
+                continue
+            prefixes = values >> np.uint64(48 - bits)
+            positions = np.minimum(np.searchsorted(keys, prefixes), len(keys) - 1)
+            hit = pending & (keys[positions] == prefixes)
+            result[hit] = ids[positions[hit]]
+            pending &= ~hit
+        return result
+
+    def describe_many(self, macs: Sequence[str]) -> List[str]:
+        """`describe` appliqué à un lot d'adresses textuelles"""
+        values, valid = parse_macs(macs)
+        ids = self.lookup_many(values)
+        ids[~valid] = UNKNOWN
+        return [_label(self, name_id) for name_id in ids.tolist()]
+
+    def close(self) -> None:
+        for view in self._keys + self._ids + [self._name_bounds, self._view]:
+            view.release()
+        self._arrays = None
+        try:
+            self._mm.close()
+        except BufferError:
+            # Des tableaux NumPy issus de lookup_many référencent encore la
+            # projection; elle sera libérée avec eux
+            pass
+
+
+def _label(index: Optional[OUIIndex], name_id: int) -> str:
+    if name_id == LOCAL:
+        return LOCAL_LABEL
+    if name_id >= 0 and index is not None:
+        return index.name(name_id)
+    return UNKNOWN_LABEL
+
+
+def parse_macs(macs: Sequence[str]):
+    """Conversion vectorisée d'adresses 'aa:bb:cc:dd:ee:ff' (ou '-') en entiers.
+
+    Retourne (valeurs uint64, masque de validité). Les formats non canoniques
+    sont convertis un par un.
+    """
+    import numpy as np
+
+    count = len(macs)
+    try:
+        # 18 octets: un 18e caractère non nul signale une chaîne trop longue
+        raw = np.asarray(macs, dtype='S18').reshape(count).view(np.uint8).reshape(count, 18)
+    except (UnicodeEncodeError, ValueError):
+        raw = None
+
+    if raw is not None:
+        nibble_table, hex_columns, separator_columns, shifts = _parse_tables()
+        nibbles = nibble_table[raw[:, hex_columns]]
+        separators = raw[:, separator_columns]
+        valid = ((nibbles >= 0).all(axis=1) & (raw[:, 17] == 0)
+                 & ((separators == ord(':')) | (separators == ord('-'))).all(axis=1))
+        values = (np.where(nibbles >= 0, nibbles, 0).astype(np.uint64) << shifts).sum(axis=1, dtype=np.uint64)
+    else:
+        valid = np.zeros(count, dtype=bool)
+        values = np.zeros(count, dtype=np.uint64)
+
+    for i in np.flatnonzero(~valid).tolist():
+        value = mac_to_int(str(macs[i]))
+        if value is not None:
+            values[i] = value
+            valid[i] = True
+    return values, valid
+
+
+@lru_cache(maxsize=1)
+def _parse_tables():
+    """Tables de conversion hexadécimale, construites au premier lot"""
+    import numpy as np
+
+    nibbles = np.full(256, -1, dtype=np.int16)
+    for i, c in enumerate('0123456789abcdef'):
+        nibbles[ord(c)] = i
+        nibbles[ord(c.upper())] = i
+    hex_columns = np.array([0, 1, 3, 4, 6, 7, 9, 10, 12, 13, 15, 16])
+    separator_columns = np.array([2, 5, 8, 11, 14])
+    shifts = np.arange(44, -4, -4).astype(np.uint64)
+    return nibbles, hex_columns, separator_columns, shifts
+
+
+def get_default_index() -> Optional[OUIIndex]:
+    """Index partagé par le processus (chemin OUI_INDEX, défaut oui.bin), chargé au premier appel"""
+    global _default_index, _default_loaded
+    if not _default_loaded:
+        with _default_lock:
+            if not _default_loaded:
+                path = os.environ.get('OUI_INDEX', 'oui.bin')
+                if os.path.exists(path):
+                    try:
+                        _default_index = OUIIndex(path)
+                    except (OSError, ValueError, struct.error) as e:
+                        logger.warning("Index OUI %s inutilisable: %s", path, e)
+                else:
+                    logger.info("Index OUI %s absent, fabricants non résolus", path)
+                _default_loaded = True
+    return _default_index
+
+
+def describe(mac: str) -> str:
+    """Fabricant d'une adresse via l'index partagé; les adresses locales
+    restent signalées même sans index"""
+    index = get_default_index()
+    if index is not None:
+        return index.describe(mac)
+    value = mac_to_int(mac)
+    return LOCAL_LABEL if value is not None and is_locally_administered(value) else UNKNOWN_LABEL
+
+
+def describe_many(macs: Sequence[str]) -> List[str]:
+    index = get_default_index()
+    if index is not None:
+        return index.describe_many(macs)
+    return [describe(mac) for mac in macs]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Construire ou interroger l'index OUI IEEE")
+    commands = parser.add_subparsers(dest='commande', required=True)
+    build = commands.add_parser('build', help="compiler les CSV IEEE (MA-L, MA-M, MA-S) en table binaire",
+                                epilog="Sources: " + ' '.join(IEEE_SOURCES))
+    build.add_argument('csv', nargs='+')
+    build.add_argument('-o', '--output', default='oui.bin')
+    lookup = commands.add_parser('lookup', help="résoudre des adresses MAC")
+    lookup.add_argument('macs', nargs='+')
+    lookup.add_argument('--index', default=os.environ.get('OUI_INDEX', 'oui.bin'))
+    args = parser.parse_args(argv)
+
+    if args.commande == 'build':
+        entries = read_registry_csv(args.csv)
+        build_index(entries, args.output)
+        print(f"{len(entries)} préfixes écrits dans {args.output} ({os.path.getsize(args.output)} octets)")
+    else:
+        index = OUIIndex(args.index)
+        for mac in args.macs:
+            print(f"{mac}\t{index.describe(mac)}")
+        index.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import os
+import sys
+import argparse
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Ordre fixe des types de réseau dans le vecteur de caractéristiques
+FEATURE_TYPES = ('wifi', 'bluetooth', 'lte', 'esim', 'vpn')
+FEATURE_NAMES = tuple(f'qualite_{t}' for t in FEATURE_TYPES) + tuple(f'present_{t}' for t in FEATURE_TYPES)
+MODEL_VERSION = 1
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30.0, 30.0)))
+
+
+def build_features(network_data: Dict[str, Any],
+                   quality_fn: Callable[[float, str], float]) -> np.ndarray:
+    """Vecteur de caractéristiques d'un état réseau {type: {'signal': ...}}"""
+    features = np.zeros(len(FEATURE_NAMES), dtype=np.float64)
+    for index, net_type in enumerate(FEATURE_TYPES):
+        info = network_data.get(net_type)
+        if isinstance(info, dict) and 'signal' in info:
+            signal = float(str(info['signal']).split()[0])
+            features[index] = quality_fn(signal, net_type)
+            features[len(FEATURE_TYPES) + index] = 1.0
+    return features
+
+
+class QualityModel:
+    """Régression logistique (NumPy) prédisant la qualité réseau entre 0 et 1.
+
+    Entraînée hors ligne sur l'historique des scans: à partir des qualités
+    moyennes par type d'un scan, elle prédit la qualité moyenne du scan suivant.
+    Le modèle tient dans quelques centaines d'octets (.npz).
+    """
+
+    def __init__(self, weights: np.ndarray, bias: float):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Prédiction par lot: une ligne de caractéristiques par échantillon"""
+        return _sigmoid(np.asarray(features, dtype=np.float64) @ self.weights + self.bias)
+
+    @classmethod
+    def fit(cls, features: np.ndarray, targets: np.ndarray, l2: float = 1e-3,
+            learning_rate: float = 0.5, iterations: int = 3000) -> 'QualityModel':
+        """Descente de gradient sur l'entropie croisée avec cibles continues"""
+        samples, width = features.shape
+        weights = np.zeros(width)
+        bias = 0.0
+        for _ in range(iterations):
+            error = _sigmoid(features @ weights + bias) - targets
+            weights -= learning_rate * (features.T @ error / samples + l2 * weights)
+            bias -= learning_rate * float(error.mean())
+        return cls(weights, bias)
+
+    def save(self, path: str) -> None:
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, weights=self.weights, bias=np.array(self.bias),
+                                version=np.array(MODEL_VERSION),
+                                feature_names=np.array(FEATURE_NAMES))
+
+    @classmethod
+    def load(cls, path: str) -> 'QualityModel':
+        with np.load(path) as data:
+            if int(data['version']) != MODEL_VERSION or tuple(data['feature_names']) != FEATURE_NAMES:
+                raise ValueError(f"Modèle incompatible: {path}")
+            return cls(data['weights'], float(data['bias']))
+
+
+def _scan_qualities(average_signal: Dict[str, float],
+                    thresholds: Dict[str, Dict[str, float]]) -> np.ndarray:
+    """Qualités par type (NaN si absent) à partir du signal moyen d'un scan"""
+    from batch_analysis import signal_quality
+
+    signals = np.full(len(FEATURE_TYPES), np.nan)
+    excellent = np.full(len(FEATURE_TYPES), -50.0)
+    poor = np.full(len(FEATURE_TYPES), -100.0)
+    for index, net_type in enumerate(FEATURE_TYPES):
+        if net_type in average_signal:
+            signals[index] = float(average_signal[net_type])
+        if net_type in thresholds:
+            excellent[index] = thresholds[net_type]['excellent']
+            poor[index] = thresholds[net_type]['poor']
+    return np.where(np.isnan(signals), np.nan, signal_quality(signals, excellent, poor))
+
+
+def build_dataset(history: Iterable[Dict[str, Any]],
+                  thresholds: Dict[str, Dict[str, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Couples (caractéristiques du scan t, qualité moyenne du scan t+1)"""
+    qualities = [_scan_qualities(entry.get('average_signal', {}), thresholds) for entry in history]
+    qualities = [q for q in qualities if not np.all(np.isnan(q))]
+    if len(qualities) < 2:
+        return np.empty((0, len(FEATURE_NAMES))), np.empty(0)
+    matrix = np.vstack(qualities)
+    present = ~np.isnan(matrix)
+    features = np.hstack([np.nan_to_num(matrix), present.astype(np.float64)])
+    targets = np.nanmean(matrix, axis=1)
+    return features[:-1], targets[1:]
+
+
+def evaluate(model: QualityModel, features: np.ndarray, targets: np.ndarray) -> Dict[str, float]:
+    """Erreurs du modèle et de l'heuristique (moyenne des qualités actuelles)"""
+    predictions = model.predict(features)
+    width = len(FEATURE_TYPES)
+    present = features[:, width:].sum(axis=1)
+    heuristic = features[:, :width].sum(axis=1) / np.maximum(present, 1)
+    return {
+        'echantillons': int(len(targets)),
+        'mae_modele': float(np.abs(predictions - targets).mean()),
+        'rmse_modele': float(np.sqrt(((predictions - targets) ** 2).mean())),
+        'mae_heuristique': float(np.abs(heuristic - targets).mean()),
+    }
+
+
+def _load_history(stats_file: str) -> List[Dict[str, Any]]:
+    from stats_store import StatsStore
+
+    db_path = os.path.splitext(stats_file)[0] + '.db'
+    store = StatsStore(db_path, max_entries=sys.maxsize, legacy_json=stats_file)
+    try:
+        return [{'average_signal': e.get('average_signal', {})} for e in store.iter_entries()]
+    finally:
+        store.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from ai_predictor import NetworkAIPredictor
+
+    parser = argparse.ArgumentParser(description="Entraîner ou évaluer le modèle local de qualité réseau")
+    parser.add_argument('commande', choices=('train', 'evaluate'))
+    parser.add_argument('--stats', default='network_stats.json',
+                        help="historique des scans (la base .db voisine est utilisée)")
+    parser.add_argument('--model', default='modele_ia.npz')
+    parser.add_argument('--test-ratio', type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    features, targets = build_dataset(_load_history(args.stats), NetworkAIPredictor.SIGNAL_THRESHOLDS)
+    if len(targets) < 10:
+        print(f"Historique insuffisant: {len(targets)} échantillon(s), 10 requis")
+        return 1
+
+    # Découpage chronologique: on évalue sur les scans les plus récents
+    split = int(len(targets) * (1 - args.test_ratio))
+    if args.commande == 'train':
+        model = QualityModel.fit(features[:split], targets[:split])
+        model.save(args.model)
+        print(f"Modèle enregistré dans {args.model}")
+    else:
+        model = QualityModel.load(args.model)
+    for name, value in evaluate(model, features[split:], targets[split:]).items():
+        print(f"{name}: {value:.4f}" if isinstance(value, float) else f"{name}: {value}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,417 @@
+import sys
+import json
+import sqlite3
+import argparse
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from stats_rollups import TimePoint, to_epoch
+
+# Types d'alerte
+SSID_COLLISION = 'ssid_collision'
+SECURITY_DOWNGRADE = 'security_downgrade'
+NEW_BSSID_TRUSTED = 'new_bssid_trusted'
+ALERT_TYPES = (SSID_COLLISION, SECURITY_DOWNGRADE, NEW_BSSID_TRUSTED)
+
+# Gravité par type d'alerte
+SEVERITY = {SSID_COLLISION: 'moyenne', SECURITY_DOWNGRADE: 'élevée', NEW_BSSID_TRUSTED: 'moyenne'}
+# Libellés de sécurité, du plus faible au plus fort (rang = position)
+SECURITY_LEVELS = ('aucune', 'WEP', 'WPA', 'WPA2', 'WPA3')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rogue_bssids (
+    ssid TEXT NOT NULL,
+    bssid TEXT NOT NULL,
+    security INTEGER NOT NULL,
+    oui TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    suspect INTEGER NOT NULL,
+    PRIMARY KEY (ssid, bssid)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rogue_alerts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT NOT NULL,
+    ssid TEXT NOT NULL,
+    bssid TEXT NOT NULL,
+    details TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    count INTEGER NOT NULL,
+    acknowledged INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (type, ssid, bssid)
+);
+CREATE TABLE IF NOT EXISTS rogue_allowlist (
+    ssid TEXT NOT NULL,
+    bssid TEXT NOT NULL,
+    PRIMARY KEY (ssid, bssid)
+) WITHOUT ROWID;
+"""
+
+# Dans rogue_allowlist, bssid = '*' marque un SSID de confiance et ssid = '*'
+# un BSSID autorisé quel que soit le SSID annoncé
+ANY = '*'
+
+
+def security_rank(encryption: Optional[str]) -> int:
+    """Rang de sécurité (0 = ouvert, 4 = WPA3) d'un libellé de chiffrement"""
+    text = str(encryption or '').upper()
+    for rank in range(len(SECURITY_LEVELS) - 1, 0, -1):
+        if SECURITY_LEVELS[rank] in text:
+            return rank
+    return 0
+
+
+def normalize_bssid(bssid: str) -> str:
+    return str(bssid).strip().upper().replace('-', ':')
+
+
+def oui_of(bssid: str) -> str:
+    """Préfixe constructeur (3 premiers octets) d'un BSSID normalisé"""
+    return bssid[:8]
+
+
+def is_local(bssid: str) -> bool:
+    """Adresse administrée localement (aléatoire, point d'accès mobile...)"""
+    try:
+        return bool(int(bssid[:2], 16) & 0x02)
+    except ValueError:
+        return False
+
+
+def _iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+class _Profile:
+    """Ce qui est connu d'un SSID: BSSID légitimes, constructeurs, meilleure sécurité"""
+    __slots__ = ('bssids', 'vendors', 'security')
+
+    def __init__(self):
+        self.bssids: Set[str] = set()
+        self.vendors: Dict[str, int] = {}
+        self.security = 0
+
+    def learn(self, bssid: str, oui: str, security: int) -> None:
+        self.bssids.add(bssid)
+        self.vendors[oui] = self.vendors.get(oui, 0) + 1
+        self.security = max(self.security, security)
+
+
+class _Record:
+    __slots__ = ('security', 'oui', 'first_seen', 'suspect')
+
+    def __init__(self, security: int, oui: str, first_seen: float, suspect: bool):
+        self.security = security
+        self.oui = oui
+        self.first_seen = first_seen
+        self.suspect = suspect
+
+
+class _Alert:
+    __slots__ = ('id', 'type', 'ssid', 'bssid', 'details', 'first_seen', 'last_seen', 'count', 'acknowledged')
+
+    def __init__(self, alert_id: Optional[int], alert_type: str, ssid: str, bssid: str,
+                 details: Dict[str, Any], first_seen: float, last_seen: Optional[float] = None,
+                 count: int = 1, acknowledged: bool = False):
+        self.id = alert_id
+        self.type = alert_type
+        self.ssid = ssid
+        self.bssid = bssid
+        self.details = details
+        self.first_seen = first_seen
+        self.last_seen = first_seen if last_seen is None else last_seen
+        self.count = count
+        self.acknowledged = acknowledged
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'type': self.type,
+            'gravite': SEVERITY[self.type],
+            'ssid': self.ssid,
+            'bssid': self.bssid,
+            'details': self.details,
+            'premiere_vue': _iso(self.first_seen),
+            'derniere_vue': _iso(self.last_seen),
+            'occurrences': self.count,
+            'acquittee': self.acknowledged,
+        }
+
+
+class RogueAPDetector:
+    """Détection de points d'accès pirates (evil twin) d'un scan à l'autre.
+
+    Index en mémoire: SSID -> profil (BSSID légitimes, préfixes constructeur,
+    meilleure sécurité vue) et (SSID, BSSID) -> enregistrement. Chaque
+    observation est vérifiée en O(1):
+
+    - `ssid_collision`: nouveau BSSID d'un SSID connu avec un constructeur
+      jamais vu pour ce SSID, ou une adresse locale (point d'accès mobile);
+    - `security_downgrade`: chiffrement plus faible que celui du SSID (ou
+      que celui déjà annoncé par ce BSSID);
+    - `new_bssid_trusted`: BSSID absent de la liste d'un SSID de confiance.
+
+    Un BSSID signalé reste « suspect » et n'enrichit pas le profil du SSID.
+    Une alerte n'est levée qu'une fois par (type, SSID, BSSID); ses
+    répétitions incrémentent son compteur. Avec `path`, profils, alertes et
+    listes d'autorisation sont persistés dans SQLite (lignes modifiées
+    uniquement).
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._profiles: Dict[str, _Profile] = {}
+        self._records: Dict[Tuple[str, str], _Record] = {}
+        self._alerts: Dict[Tuple[str, str, str], _Alert] = {}
+        self._by_device: Dict[Tuple[str, str], List[_Alert]] = {}
+        # SSID de confiance -> BSSID autorisés; BSSID autorisés pour tout SSID
+        self._trusted: Dict[str, Set[str]] = {}
+        self._allowed: Set[str] = set()
+        self._conn = None
+        if path is not None:
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            with self._conn:
+                self._conn.executescript(_SCHEMA)
+            self._load()
+
+    def _load(self) -> None:
+        for ssid, bssid in self._conn.execute('SELECT ssid, bssid FROM rogue_allowlist'):
+            if ssid == ANY:
+                self._allowed.add(bssid)
+            else:
+                allowed = self._trusted.setdefault(ssid, set())
+                if bssid != ANY:
+                    allowed.add(bssid)
+        for ssid, bssid, security, oui, first_seen, suspect in self._conn.execute(
+                'SELECT ssid, bssid, security, oui, first_seen, suspect FROM rogue_bssids ORDER BY first_seen'):
+            self._records[(ssid, bssid)] = _Record(security, oui, first_seen, bool(suspect))
+            profile = self._profiles.setdefault(ssid, _Profile())
+            if not suspect:
+                profile.learn(bssid, oui, security)
+        for row in self._conn.execute('SELECT id, type, ssid, bssid, details, first_seen, last_seen, count, '
+                                      'acknowledged FROM rogue_alerts'):
+            self._index(_Alert(row[0], row[1], row[2], row[3], json.loads(row[4]), *row[5:8], bool(row[8])))
+
+    def _index(self, alert: _Alert) -> None:
+        self._alerts[(alert.type, alert.ssid, alert.bssid)] = alert
+        self._by_device.setdefault((alert.ssid, alert.bssid), []).append(alert)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def check(self, timestamp: TimePoint,
+              observations: Iterable[Tuple[str, str, Optional[str]]]) -> List[Dict[str, Any]]:
+        """Vérifier un scan; `observations` contient (ssid, bssid, chiffrement).
+
+        Retourne les alertes levées pour la première fois par ce scan.
+        """
+        now = to_epoch(timestamp)
+        with self._lock:
+            raised: List[_Alert] = []
+            touched_alerts: List[_Alert] = []
+            touched_records: List[Tuple[str, str]] = []
+            for ssid, bssid, encryption in observations:
+                if not ssid or not bssid:
+                    continue
+                bssid = normalize_bssid(bssid)
+                security = security_rank(encryption)
+                findings = self._inspect(ssid, bssid, security, now, touched_records)
+                for alert_type, details in findings:
+                    alert = self._alerts.get((alert_type, ssid, bssid))
+                    if alert is None:
+                        alert = _Alert(None, alert_type, ssid, bssid, details, now)
+                        self._index(alert)
+                        raised.append(alert)
+                    elif alert.last_seen != now:
+                        alert.last_seen = now
+                        alert.count += 1
+                    touched_alerts.append(alert)
+            self._persist(touched_records, touched_alerts)
+            return [alert.to_dict() for alert in raised]
+
+    def _inspect(self, ssid: str, bssid: str, security: int, now: float,
+                 touched: List[Tuple[str, str]]) -> List[Tuple[str, Dict[str, Any]]]:
+        if bssid in self._allowed:
+            return []
+        record = self._records.get((ssid, bssid))
+        profile = self._profiles.get(ssid)
+        trusted = self._trusted.get(ssid)
+        findings: List[Tuple[str, Dict[str, Any]]] = []
+
+        if record is not None:
+            if record.suspect:
+                # BSSID déjà signalé: ses alertes sont comptées à nouveau
+                findings.extend((alert.type, alert.details) for alert in self._by_device.get((ssid, bssid), ()))
+            if security < record.security and all(kind != SECURITY_DOWNGRADE for kind, _ in findings):
+                findings.append((SECURITY_DOWNGRADE, {
+                    'attendu': SECURITY_LEVELS[record.security],
+                    'observe': SECURITY_LEVELS[security],
+                }))
+            elif security > record.security:
+                record.security = security
+                if not record.suspect:
+                    profile.security = max(profile.security, security)
+                touched.append((ssid, bssid))
+            return findings
+
+        oui = oui_of(bssid)
+        allowed = trusted is not None and bssid in trusted
+        if trusted is not None and not allowed:
+            findings.append((NEW_BSSID_TRUSTED, {'connus': sorted(trusted)}))
+        if profile is not None and profile.bssids:
+            if oui not in profile.vendors or is_local(bssid):
+                findings.append((SSID_COLLISION, {
+                    'constructeur': _vendor(bssid),
+                    'constructeurs_connus': sorted(profile.vendors),
+                    'adresse_locale': is_local(bssid),
+                }))
+            if security < profile.security and not allowed:
+                findings.append((SECURITY_DOWNGRADE, {
+                    'attendu': SECURITY_LEVELS[profile.security],
+                    'observe': SECURITY_LEVELS[security],
+                }))
+
+        suspect = bool(findings)
+        self._records[(ssid, bssid)] = _Record(security, oui, now, suspect)
+        if profile is None:
+            profile = self._profiles[ssid] = _Profile()
+        if not suspect:
+            profile.learn(bssid, oui, security)
+        touched.append((ssid, bssid))
+        return findings
+
+    def _persist(self, records: List[Tuple[str, str]], alerts: List[_Alert]) -> None:
+        if self._conn is None or not (records or alerts):
+            return
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO rogue_bssids (ssid, bssid, security, oui, first_seen, suspect) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(ssid, bssid, r.security, r.oui, r.first_seen, int(r.suspect))
+                 for ssid, bssid in records for r in (self._records[(ssid, bssid)],)])
+            for alert in alerts:
+                if alert.id is None:
+                    alert.id = self._conn.execute(
+                        'INSERT INTO rogue_alerts (type, ssid, bssid, details, first_seen, last_seen, count) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (alert.type, alert.ssid, alert.bssid, json.dumps(alert.details, ensure_ascii=False),
+                         alert.first_seen, alert.last_seen, alert.count)).lastrowid
+                else:
+                    self._conn.execute('UPDATE rogue_alerts SET last_seen = ?, count = ? WHERE id = ?',
+                                       (alert.last_seen, alert.count, alert.id))
+
+    def alerts(self, include_acknowledged: bool = False) -> List[Dict[str, Any]]:
+        """Alertes, de la plus récente à la plus ancienne"""
+        with self._lock:
+            alerts = sorted(self._alerts.values(), key=lambda a: a.last_seen, reverse=True)
+        return [a.to_dict() for a in alerts if include_acknowledged or not a.acknowledged]
+
+    def active_count(self) -> int:
+        """Nombre d'alertes non acquittées"""
+        with self._lock:
+            return sum(1 for alert in self._alerts.values() if not alert.acknowledged)
+
+    def acknowledge(self, alert_id: int) -> bool:
+        """Acquitter une alerte: elle n'est plus listée ni levée à nouveau"""
+        with self._lock:
+            for alert in self._alerts.values():
+                if alert.id == alert_id:
+                    alert.acknowledged = True
+                    if self._conn is not None:
+                        with self._conn:
+                            self._conn.execute('UPDATE rogue_alerts SET acknowledged = 1 WHERE id = ?',
+                                               (alert_id,))
+                    return True
+        return False
+
+    def trust_ssid(self, ssid: str, bssids: Optional[Iterable[str]] = None) -> List[str]:
+        """Déclarer un SSID de confiance: tout autre BSSID que `bssids` (par
+        défaut, les BSSID légitimes déjà connus) sera signalé"""
+        with self._lock:
+            if bssids is None:
+                profile = self._profiles.get(ssid)
+                bssids = profile.bssids if profile is not None else ()
+            allowed = self._trusted.setdefault(ssid, set())
+            allowed.update(normalize_bssid(b) for b in bssids)
+            for bssid in allowed:
+                self._clear_suspect(ssid, bssid)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.executemany('INSERT OR IGNORE INTO rogue_allowlist (ssid, bssid) VALUES (?, ?)',
+                                           [(ssid, ANY)] + [(ssid, b) for b in allowed])
+            return sorted(allowed)
+
+    def allow_bssid(self, bssid: str) -> None:
+        """Autoriser un BSSID quel que soit le SSID annoncé (il n'est plus jamais signalé)"""
+        bssid = normalize_bssid(bssid)
+        with self._lock:
+            self._allowed.add(bssid)
+            for ssid, known in list(self._records):
+                if known == bssid:
+                    self._clear_suspect(ssid, bssid)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute('INSERT OR IGNORE INTO rogue_allowlist (ssid, bssid) VALUES (?, ?)',
+                                       (ANY, bssid))
+
+    def _clear_suspect(self, ssid: str, bssid: str) -> None:
+        record = self._records.get((ssid, bssid))
+        if record is None or not record.suspect:
+            return
+        record.suspect = False
+        self._profiles.setdefault(ssid, _Profile()).learn(bssid, record.oui, record.security)
+        if self._conn is not None:
+            with self._conn:
+                self._conn.execute('UPDATE rogue_bssids SET suspect = 0 WHERE ssid = ? AND bssid = ?',
+                                   (ssid, bssid))
+
+
+def _vendor(bssid: str) -> str:
+    import oui_index
+    return oui_index.describe(bssid)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Alertes de points d'accès pirates et listes d'autorisation")
+    parser.add_argument('--db', default='network_stats.db', help="base d'historique (NetworkAIPredictor)")
+    commands = parser.add_subparsers(dest='commande', required=True)
+    listing = commands.add_parser('alerts', help="lister les alertes")
+    listing.add_argument('--all', action='store_true', help="inclure les alertes acquittées")
+    ack = commands.add_parser('ack', help="acquitter une alerte")
+    ack.add_argument('id', type=int)
+    trust = commands.add_parser('trust', help="déclarer un SSID de confiance")
+    trust.add_argument('ssid')
+    trust.add_argument('--bssid', action='append', help="BSSID autorisé (défaut: ceux déjà connus)")
+    allow = commands.add_parser('allow', help="autoriser un BSSID")
+    allow.add_argument('bssid')
+    args = parser.parse_args(argv)
+
+    detector = RogueAPDetector(args.db)
+    try:
+        if args.commande == 'alerts':
+            for alert in detector.alerts(args.all):
+                print(json.dumps(alert, ensure_ascii=False))
+        elif args.commande == 'ack':
+            if not detector.acknowledge(args.id):
+                print(f"Alerte inconnue: {args.id}", file=sys.stderr)
+                return 1
+        elif args.commande == 'trust':
+            print(f"{args.ssid}: {', '.join(detector.trust_ssid(args.ssid, args.bssid)) or 'aucun BSSID'}")
+        else:
+            detector.allow_bssid(args.bssid)
+    finally:
+        detector.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,464 @@
+import os
+import sys
+import json
+import mmap
+import struct
+import argparse
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+TimeBound = Optional[Union[str, datetime]]
+
+# Format d'une archive (petit-boutiste):
+#   en-tête de fichier FILE_MAGIC, puis des segments ajoutés les uns après les autres.
+#   Segment: en-tête SEGMENT_HEADER, table des instantanés (SNAPSHOT par instantané),
+#   enregistrements de taille fixe (RECORD par appareil), table des chaînes
+#   (n+1 décalages uint32 puis les chaînes UTF-8), bourrage jusqu'à 8 octets.
+# Les premiers/derniers instants de chaque en-tête forment l'index temporel:
+# une relecture ne lit que les segments et instantanés de la période demandée.
+FILE_MAGIC = b'SCNARCH1'
+SEGMENT_MAGIC = b'SEGM'
+# magic, taille du segment, premier et dernier instant (ms), instantanés, enregistrements, chaînes, réservé
+SEGMENT_HEADER = struct.Struct('<4sIqqIIII')
+# écart avec l'instantané précédent (ms), nombre d'enregistrements
+SNAPSHOT = struct.Struct('<II')
+# type, drapeaux, signal (dixièmes de dBm), fréquence (MHz), canal, 6 identifiants de chaînes
+RECORD = struct.Struct('<BBhHH6I')
+OFFSET = struct.Struct('<I')
+
+NO_STRING = 0xFFFFFFFF
+MAX_DELTA_MS = 0xFFFFFFFF
+DEFAULT_SEGMENT_SNAPSHOTS = 256
+
+KIND_WIFI = 0
+KIND_BLUETOOTH = 1
+KIND_CELLULAR = 2
+KIND_OTHER = 3
+
+F_SIGNAL = 1
+F_SIGNAL_INT = 2
+F_FREQUENCY = 4
+F_CHANNEL = 8
+
+# Champs texte dictionnarisés de chaque type (le 6e identifiant est le JSON des autres champs)
+STRING_FIELDS = {
+    KIND_WIFI: ('ssid', 'bssid', 'encryption', None, None),
+    KIND_BLUETOOTH: ('name', 'address', None, None, None),
+    KIND_CELLULAR: ('operator', 'iccid', None, 'technology', 'band'),
+    KIND_OTHER: (None, None, None, None, None),
+}
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_millis(value: Union[str, datetime]) -> int:
+    """Instant en ms depuis l'époque; les heures avec fuseau sont ramenées en UTC"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // timedelta(milliseconds=1)
+
+
+def from_millis(millis: int) -> str:
+    return (_EPOCH + timedelta(milliseconds=millis)).isoformat()
+
+
+def _kind(device: Dict[str, Any]) -> int:
+    # Même ordre que NetworkAIPredictor.classify_network
+    if 'ssid' in device:
+        return KIND_WIFI
+    if device.get('device_type') == 'bluetooth':
+        return KIND_BLUETOOTH
+    if 'operator' in device:
+        return KIND_CELLULAR
+    return KIND_OTHER
+
+
+def _integer(value: Any, low: int, high: int) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and low <= value <= high
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.strings: List[bytes] = []
+
+    def id(self, value: str) -> int:
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.strings)
+            self.strings.append(value.encode('utf-8'))
+        return string_id
+
+
+def encode_device(device: Dict[str, Any], strings: _StringTable) -> bytes:
+    """Enregistrement de taille fixe d'un appareil; les champs atypiques passent dans le JSON annexe"""
+    kind = _kind(device)
+    rest = dict(device)
+    if kind == KIND_BLUETOOTH:
+        del rest['device_type']
+
+    flags = signal = frequency = channel = 0
+    value = rest.get('signal')
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        scaled = value * 10
+        if -32768 <= scaled <= 32767 and scaled == int(scaled):
+            signal = int(scaled)
+            flags |= F_SIGNAL | (F_SIGNAL_INT if isinstance(value, int) else 0)
+            del rest['signal']
+    if _integer(rest.get('frequency'), 0, 0xFFFF):
+        frequency = rest.pop('frequency')
+        flags |= F_FREQUENCY
+    if _integer(rest.get('channel'), 0, 0xFFFF):
+        channel = rest.pop('channel')
+        flags |= F_CHANNEL
+
+    ids = []
+    for key in STRING_FIELDS[kind]:
+        if key is not None and isinstance(rest.get(key), str):
+            ids.append(strings.id(rest.pop(key)))
+        else:
+            ids.append(NO_STRING)
+    if rest:
+        ids.append(strings.id(json.dumps(rest, ensure_ascii=False, sort_keys=True, separators=(',', ':'))))
+    else:
+        ids.append(NO_STRING)
+    return RECORD.pack(kind, flags, signal, frequency, channel, *ids)
+
+
+class ArchiveWriter:
+    """Ajout d'instantanés à une archive, un segment écrit tous les `segment_snapshots`.
+
+    Les instantanés doivent être ajoutés dans l'ordre chronologique. Un
+    segment incomplet laissé par un arrêt brutal est tronqué à l'ouverture.
+    """
+
+    def __init__(self, path: str, segment_snapshots: int = DEFAULT_SEGMENT_SNAPSHOTS):
+        self.path = path
+        self.segment_snapshots = segment_snapshots
+        self._file = open(path, 'r+b' if os.path.exists(path) else 'w+b')
+        try:
+            segments, end = _scan_segments(self._file)
+        except ValueError:
+            self._file.close()
+            raise
+        self._last_ms = segments[-1][2] if segments else None
+        self._file.seek(end)
+        self._file.truncate()
+        if end == 0:
+            self._file.write(FILE_MAGIC)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._strings = _StringTable()
+        self._snapshots: List[bytes] = []
+        self._records: List[bytes] = []
+        self._first_ms: Optional[int] = None
+        self._previous_ms: Optional[int] = None
+
+    def append(self, timestamp: Union[str, datetime], devices: List[Dict[str, Any]]) -> None:
+        millis = to_millis(timestamp)
+        if self._last_ms is not None and millis < self._last_ms:
+            raise ValueError(f"Instantané antérieur au précédent: {timestamp}")
+        if self._previous_ms is not None and millis - self._previous_ms > MAX_DELTA_MS:
+            self.flush()
+        if self._first_ms is None:
+            self._first_ms = self._previous_ms = millis
+        self._snapshots.append(SNAPSHOT.pack(millis - self._previous_ms, len(devices)))
+        self._records.extend(encode_device(device, self._strings) for device in devices)
+        self._previous_ms = self._last_ms = millis
+        if len(self._snapshots) >= self.segment_snapshots:
+            self.flush()
+
+    def flush(self) -> None:
+        """Écrire le segment en cours (sur disque après fsync)"""
+        if not self._snapshots:
+            return
+        offsets = [0]
+        for string in self._strings.strings:
+            offsets.append(offsets[-1] + len(string))
+        body = b''.join((
+            b''.join(self._snapshots),
+            b''.join(self._records),
+            struct.pack(f'<{len(offsets)}I', *offsets),
+            b''.join(self._strings.strings),
+        ))
+        size = SEGMENT_HEADER.size + len(body)
+        padding = -size % 8
+        header = SEGMENT_HEADER.pack(SEGMENT_MAGIC, size + padding, self._first_ms, self._previous_ms,
+                                     len(self._snapshots), len(self._records), len(self._strings.strings), 0)
+        self._file.write(header + body + b'\0' * padding)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._reset()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self) -> 'ArchiveWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _scan_segments(file) -> Tuple[List[Tuple[int, int, int, int, int, int]], int]:
+    """En-têtes des segments complets: (décalage, premier ms, dernier ms, instantanés,
+    enregistrements, chaînes), et la fin du dernier segment valide"""
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    if size == 0:
+        return [], 0
+    file.seek(0)
+    if file.read(len(FILE_MAGIC)) != FILE_MAGIC:
+        raise ValueError(f"{getattr(file, 'name', 'archive')} n'est pas une archive de scans")
+    segments = []
+    offset = len(FILE_MAGIC)
+    while offset + SEGMENT_HEADER.size <= size:
+        file.seek(offset)
+        magic, length, first, last, snapshots, records, strings, _ = SEGMENT_HEADER.unpack(
+            file.read(SEGMENT_HEADER.size))
+        if magic != SEGMENT_MAGIC or length < SEGMENT_HEADER.size or offset + length > size:
+            break
+        segments.append((offset, first, last, snapshots, records, strings))
+        offset += length
+    return segments, offset
+
+
+class _Segment:
+    __slots__ = ('offset', 'first_ms', 'last_ms', 'snapshots', 'records', 'strings',
+                 'times', 'starts', 'cache')
+
+    def __init__(self, offset: int, first_ms: int, last_ms: int, snapshots: int, records: int, strings: int):
+        self.offset = offset
+        self.first_ms = first_ms
+        self.last_ms = last_ms
+        self.snapshots = snapshots
+        self.records = records
+        self.strings = strings
+        self.times: Optional[List[int]] = None
+        self.starts: Optional[List[int]] = None
+        self.cache: Dict[int, str] = {}
+
+    @property
+    def records_offset(self) -> int:
+        return self.offset + SEGMENT_HEADER.size + self.snapshots * SNAPSHOT.size
+
+    @property
+    def strings_offset(self) -> int:
+        return self.records_offset + self.records * RECORD.size
+
+
+class ArchiveReader:
+    """Lecture d'une archive projetée en mémoire (mmap).
+
+    L'ouverture ne lit que les en-têtes de segments; l'index temporel d'un
+    segment et ses chaînes ne sont décodés que s'il est relu.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            segments, self._end = _scan_segments(f)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self._end else None
+        self.segments = [_Segment(*segment) for segment in segments]
+
+    def __len__(self) -> int:
+        return sum(segment.snapshots for segment in self.segments)
+
+    def time_range(self) -> Optional[Tuple[str, str]]:
+        if not self.segments:
+            return None
+        return from_millis(self.segments[0].first_ms), from_millis(self.segments[-1].last_ms)
+
+    def _index(self, segment: _Segment) -> None:
+        if segment.times is not None:
+            return
+        times, starts = [], []
+        current, start = segment.first_ms, 0
+        for delta, count in SNAPSHOT.iter_unpack(
+                self._map[segment.offset + SEGMENT_HEADER.size:segment.records_offset]):
+            current += delta
+            times.append(current)
+            starts.append(start)
+            start += count
+        starts.append(start)
+        segment.times, segment.starts = times, starts
+
+    def _string(self, segment: _Segment, string_id: int) -> str:
+        value = segment.cache.get(string_id)
+        if value is None:
+            base = segment.strings_offset
+            start, end = struct.unpack_from('<2I', self._map, base + string_id * OFFSET.size)
+            blob = base + (segment.strings + 1) * OFFSET.size
+            value = segment.cache[string_id] = self._map[blob + start:blob + end].decode('utf-8')
+        return value
+
+    def _decode(self, segment: _Segment, record: Tuple[int, ...]) -> Dict[str, Any]:
+        kind, flags, signal, frequency, channel, *ids = record
+        device: Dict[str, Any] = {'device_type': 'bluetooth'} if kind == KIND_BLUETOOTH else {}
+        for key, string_id in zip(STRING_FIELDS[kind], ids):
+            if string_id != NO_STRING:
+                device[key] = self._string(segment, string_id)
+        if flags & F_SIGNAL:
+            device['signal'] = signal // 10 if flags & F_SIGNAL_INT else signal / 10
+        if flags & F_FREQUENCY:
+            device['frequency'] = frequency
+        if flags & F_CHANNEL:
+            device['channel'] = channel
+        if ids[-1] != NO_STRING:
+            device.update(json.loads(self._string(segment, ids[-1])))
+        return device
+
+    def replay(self, start: TimeBound = None, end: TimeBound = None) -> Iterator[Dict[str, Any]]:
+        """Instantanés {'timestamp', 'devices'} de la période [start, end], dans l'ordre"""
+        low = None if start is None else to_millis(start)
+        high = None if end is None else to_millis(end)
+        for segment in self.segments:
+            if (low is not None and segment.last_ms < low) or (high is not None and segment.first_ms > high):
+                continue
+            self._index(segment)
+            first = 0 if low is None else bisect_left(segment.times, low)
+            last = len(segment.times) if high is None else bisect_right(segment.times, high)
+            for i in range(first, last):
+                begin = segment.records_offset + segment.starts[i] * RECORD.size
+                stop = segment.records_offset + segment.starts[i + 1] * RECORD.size
+                yield {
+                    'timestamp': from_millis(segment.times[i]),
+                    'devices': [self._decode(segment, record)
+                                for record in RECORD.iter_unpack(self._map[begin:stop])],
+                }
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def __enter__(self) -> 'ArchiveReader':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def replay_into(predictor, path: str, start: TimeBound = None, end: TimeBound = None) -> Iterator[Dict[str, Any]]:
+    """Rejouer une période de l'archive dans NetworkAIPredictor.analyze_networks.
+
+    Les instantanés sont analysés en mode relecture (`replay_mode`): ni
+    historique, ni agrégats, ni appel GPT, ni alertes pour des données passées.
+    """
+    with ArchiveReader(path) as reader:
+        for snapshot in reader.replay(start, end):
+            previous, predictor.replay_mode = predictor.replay_mode, True
+            try:
+                stats = predictor.analyze_networks(snapshot['devices'], timestamp=snapshot['timestamp'])
+            finally:
+                predictor.replay_mode = previous
+            yield stats
+
+
+def _signal_from_quality(quality: Any, threshold: Dict[str, float]) -> Optional[float]:
+    """Signal approché à partir de la qualité (0-1) calculée par le prédicteur"""
+    if not isinstance(quality, (int, float)):
+        return None
+    return round(threshold['poor'] + quality * (threshold['excellent'] - threshold['poor']), 1)
+
+
+def devices_from_stats(entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Appareils reconstitués depuis une entrée de network_stats.json.
+
+    L'historique JSON ne contient que les analyses: le signal est déduit de
+    la qualité (borné aux seuils) et les adresses ne sont pas disponibles.
+    """
+    from ai_predictor import NetworkAIPredictor
+
+    devices = []
+    for analysis in entry.get('detailed_analysis', []):
+        details = analysis.get('details') or {}
+        kind = analysis.get('type')
+        if kind == 'wifi':
+            device = {'ssid': details.get('ssid', 'Unknown')}
+            encryption = (details.get('encryption_details') or {}).get('type')
+            if encryption:
+                device['encryption'] = encryption
+            quality = details.get('signal_quality')
+        elif kind == 'bluetooth':
+            device = {'device_type': 'bluetooth'}
+            if details.get('pairing_status'):
+                device['paired'] = True
+            if details.get('services'):
+                device['services'] = details['services']
+            quality = details.get('signal_strength')
+        elif kind in ('lte', 'esim'):
+            device = {'operator': details.get('operator', 'Unknown'),
+                      'technology': details.get('technology', 'Unknown')}
+            if details.get('band') not in (None, 'Unknown'):
+                device['band'] = details['band']
+            if details.get('roaming'):
+                device['roaming'] = True
+            quality = details.get('signal_strength')
+        else:
+            continue
+        threshold = NetworkAIPredictor.SIGNAL_THRESHOLDS.get(kind, NetworkAIPredictor.DEFAULT_SIGNAL_THRESHOLD)
+        signal = _signal_from_quality(quality, threshold)
+        if signal is not None:
+            device['signal'] = signal
+        devices.append(device)
+    return devices
+
+
+def convert_stats_json(json_path: str, archive_path: str,
+                       segment_snapshots: int = DEFAULT_SEGMENT_SNAPSHOTS) -> int:
+    """Ajouter l'historique network_stats.json à une archive; retourne le nombre d'instantanés"""
+    with open(json_path, 'r') as f:
+        history = json.load(f)
+    entries = sorted((entry for entry in history if entry.get('timestamp')), key=lambda e: to_millis(e['timestamp']))
+    with ArchiveWriter(archive_path, segment_snapshots) as writer:
+        for entry in entries:
+            writer.append(entry['timestamp'], devices_from_stats(entry))
+    return len(entries)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Archive binaire des scans réseau")
+    commands = parser.add_subparsers(dest='command', required=True)
+    convert = commands.add_parser('convert', help="convertir network_stats.json")
+    convert.add_argument('json')
+    convert.add_argument('archive')
+    info = commands.add_parser('info', help="résumé de l'archive")
+    info.add_argument('archive')
+    replay = commands.add_parser('replay', help="relire une période (une ligne JSON par instantané)")
+    replay.add_argument('archive')
+    replay.add_argument('--start')
+    replay.add_argument('--end')
+    replay.add_argument('--analyze', action='store_true', help="analyser avec NetworkAIPredictor")
+    args = parser.parse_args(argv)
+
+    if args.command == 'convert':
+        count = convert_stats_json(args.json, args.archive)
+        print(f"{count} instantanés ajoutés à {args.archive}")
+    elif args.command == 'info':
+        with ArchiveReader(args.archive) as reader:
+            span = reader.time_range()
+            print(f"segments: {len(reader.segments)}, instantanés: {len(reader)}, "
+                  f"enregistrements: {sum(s.records for s in reader.segments)}, "
+                  f"taille: {os.path.getsize(args.archive)} octets")
+            if span:
+                print(f"période: {span[0]} -> {span[1]}")
+    elif args.analyze:
+        from ai_predictor import NetworkAIPredictor
+        for stats in replay_into(NetworkAIPredictor(), args.archive, args.start, args.end):
+            print(json.dumps(stats, ensure_ascii=False, default=str))
+    else:
+        with ArchiveReader(args.archive) as reader:
+            for snapshot in reader.replay(args.start, args.end):
+                print(json.dumps(snapshot, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,328 @@
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import logging
+import argparse
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Délai maximal d'une sonde (secondes), comme SCAN_TIMEOUT dans config.sh
+DEFAULT_TIMEOUT = float(os.environ.get('SCAN_TIMEOUT', 10))
+
+
+class ProbeError(Exception):
+    """Échec d'une commande de sonde (code de retour non nul, outil absent...)"""
+
+
+class Probe:
+    """Sonde radio: une coroutine qui retourne des appareils au format de analyze_networks"""
+
+    def __init__(self, name: str, radio: str, run: Callable[[float], Awaitable[List[Dict[str, Any]]]],
+                 timeout: Optional[float] = None):
+        self.name = name
+        self.radio = radio
+        self.run = run
+        self.timeout = timeout
+
+
+async def run_command(argv: List[str], timeout: float) -> str:
+    """Exécuter une commande et retourner sa sortie; le processus est tué en cas
+    d'expiration ou d'annulation de la sonde"""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    except FileNotFoundError as e:
+        raise ProbeError(f"Commande introuvable: {argv[0]}") from e
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except BaseException:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    if proc.returncode != 0:
+        raise ProbeError(f"{' '.join(argv)}: code {proc.returncode}: "
+                         f"{stderr.decode(errors='replace').strip()[:200]}")
+    return stdout.decode('utf-8', errors='replace')
+
+
+def wifi_device(record: Dict[str, Any], interface: Optional[str] = None) -> Dict[str, Any]:
+    """Enregistrement de wifi_scan vers le format d'appareil de NetworkAIPredictor"""
+    device = {
+        'ssid': record['ssid'],
+        'bssid': record['bssid'],
+        'encryption': record['encryption'],
+    }
+    if record.get('rssi') is not None:
+        device['signal'] = record['rssi']
+    if record['frequency_mhz'] is not None:
+        device['frequency'] = record['frequency_mhz']
+    if record['channel'] is not None:
+        device['channel'] = record['channel']
+    if interface:
+        device['interface'] = interface
+    return device
+
+
+def wifi_interfaces() -> List[str]:
+    """Interfaces WiFi présentes (toutes celles exposant un répertoire wireless)"""
+    try:
+        names = sorted(os.listdir('/sys/class/net'))
+    except OSError:
+        return []
+    return [n for n in names if os.path.isdir(os.path.join('/sys/class/net', n, 'wireless'))]
+
+
+def wifi_probe(interface: str) -> Probe:
+    async def run(timeout: float) -> List[Dict[str, Any]]:
+        from wifi_scan import parse_scan
+
+        if shutil.which('iw'):
+            output = await run_command(['iw', 'dev', interface, 'scan'], timeout)
+        else:
+            output = await run_command(['iwlist', interface, 'scan'], timeout)
+        return [wifi_device(r, interface) for r in parse_scan(output.splitlines())]
+    return Probe(f'wifi:{interface}', 'wifi', run)
+
+
+def parse_bluetoothctl(output: str) -> List[Dict[str, Any]]:
+    """Appareils de `bluetoothctl --timeout N scan on` ([NEW]/[CHG] Device ...),
+    un enregistrement par appareil sur toute la durée du scan"""
+    from bluetooth_scan import coalesce, parse_bluetoothctl as parse_lines
+    return list(coalesce(parse_lines(output.splitlines()), window=None))
+
+
+def bluetooth_probe() -> Probe:
+    async def run(timeout: float) -> List[Dict[str, Any]]:
+        # bluetoothctl s'arrête de lui-même un peu avant l'expiration de la sonde
+        duration = max(1, int(timeout) - 1)
+        output = await run_command(['bluetoothctl', '--timeout', str(duration), 'scan', 'on'], timeout)
+        return parse_bluetoothctl(output)
+    return Probe('bluetooth', 'bluetooth', run)
+
+
+def parse_mmcli_modem(modem: Dict[str, Any], signal: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Connexion cellulaire d'après `mmcli -m any -J` (et `--signal-get -J`)"""
+    generic = modem.get('modem', {}).get('generic', {})
+    gpp = modem.get('modem', {}).get('3gpp', {})
+    technologies = [t.upper() for t in generic.get('access-technologies', [])]
+    device = {
+        'operator': gpp.get('operator-name') or 'Unknown',
+        'technology': '/'.join(technologies) or 'Unknown',
+        'roaming': gpp.get('registration-state') == 'roaming',
+    }
+    for tech in ('lte', '5g', 'umts', 'gsm'):
+        rssi = ((signal or {}).get('modem', {}).get('signal', {}).get(tech) or {}).get('rssi')
+        if rssi not in (None, '--', ''):
+            device['signal'] = float(rssi)
+            break
+    return device
+
+
+def cellular_probe() -> Probe:
+    async def run(timeout: float) -> List[Dict[str, Any]]:
+        deadline = time.monotonic() + timeout
+        modem = json.loads(await run_command(['mmcli', '-m', 'any', '-J'], timeout))
+        try:
+            signal = json.loads(await run_command(['mmcli', '-m', 'any', '--signal-get', '-J'],
+                                                  max(0.1, deadline - time.monotonic())))
+        except (ProbeError, ValueError):
+            signal = None
+        return [parse_mmcli_modem(modem, signal)]
+    return Probe('lte', 'lte', run)
+
+
+def esim_probe() -> Probe:
+    async def run(timeout: float) -> List[Dict[str, Any]]:
+        sim = json.loads(await run_command(['mmcli', '-i', 'any', '-J'], timeout))
+        properties = sim.get('sim', {}).get('properties', {})
+        if properties.get('sim-type', '').lower() != 'esim':
+            return []
+        return [{
+            'operator': properties.get('operator-name') or 'Unknown',
+            'technology': 'eSIM',
+            'iccid': properties.get('iccid'),
+        }]
+    return Probe('esim', 'esim', run)
+
+
+def default_probes() -> List[Probe]:
+    """Une sonde par interface WiFi, plus Bluetooth et cellulaire si les outils sont présents"""
+    probes = [wifi_probe(interface) for interface in wifi_interfaces()]
+    if shutil.which('bluetoothctl') and os.path.isdir('/sys/class/bluetooth'):
+        probes.append(bluetooth_probe())
+    if shutil.which('mmcli'):
+        probes.extend([cellular_probe(), esim_probe()])
+    return probes
+
+
+def simulated_probes(delays: Optional[Dict[str, float]] = None) -> List[Probe]:
+    """Sondes du mode test, avec un délai simulé par sonde"""
+    delays = delays or {}
+    data = {
+        'wifi': [
+            {'ssid': 'WiFi-Test-1', 'bssid': '00:11:22:33:44:55', 'signal': -65.0, 'encryption': 'WPA2'},
+            {'ssid': 'WiFi-Test-2', 'bssid': 'AA:BB:CC:DD:EE:FF', 'signal': -72.0, 'encryption': 'WPA2'},
+            {'ssid': 'WiFi-Test-3', 'bssid': '12:34:56:78:90:AB', 'signal': -85.0, 'encryption': 'none'},
+        ],
+        'bluetooth': [
+            {'device_type': 'bluetooth', 'address': '00:1A:7D:DA:71:13', 'name': 'Smartphone Test', 'signal': -60.0},
+            {'device_type': 'bluetooth', 'address': 'F4:5C:89:AB:CD:EF', 'name': 'Écouteurs Test', 'signal': -75.0},
+        ],
+        'lte': [{'operator': 'Orange', 'technology': '4G/LTE', 'signal': -85.0, 'band': 'B7'}],
+        'esim': [{'operator': 'Free Mobile France', 'technology': 'eSIM', 'iccid': '8933111234567890123'}],
+    }
+
+    def make(name: str, radio: str) -> Probe:
+        async def run(timeout: float) -> List[Dict[str, Any]]:
+            await asyncio.sleep(delays.get(name, 0.0))
+            return [dict(device) for device in data[radio]]
+        return Probe(name, radio, run)
+
+    return [make('wifi:test0', 'wifi'), make('bluetooth', 'bluetooth'),
+            make('lte', 'lte'), make('esim', 'esim')]
+
+
+class ScanOrchestrator:
+    """Exécute toutes les sondes radio en parallèle (asyncio).
+
+    Chaque sonde a son propre délai; une sonde expirée est annulée (et son
+    processus tué) sans retarder les autres. Un cycle dure donc autant que la
+    sonde la plus lente, bornée par le délai. Les résultats sont fusionnés en
+    un instantané horodaté pour NetworkAIPredictor.analyze_networks.
+    """
+
+    def __init__(self, probes: Optional[List[Probe]] = None, timeout: float = DEFAULT_TIMEOUT):
+        self.probes = default_probes() if probes is None else probes
+        self.timeout = timeout
+
+    async def _run_probe(self, probe: Probe) -> Dict[str, Any]:
+        timeout = probe.timeout or self.timeout
+        start = time.monotonic()
+        report: Dict[str, Any] = {'radio': probe.radio, 'status': 'ok', 'devices': []}
+        try:
+            report['devices'] = await asyncio.wait_for(probe.run(timeout), timeout)
+        except asyncio.TimeoutError:
+            report['status'] = 'timeout'
+            logger.warning("Sonde %s expirée après %.1fs", probe.name, timeout)
+        except Exception as e:
+            report['status'] = 'error'
+            report['error'] = str(e)
+            logger.warning("Erreur de la sonde %s: %s", probe.name, e)
+        report['duration'] = round(time.monotonic() - start, 3)
+        return report
+
+    async def scan(self) -> Dict[str, Any]:
+        """Un cycle complet: toutes les sondes en parallèle, résultats fusionnés"""
+        timestamp = datetime.now().isoformat()
+        start = time.monotonic()
+        reports = await asyncio.gather(*(self._run_probe(probe) for probe in self.probes))
+
+        devices: List[Dict[str, Any]] = []
+        probes: Dict[str, Dict[str, Any]] = {}
+        seen_bssids = set()
+        for probe, report in zip(self.probes, reports):
+            count = 0
+            for device in report.pop('devices'):
+                # Un même point d'accès vu par plusieurs interfaces n'est gardé qu'une fois
+                bssid = device.get('bssid')
+                if bssid:
+                    if bssid in seen_bssids:
+                        continue
+                    seen_bssids.add(bssid)
+                devices.append(device)
+                count += 1
+            report['count'] = count
+            probes[probe.name] = report
+        return {
+            'timestamp': timestamp,
+            'duration': round(time.monotonic() - start, 3),
+            'devices': devices,
+            'probes': probes,
+        }
+
+    def scan_sync(self) -> Dict[str, Any]:
+        return asyncio.run(self.scan())
+
+
+def analyze_snapshot(predictor, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Analyser un instantané; le rapport des sondes est ajouté aux statistiques"""
+    stats = predictor.analyze_networks(snapshot['devices'], timestamp=snapshot['timestamp'])
+    stats['scan'] = {
+        'timestamp': snapshot['timestamp'],
+        'duration': snapshot['duration'],
+        'probes': snapshot['probes'],
+    }
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from log_config import setup_logging
+
+    parser = argparse.ArgumentParser(description="Scan simultané WiFi, Bluetooth, LTE et eSIM")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="délai par sonde (s)")
+    parser.add_argument('--interval', type=float, default=0,
+                        help="relancer un cycle toutes les N secondes (0: un seul cycle)")
+    parser.add_argument('--test', action='store_true', default=os.environ.get('TEST_MODE') == 'true',
+                        help="données simulées (TEST_MODE)")
+    parser.add_argument('--no-analysis', action='store_true', help="afficher l'instantané sans l'analyser")
+    parser.add_argument('--incremental', action='store_true',
+                        help="entre deux cycles, ne réanalyser que les appareils modifiés")
+    parser.add_argument('--archive', help="ajouter les instantanés bruts à cette archive (scan_archive)")
+    parser.add_argument('--sample-cellular', action='store_true',
+                        help="relever en continu le signal du modem (CELLULAR_SAMPLE_INTERVAL) "
+                             "pour juger les connexions cellulaires sur la durée")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    orchestrator = ScanOrchestrator(simulated_probes() if args.test else None, timeout=args.timeout)
+    if not orchestrator.probes:
+        print("Aucune radio détectée")
+        return 1
+    predictor = None
+    if not args.no_analysis:
+        from ai_predictor import NetworkAIPredictor
+        predictor = NetworkAIPredictor()
+        predictor.incremental_analysis = predictor.incremental_analysis or args.incremental
+
+    sampler = None
+    if predictor is not None and args.sample_cellular:
+        from cellular_sampler import CellularSampler, FixtureSource, MmcliSource
+        if args.test:
+            fixture = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'mmcli_signal.ndjson')
+            source = FixtureSource(fixture, loop=True)
+        else:
+            source = MmcliSource()
+        sampler = CellularSampler(source)
+        sampler.start()
+        predictor.cellular_sampler = sampler
+
+    archive = None
+    if args.archive:
+        from scan_archive import ArchiveWriter
+        archive = ArchiveWriter(args.archive)
+
+    try:
+        while True:
+            snapshot = orchestrator.scan_sync()
+            if archive is not None:
+                archive.append(snapshot['timestamp'], snapshot['devices'])
+            result = snapshot if predictor is None else analyze_snapshot(predictor, snapshot)
+            print(json.dumps(result, ensure_ascii=False, default=str))
+            if args.interval <= 0:
+                return 0
+            time.sleep(max(0.0, args.interval - snapshot['duration']))
+    finally:
+        if sampler is not None:
+            sampler.stop()
+        if archive is not None:
+            archive.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
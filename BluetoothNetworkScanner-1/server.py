@@ -1,46 +1,94 @@
 import os
 import json
 import logging
-from flask import Flask, jsonify, render_template
+import threading
+from flask import Flask, Response, jsonify, render_template, request
+from log_config import setup_logging
+from snapshot_cache import FileSnapshotCache
+from network_query import QUERY_PARAMS, NetworkIndex, NetworkQuery, rssi_of
+from network_selector import BestNetworkSelector
+from status_stream import FileWatcher, StatusBroadcaster, stream_events
+from stats_rollups import RollupStore
+from stats_store import StatsStore
+from stats_export import export_store, filename, parse_columns
 
-# Configuration du logging en français
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configuration du logging asynchrone (lignes JSON, file bornée)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Configuration
 CONFIG_DIR = os.path.expanduser("~/.network_detect")
 WIFI_RESULTS_FILE = os.path.join(CONFIG_DIR, "wifi_results.json")
+# Base d'historique écrite par NetworkAIPredictor
+STATS_DB_FILE = os.environ.get("STATS_DB", "network_stats.db")
+# Intervalle des commentaires de maintien de connexion du flux SSE (secondes)
+STREAM_HEARTBEAT = float(os.environ.get("STREAM_HEARTBEAT", "15"))
 
 app = Flask(__name__)
+_rollup_store = None
+_stats_store = None
+_wifi_cache = None
+_network_selector = None
+_status_broadcaster = None
+_broadcaster_lock = threading.Lock()
 
-def load_wifi_data():
-    """Charge les données WiFi à partir du fichier JSON"""
-    if not os.path.exists(WIFI_RESULTS_FILE):
-        return None, "Aucun fichier de résultats WiFi trouvé"
+def get_rollup_store():
+    """Ouvre (une seule fois) les agrégats temporels des scans"""
+    global _rollup_store
+    if _rollup_store is None or _rollup_store.path != STATS_DB_FILE:
+        _rollup_store = RollupStore(STATS_DB_FILE)
+    return _rollup_store
 
-    try:
-        with open(WIFI_RESULTS_FILE, "r") as file:
-            data = json.load(file)
-            return [net for net in data if net.get("ssid")], None
-    except json.JSONDecodeError:
-        return None, "Fichier JSON invalide"
-    except Exception as e:
-        return None, f"Erreur lors de la lecture du fichier: {str(e)}"
+def get_stats_store():
+    """Ouvre (une seule fois) l'historique des scans, en lecture pour l'export"""
+    global _stats_store
+    if _stats_store is None or _stats_store.path != STATS_DB_FILE:
+        _stats_store = StatsStore(STATS_DB_FILE)
+    return _stats_store
+
+def get_wifi_cache():
+    """Cache des résultats WiFi, recréé si le chemin du fichier change"""
+    global _wifi_cache, _network_selector
+    if _wifi_cache is None or _wifi_cache.path != WIFI_RESULTS_FILE:
+        _network_selector = None
+        _wifi_cache = FileSnapshotCache(WIFI_RESULTS_FILE, _build_wifi_snapshot,
+                                        missing_error="Aucun fichier de résultats WiFi trouvé")
+    return _wifi_cache
+
+def get_network_selector():
+    """Classement des réseaux suivi d'une version du fichier WiFi à l'autre"""
+    global _network_selector
+    if _network_selector is None:
+        _network_selector = BestNetworkSelector(lambda network: score_network(network))
+    return _network_selector
+
+def _build_wifi_snapshot(data):
+    """Réseaux nommés et meilleur réseau, calculés une fois par version du fichier"""
+    networks = [net for net in data if net.get("ssid")]
+    return {'reseaux': networks, 'meilleur_reseau': recommend_best_network(networks)}
+
+def load_wifi_data():
+    """Charge les données WiFi à partir du fichier JSON (via le cache)"""
+    snapshot = get_wifi_cache().get()
+    if snapshot.error:
+        return None, snapshot.error
+    return snapshot.data['reseaux'], None
 
 def score_network(network):
-    """Calcule un score pour un réseau basé sur le RSSI et la sécurité"""
-    signal_score = max(-float(network.get("rssi", -100)), 0)
+    """Calcule un score pour un réseau basé sur le RSSI et la sécurité
+    (plus le signal est fort, plus le score est élevé)"""
+    signal_score = max(rssi_of(network) + 100, 0)
     security_score = 20 if "WPA" in str(network.get("ssid", "")) else 0
     return signal_score + security_score
 
 def recommend_best_network(wifi_data):
-    """Retourne le meilleur réseau disponible"""
-    if not wifi_data:
-        return None
-    return max(wifi_data, key=score_network)
+    """Retourne le meilleur réseau disponible.
+
+    Score du RSSI lissé d'un scan à l'autre; le réseau recommandé ne change
+    que si un autre le dépasse nettement et durablement (BEST_NETWORK_MARGIN,
+    BEST_NETWORK_HOLD).
+    """
+    return get_network_selector().update(wifi_data or [])
 
 @app.route('/')
 def index():
@@ -48,24 +96,41 @@ def index():
     logger.info("Affichage de la page d'accueil")
     return render_template('index.html')
 
-@app.route('/api/network_status')
-def network_status():
-    """Endpoint pour obtenir le statut de tous les réseaux"""
-    logger.info("Récupération du statut des réseaux")
+def _cached_json(name, build_payload):
+    """Réponse JSON sérialisée une fois par version du fichier WiFi.
+
+    Les réponses 200 portent la version du fichier en ETag: un client qui
+    renvoie la même valeur dans If-None-Match reçoit un 304 sans corps.
+    """
+    snapshot = get_wifi_cache().get()
 
-    wifi_data, wifi_error = load_wifi_data()
+    def serialize(snapshot):
+        payload, status = build_payload(snapshot)
+        return (app.json.dumps(payload) + "\n").encode('utf-8'), status
+
+    body, status = snapshot.response(name, serialize)
+    if status != 200:
+        return Response(body, status=status, mimetype='application/json')
+
+    headers = {'ETag': f'"{snapshot.version}"', 'Cache-Control': 'no-cache'}
+    if request.if_none_match.contains(snapshot.version):
+        return Response(status=304, headers=headers)
+    return Response(body, status=status, mimetype='application/json', headers=headers)
+
+def _network_status_payload(snapshot):
+    wifi_data = None if snapshot.error else snapshot.data['reseaux']
     wifi_status = {
-        'actif': bool(wifi_data and not wifi_error),
+        'actif': bool(wifi_data),
         'qualite_signal': 0.0,
         'meilleur_reseau': None,
         'nombre_reseaux': 0
     }
 
     if wifi_data:
-        best_network = recommend_best_network(wifi_data)
+        best_network = snapshot.data['meilleur_reseau']
         if best_network:
             wifi_status.update({
-                'qualite_signal': max(0, min(1, (-float(best_network.get("rssi", -100)) + 100) / 50)),
+                'qualite_signal': max(0, min(1, (rssi_of(best_network) + 100) / 50)),
                 'meilleur_reseau': {
                     'nom': best_network.get('ssid'),
                     'puissance': best_network.get('rssi'),
@@ -73,7 +138,7 @@ def network_status():
                 'nombre_reseaux': len(wifi_data)
             })
 
-    return jsonify({
+    return {
         'wifi': wifi_status,
         'bluetooth': {
             'actif': True,
@@ -91,32 +156,28 @@ def network_status():
             'actif': False,
             'message': 'Non configuré'
         }
-    })
-
-@app.route('/api/wifi')
-def wifi_analysis():
-    """Endpoint pour l'analyse détaillée des réseaux WiFi"""
-    logger.info("Analyse détaillée des réseaux WiFi")
-    wifi_data, error = load_wifi_data()
+    }, 200
 
-    if error:
-        logger.error(f"Erreur lors de l'analyse WiFi: {error}")
-        return jsonify({
+def _wifi_payload(snapshot):
+    if snapshot.error:
+        logger.error("Erreur lors de l'analyse WiFi: %s", snapshot.error)
+        return {
             'statut': 'erreur',
-            'message': error
-        }), 400
+            'message': snapshot.error
+        }, 400
 
+    wifi_data = snapshot.data['reseaux']
     if not wifi_data:
         logger.warning("Aucun réseau WiFi trouvé")
-        return jsonify({
+        return {
             'statut': 'erreur',
             'message': 'Aucun réseau trouvé'
-        }), 404
+        }, 404
 
-    best_network = recommend_best_network(wifi_data)
-    logger.info(f"Analyse terminée - {len(wifi_data)} réseaux trouvés")
+    best_network = snapshot.data['meilleur_reseau']
+    logger.info("Analyse terminée - %d réseaux trouvés", len(wifi_data))
 
-    return jsonify({
+    return {
         'statut': 'succès',
         'reseaux': {
             'total': len(wifi_data),
@@ -128,6 +189,137 @@ def wifi_analysis():
             } if best_network else None,
             'tous_les_reseaux': wifi_data
         }
+    }, 200
+
+@app.route('/api/network_status')
+def network_status():
+    """Endpoint pour obtenir le statut de tous les réseaux"""
+    logger.debug("Récupération du statut des réseaux")
+    return _cached_json('network_status', _network_status_payload)
+
+def _wifi_query(query):
+    """Réponse de /api/wifi pour une requête triée/filtrée/paginée"""
+    snapshot = get_wifi_cache().get()
+    headers = {'ETag': f'"{snapshot.version}"', 'Cache-Control': 'no-cache'}
+    if snapshot.error or not snapshot.data['reseaux']:
+        return _cached_json('wifi', _wifi_payload)
+    if request.if_none_match.contains(snapshot.version):
+        return Response(status=304, headers=headers)
+
+    index = snapshot.response('index', lambda s: NetworkIndex(s.data['reseaux'], score_network))
+    try:
+        result = query.run(index)
+    except ValueError as e:
+        return jsonify({
+            'statut': 'erreur',
+            'message': str(e)
+        }), 400
+
+    payload, status = snapshot.response('wifi_payload', _wifi_payload)
+    reseaux = dict(payload['reseaux'], tous_les_reseaux=result['reseaux'],
+                   correspondants=result['correspondants'],
+                   curseur_suivant=result['curseur_suivant'])
+    response = jsonify({'statut': payload['statut'], 'reseaux': reseaux})
+    response.headers.update(headers)
+    return response
+
+@app.route('/api/wifi')
+def wifi_analysis():
+    """Endpoint pour l'analyse détaillée des réseaux WiFi.
+
+    Paramètres optionnels: sort (rssi, ssid, frequency_mhz, channel, score;
+    préfixe '-' pour l'ordre décroissant), limit (top-k), cursor (page
+    suivante), band (2.4, 5, 6), encryption, rssi_min, rssi_max et fields.
+    """
+    logger.debug("Analyse détaillée des réseaux WiFi")
+    if not any(name in request.args for name in QUERY_PARAMS):
+        return _cached_json('wifi', _wifi_payload)
+    try:
+        query = NetworkQuery.from_args(request.args)
+    except ValueError as e:
+        return jsonify({
+            'statut': 'erreur',
+            'message': str(e)
+        }), 400
+    return _wifi_query(query)
+
+def _status_state():
+    """(version, statut) courant, calculé une fois par version du fichier WiFi"""
+    snapshot = get_wifi_cache().get()
+    return snapshot.version, snapshot.response('status_state', lambda s: _network_status_payload(s)[0])
+
+def get_status_broadcaster():
+    """Démarre (une seule fois) le diffuseur partagé par tous les flux"""
+    global _status_broadcaster
+    with _broadcaster_lock:
+        if _status_broadcaster is None or _status_broadcaster.watcher.path != WIFI_RESULTS_FILE:
+            _status_broadcaster = StatusBroadcaster(_status_state, FileWatcher(WIFI_RESULTS_FILE)).start()
+        return _status_broadcaster
+
+@app.route('/api/network_status/stream')
+def network_status_stream():
+    """Flux Server-Sent Events: snapshot complet à la connexion, puis deltas"""
+    since = request.args.get('since') or request.headers.get('Last-Event-ID')
+    logger.debug("Nouvel abonné au flux de statut (depuis %s)", since)
+    return Response(
+        stream_events(get_status_broadcaster(), since, STREAM_HEARTBEAT),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/network_status/delta')
+def network_status_delta():
+    """Changements depuis `since=<version>` (snapshot complet si la version est inconnue)"""
+    version, kind, data = get_status_broadcaster().changes_since(request.args.get('since'))
+    return jsonify({
+        'version': version,
+        'type': kind,
+        'donnees': data
+    })
+
+@app.route('/api/stats/rollups')
+def stats_rollups():
+    """Endpoint des tendances agrégées (résolution 1m, 1h ou 1d) sur une période"""
+    resolution = request.args.get('resolution', '1h')
+    try:
+        cases = get_rollup_store().query(
+            resolution,
+            start=request.args.get('start'),
+            end=request.args.get('end')
+        )
+    except ValueError as e:
+        return jsonify({
+            'statut': 'erreur',
+            'message': str(e)
+        }), 400
+
+    return jsonify({
+        'statut': 'succès',
+        'resolution': resolution,
+        'cases': cases
+    })
+
+@app.route('/api/stats/export')
+def stats_export():
+    """Export de l'historique en flux (NDJSON ou CSV, gzip par défaut, transfert par blocs)"""
+    fmt = request.args.get('format', 'ndjson')
+    level = request.args.get('level', 'scan')
+    compress = request.args.get('gzip', '1') not in ('0', 'false', 'non')
+    try:
+        columns = parse_columns(request.args.get('columns'), level)
+        chunks = export_store(get_stats_store(), fmt, level, columns,
+                              start=request.args.get('start'), end=request.args.get('end'),
+                              compress=compress)
+    except ValueError as e:
+        return jsonify({
+            'statut': 'erreur',
+            'message': str(e)
+        }), 400
+
+    mimetype = 'application/gzip' if compress else ('text/csv' if fmt == 'csv' else 'application/x-ndjson')
+    return Response(chunks, mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename(fmt, level, compress)}"',
+        'X-Accel-Buffering': 'no'
     })
 
 if __name__ == '__main__':
@@ -0,0 +1,84 @@
+import os
+import json
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+FileIdentity = Optional[Tuple[int, int, int]]
+
+
+def file_identity(path: str) -> FileIdentity:
+    """(mtime_ns, taille, inode) du fichier, None s'il n'existe pas"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class Snapshot:
+    """Contenu analysé d'une version du fichier et réponses déjà sérialisées"""
+
+    def __init__(self, identity: FileIdentity, data: Any = None, error: Optional[str] = None):
+        self.identity = identity
+        self.data = data
+        self.error = error
+        self.version = 'absent' if identity is None else '-'.join(f'{part:x}' for part in identity)
+        self._responses: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def response(self, name: str, factory: Callable[['Snapshot'], Any]) -> Any:
+        """Réponse `name` pour cette version, construite une seule fois"""
+        try:
+            return self._responses[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._responses:
+                self._responses[name] = factory(self)
+            return self._responses[name]
+
+
+class FileSnapshotCache:
+    """Cache en mémoire d'un fichier JSON indexé par son identité.
+
+    Chaque accès ne coûte qu'un stat(): tant que (mtime, taille, inode) ne
+    change pas, le même Snapshot est retourné. Un remplacement atomique
+    (rename) change l'inode et invalide donc le cache même à mtime égal.
+    `build` transforme le JSON chargé en données précalculées.
+    """
+
+    def __init__(self, path: str, build: Callable[[Any], Any] = lambda data: data,
+                 missing_error: str = "Fichier introuvable"):
+        self.path = path
+        self.build = build
+        self.missing_error = missing_error
+        self.loads = 0
+        self._snapshot: Optional[Snapshot] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Snapshot:
+        identity = file_identity(self.path)
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.identity == identity:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.identity != identity:
+                snapshot = self._snapshot = self._load(identity)
+            return snapshot
+
+    def _load(self, identity: FileIdentity) -> Snapshot:
+        if identity is None:
+            return Snapshot(None, error=self.missing_error)
+        self.loads += 1
+        try:
+            with open(self.path, 'r') as file:
+                raw = json.load(file)
+            # Le fichier a pu être remplacé entre stat() et open(): on indexe
+            # le contenu lu par l'identité du fichier effectivement ouvert
+            identity = file_identity(self.path) or identity
+            return Snapshot(identity, self.build(raw))
+        except json.JSONDecodeError:
+            return Snapshot(identity, error="Fichier JSON invalide")
+        except Exception as e:
+            return Snapshot(identity, error=f"Erreur lors de la lecture du fichier: {str(e)}")
@@ -0,0 +1,186 @@
+import io
+import sys
+import csv
+import json
+import zlib
+import argparse
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from stats_store import StatsStore, TimeBound
+
+FORMATS = ('ndjson', 'csv')
+LEVELS = ('scan', 'device')
+
+# Colonnes par défaut (chemins pointés dans l'entrée de scan ou l'analyse d'appareil)
+SCAN_COLUMNS = (
+    'timestamp', 'total_networks',
+    'network_types.wifi', 'network_types.bluetooth', 'network_types.lte', 'network_types.esim',
+    'average_signal.wifi', 'average_signal.bluetooth', 'average_signal.lte', 'average_signal.esim',
+    'security_stats.encrypted', 'security_stats.open',
+)
+DEVICE_COLUMNS = (
+    'timestamp', 'type',
+    'details.ssid', 'details.security_level', 'details.band', 'details.signal_quality',
+    'details.manufacturer', 'details.operator', 'details.technology', 'details.signal_strength',
+    'performances.congestion', 'performances.interferences',
+)
+DEFAULT_COLUMNS = {'scan': SCAN_COLUMNS, 'device': DEVICE_COLUMNS}
+
+# Entrées lues par requête SQLite: une entrée peut contenir des milliers d'appareils
+READ_CHUNK = 16
+# Texte accumulé avant chaque appel au compresseur (octets environ)
+BLOCK_SIZE = 64 * 1024
+
+
+def parse_columns(value: Optional[str], level: str) -> Optional[List[str]]:
+    """Colonnes demandées ('a,b.c'); None si aucune n'est précisée"""
+    if level not in LEVELS:
+        raise ValueError(f"Niveau inconnu: {level} (attendu: {', '.join(LEVELS)})")
+    if value is None:
+        return None
+    columns = [column.strip() for column in value.split(',') if column.strip()]
+    if not columns:
+        raise ValueError("Liste de colonnes vide")
+    return columns
+
+
+def resolve(row: Dict[str, Any], path: str) -> Any:
+    """Valeur d'un chemin pointé ('details.ssid'); None si absent"""
+    value: Any = row
+    for part in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def iter_rows(entries: Iterable[Dict[str, Any]], level: str = 'scan') -> Iterator[Dict[str, Any]]:
+    """Une ligne par scan, ou une par appareil analysé (avec l'horodatage du scan)"""
+    for entry in entries:
+        if level == 'scan':
+            row = dict(entry)
+            row.pop('detailed_analysis', None)
+            yield row
+        else:
+            for analysis in entry.get('detailed_analysis', ()):
+                yield dict(analysis, timestamp=entry.get('timestamp'))
+
+
+def encode_ndjson(rows: Iterable[Dict[str, Any]], columns: Optional[Sequence[str]] = None) -> Iterator[str]:
+    for row in rows:
+        if columns is not None:
+            row = {column: resolve(row, column) for column in columns}
+        yield json.dumps(row, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def _cell(value: Any) -> Any:
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+    return value
+
+
+def encode_csv(rows: Iterable[Dict[str, Any]], columns: Sequence[str]) -> Iterator[str]:
+    """En-tête puis une ligne CSV par ligne d'export (valeurs composées en JSON)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_cell(resolve(row, column)) for column in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _blocks(lines: Iterable[str], size: int = BLOCK_SIZE) -> Iterator[bytes]:
+    pending: List[str] = []
+    length = 0
+    for line in lines:
+        pending.append(line)
+        length += len(line)
+        if length >= size:
+            yield ''.join(pending).encode('utf-8')
+            pending, length = [], 0
+    if pending:
+        yield ''.join(pending).encode('utf-8')
+
+
+def gzip_stream(blocks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compresser au format gzip au fil de l'eau"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for block in blocks:
+        data = compressor.compress(block)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export(entries: Iterable[Dict[str, Any]], fmt: str = 'ndjson', level: str = 'scan',
+           columns: Optional[Sequence[str]] = None, compress: bool = True) -> Iterator[bytes]:
+    """Chaîne de générateurs entrées -> lignes -> texte -> (gzip) -> octets.
+
+    Rien n'est matérialisé: la mémoire utilisée ne dépend pas du nombre de
+    lignes exportées. En CSV, les colonnes par défaut du niveau s'appliquent
+    si aucune n'est demandée; en NDJSON, la ligne complète est écrite.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Format inconnu: {fmt} (attendu: {', '.join(FORMATS)})")
+    if level not in LEVELS:
+        raise ValueError(f"Niveau inconnu: {level} (attendu: {', '.join(LEVELS)})")
+    rows = iter_rows(entries, level)
+    if fmt == 'csv':
+        lines = encode_csv(rows, columns or DEFAULT_COLUMNS[level])
+    else:
+        lines = encode_ndjson(rows, columns)
+    blocks = _blocks(lines)
+    return gzip_stream(blocks) if compress else blocks
+
+
+def export_store(store: StatsStore, fmt: str = 'ndjson', level: str = 'scan',
+                 columns: Optional[Sequence[str]] = None, start: TimeBound = None,
+                 end: TimeBound = None, compress: bool = True) -> Iterator[bytes]:
+    """Exporter l'historique d'un StatsStore entre `start` et `end` inclus"""
+    entries = store.iter_entries(start, end, chunk_size=READ_CHUNK)
+    return export(entries, fmt, level, columns, compress)
+
+
+def filename(fmt: str, level: str, compress: bool = True) -> str:
+    return f"historique_{level}.{fmt}" + ('.gz' if compress else '')
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export de l'historique des scans (NDJSON ou CSV, gzip)")
+    parser.add_argument('--db', default='network_stats.db', help="base d'historique (NetworkAIPredictor)")
+    parser.add_argument('--format', choices=FORMATS, default='ndjson')
+    parser.add_argument('--level', choices=LEVELS, default='scan',
+                        help="une ligne par scan ou par appareil analysé")
+    parser.add_argument('--columns', help="colonnes (chemins pointés séparés par des virgules)")
+    parser.add_argument('--start', help="début de période (ISO 8601)")
+    parser.add_argument('--end', help="fin de période (ISO 8601)")
+    parser.add_argument('--no-gzip', action='store_true', help="sortie non compressée")
+    parser.add_argument('-o', '--output', help="fichier de sortie (sortie standard par défaut)")
+    args = parser.parse_args(argv)
+
+    try:
+        columns = parse_columns(args.columns, args.level)
+    except ValueError as e:
+        parser.error(str(e))
+    store = StatsStore(args.db)
+    try:
+        chunks = export_store(store, args.format, args.level, columns, args.start, args.end,
+                              compress=not args.no_gzip)
+        output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+        finally:
+            if args.output:
+                output.close()
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
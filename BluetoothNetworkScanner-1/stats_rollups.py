@@ -0,0 +1,199 @@
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+# Résolutions disponibles (secondes par case) et durée de conservation de chacune
+RESOLUTIONS = {
+    '1m': 60,
+    '1h': 3600,
+    '1d': 86400,
+}
+RETENTION = {
+    '1m': 24 * 3600,
+    '1h': 30 * 86400,
+    '1d': 365 * 86400,
+}
+
+# Dimensions agrégées: type de réseau, SSID, et le nombre de scans de la case
+DIMENSION_TYPE = 'type'
+DIMENSION_SSID = 'ssid'
+DIMENSION_SCAN = 'scan'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    signal_count INTEGER NOT NULL,
+    signal_sum REAL NOT NULL,
+    signal_min REAL,
+    signal_max REAL,
+    encrypted INTEGER NOT NULL,
+    open INTEGER NOT NULL,
+    PRIMARY KEY (resolution, bucket, dimension, key)
+) WITHOUT ROWID;
+"""
+
+_UPSERT = """
+INSERT INTO rollups (resolution, bucket, dimension, key, count, signal_count,
+                     signal_sum, signal_min, signal_max, encrypted, open)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (resolution, bucket, dimension, key) DO UPDATE SET
+    count = count + excluded.count,
+    signal_count = signal_count + excluded.signal_count,
+    signal_sum = signal_sum + excluded.signal_sum,
+    signal_min = MIN(COALESCE(signal_min, excluded.signal_min), COALESCE(excluded.signal_min, signal_min)),
+    signal_max = MAX(COALESCE(signal_max, excluded.signal_max), COALESCE(excluded.signal_max, signal_max)),
+    encrypted = encrypted + excluded.encrypted,
+    open = open + excluded.open
+"""
+
+TimePoint = Union[str, datetime, float, int]
+
+
+def to_epoch(value: TimePoint) -> float:
+    """Convertir un horodatage ISO, datetime ou epoch en secondes epoch"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+class _Accumulator:
+    __slots__ = ('count', 'signal_count', 'signal_sum', 'signal_min', 'signal_max', 'encrypted', 'open')
+
+    def __init__(self):
+        self.count = 0
+        self.signal_count = 0
+        self.signal_sum = 0.0
+        self.signal_min = None
+        self.signal_max = None
+        self.encrypted = 0
+        self.open = 0
+
+    def add(self, signal: Optional[float], encrypted: Optional[bool]) -> None:
+        self.count += 1
+        if signal is not None:
+            self.signal_count += 1
+            self.signal_sum += signal
+            self.signal_min = signal if self.signal_min is None else min(self.signal_min, signal)
+            self.signal_max = signal if self.signal_max is None else max(self.signal_max, signal)
+        if encrypted is True:
+            self.encrypted += 1
+        elif encrypted is False:
+            self.open += 1
+
+    def row(self) -> Tuple:
+        return (self.count, self.signal_count, self.signal_sum, self.signal_min,
+                self.signal_max, self.encrypted, self.open)
+
+
+class RollupStore:
+    """Agrégats incrémentaux des scans à 1 minute, 1 heure et 1 jour.
+
+    Chaque scan met à jour une case par résolution et par clé (type de réseau,
+    SSID) avec un UPSERT: le coût d'un scan ne dépend pas de la taille de
+    l'historique. Les cases expirent selon `RETENTION`, et la lecture d'une
+    plage parcourt l'index primaire case par case.
+    """
+
+    def __init__(self, path: str, retention: Optional[Dict[str, int]] = None):
+        self.path = path
+        self.retention = dict(RETENTION, **(retention or {}))
+        self._lock = threading.Lock()
+        self._last_pruned: Dict[str, int] = {}
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def record_scan(self, timestamp: TimePoint,
+                    observations: Iterable[Tuple[str, Optional[str], Optional[float], Optional[bool]]]) -> None:
+        """Ajouter un scan.
+
+        `observations` contient un tuple (type, ssid, signal, chiffré) par appareil;
+        ssid, signal et chiffré peuvent être None quand ils ne s'appliquent pas.
+        """
+        groups: Dict[Tuple[str, str], _Accumulator] = {(DIMENSION_SCAN, ''): _Accumulator()}
+        groups[(DIMENSION_SCAN, '')].count = 1
+        for net_type, ssid, signal, encrypted in observations:
+            groups.setdefault((DIMENSION_TYPE, net_type), _Accumulator()).add(signal, encrypted)
+            if ssid:
+                groups.setdefault((DIMENSION_SSID, ssid), _Accumulator()).add(signal, encrypted)
+
+        epoch = int(to_epoch(timestamp))
+        rows = []
+        for resolution, width in RESOLUTIONS.items():
+            bucket = epoch - epoch % width
+            rows.extend((width, bucket, dimension, key) + acc.row()
+                        for (dimension, key), acc in groups.items())
+
+        with self._lock, self._conn:
+            self._conn.executemany(_UPSERT, rows)
+            self._prune(epoch)
+
+    def _prune(self, epoch: int) -> None:
+        # Une seule purge par résolution à chaque nouvelle case
+        for resolution, width in RESOLUTIONS.items():
+            bucket = epoch - epoch % width
+            if self._last_pruned.get(resolution) == bucket:
+                continue
+            self._last_pruned[resolution] = bucket
+            self._conn.execute('DELETE FROM rollups WHERE resolution = ? AND bucket < ?',
+                               (width, epoch - self.retention[resolution]))
+
+    def query(self, resolution: str = '1h', start: Optional[TimePoint] = None,
+              end: Optional[TimePoint] = None,
+              dimensions: Tuple[str, ...] = (DIMENSION_TYPE, DIMENSION_SSID)) -> List[Dict[str, Any]]:
+        """Cases de la résolution demandée entre `start` et `end`, dans l'ordre"""
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Résolution inconnue: {resolution} (valeurs: {', '.join(RESOLUTIONS)})")
+        width = RESOLUTIONS[resolution]
+        low = 0 if start is None else int(to_epoch(start)) // width * width
+        high = 2 ** 62 if end is None else int(to_epoch(end))
+        wanted = (DIMENSION_SCAN,) + tuple(dimensions)
+
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT bucket, dimension, key, count, signal_count, signal_sum, signal_min, '
+                'signal_max, encrypted, open FROM rollups '
+                'WHERE resolution = ? AND bucket BETWEEN ? AND ? '
+                f"AND dimension IN ({','.join('?' * len(wanted))}) "
+                'ORDER BY bucket', (width, low, high) + wanted).fetchall()
+
+        buckets: List[Dict[str, Any]] = []
+        for bucket, dimension, key, count, signal_count, signal_sum, signal_min, signal_max, enc, opn in rows:
+            if not buckets or buckets[-1]['_bucket'] != bucket:
+                buckets.append({
+                    '_bucket': bucket,
+                    'debut': datetime.fromtimestamp(bucket, timezone.utc).isoformat(),
+                    'scans': 0,
+                    'types': {},
+                    'ssids': {},
+                })
+            current = buckets[-1]
+            if dimension == DIMENSION_SCAN:
+                current['scans'] = count
+                continue
+            secured = enc + opn
+            summary = {
+                'nombre': count,
+                'signal_moyen': signal_sum / signal_count if signal_count else None,
+                'signal_min': signal_min,
+                'signal_max': signal_max,
+                'ratio_chiffre': enc / secured if secured else None,
+                'ratio_ouvert': opn / secured if secured else None,
+            }
+            current['types' if dimension == DIMENSION_TYPE else 'ssids'][key] = summary
+        for entry in buckets:
+            del entry['_bucket']
+        return buckets
@@ -0,0 +1,213 @@
+import os
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+TimeBound = Optional[Union[str, datetime]]
+
+# Clé remplaçant un texte d'analyse dédupliqué dans les entrées stockées
+_TEXT_REF = '$texte'
+# Textes d'analyse gardés en mémoire pendant une lecture (LRU)
+TEXT_MEMO_SIZE = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scans_timestamp ON scans(timestamp);
+CREATE TABLE IF NOT EXISTS texts (
+    hash TEXT PRIMARY KEY,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scan_texts (
+    scan_id INTEGER NOT NULL REFERENCES scans(id) ON DELETE CASCADE,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (scan_id, hash)
+);
+CREATE INDEX IF NOT EXISTS scan_texts_hash ON scan_texts(hash);
+"""
+
+
+def _bound(value: Union[str, datetime]) -> Tuple[datetime, bool]:
+    """Borne de période en heure locale naïve, comme les horodatages stockés
+    (datetime.now().isoformat()); indique aussi si seule la date est donnée"""
+    date_only = False
+    if not isinstance(value, datetime):
+        text = str(value).strip()
+        try:
+            value = datetime.fromisoformat(text)
+        except ValueError:
+            raise ValueError(f"Horodatage invalide: {text!r} (ISO 8601 attendu)") from None
+        date_only = 'T' not in text and ' ' not in text
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value, date_only
+
+
+class StatsStore:
+    """Historique des statistiques de scan dans SQLite (mode WAL).
+
+    Chaque scan est une ligne ajoutée dans une transaction, donc écrite de façon
+    atomique et sûre entre processus. Les textes d'analyse répétés
+    (`analyse_ia`) ne sont stockés qu'une fois. Seules les `max_entries`
+    dernières entrées sont conservées.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100, legacy_json: Optional[str] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA foreign_keys=ON')
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+        if legacy_json:
+            self._import_legacy(legacy_json)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def append(self, stats: Dict[str, Any]) -> None:
+        """Ajouter les statistiques d'un scan"""
+        texts: Dict[str, str] = {}
+        payload = json.dumps(self._dedupe(stats, texts), ensure_ascii=False, separators=(',', ':'))
+        with self._lock, self._conn:
+            self._insert(stats.get('timestamp', datetime.now().isoformat()), payload, texts)
+            self._apply_retention()
+
+    def _insert(self, timestamp: str, payload: str, texts: Dict[str, str]) -> None:
+        cursor = self._conn.execute(
+            'INSERT INTO scans (timestamp, payload) VALUES (?, ?)', (timestamp, payload))
+        scan_id = cursor.lastrowid
+        self._conn.executemany(
+            'INSERT OR IGNORE INTO texts (hash, body) VALUES (?, ?)', texts.items())
+        self._conn.executemany(
+            'INSERT OR IGNORE INTO scan_texts (scan_id, hash) VALUES (?, ?)',
+            ((scan_id, digest) for digest in texts))
+
+    def _apply_retention(self) -> None:
+        deleted = self._conn.execute(
+            'DELETE FROM scans WHERE id <= (SELECT MAX(id) FROM scans) - ?', (self.max_entries,)
+        ).rowcount
+        if deleted:
+            self._conn.execute(
+                'DELETE FROM texts WHERE hash NOT IN (SELECT hash FROM scan_texts)')
+
+    def count(self, start: TimeBound = None, end: TimeBound = None) -> int:
+        where, params = self._where(start, end)
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM scans{where}', params).fetchone()[0]
+
+    def query(self, start: TimeBound = None, end: TimeBound = None,
+              limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """Entrées entre `start` et `end` inclus, par ordre chronologique"""
+        return list(self.iter_entries(start, end, limit, offset))
+
+    def iter_entries(self, start: TimeBound = None, end: TimeBound = None,
+                     limit: Optional[int] = None, offset: int = 0,
+                     chunk_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Parcourir les entrées par paquets, sans charger tout l'historique.
+
+        La lecture utilise sa propre connexion: elle voit un instantané cohérent
+        (WAL) et n'est pas bloquée par les écritures concurrentes. Les bornes
+        sont vérifiées dès l'appel (ValueError si elles sont invalides).
+        """
+        where, params = self._where(start, end)
+        sql = f'SELECT payload FROM scans{where} ORDER BY timestamp, id LIMIT ? OFFSET ?'
+        params += [-1 if limit is None else limit, offset]
+        return self._read(sql, params, chunk_size)
+
+    def _read(self, sql: str, params: List[Any], chunk_size: int) -> Iterator[Dict[str, Any]]:
+        reader = sqlite3.connect(self.path, timeout=30)
+        try:
+            # Mémo borné: la mémoire ne croît pas avec le nombre de textes distincts lus
+            texts: 'OrderedDict[str, str]' = OrderedDict()
+            cursor = reader.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for (payload,) in rows:
+                    yield self._restore(reader, json.loads(payload), texts)
+        finally:
+            reader.close()
+
+    def _where(self, start: TimeBound, end: TimeBound):
+        """Clause WHERE de la période; une fin sans heure couvre toute la journée"""
+        clauses, params = [], []
+        if start is not None:
+            clauses.append('timestamp >= ?')
+            params.append(_bound(start)[0].isoformat())
+        if end is not None:
+            moment, date_only = _bound(end)
+            if date_only:
+                clauses.append('timestamp < ?')
+                params.append((moment + timedelta(days=1)).isoformat())
+            else:
+                clauses.append('timestamp <= ?')
+                params.append(moment.isoformat())
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def _dedupe(self, stats: Dict[str, Any], texts: Dict[str, str]) -> Dict[str, Any]:
+        details = stats.get('detailed_analysis')
+        if not details:
+            return stats
+        stored = dict(stats)
+        stored['detailed_analysis'] = []
+        for analysis in details:
+            text = analysis.get('analyse_ia')
+            if isinstance(text, str):
+                digest = hashlib.sha1(text.encode('utf-8')).hexdigest()
+                texts[digest] = text
+                analysis = dict(analysis, analyse_ia={_TEXT_REF: digest})
+            stored['detailed_analysis'].append(analysis)
+        return stored
+
+    def _restore(self, reader: sqlite3.Connection, entry: Dict[str, Any],
+                 texts: 'OrderedDict[str, str]') -> Dict[str, Any]:
+        for analysis in entry.get('detailed_analysis', ()):
+            ref = analysis.get('analyse_ia')
+            if isinstance(ref, dict) and _TEXT_REF in ref:
+                digest = ref[_TEXT_REF]
+                text = texts.get(digest)
+                if text is None:
+                    row = reader.execute('SELECT body FROM texts WHERE hash = ?', (digest,)).fetchone()
+                    text = texts[digest] = row[0] if row else ''
+                    if len(texts) > TEXT_MEMO_SIZE:
+                        texts.popitem(last=False)
+                else:
+                    texts.move_to_end(digest)
+                analysis['analyse_ia'] = text
+        return entry
+
+    def _import_legacy(self, legacy_json: str) -> None:
+        """Reprendre une fois l'ancien historique network_stats.json"""
+        if not os.path.exists(legacy_json):
+            return
+        with self._lock:
+            if self._conn.execute('SELECT 1 FROM scans LIMIT 1').fetchone():
+                return
+        try:
+            with open(legacy_json, 'r') as f:
+                history = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Historique %s illisible: %s", legacy_json, e)
+            return
+        with self._lock, self._conn:
+            for stats in history[-self.max_entries:]:
+                texts: Dict[str, str] = {}
+                payload = json.dumps(self._dedupe(stats, texts), ensure_ascii=False, separators=(',', ':'))
+                self._insert(stats.get('timestamp', ''), payload, texts)
+        logger.info("%d entrées importées depuis %s", min(len(history), self.max_entries), legacy_json)
@@ -0,0 +1,270 @@
+import os
+import json
+import queue
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from snapshot_cache import file_identity
+
+logger = logging.getLogger(__name__)
+
+# Constantes de <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct('iIII')
+# IN_MODIFY est ignoré: le fichier n'est relu qu'une fois l'écriture terminée
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# Clé réservée d'un delta: liste des clés supprimées à ce niveau (null reste une valeur)
+DELETED_KEY = '$supprimees'
+
+
+def diff(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Delta compact de `old` vers `new`.
+
+    Seules les clés modifiées sont présentes et les listes sont remplacées
+    en entier, comme un JSON Merge Patch (RFC 7386), à ceci près qu'une
+    valeur null est transmise telle quelle: les clés supprimées sont
+    listées sous DELETED_KEY.
+    """
+    delta = {}
+    for key, value in new.items():
+        if key in old and old[key] == value:
+            continue
+        previous = old.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            delta[key] = diff(previous, value)
+        else:
+            delta[key] = value
+    deleted = [key for key in old if key not in new]
+    if deleted:
+        delta[DELETED_KEY] = deleted
+    return delta
+
+
+def apply_delta(state: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Appliquer un delta produit par diff() (nouvel objet, `state` inchangé)"""
+    result = dict(state)
+    for key, value in delta.items():
+        if key == DELETED_KEY:
+            for deleted in value:
+                result.pop(deleted, None)
+        elif isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = apply_delta(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+class FileWatcher:
+    """Attente des modifications d'un fichier: inotify si possible, sinon stat() périodique.
+
+    inotify surveille le répertoire parent, ce qui couvre les remplacements
+    atomiques (rename) et la création du fichier après le démarrage.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 1.0, use_inotify: bool = True):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._name = os.fsencode(os.path.basename(path))
+        self._identity = file_identity(path)
+        self._fd = self._open_inotify() if use_inotify else None
+
+    @property
+    def mode(self) -> str:
+        return 'inotify' if self._fd is not None else 'polling'
+
+    def _open_inotify(self) -> Optional[int]:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (OSError, AttributeError, TypeError):
+            return None
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK) < 0:
+            logger.debug("inotify indisponible pour %s: %s", directory, os.strerror(ctypes.get_errno()))
+            os.close(fd)
+            return None
+        return fd
+
+    def _read_events(self) -> bool:
+        """Vider la file inotify; True si un événement concerne le fichier surveillé"""
+        touched = False
+        while True:
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return touched
+            offset = 0
+            while offset + _EVENT.size <= len(buffer):
+                _, _, _, length = _EVENT.unpack_from(buffer, offset)
+                name = buffer[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0')
+                touched = touched or name == self._name
+                offset += _EVENT.size + length
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Bloquer jusqu'à `timeout` secondes; True si l'identité du fichier a changé"""
+        if self._fd is not None:
+            ready, _, _ = select.select([self._fd], [], [], timeout)
+            if not ready or not self._read_events():
+                return False
+        else:
+            time.sleep(self.poll_interval if timeout is None else min(timeout, self.poll_interval))
+        identity = file_identity(self.path)
+        if identity == self._identity:
+            return False
+        self._identity = identity
+        return True
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class Subscription:
+    """File d'événements d'un client; un client trop lent est resynchronisé par un snapshot"""
+
+    def __init__(self, maxsize: int = 16):
+        self.events: 'queue.Queue[Tuple[str, str, Dict[str, Any]]]' = queue.Queue(maxsize)
+
+    def put(self, event: Tuple[str, str, Dict[str, Any]], snapshot: Callable[[], Tuple[str, str, Dict[str, Any]]]) -> None:
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            while True:
+                try:
+                    self.events.get_nowait()
+                except queue.Empty:
+                    break
+            self.events.put_nowait(snapshot())
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class StatusBroadcaster:
+    """Diffuseur unique du statut réseau vers tous les abonnés.
+
+    Un seul thread surveille le fichier de résultats et recalcule l'état;
+    chaque abonné reçoit un snapshot complet à la connexion puis des deltas.
+    Les `history` derniers états sont conservés pour servir `since=<version>`.
+    """
+
+    def __init__(self, load: Callable[[], Tuple[str, Dict[str, Any]]], watcher: FileWatcher,
+                 history: int = 64, max_queue: int = 16):
+        self.load = load
+        self.watcher = watcher
+        self.history = history
+        self.max_queue = max_queue
+        self.version, self.state = load()
+        self._states: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict([(self.version, self.state)])
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'StatusBroadcaster':
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='status-broadcaster', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.watcher.close()
+
+    def _run(self) -> None:
+        logger.info("Diffusion du statut réseau (%s)", self.watcher.mode)
+        while not self._stop.is_set():
+            try:
+                if self.watcher.wait(timeout=0.5):
+                    self.refresh()
+            except Exception:
+                logger.exception("Erreur lors de la diffusion du statut")
+
+    def refresh(self) -> bool:
+        """Recharger l'état et publier le delta; False si la version n'a pas changé"""
+        version, state = self.load()
+        with self._lock:
+            if version == self.version:
+                return False
+            delta = diff(self.state, state)
+            self.version, self.state = version, state
+            self._states[version] = state
+            self._states.move_to_end(version)
+            while len(self._states) > self.history:
+                self._states.popitem(last=False)
+            if not delta:
+                return True
+            for subscription in self._subscribers:
+                subscription.put((version, 'delta', delta), self._snapshot_event)
+        return True
+
+    def _snapshot_event(self) -> Tuple[str, str, Dict[str, Any]]:
+        return self.version, 'snapshot', self.state
+
+    def changes_since(self, since: Optional[str] = None) -> Tuple[str, str, Dict[str, Any]]:
+        """(version, 'delta'|'snapshot', données) pour un client à la version `since`"""
+        with self._lock:
+            previous = self._states.get(since) if since else None
+            if previous is None:
+                return self._snapshot_event()
+            return self.version, 'delta', diff(previous, self.state)
+
+    def subscribe(self, since: Optional[str] = None) -> Subscription:
+        """Nouvel abonné; son premier événement est l'état courant (ou le delta depuis `since`)"""
+        subscription = Subscription(self.max_queue)
+        with self._lock:
+            previous = self._states.get(since) if since else None
+            if previous is None:
+                subscription.put(self._snapshot_event(), self._snapshot_event)
+            elif previous is not self.state:
+                subscription.put((self.version, 'delta', diff(previous, self.state)), self._snapshot_event)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+
+def format_event(version: str, kind: str, data: Dict[str, Any]) -> str:
+    """Événement Server-Sent Events (l'id permet la reprise via Last-Event-ID)"""
+    return f"id: {version}\nevent: {kind}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def stream_events(broadcaster: StatusBroadcaster, since: Optional[str] = None,
+                  heartbeat: float = 15.0) -> Iterator[str]:
+    """Flux SSE d'un abonné, avec un commentaire périodique pour garder la connexion"""
+    subscription = broadcaster.subscribe(since)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            event = subscription.get(timeout=heartbeat)
+            yield ": ping\n\n" if event is None else format_event(*event)
+    finally:
+        broadcaster.unsubscribe(subscription)
@@ -0,0 +1,121 @@
+import math
+import random
+from typing import Any, Dict, List, Tuple
+
+from scan_orchestrator import wifi_device
+from wifi_scan import channel_from_frequency
+
+# Répartition du chiffrement observée sur les relevés publics (ordre de grandeur)
+ENCRYPTION_WEIGHTS = (('WPA2', 0.68), ('WPA3', 0.10), ('WPA', 0.05), ('WEP', 0.02), ('none', 0.15))
+# Éléments RSN/WPA annoncés, comme les produit wifi_scan (WPA3 = RSN avec SAE)
+SECURITY = {'WPA': ['WPA'], 'WPA2': ['WPA2'], 'WPA3': ['WPA2']}
+# Bandes: (fréquences possibles en MHz, proportion des points d'accès)
+BANDS = (
+    ((2412, 2437, 2462), 0.55),
+    ((5180, 5200, 5220, 5240, 5260, 5500, 5745, 5785), 0.38),
+    ((5975, 6055, 6135, 6215), 0.07),
+)
+BLE_NAMES = ('Montre', 'Écouteurs', 'Balise', 'Capteur', 'Badge', 'Smartphone', 'Tag', None)
+OPERATORS = (('Orange', 'B3'), ('SFR', 'B20'), ('Bouygues Telecom', 'B7'), ('Free Mobile', 'B28'))
+TECHNOLOGIES = ('4G/LTE', '5G/NR', '4G/LTE', '3G/UMTS')
+
+# Environnements de référence (points d'accès, appareils BLE, cellules)
+PRESETS = {
+    'maison': (30, 20, 2),
+    'bureau': (500, 300, 3),
+    'entrepot': (3000, 2000, 4),
+    'stade': (10000, 5000, 6),
+}
+
+
+def path_loss_rssi(rng: random.Random, tx_power: float, distance: float,
+                   exponent: float = 3.0, shadowing: float = 6.0) -> float:
+    """RSSI selon le modèle log-distance avec masquage log-normal, borné à [-100, -20] dBm"""
+    rssi = tx_power - 10 * exponent * math.log10(max(distance, 1.0)) + rng.gauss(0, shadowing)
+    return float(round(min(-20.0, max(-100.0, rssi))))
+
+
+def _weighted(rng: random.Random, choices: Tuple[Tuple[Any, float], ...]) -> Any:
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def _mac(rng: random.Random, local: bool = False) -> str:
+    octets = [rng.randrange(256) for _ in range(6)]
+    octets[0] = (octets[0] & 0xFC) | (0x02 if local else 0x00)
+    return ':'.join(f'{octet:02X}' for octet in octets)
+
+
+def generate_wifi(rng: random.Random, count: int, radius: float = 100.0) -> List[Dict[str, Any]]:
+    """Points d'accès au format de wifi_scan (wifi_results.json).
+
+    Les points d'accès sont répartis uniformément sur un disque: la plupart
+    sont loin et faibles, comme dans un relevé réel. Plusieurs BSSID
+    partagent un SSID (réseaux d'entreprise) et quelques SSID sont cachés.
+    """
+    ssids = max(1, count // 6)
+    records = []
+    for _ in range(count):
+        frequency = rng.choice(_weighted(rng, BANDS))
+        encryption = _weighted(rng, ENCRYPTION_WEIGHTS)
+        distance = radius * math.sqrt(rng.random())
+        # Le 5/6 GHz s'atténue plus vite que le 2,4 GHz
+        exponent = 2.5 if frequency < 3000 else 3.0
+        ssid = None if rng.random() < 0.03 else f'Reseau-{rng.randrange(ssids)}'
+        records.append({
+            'bssid': _mac(rng),
+            'ssid': ssid,
+            'rssi': path_loss_rssi(rng, -30.0, distance, exponent),
+            'frequency_mhz': frequency,
+            'channel': channel_from_frequency(frequency),
+            'encryption': encryption,
+            'security': SECURITY.get(encryption, []),
+            'ciphers': ['CCMP'] if encryption in SECURITY else [],
+            'auth_suites': (['SAE'] if encryption == 'WPA3' else ['PSK']) if encryption in SECURITY else [],
+            'quality': None,
+        })
+    return records
+
+
+def generate_ble(rng: random.Random, count: int, radius: float = 30.0) -> List[Dict[str, Any]]:
+    """Appareils BLE; la majorité annonce une adresse aléatoire (locale)"""
+    devices = []
+    for _ in range(count):
+        device = {
+            'device_type': 'bluetooth',
+            'address': _mac(rng, local=rng.random() < 0.6),
+            'signal': path_loss_rssi(rng, -59.0, radius * math.sqrt(rng.random()), 2.0, 4.0),
+        }
+        name = rng.choice(BLE_NAMES)
+        if name:
+            device['name'] = name
+        devices.append(device)
+    return devices
+
+
+def generate_cells(rng: random.Random, count: int) -> List[Dict[str, Any]]:
+    """Cellules voisines vues par le modem"""
+    cells = []
+    for i in range(count):
+        operator, band = OPERATORS[i % len(OPERATORS)]
+        cells.append({
+            'operator': operator,
+            'technology': rng.choice(TECHNOLOGIES),
+            'signal': float(rng.randint(-115, -65)),
+            'band': band,
+        })
+    return cells
+
+
+def generate_environment(aps: int, ble: int, cells: int, seed: int = 0) -> Dict[str, Any]:
+    """Environnement synthétique reproductible.
+
+    'wifi_results' a le format écrit par wifi_scan (lu par server.py) et
+    'devices' celui de NetworkAIPredictor.analyze_networks.
+    """
+    rng = random.Random(seed)
+    wifi = generate_wifi(rng, aps)
+    devices = [wifi_device(record) for record in wifi if record['ssid'] is not None]
+    devices.extend(generate_ble(rng, ble))
+    devices.extend(generate_cells(rng, cells))
+    return {'wifi_results': wifi, 'devices': devices}
@@ -0,0 +1,117 @@
+import copy
+import random
+
+import numpy as np
+import pytest
+
+from ai_predictor import NetworkAIPredictor
+from channel_model import ChannelModel
+from batch_analysis import BatchAnalyzer, ScanColumns, bucket, QUALITY_CUTS
+
+
+@pytest.fixture
+def predictor(tmp_path, monkeypatch):
+    # Sans clé API, aucune analyse GPT n'est tentée
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    predictor = NetworkAIPredictor()
+    predictor.stats_file = str(tmp_path / 'network_stats.json')
+    return predictor
+
+
+def _empty_stats(predictor):
+    return {
+        'total_networks': 0,
+        'network_types': {t: 0 for t in predictor.network_types.keys()},
+        'average_signal': {},
+        'security_stats': {'encrypted': 0, 'open': 0},
+        'timestamp': '2025-01-01T00:00:00',
+        'detailed_analysis': []
+    }
+
+
+def _mixed_scan(count=400, seed=7):
+    rng = random.Random(seed)
+    scan = [
+        # Valeurs aux bornes exactes des seuils
+        {'ssid': 'Borne-Excellente', 'signal': '-50', 'encryption': 'WPA2'},
+        {'ssid': 'Borne-Faible', 'signal': -80, 'encryption': 'none'},
+        {'ssid': 'Sans-Signal', 'encryption': ''},
+        {'ssid': 'Debit-Connu', 'signal': '-61.5 dBm', 'bandwidth': 300, 'frequency': 5180},
+        {'device_type': 'audio', 'address': '00:11:22:33:44:55', 'version': '5.0'},
+        {'operator': 'Test Mobile', 'technology': '5G', 'signal': '-100'},
+    ]
+    for i in range(count):
+        kind = rng.choice(['wifi', 'wifi', 'bluetooth', 'lte', 'esim'])
+        signal = f"{rng.uniform(-110, -30):.1f}"
+        if kind == 'wifi':
+            scan.append({
+                'ssid': f'AP-{i}',
+                'signal': signal if rng.random() < 0.5 else f'{signal} dBm',
+                'encryption': rng.choice(['WPA2', 'WPA3', 'WEP', 'none', 'WPA2 Enterprise', '']),
+                'frequency': rng.choice([2412, 5180, 0]),
+                'noise': rng.choice([-95, -75, -65]),
+                'channel_utilization': rng.random(),
+            })
+        elif kind == 'bluetooth':
+            scan.append({
+                'device_type': 'audio',
+                'signal': signal,
+                'address': f'AA:BB:CC:00:00:{i % 256:02X}',
+                'class': rng.choice(['audio', 'phone', 'computer', '']),
+                'version': rng.choice(['4.0', '5.2', '3.0']),
+                'nearby_devices': ['x'] * rng.randint(0, 12),
+            })
+        else:
+            scan.append({
+                'operator': 'Op',
+                'technology': 'LTE' if kind == 'lte' else '5G',
+                'signal': signal,
+                'band': 'B7',
+            })
+    return scan
+
+
+def test_batch_matches_scalar_path(predictor):
+    scan = _mixed_scan()
+
+    expected = _empty_stats(predictor)
+    predictor._analyze_networks_scalar(copy.deepcopy(scan), expected)
+    actual = _empty_stats(predictor)
+    BatchAnalyzer(predictor).analyze(copy.deepcopy(scan), actual)
+
+    assert actual == expected
+    # Même ordre d'insertion pour les moyennes par type
+    assert list(actual['average_signal']) == list(expected['average_signal'])
+    assert all(type(a['details'].get('signal_quality', 0.0)) is float
+               for a in actual['detailed_analysis'])
+
+
+def test_analyze_networks_uses_batch_path(predictor):
+    scan = _mixed_scan(count=50, seed=3)
+    stats = predictor.analyze_networks(scan)
+
+    expected = _empty_stats(predictor)
+    # Les appareils sont complétés par le modèle de canaux avant l'analyse
+    predictor._analyze_networks_scalar(ChannelModel(scan).annotate(), expected)
+    assert stats['detailed_analysis'] == expected['detailed_analysis']
+    assert stats['network_types'] == expected['network_types']
+    assert stats['average_signal'] == expected['average_signal']
+
+
+def test_unknown_device_type_still_rejected(predictor):
+    with pytest.raises(KeyError):
+        BatchAnalyzer(predictor).analyze([{'foo': 'bar'}], _empty_stats(predictor))
+
+
+def test_columns_parse_each_signal_once(predictor):
+    columns = ScanColumns.from_devices(predictor, [
+        {'ssid': 'a', 'signal': '-65 dBm'},
+        {'device_type': 'audio'},
+    ])
+    assert columns.signal.tolist() == [-65.0, -90.0]
+    assert columns.has_signal.tolist() == [True, False]
+
+
+def test_bucket_thresholds_are_strict():
+    values = np.array([0.81, 0.8, 0.6, 0.41, 0.4, np.nan])
+    assert bucket(values, QUALITY_CUTS).tolist() == [0, 1, 2, 2, 3, 3]
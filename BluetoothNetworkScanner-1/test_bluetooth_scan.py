@@ -0,0 +1,123 @@
+import io
+import json
+import os
+
+import pytest
+
+from ai_predictor import NetworkAIPredictor
+from bluetooth_scan import (Coalescer, class_name, coalesce, main, parse_bluetoothctl, parse_btmon,
+                            parse_hcitool, parse_stream, short_uuid)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read().splitlines(True)
+
+
+def test_btmon_fixture():
+    observations = list(parse_btmon(_fixture('btmon_scan.txt')))
+    assert [o['address'] for o in observations] == ['5C:F3:70:11:22:33', '7A:11:22:33:44:55', '5C:F3:70:11:22:33',
+                                                   'A4:C1:38:00:00:01', '44:55:66:77:88:99', '5C:F3:70:11:22:33']
+    casque = observations[0]
+    assert (casque['time'], casque['rssi'], casque['name']) == (1.105237, -67.0, 'Casque')
+    assert casque['services'] == ['0x110b', '0x110e']
+    # Rapport étendu: RSSI avant les données, adresse directe ignorée
+    capteur = observations[3]
+    assert (capteur['rssi'], capteur['name']) == (-74.0, 'Capteur')
+    assert capteur['services'] == ['6e400001-b5a3-f393-e0a9-e50e24dcca9e']
+    assert class_name(observations[4]['class_of_device']) == 'phone'
+
+
+def test_bluetoothctl_fixture():
+    records = list(coalesce(parse_bluetoothctl(_fixture('bluetoothctl_scan.txt')), window=None))
+    assert [r['address'] for r in records] == ['5C:F3:70:11:22:33', '7A:11:22:33:44:55', '44:55:66:77:88:99']
+    casque, anonyme, galaxy = records
+    assert casque == {'device_type': 'bluetooth', 'address': '5C:F3:70:11:22:33', 'name': 'Casque',
+                      'class': 'audio-video', 'class_of_device': 0x240404, 'services': ['0x110b', '0x110e'],
+                      'signal': -66.0, 'rssi_min': -70.0, 'rssi_max': -61.0, 'rssi_mean': -66.0,
+                      'advertisements': 4}
+    # Nom égal à l'adresse: inconnu; icône utilisée faute de Class of Device
+    assert 'name' not in anonyme and anonyme['advertisements'] == 2
+    assert (galaxy['name'], galaxy['class']) == ('Galaxy', 'phone')
+
+
+def test_hcitool_and_format_detection():
+    capture = ['LE Scan ...\n', '5C:F3:70:11:22:33 (unknown)\n', '5C:F3:70:11:22:33 Casque\n',
+               'A4:C1:38:00:00:01 Capteur\n']
+    assert [o.get('name') for o in parse_hcitool(capture)] == [None, 'Casque', 'Capteur']
+    assert len(list(parse_stream(capture))) == 3
+    assert len(list(parse_stream(_fixture('btmon_scan.txt')))) == 6
+    assert len(list(parse_stream(_fixture('bluetoothctl_scan.txt')))) == 13
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('0000110B-0000-1000-8000-00805F9B34FB', '0x110b'), ('Audio Sink (0x110b)', '0x110b'),
+    ('Unknown (0xfe9f)', '0xfe9f'), ('6E400001-B5A3-F393-E0A9-E50E24DCCA9E', '6e400001-b5a3-f393-e0a9-e50e24dcca9e'),
+])
+def test_short_uuid(value, expected):
+    assert short_uuid(value) == expected
+
+
+def test_window_coalescing():
+    def adv(address, time, rssi):
+        return {'address': address, 'time': time, 'advertisement': True, 'rssi': rssi}
+
+    coalescer = Coalescer(window=1.0)
+    assert coalescer.add(adv('AA:00:00:00:00:01', 0.0, -60.0)) == []
+    assert coalescer.add(adv('AA:00:00:00:00:02', 0.5, -80.0)) == []
+    assert coalescer.add(adv('AA:00:00:00:00:01', 0.9, -50.0)) == []
+    # La première fenêtre expire; la seconde (ouverte à 0,5 s) reste ouverte
+    [closed] = coalescer.add(adv('AA:00:00:00:00:01', 1.2, -70.0))
+    assert (closed['rssi_min'], closed['rssi_max'], closed['rssi_mean'], closed['advertisements']) == \
+        (-60.0, -50.0, -55.0, 2)
+    assert (closed['first_seen'], closed['last_seen']) == (0.0, 0.9)
+    assert [(r['address'], r['advertisements']) for r in coalescer.flush()] == \
+        [('AA:00:00:00:00:02', 1), ('AA:00:00:00:00:01', 1)]
+
+
+def test_coalesce_is_streaming():
+    def observations():
+        for i in range(3):
+            yield {'address': 'AA:00:00:00:00:01', 'time': float(i), 'advertisement': True, 'rssi': -60.0}
+        raise AssertionError("lecture au-delà du nécessaire")
+
+    assert next(coalesce(observations(), window=1.0))['first_seen'] == 0.0
+
+
+def test_clock_for_untimed_lines():
+    ticks = iter([0.0, 0.1, 5.0])
+    lines = ['[CHG] Device 5C:F3:70:11:22:33 RSSI: -60\n'] * 3
+    records = list(coalesce(parse_bluetoothctl(lines), window=1.0, clock=lambda: next(ticks)))
+    assert [r['advertisements'] for r in records] == [2, 1]
+
+
+def test_records_feed_predictor(tmp_path, monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    predictor = NetworkAIPredictor()
+    predictor.stats_file = str(tmp_path / 'network_stats.json')
+    records = list(coalesce(parse_stream(_fixture('bluetoothctl_scan.txt')), window=None))
+    stats = predictor.analyze_networks(records)
+    assert stats['network_types']['bluetooth'] == 3
+    details = [a['details'] for a in stats['detailed_analysis']]
+    assert [d['device_class'] for d in details] == ['Audio', 'Autre', 'Téléphone']
+    assert details[0]['services'] == ['0x110b', '0x110e']
+
+
+def test_cli(tmp_path):
+    output = tmp_path / 'bluetooth_results.json'
+    stdout = io.StringIO()
+    assert main([os.path.join(FIXTURES, 'btmon_scan.txt'), '-o', str(output), '--summary'], stdout=stdout) == 0
+    data = json.loads(output.read_text())
+    assert [d['address'] for d in data] == ['5C:F3:70:11:22:33', '7A:11:22:33:44:55', 'A4:C1:38:00:00:01',
+                                            '44:55:66:77:88:99']
+    assert data[0]['advertisements'] == 3
+    assert os.listdir(tmp_path) == ['bluetooth_results.json']
+    assert stdout.getvalue().splitlines()[0] == \
+        r'Adresse MAC : 5C:F3:70:11:22:33\nNom : Casque\nSignal : -66 dBm (-70 à -61)\nAnnonces : 3'
+
+    stdout = io.StringIO()
+    assert main(['-', '--format', 'btmon', '--window', '1', '--ndjson'],
+                stdin=io.StringIO(''.join(_fixture('btmon_scan.txt'))), stdout=stdout) == 0
+    assert len(stdout.getvalue().splitlines()) == 5
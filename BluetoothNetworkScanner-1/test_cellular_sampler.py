@@ -0,0 +1,147 @@
+import math
+import os
+import random
+import statistics
+
+import pytest
+
+from ai_predictor import NetworkAIPredictor
+from cellular_sampler import CellularSampler, FixtureSource, RollingWindow, parse_signal_metrics
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'mmcli_signal.ndjson')
+
+
+def _exact_percentile(values, p):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def test_window_matches_exact_statistics():
+    rng = random.Random(1)
+    window = RollingWindow(50, -156.0, -31.0)
+    pushed = []
+    for _ in range(437):
+        value = round(rng.uniform(-120, -60), 1)
+        window.push(value)
+        pushed.append(value)
+    recent = pushed[-50:]
+    assert len(window) == 50 and window.values() == recent
+    assert window.mean() == pytest.approx(statistics.fmean(recent))
+    assert window.variance() == pytest.approx(statistics.pvariance(recent))
+    for p in (10, 50, 90):
+        assert abs(window.percentile(p) - _exact_percentile(recent, p)) <= window.resolution
+
+
+def test_partial_window_and_out_of_range_values():
+    window = RollingWindow(10, -43.0, 20.0)
+    assert window.mean() is None and window.percentile(50) is None and window.summary() == {'count': 0}
+    for value in (-50.0, -10.0, 35.0):
+        window.push(value)
+    assert window.values() == [-50.0, -10.0, 35.0]
+    # Valeurs hors plage rangées dans les classes extrêmes
+    assert window.percentile(0) == -43.0 and window.percentile(100) == pytest.approx(20.5)
+    with pytest.raises(ValueError):
+        RollingWindow(0, -43.0, 20.0)
+
+
+def test_running_sums_do_not_drift():
+    window = RollingWindow(100, -156.0, -31.0)
+    for i in range(100_000):
+        window.push(-100.0 + (i % 7) * 0.1 + 1e6 * (i < 100))
+    assert window.variance() == pytest.approx(statistics.pvariance(window.values()), abs=1e-9)
+
+
+def test_parse_signal_metrics():
+    signal = {'modem': {'signal': {
+        'lte': {'rsrp': '--', 'rssi': '--', 'snr': '--'},
+        '5g': {'rsrp': '-101.00', 'rsrq': '-12.00', 'snr': '4.50'},
+        'gsm': {'rssi': '-70.00'},
+    }}}
+    assert parse_signal_metrics(signal) == {'rsrp': -101.0, 'rsrq': -12.0, 'sinr': 4.5}
+    assert parse_signal_metrics({}) == {}
+
+
+def test_sampler_replays_fixture():
+    sampler = CellularSampler(FixtureSource(FIXTURE), interval=0, capacity=30)
+    while sampler.sample():
+        pass
+    stats = sampler.stats()
+    assert stats['samples'] == 40
+    assert set(stats) == {'samples', 'interval', 'rssi', 'rsrp', 'rsrq', 'sinr'}
+    assert stats['rsrp']['count'] == 30
+    assert stats['rsrp']['p10'] < stats['rsrp']['p50'] < stats['rsrp']['p90']
+    assert stats['rsrp']['stddev'] == pytest.approx(stats['rsrp']['variance'] ** 0.5, abs=0.01)
+
+
+def test_background_thread_and_source_errors():
+    calls = []
+
+    def source():
+        calls.append(1)
+        if len(calls) == 2:
+            raise OSError("modem occupé")
+        return {'rssi': -70.0} if len(calls) < 5 else None
+
+    sampler = CellularSampler(source, interval=0.001, capacity=10)
+    sampler.start()
+    sampler._thread.join(5)
+    sampler.stop()
+    # La source épuisée arrête le thread; l'erreur est comptée sans l'interrompre
+    assert (sampler.samples, sampler.errors) == (3, 1)
+    assert sampler.stats()['rssi']['count'] == 3
+
+
+@pytest.fixture
+def predictor(tmp_path, monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    predictor = NetworkAIPredictor()
+    predictor.stats_file = str(tmp_path / 'network_stats.json')
+    return predictor
+
+
+def _window(**metrics):
+    return {'samples': 100, 'interval': 1.0, **{name: dict(value, count=100) for name, value in metrics.items()}}
+
+
+def test_stability_and_coverage_use_window(predictor):
+    connection = {'operator': 'Orange', 'technology': '4G/LTE', 'signal': -65.0}
+    assert predictor._evaluate_cellular_stability(connection) == 'Excellente'
+    assert predictor._analyze_coverage(connection) == 'Excellente'
+
+    # Une lecture unique favorable, mais des évanouissements sur la fenêtre
+    connection['signal_window'] = _window(rsrp={'p10': -104.0, 'p50': -95.0, 'stddev': 6.0})
+    assert predictor._evaluate_cellular_stability(connection) == 'Faible'
+    assert predictor._analyze_coverage(connection) == 'Moyenne'
+
+    connection['signal_window'] = _window(rssi={'p10': -72.0, 'p50': -68.0, 'stddev': 1.0})
+    assert predictor._evaluate_cellular_stability(connection) == 'Excellente'
+    connection['signal_window']['rssi']['stddev'] = 9.0
+    assert predictor._evaluate_cellular_stability(connection) == 'Moyenne'
+
+
+def test_analyze_networks_reads_sampler(predictor):
+    sampler = CellularSampler(FixtureSource(FIXTURE), interval=0)
+    while sampler.sample():
+        pass
+    scan = [{'operator': 'Orange', 'technology': '4G/LTE', 'signal': -65.0, 'band': 'B7'},
+            {'operator': 'Free Mobile France', 'technology': 'eSIM', 'iccid': '8933111234567890123'}]
+
+    baseline = predictor.analyze_networks(scan)
+    predictor.cellular_sampler = sampler
+    stats = predictor.analyze_networks(scan)
+    assert stats['cellular_signal']['samples'] == 40 and 'cellular_signal' not in baseline
+    lte, esim = stats['detailed_analysis']
+    assert baseline['detailed_analysis'][0]['performances']['stabilite'] == 'Excellente'
+    assert lte['performances']['stabilite'] == 'Faible'
+    assert lte['performances']['couverture'] == 'Moyenne'
+    # Profil eSIM sans lecture de signal: pas de fenêtre jointe
+    assert esim == baseline['detailed_analysis'][1]
+    assert 'signal_window' not in scan[0]
+
+    # Analyse complète, appareil par appareil et incrémentale identiques
+    devices = predictor._attach_signal_window(scan, {})
+    assert [predictor._build_device_analysis(d) for d in devices] == stats['detailed_analysis']
+    predictor.incremental_analysis = True
+    first = predictor.analyze_networks(scan)
+    second = predictor.analyze_networks(scan)
+    assert first['detailed_analysis'] == second['detailed_analysis'] == stats['detailed_analysis']
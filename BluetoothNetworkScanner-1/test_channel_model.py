@@ -0,0 +1,113 @@
+import math
+import random
+
+import pytest
+
+from ai_predictor import NetworkAIPredictor
+from channel_model import AIRTIME_PER_AP, ChannelModel, center_frequency, rssi_weight
+
+
+def _ap(channel, signal, frequency=None, **extra):
+    device = {'ssid': f'AP-{channel}', 'channel': channel, 'signal': signal}
+    if frequency:
+        device['frequency'] = frequency
+    device.update(extra)
+    return device
+
+
+def _brute_force(devices, position):
+    """Référence O(n²): recouvrement de chaque paire d'intervalles"""
+    model = ChannelModel(devices)
+    start, end = model.wifi[position][:2]
+    power = load = 0.0
+    overlapping = 0
+    for other, (s, e, p, w, _, _) in model.wifi.items():
+        overlap = max(0.0, min(end, e) - max(start, s))
+        if other == position or not overlap:
+            continue
+        overlapping += 1
+        power += p * overlap / (e - s)
+        load += w * overlap / (e - s)
+    return power, load, overlapping
+
+
+def test_center_frequency():
+    assert center_frequency({'frequency': 5180}) == 5180.0
+    assert center_frequency({'channel': 1}) == 2412.0
+    assert center_frequency({'channel': 14}) == 2484.0
+    assert center_frequency({'channel': 36}) == 5180.0
+    assert center_frequency({'center_frequency': 5210, 'frequency': 5180}) == 5210.0
+    assert center_frequency({'ssid': 'x'}) is None
+
+
+def test_co_channel_adjacent_and_separate_channels():
+    devices = [_ap(6, -50), _ap(6, -50), _ap(8, -50), _ap(1, -50), _ap(11, -95)]
+    model = ChannelModel(devices)
+    first = model.device_metrics(0)
+    # Co-canal: toute la puissance du voisin; canal 8: 12 MHz sur 22 en commun
+    expected_mw = 1e-5 + 1e-5 * 12 / 22
+    assert first['interference_dbm'] == round(10 * math.log10(expected_mw), 1)
+    assert first['overlapping_networks'] == 2
+    assert first['channel_utilization'] == round(1 - math.exp(-AIRTIME_PER_AP * (1 + 12 / 22)), 4)
+    # Canaux 1, 6 et 11 ne se chevauchent pas
+    assert model.device_metrics(3)['overlapping_networks'] == 0
+    assert model.device_metrics(3)['interference_dbm'] is None
+    # Le canal 11 ne reçoit que le bord du canal 8 (7 MHz)
+    assert model.device_metrics(4)['channel_utilization'] == round(1 - math.exp(-AIRTIME_PER_AP * 7 / 22), 4)
+
+
+def test_sweep_matches_pairwise_reference():
+    rng = random.Random(5)
+    devices = []
+    for _ in range(300):
+        channel, frequency = rng.choice([(c, None) for c in range(1, 14)] + [(36, 5180), (40, 5200), (1, 5955)])
+        devices.append(_ap(channel, rng.randint(-95, -30), frequency,
+                           channel_width=rng.choice([None, 20, 40, 80])))
+    model = ChannelModel(devices)
+    for position in range(0, 300, 7):
+        power, load, overlapping = _brute_force(devices, position)
+        metrics = model.device_metrics(position)
+        assert metrics['overlapping_networks'] == overlapping
+        assert metrics['channel_utilization'] == pytest.approx(1 - math.exp(-AIRTIME_PER_AP * load), abs=1e-4)
+        if power:
+            assert metrics['interference_dbm'] == pytest.approx(10 * math.log10(power), abs=0.06)
+
+
+def test_congestion_table():
+    devices = [_ap(6, -50), _ap(6, -60), _ap(1, -70), _ap(36, -55, 5180), {'ssid': 'Sans-Canal'}]
+    table = ChannelModel(devices).congestion_table()
+    assert [(row['band'], row['channel'], row['access_points']) for row in table] == \
+        [('2.4', 1, 1), ('2.4', 6, 2), ('5', 36, 1)]
+    six = table[1]
+    assert six['overlapping'] == 2
+    assert six['power_dbm'] == round(10 * math.log10(1e-5 + 1e-6), 1)
+    assert six['utilization'] == round(1 - math.exp(-AIRTIME_PER_AP * (rssi_weight(-50) + rssi_weight(-60))), 4)
+
+
+def test_annotate_fills_bluetooth_neighbours_and_keeps_scanner_values():
+    devices = [_ap(6, -40, channel_utilization=0.9)]
+    devices += [{'device_type': 'bluetooth', 'address': f'04:00:00:00:00:{i:02X}', 'signal': -60}
+                for i in range(12)]
+    devices.append({'device_type': 'bluetooth', 'address': '04:00:00:00:00:FF', 'signal': -95})
+    annotated = ChannelModel(devices).annotate()
+    assert annotated[0]['channel_utilization'] == 0.9
+    assert 'nearby_count' not in devices[1]
+    assert [d['nearby_count'] for d in annotated[1:]] == [11] * 12 + [12]
+    assert annotated[1]['interference_dbm'] == -40.0
+
+    predictor = NetworkAIPredictor()
+    assert predictor._detect_bluetooth_interference(annotated[1]) == "Risque élevé d'interférences"
+    assert predictor._detect_interference_level({'interference_dbm': -65.0}) == "Élevé"
+
+
+def test_analyze_networks_uses_scan_wide_congestion(tmp_path, monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    predictor = NetworkAIPredictor()
+    predictor.stats_file = str(tmp_path / 'network_stats.json')
+    crowded = [_ap(6, -45, bssid=f'02:00:00:00:00:{i:02X}') for i in range(10)]
+    lonely = _ap(36, -45, 5180, bssid='02:00:00:00:01:00')
+    stats = predictor.analyze_networks(crowded + [lonely])
+
+    congestion = [a['performances']['congestion'] for a in stats['detailed_analysis']]
+    assert congestion == ['Élevée'] * 10 + ['Faible']
+    assert stats['channel_congestion'][0]['access_points'] == 10
@@ -0,0 +1,89 @@
+import pytest
+
+from device_registry import DeviceRegistry, device_key
+
+BASE = 1_740_405_600.0
+
+
+def _keys(devices):
+    return [d['adresse'] for d in devices]
+
+
+def test_appeared_and_disappeared_deltas():
+    registry = DeviceRegistry(ttl=60)
+    delta = registry.update(BASE, [('AA:01', 'wifi', 'Maison', -60.0), ('BB:02', 'bluetooth', None, -80.0)])
+    assert _keys(delta['appeared']) == ['AA:01', 'BB:02']
+    assert delta['disappeared'] == [] and delta['active'] == 2
+
+    delta = registry.update(BASE + 30, [('AA:01', 'wifi', 'Maison', -50.0)])
+    assert delta['appeared'] == [] and delta['disappeared'] == []
+
+    # BB:02 n'a plus été vu depuis plus de 60 s
+    delta = registry.update(BASE + 70, [('AA:01', 'wifi', 'Maison', -50.0), ('CC:03', 'wifi', None, None)])
+    assert _keys(delta['appeared']) == ['CC:03']
+    assert _keys(delta['disappeared']) == ['BB:02']
+    assert delta['active'] == 2
+
+
+def test_counters_and_moving_average():
+    registry = DeviceRegistry(alpha=0.5)
+    registry.update(BASE, [('AA:01', 'wifi', 'Maison', -60.0)])
+    registry.update(BASE + 10, [('AA:01', 'wifi', 'Maison', -40.0), ('AA:01', 'wifi', 'Maison', -40.0)])
+
+    device = registry.get('AA:01')
+    assert device['scans'] == 2
+    assert device['rssi_moyen'] == pytest.approx(-45.0)
+    assert device['premiere_vue'] == '2025-02-24T14:00:00+00:00'
+    assert device['derniere_vue'] == '2025-02-24T14:00:10+00:00'
+
+
+def test_memory_bounded_by_max_devices():
+    registry = DeviceRegistry(max_devices=3)
+    for i in range(10):
+        delta = registry.update(BASE + i, [(f'K{i}', 'wifi', None, None)])
+    assert len(registry) == 3
+    assert _keys(delta['disappeared']) == ['K6']
+    assert _keys(registry.devices()) == ['K9', 'K8', 'K7']
+
+
+def test_state_survives_restart(tmp_path):
+    path = str(tmp_path / 'stats.db')
+    registry = DeviceRegistry(path, ttl=60)
+    registry.update(BASE, [('AA:01', 'wifi', 'Maison', -60.0), ('BB:02', 'bluetooth', None, -80.0)])
+    registry.update(BASE + 30, [('AA:01', 'wifi', 'Maison', -60.0)])
+    registry.close()
+
+    registry = DeviceRegistry(path, ttl=60)
+    assert registry.get('AA:01')['scans'] == 2
+    delta = registry.update(BASE + 80, [('AA:01', 'wifi', 'Maison', -60.0)])
+    assert delta['appeared'] == []
+    assert _keys(delta['disappeared']) == ['BB:02']
+    registry.close()
+
+    assert 'BB:02' not in DeviceRegistry(path)
+
+
+def test_device_key_normalisation():
+    assert device_key({'address': 'aa-bb-cc-dd-ee-ff'}) == 'AA:BB:CC:DD:EE:FF'
+    assert device_key({'bssid': '00:11:22:33:44:55', 'address': 'x'}) == '00:11:22:33:44:55'
+    assert device_key({'ssid': 'Maison'}) is None
+
+
+def test_predictor_reports_presence(tmp_path, monkeypatch):
+    from ai_predictor import NetworkAIPredictor
+
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    predictor = NetworkAIPredictor()
+    predictor.stats_file = str(tmp_path / 'network_stats.json')
+
+    first = predictor.analyze_networks([
+        {'ssid': 'Maison', 'bssid': '00:11:22:33:44:55', 'signal': '-55'},
+        {'device_type': 'audio', 'address': 'F0:D5:BF:00:00:01', 'signal': '-70'},
+        {'operator': 'Op', 'technology': 'LTE', 'signal': '-90'},
+    ])
+    assert [(d['adresse'], d['type']) for d in first['presence']['appeared']] == [
+        ('00:11:22:33:44:55', 'wifi'), ('F0:D5:BF:00:00:01', 'bluetooth')]
+
+    second = predictor.analyze_networks([{'ssid': 'Maison', 'bssid': '00:11:22:33:44:55', 'signal': '-55'}])
+    assert second['presence']['appeared'] == []
+    assert predictor.get_devices('wifi')[0]['scans'] == 2
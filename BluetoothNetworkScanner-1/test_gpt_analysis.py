@@ -0,0 +1,145 @@
+import json
+import time
+import threading
+from types import SimpleNamespace
+
+from gpt_analysis import GPTAnalyzer, default_analysis
+
+
+class FakeCompletions:
+    """Client factice: répond après `delay` secondes, échoue pour les ssid listés"""
+
+    def __init__(self, delays=None, failing=(), batch_drop=()):
+        self.delays = delays or {}
+        self.failing = set(failing)
+        self.batch_drop = set(batch_drop)
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def create(self, model, messages, timeout=None, response_format=None):
+        prompt = messages[-1]['content']
+        with self._lock:
+            self.calls.append({'prompt': prompt, 'timeout': timeout, 'format': response_format})
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if response_format:
+                devices = json.loads(prompt.split('Connexions: ', 1)[1])
+                content = json.dumps({'analyses': [
+                    {'id': d['id'], 'analyse': f"Analyse de {d['details']['ssid']}"}
+                    for d in devices if d['details']['ssid'] not in self.batch_drop
+                ]})
+            else:
+                ssid = json.loads(prompt.split('Données de connexion: ', 1)[1])['ssid']
+                time.sleep(self.delays.get(ssid, 0.0))
+                if ssid in self.failing:
+                    raise RuntimeError('API indisponible')
+                content = f"Analyse de {ssid}"
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+def _analyses(count):
+    return [{'type': 'wifi', 'details': {'ssid': f'AP-{i}'}} for i in range(count)]
+
+
+def test_concurrent_mode_takes_about_the_slowest_call():
+    completions = FakeCompletions(delays={f'AP-{i}': 0.2 for i in range(10)})
+    analyzer = GPTAnalyzer(lambda: _client(completions), mode='concurrent', max_workers=10, timeout=5)
+    analyses = _analyses(10)
+
+    start = time.perf_counter()
+    analyzer.analyze(analyses)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1.0
+    assert completions.max_active > 1
+    assert [a['analyse_ia'] for a in analyses] == [f'Analyse de AP-{i}' for i in range(10)]
+    assert all(call['timeout'] == 5 for call in completions.calls)
+
+
+def test_concurrency_is_bounded():
+    completions = FakeCompletions(delays={f'AP-{i}': 0.05 for i in range(12)})
+    GPTAnalyzer(lambda: _client(completions), mode='concurrent', max_workers=3, timeout=5).analyze(_analyses(12))
+    assert completions.max_active <= 3
+
+
+def test_failures_and_timeouts_fall_back_to_default():
+    completions = FakeCompletions(delays={'AP-1': 2.0}, failing={'AP-2'})
+    analyzer = GPTAnalyzer(lambda: _client(completions), mode='concurrent', max_workers=4, timeout=0.3)
+    analyses = _analyses(4)
+
+    start = time.perf_counter()
+    analyzer.analyze(analyses)
+
+    assert time.perf_counter() - start < 1.0
+    assert analyses[0]['analyse_ia'] == 'Analyse de AP-0'
+    assert analyses[1]['analyse_ia'] == default_analysis('wifi')
+    assert analyses[2]['analyse_ia'] == default_analysis('wifi')
+    assert analyses[3]['analyse_ia'] == 'Analyse de AP-3'
+
+
+def test_overall_deadline_bounds_large_scans():
+    completions = FakeCompletions(delays={f'AP-{i}': 0.2 for i in range(50)})
+    analyzer = GPTAnalyzer(lambda: _client(completions), mode='concurrent', max_workers=4, timeout=0.5)
+    analyses = _analyses(50)
+
+    start = time.perf_counter()
+    analyzer.analyze(analyses)
+
+    # Un seul délai pour le scan, pas un par vague de `max_workers` appels
+    assert time.perf_counter() - start < 0.9
+    texts = [a['analyse_ia'] for a in analyses]
+    assert texts[:4] == [f'Analyse de AP-{i}' for i in range(4)]
+    assert texts[-1] == default_analysis('wifi')
+
+
+def test_unknown_mode_falls_back_to_concurrent(monkeypatch, caplog):
+    monkeypatch.setenv('GPT_ANALYSIS_MODE', 'parallele')
+    assert GPTAnalyzer(lambda: None).mode == 'concurrent'
+    assert "parallele" in caplog.text
+
+
+def test_batch_mode_maps_answers_by_id():
+    completions = FakeCompletions(batch_drop={'AP-4'})
+    analyzer = GPTAnalyzer(lambda: _client(completions), mode='batch', batch_size=3, timeout=5)
+    analyses = _analyses(7)
+    analyses[5]['type'] = 'bluetooth'
+    analyses[5]['details']['ssid'] = 'AP-5'
+
+    analyzer.analyze(analyses)
+
+    assert len(completions.calls) == 3
+    assert all(call['format'] == {'type': 'json_object'} for call in completions.calls)
+    assert analyses[0]['analyse_ia'] == 'Analyse de AP-0'
+    assert analyses[4]['analyse_ia'] == default_analysis('wifi')
+    assert analyses[5]['analyse_ia'] == 'Analyse de AP-5'
+    assert analyses[6]['analyse_ia'] == 'Analyse de AP-6'
+
+
+def test_unknown_type_fallback():
+    assert default_analysis('unknown') == "Analyse IA non disponible. Veuillez réessayer plus tard."
+
+
+def test_analyze_networks_fans_out_gpt_calls(tmp_path, monkeypatch):
+    from ai_predictor import NetworkAIPredictor
+
+    monkeypatch.setenv('OPENAI_API_KEY', 'test')
+    predictor = NetworkAIPredictor()
+    predictor.stats_file = str(tmp_path / 'network_stats.json')
+    completions = FakeCompletions(delays={f'AP-{i}': 0.2 for i in range(8)})
+    predictor.openai_client = _client(completions)
+
+    start = time.perf_counter()
+    stats = predictor.analyze_networks([{'ssid': f'AP-{i}', 'signal': '-60'} for i in range(8)])
+
+    assert time.perf_counter() - start < 1.0
+    assert [a['analyse_ia'] for a in stats['detailed_analysis']] == [f'Analyse de AP-{i}' for i in range(8)]
@@ -0,0 +1,158 @@
+import json
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+from ai_predictor import NetworkAIPredictor
+from gpt_analysis import default_analysis
+from gpt_cache import AnalysisCache, analysis_key, fingerprint, signal_bucket
+
+
+class CountingCompletions:
+    """Client factice: compte les appareils analysés, échoue pour les ssid listés"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.analyzed = []
+
+    def create(self, model, messages, timeout=None, response_format=None):
+        ssid = json.loads(messages[-1]['content'].split('Données de connexion: ', 1)[1])['ssid']
+        self.analyzed.append(ssid)
+        if ssid in self.failing:
+            raise RuntimeError('API indisponible')
+        content = f"Analyse de {ssid}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _predictor(tmp_path, monkeypatch, completions, ttl=None):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test')
+    monkeypatch.setenv('GPT_ANALYSIS_MODE', 'concurrent')
+    if ttl is not None:
+        monkeypatch.setenv('GPT_CACHE_TTL', str(ttl))
+    predictor = NetworkAIPredictor()
+    predictor.stats_file = str(tmp_path / 'network_stats.json')
+    predictor.openai_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return predictor
+
+
+def _wifi(i, signal=-55, encryption='WPA2'):
+    return {'ssid': f'AP-{i}', 'bssid': f'AA:BB:CC:DD:EE:{i:02X}', 'signal': signal,
+            'encryption': encryption, 'frequency': 2437, 'channel': 6}
+
+
+def test_signal_bucket_and_fingerprint():
+    assert [signal_bucket(q) for q in (0.1, 0.4, 0.5, 0.79, 0.95)] == [0, 1, 1, 2, 3]
+    assert signal_bucket(None) is None
+    base = {'type': 'wifi', 'details': {'security_level': 'Bon - WPA2', 'band': '2.4GHz', 'signal_quality': 0.82}}
+    same_bucket = {'type': 'wifi', 'details': dict(base['details'], signal_quality=0.9)}
+    other_bucket = {'type': 'wifi', 'details': dict(base['details'], signal_quality=0.7)}
+    assert fingerprint(base) == fingerprint(same_bucket) != fingerprint(other_bucket)
+
+
+def test_unchanged_devices_skip_gpt(tmp_path, monkeypatch):
+    completions = CountingCompletions()
+    predictor = _predictor(tmp_path, monkeypatch, completions)
+    networks = [_wifi(i) for i in range(5)]
+
+    first = predictor.analyze_networks(networks)
+    assert first['gpt_cache'] == {'hits': 0, 'misses': 5, 'hit_rate': 0.0}
+    # Variation de 2 dBm: même tranche de signal, aucun nouvel appel
+    second = predictor.analyze_networks([dict(n, signal=-53) for n in networks])
+    assert second['gpt_cache'] == {'hits': 5, 'misses': 0, 'hit_rate': 1.0}
+    assert len(completions.analyzed) == 5
+    assert [a['analyse_ia'] for a in second['detailed_analysis']] == [f"Analyse de AP-{i}" for i in range(5)]
+
+
+def test_keys_without_bssid_do_not_collide(tmp_path, monkeypatch):
+    wifi = {'type': 'wifi', 'details': {'ssid': 'Gare'}}
+    assert analysis_key(wifi, {'ssid': 'Gare', 'bssid': 'aa:bb:cc:dd:ee:01'}) == 'AA:BB:CC:DD:EE:01'
+    assert analysis_key(wifi, {'ssid': 'Gare', 'frequency': 2437}) != analysis_key(wifi, {'ssid': 'Gare', 'frequency': 5180})
+    assert analysis_key(wifi, {'ssid': 'Gare'}, 0) != analysis_key(wifi, {'ssid': 'Gare'}, 1)
+
+    # Deux points d'accès de même SSID sans BSSID: chacun garde sa propre analyse
+    completions = CountingCompletions()
+    predictor = _predictor(tmp_path, monkeypatch, completions)
+    networks = [{'ssid': 'Gare', 'signal': -85, 'frequency': 2437, 'encryption': 'none'},
+                {'ssid': 'Gare', 'signal': -45, 'frequency': 5180, 'encryption': 'WPA2'}]
+    predictor.analyze_networks(networks)
+    stats = predictor.analyze_networks(networks)
+    assert stats['gpt_cache']['hits'] == 2 and len(completions.analyzed) == 2
+
+
+def test_bucket_or_security_change_invalidates(tmp_path, monkeypatch):
+    completions = CountingCompletions()
+    predictor = _predictor(tmp_path, monkeypatch, completions)
+    predictor.analyze_networks([_wifi(0), _wifi(1), _wifi(2)])
+    completions.analyzed.clear()
+
+    stats = predictor.analyze_networks([_wifi(0, signal=-85), _wifi(1, encryption='none'), _wifi(2)])
+    assert sorted(completions.analyzed) == ['AP-0', 'AP-1']
+    assert stats['gpt_cache']['hits'] == 1
+
+
+def test_ttl_expiry(tmp_path):
+    cache = AnalysisCache(str(tmp_path / 'cache.db'), ttl=60)
+    cache.put_many([('AA', 'fp', 'Analyse')], now=1000.0)
+    assert cache.get_many([('AA', 'fp')], now=1059.0) == {'AA': 'Analyse'}
+    assert cache.get_many([('AA', 'fp')], now=1061.0) == {}
+    assert len(cache) == 0
+    cache.put_many([('BB', 'fp', 'Analyse')], now=1000.0)
+    assert cache.purge(now=2000.0) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_expired_rows_of_unseen_devices_are_purged(tmp_path, monkeypatch):
+    completions = CountingCompletions()
+    predictor = _predictor(tmp_path, monkeypatch, completions)
+    # Entrées périmées d'appareils qui ne sont plus revus (dont des clés par position)
+    predictor.gpt_cache.put_many([('AA:BB:CC:DD:EE:99', 'fp', 'Ancienne'), ('wifi:Gare@#3', 'fp', 'Ancienne')],
+                                 now=time.time() - 2 * predictor.gpt_cache_ttl)
+
+    predictor.analyze_networks([_wifi(0)])
+    assert len(predictor.gpt_cache) == 1
+
+    # Purge au plus une fois par intervalle
+    predictor.gpt_cache.put_many([('AA:BB:CC:DD:EE:98', 'fp', 'Ancienne')], now=0.0)
+    predictor.analyze_networks([_wifi(0)])
+    assert len(predictor.gpt_cache) == 2
+    predictor.gpt_cache_purge_interval = 0
+    predictor.analyze_networks([_wifi(0)])
+    assert len(predictor.gpt_cache) == 1
+
+
+def test_default_analyses_are_not_cached(tmp_path, monkeypatch):
+    completions = CountingCompletions(failing={'AP-1'})
+    predictor = _predictor(tmp_path, monkeypatch, completions)
+    stats = predictor.analyze_networks([_wifi(0), _wifi(1)])
+    assert stats['detailed_analysis'][1]['analyse_ia'] == default_analysis('wifi')
+
+    completions.failing.clear()
+    completions.analyzed.clear()
+    stats = predictor.analyze_networks([_wifi(0), _wifi(1)])
+    assert completions.analyzed == ['AP-1']
+    assert stats['detailed_analysis'][1]['analyse_ia'] == "Analyse de AP-1"
+
+
+def test_cache_is_shared_across_instances_and_processes(tmp_path, monkeypatch):
+    completions = CountingCompletions()
+    _predictor(tmp_path, monkeypatch, completions).analyze_networks([_wifi(0)])
+
+    other = _predictor(tmp_path, monkeypatch, completions)
+    assert other.analyze_device_details(_wifi(0))['analyse_ia'] == "Analyse de AP-0"
+    assert completions.analyzed == ['AP-0']
+
+    script = (
+        "import sys\n"
+        "from gpt_cache import AnalysisCache\n"
+        "cache = AnalysisCache(sys.argv[1])\n"
+        "print(len(cache))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', script, str(tmp_path / 'network_stats.db')],
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '1'
+
+
+def test_ttl_from_environment(tmp_path, monkeypatch):
+    predictor = _predictor(tmp_path, monkeypatch, CountingCompletions(), ttl=5)
+    assert predictor.gpt_cache.ttl == 5.0
@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Budget de démarrage (cumul rapporté par -X importtime), ajustable sur les machines lentes
+BUDGET_MS = float(os.environ.get('IMPORT_TIME_BUDGET_MS', 150))
+HEAVY_MODULES = ('openai', 'twilio', 'httpx', 'pydantic')
+
+
+def _import_time(module: str):
+    """Temps d'import cumulé (ms) du module et modules lourds chargés au passage"""
+    code = (f"import sys, {module}; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=HERE, capture_output=True, text=True, check=True)
+    cumulative = None
+    for line in result.stderr.splitlines():
+        parts = [p.strip() for p in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            cumulative = int(parts[1]) / 1000
+    loaded = [m for m in result.stdout.strip().split(',') if m]
+    return cumulative, loaded
+
+
+@pytest.mark.parametrize('module', ['ai_predictor', 'notify'])
+def test_startup_within_budget(module):
+    cumulative, loaded = _import_time(module)
+    assert loaded == []
+    assert cumulative is not None and cumulative < BUDGET_MS, \
+        f"import {module}: {cumulative:.1f} ms (budget {BUDGET_MS:.0f} ms)"
+
+
+def test_predictor_without_key_creates_no_client(monkeypatch):
+    import gpt_analysis
+    from ai_predictor import NetworkAIPredictor
+
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    predictor = NetworkAIPredictor()
+    predictor.analyze_device_details({'ssid': 'Maison', 'signal': '-60'})
+    assert gpt_analysis._openai_client is None
+
+
+def test_twilio_client_is_shared(monkeypatch):
+    import notify
+
+    created = []
+    monkeypatch.setattr('twilio.rest.Client', lambda sid, token: created.append(sid) or object())
+    notify.get_twilio_client.cache_clear()
+    first = notify.get_twilio_client('AC1', 'jeton')
+    assert notify.get_twilio_client('AC1', 'jeton') is first
+    assert created == ['AC1']
+    notify.get_twilio_client.cache_clear()
@@ -0,0 +1,188 @@
+import copy
+import json
+import random
+
+import pytest
+
+from ai_predictor import NetworkAIPredictor
+from channel_model import ChannelModel
+from incremental_analysis import IncrementalAnalyzer
+
+
+@pytest.fixture
+def predictor(tmp_path, monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    predictor = NetworkAIPredictor()
+    predictor.stats_file = str(tmp_path / 'network_stats.json')
+    return predictor
+
+
+def _empty_stats(predictor):
+    return {
+        'network_types': {t: 0 for t in predictor.network_types.keys()},
+        'average_signal': {},
+        'security_stats': {'encrypted': 0, 'open': 0},
+        'detailed_analysis': []
+    }
+
+
+def _full(predictor, devices):
+    stats = _empty_stats(predictor)
+    predictor._analyze_networks_scalar(copy.deepcopy(devices), stats)
+    return stats
+
+
+def _incremental(analyzer, devices):
+    stats = _empty_stats(analyzer.predictor)
+    analyzer.analyze(devices, stats)
+    return stats
+
+
+def _site(rng, count):
+    devices = []
+    for i in range(count):
+        kind = rng.choice(['wifi', 'wifi', 'bluetooth', 'cell'])
+        if kind == 'wifi':
+            devices.append({'ssid': f'AP-{i}', 'bssid': f'02:00:00:00:{i // 256:02X}:{i % 256:02X}',
+                            'signal': rng.randint(-95, -35), 'frequency': rng.choice([2437, 5180]),
+                            'encryption': rng.choice(['WPA2', 'WPA3', 'none', ''])})
+        elif kind == 'bluetooth':
+            devices.append({'device_type': 'bluetooth', 'address': f'04:00:00:00:{i // 256:02X}:{i % 256:02X}',
+                            'signal': f'{rng.randint(-95, -40)} dBm'})
+        else:
+            devices.append({'operator': f'Op-{i}', 'technology': rng.choice(['4G/LTE', '5G']),
+                            'signal': str(rng.randint(-115, -65))})
+    return devices
+
+
+def _next_scan(rng, devices, count):
+    """Quelques appareils changent, disparaissent ou apparaissent; l'ordre varie"""
+    scan = []
+    for device in devices:
+        roll = rng.random()
+        if roll < 0.05:
+            continue
+        device = dict(device)
+        if roll < 0.15:
+            device['signal'] = rng.randint(-95, -35) + (0.5 if rng.random() < 0.2 else 0)
+        elif roll < 0.18 and 'ssid' in device:
+            device['encryption'] = 'none'
+        scan.append(device)
+    scan.extend(_site(rng, 3))
+    for device in scan[-3:]:
+        device['bssid' if 'ssid' in device else 'address' if 'address' in device else 'operator'] += f'-{count}'
+    if rng.random() < 0.3:
+        rng.shuffle(scan)
+    return scan
+
+
+def test_identical_to_full_recompute_over_many_scans(predictor):
+    rng = random.Random(3)
+    analyzer = IncrementalAnalyzer(predictor)
+    scan = _site(rng, 300)
+    for n in range(15):
+        full = _full(predictor, scan)
+        incremental = _incremental(analyzer, scan)
+        assert incremental == full
+        # Même ordre de clés: l'historique JSON est identique
+        assert json.dumps(incremental) == json.dumps(full)
+        scan = _next_scan(rng, scan, n)
+
+
+def test_only_changed_devices_are_recomputed(predictor, monkeypatch):
+    analyzer = IncrementalAnalyzer(predictor)
+    scan = _site(random.Random(1), 200)
+    _incremental(analyzer, scan)
+    assert analyzer.last_changes == {'added': 200, 'changed': 0, 'removed': 0, 'unchanged': 0, 'remeasured': 0}
+
+    built = []
+    original = analyzer._build_analyses
+    monkeypatch.setattr(analyzer, '_build_analyses', lambda devices: built.extend(devices) or original(devices))
+    scan = [dict(d) for d in scan]
+    scan[5]['signal'] = -20
+    removed = scan.pop(10)
+    scan.append({'ssid': 'Nouveau', 'bssid': 'AA:AA:AA:AA:AA:AA', 'signal': -60})
+    stats = _incremental(analyzer, scan)
+
+    assert [d.get('ssid', d.get('address', d.get('operator'))) for d in built] == \
+        [scan[5].get('ssid', scan[5].get('address', scan[5].get('operator'))), 'Nouveau']
+    assert analyzer.last_changes == {'added': 1, 'changed': 1, 'removed': 1, 'unchanged': 198, 'remeasured': 0}
+    assert removed not in scan and stats == _full(predictor, scan)
+
+
+def test_duplicate_and_keyless_devices(predictor):
+    analyzer = IncrementalAnalyzer(predictor)
+    scan = [
+        {'ssid': 'A', 'bssid': '02:00:00:00:00:01', 'signal': -50},
+        {'ssid': 'A', 'bssid': '02:00:00:00:00:01', 'signal': -70},
+        {'ssid': 'Sans-BSSID', 'signal': -65.25},
+        {'operator': 'Op', 'technology': '4G/LTE', 'signal': '-90'},
+    ]
+    for _ in range(2):
+        assert _incremental(analyzer, scan) == _full(predictor, scan)
+    assert len(analyzer) == 4
+    scan[2]['signal'] = -64.75
+    assert _incremental(analyzer, scan) == _full(predictor, scan)
+
+
+def test_signal_tolerance_keeps_previous_reading(predictor):
+    analyzer = IncrementalAnalyzer(predictor, signal_tolerance=3)
+    first = [{'ssid': 'A', 'bssid': '02:00:00:00:00:01', 'signal': -60, 'encryption': 'WPA2'}]
+    _incremental(analyzer, first)
+    moved = [dict(first[0], signal=-62)]
+    assert _incremental(analyzer, moved) == _full(predictor, first)
+    assert analyzer.last_changes['unchanged'] == 1
+    assert _incremental(analyzer, [dict(first[0], signal=-70)]) == _full(predictor, [dict(first[0], signal=-70)])
+    # Un autre attribut modifié n'est jamais toléré
+    reencrypted = [dict(first[0], signal=-71, encryption='none')]
+    assert _incremental(analyzer, reencrypted) == _full(predictor, reencrypted)
+
+
+def test_invalid_signal_resets_state(predictor):
+    analyzer = IncrementalAnalyzer(predictor)
+    scan = _site(random.Random(2), 20)
+    _incremental(analyzer, scan)
+    with pytest.raises(ValueError):
+        _incremental(analyzer, scan + [{'ssid': 'X', 'signal': 'inconnu'}])
+    assert len(analyzer) == 0
+    assert _incremental(analyzer, scan) == _full(predictor, scan)
+
+
+def test_analyze_networks_incremental_mode(predictor):
+    predictor.incremental_analysis = True
+    scan = _site(random.Random(4), 50)
+    first = predictor.analyze_networks(scan)
+    second = predictor.analyze_networks(scan)
+    assert predictor.incremental_analyzer.last_changes['unchanged'] == 50
+    for stats in (first, second):
+        expected = _full(predictor, ChannelModel(scan).annotate())
+        assert {k: stats[k] for k in expected} == expected
+
+
+def test_neighbour_change_only_remeasures(predictor, monkeypatch):
+    predictor.incremental_analysis = True
+    rng = random.Random(6)
+    # Points d'accès 2,4 GHz qui se recouvrent et appareils BLE: les mesures du
+    # scan (interférence, charge, voisins) dépendent de tous les autres
+    scan = [{'ssid': f'AP-{i}', 'bssid': f'02:00:00:00:01:{i:02X}', 'signal': rng.randint(-90, -45),
+             'channel': rng.choice([1, 3, 6, 9, 11]), 'encryption': 'WPA2'} for i in range(150)]
+    scan += [{'device_type': 'bluetooth', 'address': f'04:00:00:00:01:{i:02X}',
+              'signal': rng.randint(-95, -50)} for i in range(50)]
+    scan[0].update(signal=-30, channel=6)
+    predictor.analyze_networks(scan)
+
+    analyzer = predictor.incremental_analyzer
+    built = []
+    original = analyzer._build_analyses
+    monkeypatch.setattr(analyzer, '_build_analyses', lambda devices: built.extend(devices) or original(devices))
+    scan = [dict(d) for d in scan]
+    scan[0]['signal'] = -85
+    stats = predictor.analyze_networks(scan)
+
+    # Seul le point d'accès modifié est réanalysé; ses voisins sont seulement remesurés
+    assert [d['ssid'] for d in built] == ['AP-0']
+    assert analyzer.last_changes['changed'] == 1 and analyzer.last_changes['unchanged'] == 199
+    assert analyzer.last_changes['remeasured'] > 0
+    expected = _full(predictor, ChannelModel(scan).annotate())
+    assert {k: stats[k] for k in expected} == expected
+    assert json.dumps(stats['detailed_analysis']) == json.dumps(expected['detailed_analysis'])
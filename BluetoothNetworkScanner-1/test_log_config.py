@@ -0,0 +1,73 @@
+import io
+import json
+import queue
+import logging
+
+import log_config
+from log_config import BoundedQueueHandler, JsonFormatter, SamplingFilter, parse_sample_rates
+
+
+def _record(name='scanner', level=logging.INFO, msg='Réseau %s détecté', args=('WiFi-Test',)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_bounded_queue_drops_instead_of_blocking():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2))
+    for _ in range(5):
+        handler.handle(_record())
+
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_formatting_is_deferred_to_writer():
+    handler = BoundedQueueHandler(queue.Queue())
+    handler.handle(_record())
+
+    queued = handler.queue.get_nowait()
+    assert queued.msg == 'Réseau %s détecté'
+    assert queued.args == ('WiFi-Test',)
+
+
+def test_json_formatter_emits_extra_fields():
+    record = _record()
+    record.scan_id = 42
+    line = json.loads(JsonFormatter().format(record))
+
+    assert line['message'] == 'Réseau WiFi-Test détecté'
+    assert line['level'] == 'INFO'
+    assert line['logger'] == 'scanner'
+    assert line['scan_id'] == 42
+
+
+def test_sampling_filter_per_logger():
+    sampler = SamplingFilter({'werkzeug': 0.25, 'muet': 0})
+
+    kept = sum(sampler.filter(_record(name='werkzeug')) for _ in range(100))
+    assert kept == 25
+    # Les loggers enfants héritent du taux de leur parent
+    assert sum(sampler.filter(_record(name='werkzeug.serving')) for _ in range(8)) == 2
+    assert not sampler.filter(_record(name='muet'))
+    # Les avertissements ne sont jamais échantillonnés
+    assert sampler.filter(_record(name='muet', level=logging.WARNING))
+    assert all(sampler.filter(_record(name='server')) for _ in range(10))
+
+
+def test_parse_sample_rates():
+    assert parse_sample_rates('werkzeug=0.1, server=0.5,invalide,x=abc') == {
+        'werkzeug': 0.1,
+        'server': 0.5,
+    }
+
+
+def test_setup_logging_writes_json_lines():
+    stream = io.StringIO()
+    log_config.shutdown_logging()
+    try:
+        log_config.setup_logging(level='DEBUG', stream=stream, sample_rates={})
+        logging.getLogger('test').info('Scan de %d réseaux', 3)
+    finally:
+        log_config.shutdown_logging()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert lines[-1]['message'] == 'Scan de 3 réseaux'
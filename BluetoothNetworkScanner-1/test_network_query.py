@@ -0,0 +1,112 @@
+import json
+import random
+
+import pytest
+
+import server
+from network_query import NetworkIndex, NetworkQuery, band_of
+
+NETWORKS = [
+    {'ssid': 'Maison', 'bssid': 'AA', 'rssi': -40, 'frequency_mhz': 2437, 'channel': 6, 'encryption': 'WPA2'},
+    {'ssid': 'Bureau', 'bssid': 'BB', 'rssi': -60, 'frequency_mhz': 5180, 'channel': 36, 'encryption': 'WPA3'},
+    {'ssid': 'Gare', 'bssid': 'CC', 'rssi': -85, 'frequency_mhz': 2412, 'channel': 1, 'encryption': 'none'},
+    {'ssid': 'Labo', 'bssid': 'DD', 'rssi': -60, 'frequency_mhz': 5975, 'channel': 5, 'encryption': 'WPA3'},
+    {'ssid': 'Ancien', 'bssid': 'EE'},
+]
+
+
+def _run(**kwargs):
+    return NetworkQuery(**kwargs).run(NetworkIndex(NETWORKS, server.score_network))
+
+
+def _ssids(result):
+    return [n['ssid'] for n in result['reseaux']]
+
+
+@pytest.mark.parametrize('mhz, band', [(2412, '2.4'), (5180, '5'), (5975, '6'), (None, None)])
+def test_band_of(mhz, band):
+    assert band_of(mhz) == band
+
+
+def test_sort_and_top_k():
+    assert _ssids(_run(sort='-rssi')) == ['Maison', 'Labo', 'Bureau', 'Gare', 'Ancien']
+    assert _ssids(_run(sort='ssid', limit=2)) == ['Ancien', 'Bureau']
+    assert _ssids(_run(sort='-ssid', limit=1)) == ['Maison']
+    # Sans tri: ordre du fichier
+    assert _ssids(_run(limit=2)) == ['Maison', 'Bureau']
+
+
+def test_filters_and_projection():
+    result = _run(bands=['5', '6'], encryptions=['wpa3'], sort='channel')
+    assert _ssids(result) == ['Labo', 'Bureau'] and result['correspondants'] == 2
+    assert _ssids(_run(rssi_min=-60, rssi_max=-41, sort='ssid')) == ['Bureau', 'Labo']
+    assert _ssids(_run(encryptions=['inconnu'])) == ['Ancien']
+    assert _run(sort='-rssi', limit=1, fields=['ssid', 'rssi'])['reseaux'] == [{'ssid': 'Maison', 'rssi': -40}]
+
+
+def test_cursor_pagination_matches_full_sort():
+    rng = random.Random(3)
+    networks = [{'ssid': f'AP{i}', 'bssid': f'{i:04d}', 'rssi': rng.randint(-90, -30)} for i in range(500)]
+    index = NetworkIndex(networks, server.score_network)
+    expected = NetworkQuery(sort='-rssi').run(index)['reseaux']
+
+    pages, cursor = [], None
+    while True:
+        result = NetworkQuery(sort='-rssi', limit=64, cursor=cursor).run(index)
+        pages.extend(result['reseaux'])
+        cursor = result['curseur_suivant']
+        if cursor is None:
+            break
+    assert pages == expected
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'bands': ['4']},
+    {'limit': 0},
+    {'cursor': 'abc'},
+])
+def test_invalid_query(kwargs):
+    with pytest.raises(ValueError):
+        _run(**kwargs)
+
+
+def test_cursor_bound_to_sort():
+    cursor = _run(sort='rssi', limit=1)['curseur_suivant']
+    with pytest.raises(ValueError):
+        _run(sort='ssid', limit=1, cursor=cursor)
+    with pytest.raises(ValueError):
+        _run(sort='rssi', limit=1, cursor='pas-un-curseur')
+    with pytest.raises(ValueError):
+        _run(sort='inconnu')
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    path = tmp_path / 'wifi_results.json'
+    path.write_text(json.dumps(NETWORKS))
+    monkeypatch.setattr(server, 'WIFI_RESULTS_FILE', str(path))
+    return server.app.test_client()
+
+
+def test_api_query(client):
+    response = client.get('/api/wifi?sort=-rssi&limit=2&fields=ssid')
+    reseaux = response.get_json()['reseaux']
+    assert response.status_code == 200
+    assert reseaux['tous_les_reseaux'] == [{'ssid': 'Maison'}, {'ssid': 'Labo'}]
+    assert reseaux['total'] == 5 and reseaux['correspondants'] == 5
+    assert reseaux['meilleur_reseau'] is not None
+
+    page = client.get('/api/wifi', query_string={'sort': '-rssi', 'limit': 2, 'fields': 'ssid',
+                                                  'cursor': reseaux['curseur_suivant']})
+    assert page.get_json()['reseaux']['tous_les_reseaux'] == [{'ssid': 'Bureau'}, {'ssid': 'Gare'}]
+
+    cached = client.get('/api/wifi?band=5', headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
+
+
+def test_api_query_errors(client):
+    for query in ('limit=abc', 'band=3', 'sort=inconnu', 'rssi_min=x'):
+        response = client.get('/api/wifi?' + query)
+        assert response.status_code == 400 and response.get_json()['statut'] == 'erreur'
+    # Sans paramètre: réponse inchangée
+    assert 'correspondants' not in client.get('/api/wifi').get_json()['reseaux']
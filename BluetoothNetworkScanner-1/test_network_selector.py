@@ -0,0 +1,137 @@
+import json
+import os
+import random
+
+import pytest
+
+import server
+from network_manager import NetworkDataManager
+from network_selector import BestNetworkSelector, network_key
+
+
+def score(network):
+    # Plus le signal est fort, meilleur est le score
+    return float(network.get('rssi', -100)) + 100
+
+
+def _scan(**rssi):
+    return [{'bssid': bssid, 'ssid': bssid, 'rssi': value} for bssid, value in rssi.items()]
+
+
+def test_first_scan_matches_max():
+    rng = random.Random(3)
+    networks = [{'bssid': f'00:00:00:00:00:{i:02X}', 'rssi': rng.randint(-90, -40)} for i in range(200)]
+    selector = BestNetworkSelector(score)
+    assert selector.update(networks, now=0.0) is max(networks, key=score)
+    assert selector.leader is selector.best and len(selector) == 200
+    # À score égal, le premier du scan, comme max()
+    tie = BestNetworkSelector(score)
+    assert tie.update(_scan(A=-50, B=-50), now=0.0)['bssid'] == 'A'
+
+
+def test_noise_does_not_flip_the_recommendation():
+    selector = BestNetworkSelector(score, smoothing=0.3, margin=5.0, hold=10.0)
+    rng = random.Random(0)
+    chosen = set()
+    for t in range(100):
+        # Deux points d'accès de même niveau moyen, bruit de ±4 dB
+        chosen.add(selector.update(_scan(A=-60 + rng.uniform(-4, 4), B=-60 + rng.uniform(-4, 4)),
+                                   now=float(t))['bssid'])
+    assert len(chosen) == 1 and selector.switches == 0
+
+
+def test_switch_requires_margin_for_hold_time():
+    selector = BestNetworkSelector(score, smoothing=1.0, margin=5.0, hold=10.0)
+    assert selector.update(_scan(A=-60, B=-70), now=0.0)['bssid'] == 'A'
+    # B devance A, mais de moins que la marge
+    assert selector.update(_scan(A=-60, B=-57), now=1.0)['bssid'] == 'A'
+    assert selector.leader['bssid'] == 'B'
+    # Avance suffisante: il faut encore la garder pendant `hold`
+    assert selector.update(_scan(A=-60, B=-50), now=2.0)['bssid'] == 'A'
+    assert selector.update(_scan(A=-60, B=-50), now=11.0)['bssid'] == 'A'
+    # Un recul sous la marge relance le délai
+    assert selector.update(_scan(A=-60, B=-58), now=11.5)['bssid'] == 'A'
+    assert selector.update(_scan(A=-60, B=-50), now=12.0)['bssid'] == 'A'
+    assert selector.update(_scan(A=-60, B=-50), now=22.0)['bssid'] == 'B'
+    assert selector.switches == 1
+
+
+def test_smoothing_delays_a_spike():
+    selector = BestNetworkSelector(score, smoothing=0.3, margin=5.0, hold=0.0)
+    selector.update(_scan(A=-60, B=-70), now=0.0)
+    # Pic isolé de B: le RSSI lissé reste sous A + marge
+    assert selector.update(_scan(A=-60, B=-45), now=1.0)['bssid'] == 'A'
+    assert selector.smoothed_rssi({'bssid': 'B'}) == pytest.approx(-62.5)
+    assert selector.update(_scan(A=-60, B=-70), now=2.0)['bssid'] == 'A'
+    # Amélioration durable: le lissage la rejoint
+    for t in range(3, 10):
+        best = selector.update(_scan(A=-60, B=-45), now=float(t))
+    assert best['bssid'] == 'B'
+
+
+def test_incumbent_removed_and_empty_scan():
+    selector = BestNetworkSelector(score, hold=1000.0)
+    selector.update(_scan(A=-50, B=-70, C=-80), now=0.0)
+    assert selector.update(_scan(B=-70, C=-80), now=1.0)['bssid'] == 'B'
+    assert selector.switches == 1 and len(selector) == 2
+    assert selector.update([], now=2.0) is None and selector.leader is None
+    assert selector.update(_scan(C=-80), now=3.0)['bssid'] == 'C'
+
+
+def test_heap_stays_bounded_and_stable_scans_are_free():
+    selector = BestNetworkSelector(score, smoothing=0.5)
+    rng = random.Random(5)
+    networks = [{'bssid': f'00:00:00:00:01:{i:02X}', 'rssi': -70} for i in range(50)]
+    for t in range(300):
+        for network in rng.sample(networks, 10):
+            network['rssi'] = rng.randint(-90, -40)
+        best = selector.update([dict(n) for n in networks], now=float(t))
+        assert len(selector._heap) <= 2 * len(selector) + 32
+    assert best is not None
+
+    # Lectures convergées: plus aucune insertion dans le tas
+    for _ in range(30):
+        selector.update(networks, now=1000.0)
+    size = len(selector._heap)
+    selector.update(networks, now=1001.0)
+    assert len(selector._heap) == size
+
+
+def test_network_key_and_invalid_smoothing():
+    assert network_key({'bssid': 'aa:bb:cc:dd:ee:ff', 'ssid': 'X'}) == 'AA:BB:CC:DD:EE:FF'
+    assert network_key({'ssid': 'X'}) == 'ssid:X'
+    with pytest.raises(ValueError):
+        BestNetworkSelector(score, smoothing=0)
+
+
+def _write(path, data):
+    tmp = str(path) + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def test_server_and_manager_keep_recommendation(tmp_path, monkeypatch):
+    path = tmp_path / 'wifi_results.json'
+    monkeypatch.setattr(server, 'WIFI_RESULTS_FILE', str(path))
+    manager = NetworkDataManager()
+    manager.wifi_results_file = str(path)
+    client = server.app.test_client()
+
+    _write(path, [{'ssid': 'Maison', 'bssid': 'A', 'rssi': -80}, {'ssid': 'Voisin', 'bssid': 'B', 'rssi': -78}])
+    assert client.get('/api/network_status').get_json()['wifi']['meilleur_reseau']['nom'] == 'Voisin'
+    assert manager.get_best_network()['ssid'] == 'Voisin'
+
+    # Maison passe devant, mais son RSSI lissé (-74) reste en deçà de la marge
+    _write(path, [{'ssid': 'Maison', 'bssid': 'A', 'rssi': -60}, {'ssid': 'Voisin', 'bssid': 'B', 'rssi': -78}])
+    assert client.get('/api/network_status').get_json()['wifi']['meilleur_reseau']['nom'] == 'Voisin'
+    assert manager.get_best_network()['ssid'] == 'Voisin'
+    assert server.get_network_selector().leader['ssid'] == 'Maison'
+    assert server.get_network_selector().smoothed_rssi({'bssid': 'A'}) == pytest.approx(-74.0)
+
+
+def test_server_score_prefers_stronger_signal():
+    weak, strong = {'ssid': 'Loin', 'rssi': -85}, {'ssid': 'Proche', 'rssi': -45}
+    for score_network in (server.score_network, NetworkDataManager().score_network):
+        assert score_network(strong) > score_network(weak) > score_network({'ssid': 'Sans RSSI'})
+        assert score_network({'ssid': 'Box-WPA', 'rssi': -85}) == score_network(weak) + 20
@@ -0,0 +1,163 @@
+import os
+import subprocess
+import threading
+import time
+
+import pytest
+
+from fake_twilio import FakeTwilioClient
+from notify_daemon import NotificationDispatcher, enqueue
+
+PHONE = '+33612345678'
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def setup(tmp_path):
+    clock = Clock()
+    client = FakeTwilioClient()
+
+    def make(**kwargs):
+        options = dict(client_factory=lambda: client, from_phone='+10000000000', digest_delay=30,
+                       dedup_window=3600, rate_per_minute=60, burst=5, clock=clock)
+        options.update(kwargs)
+        return NotificationDispatcher(str(tmp_path / 'spool'), **options)
+
+    return make, client, clock, str(tmp_path / 'spool')
+
+
+def test_events_are_coalesced_into_one_digest(setup):
+    make, client, clock, spool = setup
+    dispatcher = make()
+    for i in range(3):
+        enqueue(spool, f'Nom : Reseau-{i}', PHONE)
+    assert dispatcher.step() == 0
+
+    clock.now += 31
+    assert dispatcher.step() == 1
+    assert len(client.sent) == 1
+    assert client.sent[0]['body'].startswith('3 nouvelles détections:')
+    assert 'Reseau-2' in client.sent[0]['body']
+    assert os.listdir(os.path.join(spool, 'new')) == []
+
+
+def test_single_event_keeps_original_wording(setup):
+    make, client, clock, spool = setup
+    dispatcher = make()
+    enqueue(spool, 'Adresse MAC : 00:11:22:33:44:55\nNom : Maison', PHONE, source='wifi')
+    dispatcher.ingest()
+    clock.now += 31
+    dispatcher.flush()
+    assert client.bodies() == ['Nouveau réseau WiFi détecté:\nAdresse MAC : 00:11:22:33:44:55\nNom : Maison']
+
+
+def test_duplicates_within_window_are_dropped(setup):
+    make, client, clock, spool = setup
+    dispatcher = make()
+    enqueue(spool, 'Nom : Maison', PHONE)
+    enqueue(spool, 'Nom :   Maison', PHONE)
+    dispatcher.ingest()
+    clock.now += 31
+    dispatcher.flush()
+
+    clock.now += 600
+    enqueue(spool, 'Nom : Maison', PHONE)
+    assert dispatcher.ingest() == 0
+    assert dispatcher.dropped_duplicates == 2
+
+    clock.now += 3600
+    assert dispatcher.ingest() == 0
+    enqueue(spool, 'Nom : Maison', PHONE)
+    assert dispatcher.ingest() == 1
+    assert len(client.sent) == 1
+
+
+def test_rate_limit_defers_sends(setup):
+    make, client, clock, spool = setup
+    dispatcher = make(rate_per_minute=1, burst=1, max_digest=1)
+    for i in range(3):
+        enqueue(spool, f'Nom : Reseau-{i}', PHONE)
+    dispatcher.ingest()
+    assert dispatcher.flush() == 1
+    clock.now += 30
+    assert dispatcher.flush() == 0
+    clock.now += 30
+    assert dispatcher.flush() == 1
+    assert dispatcher.pending_count() == 1
+
+
+def test_retry_with_backoff_then_success(setup):
+    make, client, clock, spool = setup
+    client.failures = 2
+    dispatcher = make(backoff=10)
+    enqueue(spool, 'Nom : Maison', PHONE)
+    dispatcher.ingest()
+    clock.now += 31
+    assert dispatcher.flush() == 0
+    assert dispatcher.flush() == 0
+    assert client.attempts == 1
+
+    clock.now += 13
+    assert dispatcher.flush() == 0
+    clock.now += 25
+    assert dispatcher.flush() == 1
+    assert client.attempts == 3
+    assert os.listdir(os.path.join(spool, 'new')) == []
+
+
+def test_permanent_failure_moves_to_failed(setup):
+    make, client, clock, spool = setup
+    client.fail_always = True
+    dispatcher = make(max_attempts=2, backoff=1)
+    enqueue(spool, 'Nom : Maison', PHONE)
+    dispatcher.ingest()
+    clock.now += 31
+    dispatcher.flush()
+    clock.now += 5
+    dispatcher.flush()
+    assert len(os.listdir(os.path.join(spool, 'failed'))) == 1
+    assert dispatcher.pending_count() == 0
+
+
+def test_client_is_created_once(setup):
+    make, client, clock, spool = setup
+    created = []
+    dispatcher = make(client_factory=lambda: created.append(1) or client)
+    for i in range(4):
+        enqueue(spool, f'Nom : Reseau-{i}', PHONE)
+        dispatcher.ingest()
+        dispatcher.flush(force=True)
+    assert len(client.sent) == 4 and created == [1]
+
+
+def test_run_flushes_on_stop(setup):
+    make, client, clock, spool = setup
+    dispatcher = make(clock=time.monotonic)
+    enqueue(spool, 'Nom : Maison', PHONE)
+    stop = threading.Event()
+    stop.set()
+    dispatcher.run(poll_interval=0, stop=stop)
+    assert len(client.sent) == 1
+    assert not os.path.exists(os.path.join(spool, 'daemon.pid'))
+
+
+def test_shell_enqueue_matches_format(setup, tmp_path):
+    make, client, clock, spool = setup
+    dispatcher = make()
+    with open(os.path.join(spool, 'daemon.pid'), 'w') as f:
+        f.write(str(os.getpid()))
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.sh')
+    env = dict(os.environ, HOME=str(tmp_path), NOTIFY_SPOOL=spool, NOTIFICATION_PHONE=PHONE)
+    subprocess.run(['bash', '-c', f'source "{script}" && enqueue_notification bluetooth "Appareil : Casque\\nSignal : -60"'],
+                   env=env, check=True)
+
+    assert dispatcher.ingest() == 1
+    dispatcher.flush(force=True)
+    assert client.bodies(PHONE) == ['Nouvel appareil Bluetooth détecté:\nAppareil : Casque\nSignal : -60']
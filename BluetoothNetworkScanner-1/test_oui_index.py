@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+import oui_index
+from oui_index import OUIIndex, build_index, main, parse_macs, read_registry_csv, LOCAL_LABEL
+
+CSV_HEADER = 'Registry,Assignment,Organization Name,Organization Address\n'
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    (tmp_path / 'oui.csv').write_text(CSV_HEADER + ''.join([
+        'MA-L,001122,CIMSYS Inc,"Séoul KR"\n',
+        'MA-L,F0D5BF,Intel Corporate,Malaysia\n',
+        'MA-L,70B3D5,IEEE Registration Authority,US\n',
+        'MA-L,001122,Doublon,XX\n',
+    ]), encoding='utf-8')
+    (tmp_path / 'mam.csv').write_text(CSV_HEADER + 'MA-M,70B3D5A,Fabricant MA-M,FR\n', encoding='utf-8')
+    (tmp_path / 'oui36.csv').write_text(CSV_HEADER + 'MA-S,70B3D5A12,Société Caméras,FR\n',
+                                        encoding='utf-8')
+    path = str(tmp_path / 'oui.bin')
+    build_index(read_registry_csv(str(tmp_path / name) for name in ('oui.csv', 'mam.csv', 'oui36.csv')), path)
+    return path
+
+
+def test_longest_prefix_match(index_path):
+    index = OUIIndex(index_path)
+    assert len(index) == 5
+    assert index.lookup('00:11:22:33:44:55') == 'CIMSYS Inc'
+    assert index.lookup('f0-d5-bf-00-00-01') == 'Intel Corporate'
+    assert index.lookup('70:B3:D5:A1:23:45') == 'Société Caméras'
+    assert index.lookup('70:B3:D5:A9:00:00') == 'Fabricant MA-M'
+    assert index.lookup('70:B3:D5:10:00:00') == 'IEEE Registration Authority'
+    assert index.lookup('00:00:5E:00:00:00') is None
+    index.close()
+
+
+def test_local_and_invalid_addresses(index_path):
+    index = OUIIndex(index_path)
+    # Bit U/L positionné: adresse aléatoire, jamais attribuée par l'IEEE
+    assert index.describe('AA:BB:CC:DD:EE:FF') == LOCAL_LABEL
+    assert index.describe('02:11:22:33:44:55') == LOCAL_LABEL
+    assert index.describe('') == 'Inconnu'
+    assert index.describe('zz:11:22:33:44:55') == 'Inconnu'
+    index.close()
+
+
+def test_batch_matches_single_lookups(index_path):
+    index = OUIIndex(index_path)
+    macs = ['00:11:22:33:44:55', '70b3d5a12345', '70:B3:D5:A9:00:00', 'AA:BB:CC:DD:EE:FF',
+            '00:00:5E:00:00:00', 'invalide', '00:11:22:33:44:55:66', '001122334455']
+    assert index.describe_many(macs) == [index.describe(mac) for mac in macs]
+    index.close()
+
+
+def test_parse_macs_vectorised():
+    values, valid = parse_macs(['00:11:22:33:44:55', 'ff-ff-ff-ff-ff-fe', '00:11:22:33:44', 'é'])
+    assert values[:2].tolist() == [0x001122334455, 0xFFFFFFFFFFFE]
+    assert valid.tolist() == [True, True, False, False]
+
+
+def test_lookup_many_on_integers(index_path):
+    index = OUIIndex(index_path)
+    ids = index.lookup_many(np.array([0xF0D5BF000001, 0x00005E000000], dtype=np.uint64))
+    assert index.name(int(ids[0])) == 'Intel Corporate'
+    assert ids[1] == oui_index.UNKNOWN
+
+
+def test_incompatible_file(tmp_path):
+    path = tmp_path / 'oui.bin'
+    path.write_bytes(b'X' * 64)
+    with pytest.raises(ValueError):
+        OUIIndex(str(path))
+
+
+def test_predictor_uses_shared_index(index_path, tmp_path, monkeypatch):
+    from ai_predictor import NetworkAIPredictor
+
+    monkeypatch.setenv('OUI_INDEX', index_path)
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    monkeypatch.setattr(oui_index, '_default_loaded', False)
+    monkeypatch.setattr(oui_index, '_default_index', None)
+
+    predictor = NetworkAIPredictor()
+    predictor.stats_file = str(tmp_path / 'network_stats.json')
+    devices = [{'device_type': 'audio', 'address': '00:11:22:33:44:55'},
+               {'device_type': 'phone', 'address': '5A:11:22:33:44:55'}]
+    scalar = [predictor.analyze_device_details(d)['details']['manufacturer'] for d in devices]
+    assert scalar == ['CIMSYS Inc', LOCAL_LABEL]
+
+    stats = predictor.analyze_networks(devices)
+    assert [a['details']['manufacturer'] for a in stats['detailed_analysis']] == scalar
+
+
+def test_without_index_local_addresses_are_flagged(tmp_path, monkeypatch):
+    monkeypatch.setenv('OUI_INDEX', str(tmp_path / 'absent.bin'))
+    monkeypatch.setattr(oui_index, '_default_loaded', False)
+    monkeypatch.setattr(oui_index, '_default_index', None)
+    assert oui_index.describe_many(['00:11:22:33:44:55', 'AA:BB:CC:DD:EE:FF']) == ['Inconnu', LOCAL_LABEL]
+
+
+def test_cli(tmp_path, capsys):
+    (tmp_path / 'oui.csv').write_text(CSV_HEADER + 'MA-L,F0D5BF,Intel Corporate,MY\n', encoding='utf-8')
+    output = str(tmp_path / 'oui.bin')
+    assert main(['build', str(tmp_path / 'oui.csv'), '-o', output]) == 0
+    assert main(['lookup', 'F0:D5:BF:01:02:03', '--index', output]) == 0
+    assert 'Intel Corporate' in capsys.readouterr().out
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from quality_model import QualityModel, build_dataset, build_features, evaluate, main, FEATURE_NAMES
+
+THRESHOLDS = {
+    'wifi': {'excellent': -50, 'poor': -80},
+    'bluetooth': {'excellent': -60, 'poor': -90},
+}
+
+
+def _history(count=60, seed=1):
+    rng = np.random.default_rng(seed)
+    wifi = -65 + np.cumsum(rng.normal(0, 1.5, count))
+    return [{'average_signal': {'wifi': float(w), 'bluetooth': -75.0}} for w in wifi]
+
+
+def test_dataset_pairs_scan_with_next_quality():
+    features, targets = build_dataset(_history(5), THRESHOLDS)
+    assert features.shape == (4, len(FEATURE_NAMES))
+    assert features[0, 5:7].tolist() == [1.0, 1.0]
+    assert features[0, 7:].tolist() == [0.0, 0.0, 0.0]
+    # La cible est la qualité moyenne du scan suivant
+    next_features, _ = build_dataset(_history(5)[1:], THRESHOLDS)
+    assert targets[0] == pytest.approx(next_features[0, :2].mean())
+
+
+def test_fit_beats_constant_prediction():
+    features, targets = build_dataset(_history(200), THRESHOLDS)
+    model = QualityModel.fit(features, targets)
+    scores = evaluate(model, features, targets)
+    assert scores['mae_modele'] < np.abs(targets - targets.mean()).mean()
+    assert np.all((model.predict(features) >= 0) & (model.predict(features) <= 1))
+
+
+def test_save_and_load_round_trip(tmp_path):
+    features, targets = build_dataset(_history(), THRESHOLDS)
+    model = QualityModel.fit(features, targets, iterations=200)
+    path = tmp_path / 'modele.npz'
+    model.save(str(path))
+
+    loaded = QualityModel.load(str(path))
+    assert np.allclose(loaded.predict(features), model.predict(features))
+    assert path.stat().st_size < 2048
+
+
+def test_build_features_uses_fixed_order():
+    features = build_features({'lte': {'signal': '-85 dBm'}, 'wifi': {'signal': -50}},
+                              lambda signal, net_type: 0.5)
+    assert features.tolist() == [0.5, 0, 0.5, 0, 0, 1, 0, 1, 0, 0]
+
+
+@pytest.fixture
+def predictor(tmp_path, monkeypatch):
+    from ai_predictor import NetworkAIPredictor
+
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    predictor = NetworkAIPredictor(model_path=str(tmp_path / 'modele_ia.npz'))
+    return predictor
+
+
+def test_predictor_loads_model_lazily(predictor):
+    QualityModel(np.zeros(len(FEATURE_NAMES)), 0.0).save(predictor.model_path)
+    assert predictor.model is None
+
+    result = predictor.predict_network_quality({'wifi': {'signal': '-65'}})
+
+    assert isinstance(predictor.model, QualityModel)
+    assert result == {'quality_score': 0.5, 'reliability': 0.95}
+
+
+def test_predictor_falls_back_to_heuristic(predictor):
+    result = predictor.predict_network_quality({'wifi': {'signal': '-65'}})
+    assert predictor.is_fallback_mode
+    assert result == {'quality_score': 0.5, 'reliability': 0.7}
+
+
+def test_train_and_evaluate_commands(tmp_path, capsys):
+    from stats_store import StatsStore
+
+    store = StatsStore(str(tmp_path / 'network_stats.db'), max_entries=1000)
+    for i, entry in enumerate(_history(80)):
+        store.append(dict(entry, timestamp=f'2025-02-24T14:{i // 60:02d}:{i % 60:02d}'))
+    store.close()
+    stats = str(tmp_path / 'network_stats.json')
+    model = str(tmp_path / 'modele_ia.npz')
+
+    assert main(['train', '--stats', stats, '--model', model]) == 0
+    assert main(['evaluate', '--stats', stats, '--model', model]) == 0
+    assert 'mae_modele' in capsys.readouterr().out
@@ -0,0 +1,106 @@
+import pytest
+
+from ai_predictor import NetworkAIPredictor
+from rogue_ap import (NEW_BSSID_TRUSTED, SECURITY_DOWNGRADE, SSID_COLLISION, RogueAPDetector,
+                      main, security_rank)
+
+OFFICE = [('Bureau', '00:11:22:00:00:01', 'WPA2'), ('Bureau', '00:11:22:00:00:02', 'WPA2'),
+          ('Invites', '00:11:22:00:00:03', 'none')]
+
+
+def _types(alerts):
+    return sorted((a['type'], a['bssid']) for a in alerts)
+
+
+@pytest.fixture
+def detector(tmp_path):
+    detector = RogueAPDetector(str(tmp_path / 'network_stats.db'))
+    assert detector.check('2025-01-01T00:00:00', OFFICE) == []
+    yield detector
+    detector.close()
+
+
+def test_security_rank():
+    assert [security_rank(e) for e in (None, 'none', 'WEP', 'WPA', 'WPA2 Enterprise', 'wpa3')] == [0, 0, 1, 2, 3, 4]
+
+
+def test_same_vendor_access_point_is_learned(detector):
+    # Nouveau point d'accès du même constructeur et même sécurité: réseau étendu
+    assert detector.check('2025-01-01T00:01:00', [('Bureau', '00:11:22:00:00:04', 'WPA2')]) == []
+    assert len(detector) == 4
+
+
+def test_evil_twin_with_other_vendor_and_open_security(detector):
+    alerts = detector.check('2025-01-01T00:01:00', [('Bureau', 'AC:DE:48:00:00:99', 'none')])
+    assert _types(alerts) == [(SECURITY_DOWNGRADE, 'AC:DE:48:00:00:99'), (SSID_COLLISION, 'AC:DE:48:00:00:99')]
+    downgrade = next(a for a in alerts if a['type'] == SECURITY_DOWNGRADE)
+    assert downgrade['gravite'] == 'élevée'
+    assert downgrade['details'] == {'attendu': 'WPA2', 'observe': 'aucune'}
+
+    # Répétition: pas de nouvelle alerte, compteur incrémenté
+    assert detector.check('2025-01-01T00:02:00', [('Bureau', 'ac-de-48-00-00-99', 'none')]) == []
+    assert {a['occurrences'] for a in detector.alerts()} == {2}
+    # Le BSSID suspect n'enrichit pas le profil: un autre clone reste signalé
+    assert _types(detector.check('2025-01-01T00:03:00', [('Bureau', 'AC:DE:48:00:00:98', 'WPA2')])) == \
+        [(SSID_COLLISION, 'AC:DE:48:00:00:98')]
+
+
+def test_locally_administered_clone(detector):
+    alerts = detector.check('2025-01-01T00:01:00', [('Bureau', '02:11:22:00:00:05', 'WPA2')])
+    assert _types(alerts) == [(SSID_COLLISION, '02:11:22:00:00:05')]
+    assert alerts[0]['details']['adresse_locale'] is True
+
+
+def test_known_bssid_downgrade(detector):
+    alerts = detector.check('2025-01-01T00:01:00', [('Bureau', '00:11:22:00:00:01', 'WEP')])
+    assert _types(alerts) == [(SECURITY_DOWNGRADE, '00:11:22:00:00:01')]
+
+
+def test_trusted_ssid_and_allow_list(detector):
+    assert detector.trust_ssid('Bureau') == ['00:11:22:00:00:01', '00:11:22:00:00:02']
+    alerts = detector.check('2025-01-01T00:01:00', [('Bureau', '00:11:22:00:00:07', 'WPA2')])
+    assert _types(alerts) == [(NEW_BSSID_TRUSTED, '00:11:22:00:00:07')]
+
+    detector.allow_bssid('AC:DE:48:00:00:99')
+    assert detector.check('2025-01-01T00:02:00', [('Bureau', 'AC:DE:48:00:00:99', 'none')]) == []
+
+
+def test_state_persists_and_acknowledge(detector, tmp_path):
+    detector.trust_ssid('Bureau')
+    [alert] = detector.check('2025-01-01T00:01:00', [('Bureau', '00:11:22:00:00:07', 'WPA2')])
+    detector.close()
+
+    reopened = RogueAPDetector(str(tmp_path / 'network_stats.db'))
+    assert len(reopened) == 4
+    assert [a['id'] for a in reopened.alerts()] == [alert['id']]
+    assert reopened.check('2025-01-01T00:02:00', [('Bureau', '00:11:22:00:00:08', 'WPA2')])[0]['type'] == \
+        NEW_BSSID_TRUSTED
+    assert reopened.acknowledge(alert['id']) and not reopened.acknowledge(12345)
+    assert alert['id'] not in [a['id'] for a in reopened.alerts()]
+    assert reopened.active_count() == 1
+    reopened.close()
+
+
+def test_cli(detector, tmp_path, capsys):
+    detector.check('2025-01-01T00:01:00', [('Bureau', 'AC:DE:48:00:00:99', 'WPA2')])
+    detector.close()
+    db = str(tmp_path / 'network_stats.db')
+    assert main(['--db', db, 'alerts']) == 0
+    assert 'AC:DE:48:00:00:99' in capsys.readouterr().out
+    assert main(['--db', db, 'trust', 'Bureau', '--bssid', '00:11:22:00:00:01']) == 0
+    assert capsys.readouterr().out.strip() == 'Bureau: 00:11:22:00:00:01'
+    assert main(['--db', db, 'ack', '999']) == 1
+
+
+def test_analyze_networks_reports_alerts(tmp_path, monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    predictor = NetworkAIPredictor()
+    predictor.stats_file = str(tmp_path / 'network_stats.json')
+    scan = [{'ssid': ssid, 'bssid': bssid, 'encryption': enc, 'signal': -60} for ssid, bssid, enc in OFFICE]
+    assert predictor.analyze_networks(scan)['rogue_ap'] == {'alerts': [], 'active': 0}
+
+    twin = {'ssid': 'Bureau', 'bssid': 'AC:DE:48:00:00:99', 'encryption': 'none', 'signal': -40}
+    stats = predictor.analyze_networks(scan + [twin])
+    assert _types(stats['rogue_ap']['alerts']) == [(SECURITY_DOWNGRADE, 'AC:DE:48:00:00:99'),
+                                                   (SSID_COLLISION, 'AC:DE:48:00:00:99')]
+    assert stats['rogue_ap']['active'] == 2
@@ -0,0 +1,165 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from ai_predictor import NetworkAIPredictor
+from scan_archive import (RECORD, ArchiveReader, ArchiveWriter, convert_stats_json, devices_from_stats,
+                          main, replay_into)
+from scan_orchestrator import simulated_probes, ScanOrchestrator
+
+START = datetime(2024, 5, 1, 12, 0, 0)
+
+
+def _snapshot(i):
+    devices = [
+        {'ssid': 'Maison', 'bssid': '00:11:22:33:44:55', 'signal': -40.5 - i, 'encryption': 'WPA2',
+         'frequency': 2437, 'channel': 6},
+        {'ssid': 'Gare', 'bssid': '12:34:56:78:90:AB', 'signal': -85, 'encryption': 'none'},
+        {'device_type': 'bluetooth', 'address': '00:1A:7D:DA:71:13', 'name': 'Téléphone', 'signal': -60.0,
+         'services': ['audio']},
+        {'operator': 'Orange', 'technology': '4G/LTE', 'signal': -85.0, 'band': 'B7'},
+        {'operator': 'Free', 'technology': 'eSIM', 'iccid': '8933111234567890123'},
+        {'ssid': None, 'signal': -72.3, 'frequency': 2437.5},
+        {'kind': 'inconnu'},
+    ]
+    return (START + timedelta(seconds=30 * i)).isoformat(), devices
+
+
+@pytest.fixture
+def predictor(tmp_path, monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    predictor = NetworkAIPredictor()
+    predictor.stats_file = str(tmp_path / 'network_stats.json')
+    return predictor
+
+
+def test_round_trip_across_segments(tmp_path):
+    path = str(tmp_path / 'scans.scna')
+    snapshots = [_snapshot(i) for i in range(10)]
+    with ArchiveWriter(path, segment_snapshots=4) as writer:
+        for timestamp, devices in snapshots:
+            writer.append(timestamp, devices)
+
+    with ArchiveReader(path) as reader:
+        assert len(reader.segments) == 3 and len(reader) == 10
+        replayed = list(reader.replay())
+    assert [(s['timestamp'], s['devices']) for s in replayed] == snapshots
+    # Types conservés: entier reste entier, flottant reste flottant
+    assert isinstance(replayed[0]['devices'][1]['signal'], int)
+    assert isinstance(replayed[0]['devices'][0]['signal'], float)
+
+
+def test_time_range_replay_reads_only_matching_snapshots(tmp_path):
+    path = str(tmp_path / 'scans.scna')
+    with ArchiveWriter(path, segment_snapshots=4) as writer:
+        for i in range(12):
+            writer.append(*_snapshot(i))
+
+    with ArchiveReader(path) as reader:
+        replayed = list(reader.replay(START + timedelta(seconds=150), (START + timedelta(seconds=210)).isoformat()))
+        assert [s['timestamp'] for s in replayed] == [_snapshot(i)[0] for i in (5, 6, 7)]
+        # Seul le segment concerné a été indexé
+        assert [segment.times is not None for segment in reader.segments] == [False, True, False]
+        assert reader.time_range() == (_snapshot(0)[0], _snapshot(11)[0])
+
+
+def test_strings_are_deduplicated(tmp_path):
+    path = str(tmp_path / 'scans.scna')
+    devices = [{'ssid': 'Réseau partagé', 'bssid': '00:11:22:33:44:55', 'signal': -50, 'encryption': 'WPA2'}]
+    with ArchiveWriter(path) as writer:
+        for i in range(200):
+            writer.append(START + timedelta(seconds=i), devices)
+    size = os.path.getsize(path)
+    # Un enregistrement fixe par appareil plus une table de chaînes unique
+    assert size < 200 * (RECORD.size + 8) + 200
+    assert size * 3 < len(json.dumps([{'timestamp': START.isoformat(), 'devices': devices}] * 200))
+
+
+def test_append_reopens_and_truncates_partial_segment(tmp_path):
+    path = str(tmp_path / 'scans.scna')
+    with ArchiveWriter(path) as writer:
+        writer.append(*_snapshot(0))
+    with open(path, 'ab') as f:
+        f.write(b'SEGM\x00\x10')  # segment interrompu
+    with ArchiveWriter(path) as writer:
+        writer.append(*_snapshot(1))
+        with pytest.raises(ValueError):
+            writer.append(*_snapshot(0))
+    with ArchiveReader(path) as reader:
+        assert [s['timestamp'] for s in reader.replay()] == [_snapshot(0)[0], _snapshot(1)[0]]
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / 'autre.bin'
+    path.write_bytes(b'pas une archive')
+    with pytest.raises(ValueError):
+        ArchiveReader(str(path))
+    with pytest.raises(ValueError):
+        ArchiveWriter(str(path))
+
+
+def test_replay_into_predictor_keeps_timestamps(tmp_path, predictor):
+    path = str(tmp_path / 'scans.scna')
+    orchestrator = ScanOrchestrator(simulated_probes())
+    snapshot = orchestrator.scan_sync()
+    with ArchiveWriter(path) as writer:
+        writer.append(START, snapshot['devices'])
+
+    expected = predictor.analyze_networks(snapshot['devices'])
+    [stats] = list(replay_into(predictor, path))
+    assert stats['timestamp'] == START.isoformat()
+    assert stats['network_types'] == expected['network_types']
+    assert stats['security_stats'] == expected['security_stats']
+
+
+def test_replay_leaves_live_history_and_alerts_alone(tmp_path, predictor, monkeypatch):
+    path = str(tmp_path / 'scans.scna')
+    devices = ScanOrchestrator(simulated_probes()).scan_sync()['devices']
+    with ArchiveWriter(path) as writer:
+        for i in range(5):
+            writer.append(START + timedelta(minutes=i), devices)
+    predictor.stats_retention = 2
+    live = predictor.analyze_networks(devices)
+
+    def no_gpt():
+        raise AssertionError("appel GPT pendant une relecture")
+
+    monkeypatch.setenv('OPENAI_API_KEY', 'test')
+    monkeypatch.setattr(type(predictor), 'openai_client', property(lambda self: no_gpt()))
+    replayed = list(replay_into(predictor, path))
+
+    assert len(replayed) == 5 and predictor.replay_mode is False
+    assert all('analyse_ia' not in a for stats in replayed for a in stats['detailed_analysis'])
+    assert all('rogue_ap' not in stats and 'presence' not in stats for stats in replayed)
+    # L'historique (rétention par id) ne contient toujours que le scan réel
+    assert [s['timestamp'] for s in predictor.get_network_stats()] == [live['timestamp']]
+
+
+def test_convert_legacy_stats_json(tmp_path, predictor):
+    networks = [
+        {'ssid': 'Maison', 'signal': -60, 'encryption': 'WPA2'},
+        {'device_type': 'bluetooth', 'address': '00:1A:7D:DA:71:13', 'signal': -75},
+        {'operator': 'Orange', 'technology': '4G/LTE', 'signal': -85, 'band': 'B7'},
+    ]
+    history = []
+    for i in range(3):
+        stats = predictor.analyze_networks(networks, timestamp=(START + timedelta(minutes=i)).isoformat())
+        history.append(stats)
+    legacy = tmp_path / 'legacy.json'
+    legacy.write_text(json.dumps(history[::-1]))
+
+    archive = str(tmp_path / 'scans.scna')
+    assert main(['convert', str(legacy), archive]) == 0
+    with ArchiveReader(archive) as reader:
+        replayed = list(reader.replay())
+    assert [s['timestamp'] for s in replayed] == [s['timestamp'] for s in history]
+    # Le signal est retrouvé à partir de la qualité tant qu'il est entre les seuils
+    assert replayed[0]['devices'] == devices_from_stats(history[0])
+    assert replayed[0]['devices'][0] == {'ssid': 'Maison', 'encryption': 'WPA2', 'signal': -60.0}
+    assert replayed[0]['devices'][1]['signal'] == -75.0
+    assert replayed[0]['devices'][2]['band'] == 'B7'
+    # Une nouvelle conversion de la même période serait antérieure à l'archive
+    with pytest.raises(ValueError):
+        convert_stats_json(str(legacy), archive)
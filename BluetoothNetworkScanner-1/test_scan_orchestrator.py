@@ -0,0 +1,128 @@
+import asyncio
+import json
+import sys
+import time
+
+import pytest
+
+from scan_orchestrator import (Probe, ProbeError, ScanOrchestrator, analyze_snapshot, parse_bluetoothctl,
+                               parse_mmcli_modem, run_command, simulated_probes)
+
+
+def test_cycle_lasts_as_long_as_slowest_probe():
+    delays = {'wifi:test0': 0.3, 'bluetooth': 0.2, 'lte': 0.4, 'esim': 0.1}
+    orchestrator = ScanOrchestrator(simulated_probes(delays), timeout=2)
+
+    start = time.perf_counter()
+    snapshot = orchestrator.scan_sync()
+    elapsed = time.perf_counter() - start
+
+    assert 0.4 <= elapsed < 0.7
+    assert {name: report['status'] for name, report in snapshot['probes'].items()} == dict.fromkeys(delays, 'ok')
+    assert [d.get('ssid') for d in snapshot['devices'][:3]] == ['WiFi-Test-1', 'WiFi-Test-2', 'WiFi-Test-3']
+    assert len(snapshot['devices']) == 7
+    assert snapshot['timestamp']
+
+
+def test_slow_probe_is_cancelled_without_delaying_others():
+    cancelled = []
+
+    async def slow(timeout):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    probes = simulated_probes() + [Probe('lent', 'wifi', slow, timeout=0.2)]
+    start = time.perf_counter()
+    snapshot = ScanOrchestrator(probes, timeout=5).scan_sync()
+
+    assert time.perf_counter() - start < 1
+    assert snapshot['probes']['lent']['status'] == 'timeout'
+    assert snapshot['probes']['lte']['count'] == 1
+    assert cancelled == [True]
+
+
+def test_failing_probe_is_reported():
+    async def broken(timeout):
+        raise ProbeError('Commande introuvable: iw')
+
+    snapshot = ScanOrchestrator([Probe('wifi:wlan1', 'wifi', broken)], timeout=1).scan_sync()
+    assert snapshot['probes']['wifi:wlan1'] == {'radio': 'wifi', 'status': 'error', 'count': 0,
+                                                'error': 'Commande introuvable: iw',
+                                                'duration': snapshot['probes']['wifi:wlan1']['duration']}
+
+
+def test_access_point_seen_by_two_interfaces_is_merged():
+    def probe(name):
+        async def run(timeout):
+            return [{'ssid': 'Maison', 'bssid': '00:11:22:33:44:55', 'signal': -50.0, 'interface': name}]
+        return Probe(f'wifi:{name}', 'wifi', run)
+
+    snapshot = ScanOrchestrator([probe('wlan0'), probe('wlan1')]).scan_sync()
+    assert len(snapshot['devices']) == 1
+    assert snapshot['probes']['wifi:wlan1']['count'] == 0
+
+
+def test_command_timeout_kills_process():
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await run_command([sys.executable, '-c', 'import time; time.sleep(10)'], 0.2)
+
+    start = time.perf_counter()
+    asyncio.run(scenario())
+    assert time.perf_counter() - start < 2
+
+
+def test_command_errors():
+    async def scenario():
+        with pytest.raises(ProbeError):
+            await run_command(['commande-inexistante-xyz'], 1)
+        with pytest.raises(ProbeError):
+            await run_command([sys.executable, '-c', 'raise SystemExit(3)'], 5)
+        assert await run_command([sys.executable, '-c', 'print("ok")'], 5) == 'ok\n'
+
+    asyncio.run(scenario())
+
+
+def test_parse_bluetoothctl():
+    output = '\n'.join([
+        'Discovery started',
+        '[CHG] Controller 00:1A:7D:DA:71:13 Discovering: yes',
+        '[NEW] Device 5C:F3:70:11:22:33 Casque',
+        '[CHG] Device 5C:F3:70:11:22:33 RSSI: -67',
+        '[CHG] Device 44:55:66:77:88:99 RSSI: 0xffffffc4 (-60)',
+        '[CHG] Device 44:55:66:77:88:99 ManufacturerData Key: 0x004c',
+    ])
+    assert parse_bluetoothctl(output) == [
+        {'device_type': 'bluetooth', 'address': '5C:F3:70:11:22:33', 'name': 'Casque', 'signal': -67.0,
+         'rssi_min': -67.0, 'rssi_max': -67.0, 'rssi_mean': -67.0, 'advertisements': 2},
+        {'device_type': 'bluetooth', 'address': '44:55:66:77:88:99', 'signal': -60.0,
+         'rssi_min': -60.0, 'rssi_max': -60.0, 'rssi_mean': -60.0, 'advertisements': 1},
+    ]
+
+
+def test_parse_mmcli():
+    modem = {'modem': {'generic': {'access-technologies': ['lte']},
+                       '3gpp': {'operator-name': 'Orange', 'registration-state': 'home'}}}
+    signal = {'modem': {'signal': {'lte': {'rssi': '-71.00'}, '5g': {'rssi': '--'}}}}
+    assert parse_mmcli_modem(modem, signal) == {'operator': 'Orange', 'technology': 'LTE',
+                                               'roaming': False, 'signal': -71.0}
+
+
+def test_snapshot_feeds_predictor(tmp_path, monkeypatch):
+    from ai_predictor import NetworkAIPredictor
+
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    predictor = NetworkAIPredictor()
+    predictor.stats_file = str(tmp_path / 'network_stats.json')
+
+    stats = analyze_snapshot(predictor, ScanOrchestrator(simulated_probes()).scan_sync())
+    assert stats['total_networks'] == 7
+    assert stats['network_types']['wifi'] == 3
+    assert stats['network_types']['bluetooth'] == 2
+    assert stats['network_types']['lte'] == 1 and stats['network_types']['esim'] == 1
+    assert set(stats['scan']['probes']) == {'wifi:test0', 'bluetooth', 'lte', 'esim'}
+    assert stats['timestamp'] == stats['scan']['timestamp']
+    json.dumps(stats)
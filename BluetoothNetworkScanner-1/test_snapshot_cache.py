@@ -0,0 +1,107 @@
+import json
+import os
+
+import pytest
+
+import server
+from network_manager import NetworkDataManager
+from snapshot_cache import FileSnapshotCache
+
+NETWORKS = [
+    {'ssid': 'Maison', 'rssi': -40, 'frequency_mhz': 2437},
+    {'ssid': 'Voisin', 'rssi': -80, 'frequency_mhz': 5180},
+    {'ssid': None, 'rssi': -30, 'frequency_mhz': 2412},
+]
+
+
+def _write(path, data):
+    # Remplacement atomique comme wifi_scan.write_results: nouvel inode
+    tmp = str(path) + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+@pytest.fixture
+def results(tmp_path, monkeypatch):
+    path = tmp_path / 'wifi_results.json'
+    _write(path, NETWORKS)
+    monkeypatch.setattr(server, 'WIFI_RESULTS_FILE', str(path))
+    return path
+
+
+def test_file_parsed_once_per_version(results):
+    cache = FileSnapshotCache(str(results))
+    first = cache.get()
+    assert cache.get() is first and cache.loads == 1
+
+    _write(results, NETWORKS[:1])
+    second = cache.get()
+    assert second is not first and second.data == NETWORKS[:1]
+    assert second.version != first.version and cache.loads == 2
+
+
+def test_errors_are_snapshots(tmp_path):
+    path = tmp_path / 'wifi_results.json'
+    cache = FileSnapshotCache(str(path), missing_error='absent')
+    assert cache.get().error == 'absent' and cache.loads == 0
+
+    path.write_text('{pas du json')
+    assert cache.get().error == 'Fichier JSON invalide'
+    assert cache.get().error == 'Fichier JSON invalide' and cache.loads == 1
+
+
+def test_etag_and_304(results):
+    client = server.app.test_client()
+    response = client.get('/api/network_status')
+    etag = response.headers['ETag']
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert response.get_json()['wifi']['meilleur_reseau']['nom'] == 'Maison'
+    assert response.get_json()['wifi']['nombre_reseaux'] == 2
+
+    cached = client.get('/api/network_status', headers={'If-None-Match': etag})
+    assert cached.status_code == 304 and cached.data == b''
+    assert cached.headers['ETag'] == etag
+
+    _write(results, NETWORKS[1:])
+    fresh = client.get('/api/network_status', headers={'If-None-Match': etag})
+    assert fresh.status_code == 200 and fresh.headers['ETag'] != etag
+    assert fresh.get_json()['wifi']['meilleur_reseau']['nom'] == 'Voisin'
+
+
+def test_wifi_responses_serialized_once(results, monkeypatch):
+    client = server.app.test_client()
+    first = client.get('/api/wifi')
+    assert first.get_json()['reseaux']['total'] == 2
+
+    # Le meilleur réseau n'est plus recalculé tant que le fichier ne change pas
+    monkeypatch.setattr(server, 'recommend_best_network', None)
+    monkeypatch.setattr(server, 'score_network', None)
+    second = client.get('/api/wifi')
+    assert second.data == first.data and server.get_wifi_cache().loads == 1
+
+
+def test_error_responses_without_etag(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, 'WIFI_RESULTS_FILE', str(tmp_path / 'absent.json'))
+    client = server.app.test_client()
+
+    response = client.get('/api/wifi')
+    assert response.status_code == 400 and 'ETag' not in response.headers
+    assert response.get_json()['message'] == 'Aucun fichier de résultats WiFi trouvé'
+    assert client.get('/api/network_status').get_json()['wifi']['actif'] is False
+
+    _write(tmp_path / 'absent.json', [{'ssid': None}])
+    assert client.get('/api/wifi').status_code == 404
+
+
+def test_network_manager_reads_file_once(results):
+    manager = NetworkDataManager()
+    manager.wifi_results_file = str(results)
+
+    status = manager.get_network_status()
+    assert status['wifi']['networks_count'] == 3
+    # Le gestionnaire classe aussi les réseaux sans SSID: le plus fort l'emporte
+    assert status['wifi']['best_network'] == NETWORKS[2]
+    assert manager.get_best_network() is status['wifi']['best_network']
+    assert manager._cache.loads == 1
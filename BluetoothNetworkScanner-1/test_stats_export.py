@@ -0,0 +1,127 @@
+import csv
+import gzip
+import io
+import json
+import tracemalloc
+
+import pytest
+
+import server
+from stats_export import export, export_store, main, resolve
+from stats_store import StatsStore
+
+
+def _scan(n, devices=3):
+    return {
+        'timestamp': f'2025-01-01T{n // 60:02d}:{n % 60:02d}:00',
+        'total_networks': devices,
+        'network_types': {'wifi': devices, 'bluetooth': 0, 'lte': 0, 'esim': 0, 'vpn': 0},
+        'average_signal': {'wifi': -60.0 - n},
+        'security_stats': {'encrypted': devices - 1, 'open': 1},
+        'detailed_analysis': [
+            {'type': 'wifi', 'details': {'ssid': f'AP-{i}', 'band': '5GHz', 'signal_quality': 0.5},
+             'performances': {'congestion': 'Faible'}, 'analyse_ia': 'Texte commun'}
+            for i in range(devices)
+        ],
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StatsStore(str(tmp_path / 'network_stats.db'), max_entries=1000)
+    for n in range(10):
+        store.append(_scan(n))
+    yield store
+    store.close()
+
+
+def _read(chunks, compressed=True):
+    data = b''.join(chunks)
+    return (gzip.decompress(data) if compressed else data).decode('utf-8')
+
+
+def test_ndjson_scans_with_time_range(store):
+    text = _read(export_store(store, start='2025-01-01T00:02:00', end='2025-01-01T00:04:00'))
+    rows = [json.loads(line) for line in text.splitlines()]
+    assert [row['timestamp'] for row in rows] == ['2025-01-01T00:02:00', '2025-01-01T00:03:00',
+                                                   '2025-01-01T00:04:00']
+    assert 'detailed_analysis' not in rows[0] and rows[0]['average_signal'] == {'wifi': -62.0}
+
+
+def test_csv_devices_with_columns(store):
+    text = _read(export_store(store, 'csv', 'device', ['timestamp', 'details.ssid', 'analyse_ia', 'details'],
+                              end='2025-01-01T00:01:00'))
+    rows = list(csv.reader(io.StringIO(text)))
+    assert rows[0] == ['timestamp', 'details.ssid', 'analyse_ia', 'details']
+    assert len(rows) == 1 + 2 * 3
+    assert rows[1][:3] == ['2025-01-01T00:00:00', 'AP-0', 'Texte commun']
+    assert json.loads(rows[1][3])['band'] == '5GHz'
+
+
+def test_default_csv_columns_and_missing_values(store):
+    rows = list(csv.DictReader(io.StringIO(_read(export_store(store, 'csv')))))
+    assert len(rows) == 10
+    assert rows[0]['network_types.wifi'] == '3' and rows[0]['average_signal.lte'] == ''
+
+
+def test_uncompressed_and_invalid_arguments(store):
+    assert _read(export_store(store, compress=False), compressed=False).count('\n') == 10
+    with pytest.raises(ValueError):
+        export([], fmt='xml')
+    with pytest.raises(ValueError):
+        export([], level='reseau')
+    assert resolve({'a': {'b': 1}}, 'a.b.c') is None
+
+
+def test_constant_memory_export():
+    """La mémoire de pointe ne dépend pas du nombre de lignes exportées"""
+    def entries(count):
+        for n in range(count):
+            yield _scan(n % 1440, devices=50)
+
+    def peak(count):
+        tracemalloc.start()
+        size = sum(len(chunk) for chunk in export(entries(count), 'csv', 'device'))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak, size
+
+    small_peak, small_size = peak(20)
+    large_peak, large_size = peak(600)  # 30 000 lignes
+    assert large_size > 20 * small_size
+    assert large_peak < small_peak * 1.5 + 256 * 1024
+
+
+def test_export_endpoint_streams(store, monkeypatch):
+    monkeypatch.setattr(server, 'STATS_DB_FILE', store.path)
+    client = server.app.test_client()
+    response = client.get('/api/stats/export?format=csv&level=device&columns=timestamp,details.ssid'
+                          '&start=2025-01-01T00:09:00')
+    assert response.status_code == 200
+    assert response.is_streamed and response.mimetype == 'application/gzip'
+    assert 'historique_device.csv.gz' in response.headers['Content-Disposition']
+    assert gzip.decompress(response.get_data()).decode().splitlines() == \
+        ['timestamp,details.ssid'] + [f'2025-01-01T00:09:00,AP-{i}' for i in range(3)]
+
+    plain = client.get('/api/stats/export?gzip=0')
+    assert plain.mimetype == 'application/x-ndjson' and len(plain.get_data().splitlines()) == 10
+
+    error = client.get('/api/stats/export?format=xml')
+    assert error.status_code == 400 and error.get_json()['statut'] == 'erreur'
+    for bound in ('start=garbage', 'end=2025-02-30'):
+        error = client.get(f'/api/stats/export?{bound}')
+        assert error.status_code == 400 and 'Horodatage invalide' in error.get_json()['message']
+    # Fin sans heure: tous les scans du jour
+    whole_day = client.get('/api/stats/export?gzip=0&end=2025-01-01')
+    assert len(whole_day.get_data().splitlines()) == 10
+
+
+def test_cli(store, tmp_path, capsysbinary):
+    output = tmp_path / 'export.ndjson.gz'
+    assert main(['--db', store.path, '--level', 'device', '--columns', 'details.ssid',
+                 '--start', '2025-01-01T00:09:00', '-o', str(output)]) == 0
+    lines = gzip.decompress(output.read_bytes()).decode().splitlines()
+    assert [json.loads(line) for line in lines] == [{'details.ssid': f'AP-{i}'} for i in range(3)]
+
+    assert main(['--db', store.path, '--format', 'csv', '--no-gzip', '--end', '2025-01-01T00:00:00']) == 0
+    assert capsysbinary.readouterr().out.decode().splitlines()[1].startswith('2025-01-01T00:00:00,3,3')
@@ -0,0 +1,107 @@
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+
+from stats_rollups import RollupStore
+
+BASE = datetime(2025, 2, 24, 14, 0, tzinfo=timezone.utc).timestamp()
+
+
+def _scan(store, offset, signals=(-60.0, -70.0)):
+    store.record_scan(BASE + offset, [
+        ('wifi', 'Maison', signals[0], True),
+        ('wifi', 'Public', signals[1], False),
+        ('bluetooth', None, -80.0, None),
+    ])
+
+
+def test_minute_buckets_aggregate_scans(tmp_path):
+    store = RollupStore(str(tmp_path / 'stats.db'))
+    _scan(store, 5)
+    _scan(store, 35, signals=(-50.0, -90.0))
+    _scan(store, 65)
+
+    buckets = store.query('1m')
+    assert [b['scans'] for b in buckets] == [2, 1]
+    wifi = buckets[0]['types']['wifi']
+    assert wifi['nombre'] == 4
+    assert wifi['signal_moyen'] == pytest.approx(-67.5)
+    assert (wifi['signal_min'], wifi['signal_max']) == (-90.0, -50.0)
+    assert wifi['ratio_chiffre'] == 0.5
+    assert buckets[0]['ssids']['Maison']['signal_max'] == -50.0
+    assert buckets[0]['types']['bluetooth']['ratio_chiffre'] is None
+
+
+def test_coarser_resolutions_and_range(tmp_path):
+    store = RollupStore(str(tmp_path / 'stats.db'))
+    for minute in range(0, 180, 10):
+        _scan(store, minute * 60)
+
+    hours = store.query('1h')
+    assert [b['scans'] for b in hours] == [6, 6, 6]
+    assert store.query('1d')[0]['scans'] == 18
+
+    window = store.query('1m', start=BASE + 3600, end=BASE + 2 * 3600 - 1)
+    assert len(window) == 6
+    assert window[0]['debut'] == '2025-02-24T15:00:00+00:00'
+
+
+def test_tiered_retention(tmp_path):
+    store = RollupStore(str(tmp_path / 'stats.db'))
+    _scan(store, 0)
+    _scan(store, 2 * 86400)
+
+    assert len(store.query('1m')) == 1
+    assert len(store.query('1h')) == 2
+    assert len(store.query('1d')) == 2
+
+
+def test_scan_cost_does_not_grow_with_history(tmp_path):
+    store = RollupStore(str(tmp_path / 'stats.db'))
+    for minute in range(500):
+        _scan(store, minute * 60)
+
+    with sqlite3.connect(store.path) as conn:
+        rows = conn.execute('SELECT COUNT(*) FROM rollups WHERE resolution = 86400').fetchone()[0]
+    # Une ligne par clé et par jour, quel que soit le nombre de scans
+    assert rows == 1 + 2 + 2
+
+
+def test_unknown_resolution(tmp_path):
+    with pytest.raises(ValueError):
+        RollupStore(str(tmp_path / 'stats.db')).query('5m')
+
+
+def test_predictor_records_rollups(tmp_path, monkeypatch):
+    from ai_predictor import NetworkAIPredictor
+
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    predictor = NetworkAIPredictor()
+    predictor.stats_file = str(tmp_path / 'network_stats.json')
+
+    predictor.analyze_networks([
+        {'ssid': 'Maison', 'signal': '-55 dBm', 'encryption': 'WPA2'},
+        {'ssid': 'Public', 'signal': '-75', 'encryption': 'none'},
+        {'device_type': 'audio', 'signal': '-70'},
+    ])
+
+    bucket = predictor.get_network_rollups('1m')[0]
+    assert bucket['scans'] == 1
+    assert bucket['types']['wifi']['signal_moyen'] == -65.0
+    assert bucket['types']['wifi']['ratio_ouvert'] == 0.5
+    assert set(bucket['ssids']) == {'Maison', 'Public'}
+
+
+def test_server_follows_stats_db(tmp_path, monkeypatch):
+    import server
+
+    client = server.app.test_client()
+    for name, scans in (('a.db', 1), ('b.db', 2)):
+        store = RollupStore(str(tmp_path / name))
+        for i in range(scans):
+            _scan(store, i)
+        monkeypatch.setattr(server, 'STATS_DB_FILE', store.path)
+        response = client.get('/api/stats/rollups', query_string={'resolution': '1m', 'start': '2025-02-24T14:00:00+00:00'})
+        cases = response.get_json()['cases']
+        assert cases[0]['scans'] == scans
@@ -0,0 +1,153 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+import stats_store
+from stats_store import StatsStore
+
+
+def _stats(minute, analysis='Analyse répétée'):
+    return {
+        'total_networks': 2,
+        'network_types': {'wifi': 2},
+        'average_signal': {'wifi': -60.0},
+        'security_stats': {'encrypted': 1, 'open': 1},
+        'timestamp': f'2025-02-24T14:{minute:02d}:00',
+        'detailed_analysis': [
+            {'type': 'wifi', 'details': {'ssid': 'A'}, 'analyse_ia': analysis},
+            {'type': 'wifi', 'details': {'ssid': 'B'}, 'analyse_ia': analysis},
+        ]
+    }
+
+
+def test_append_and_read_back(tmp_path):
+    store = StatsStore(str(tmp_path / 'stats.db'))
+    store.append(_stats(0))
+
+    assert store.query() == [_stats(0)]
+
+
+def test_retention_is_bounded(tmp_path):
+    store = StatsStore(str(tmp_path / 'stats.db'), max_entries=5)
+    for minute in range(12):
+        store.append(_stats(minute, analysis=f'Analyse {minute}'))
+
+    entries = store.query()
+    assert [e['timestamp'][-5:-3] for e in entries] == ['07', '08', '09', '10', '11']
+    # Les textes qui ne sont plus référencés sont supprimés
+    with sqlite3.connect(store.path) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM texts').fetchone()[0] == 5
+
+
+def test_repeated_analysis_texts_are_stored_once(tmp_path):
+    store = StatsStore(str(tmp_path / 'stats.db'))
+    for minute in range(10):
+        store.append(_stats(minute))
+
+    with sqlite3.connect(store.path) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM texts').fetchone()[0] == 1
+        payload = conn.execute('SELECT payload FROM scans LIMIT 1').fetchone()[0]
+    assert 'Analyse répétée' not in payload
+    assert all(a['analyse_ia'] == 'Analyse répétée'
+               for e in store.query() for a in e['detailed_analysis'])
+
+
+def test_time_range_and_pagination(tmp_path):
+    store = StatsStore(str(tmp_path / 'stats.db'))
+    for minute in range(20):
+        store.append(_stats(minute))
+
+    window = store.query(start='2025-02-24T14:05:00', end='2025-02-24T14:14:00')
+    assert len(window) == 10
+    assert store.count(start='2025-02-24T14:05:00', end='2025-02-24T14:14:00') == 10
+
+    page = store.query(start='2025-02-24T14:05:00', limit=3, offset=3)
+    assert [e['timestamp'][-5:-3] for e in page] == ['08', '09', '10']
+
+
+def test_time_bounds_are_parsed(tmp_path):
+    store = StatsStore(str(tmp_path / 'stats.db'))
+    for minute in range(20):
+        store.append(_stats(minute))
+
+    # Fin sans heure: toute la journée; bornes avec décalage ramenées à l'heure locale
+    assert store.count(end='2025-02-24') == 20 and store.count(end='2025-02-23') == 0
+    local = datetime(2025, 2, 24, 14, 5).astimezone()
+    assert store.count(start=local.isoformat()) == 15
+    utc = local.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    assert store.count(start=utc) == 15
+    # Bornes invalides refusées dès l'appel, avant toute lecture
+    for bound in ('garbage', '2025-13-01'):
+        with pytest.raises(ValueError):
+            store.iter_entries(start=bound)
+        with pytest.raises(ValueError):
+            store.count(end=bound)
+
+
+def test_text_memo_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(stats_store, 'TEXT_MEMO_SIZE', 3)
+    store = StatsStore(str(tmp_path / 'stats.db'))
+    for minute in range(20):
+        store.append(_stats(minute, analysis=f'Analyse {minute % 7}'))
+
+    restored = []
+    original = store._restore
+
+    def spy(reader, entry, texts):
+        entry = original(reader, entry, texts)
+        restored.append(len(texts))
+        return entry
+
+    monkeypatch.setattr(store, '_restore', spy)
+    entries = store.query()
+    assert max(restored) == 3
+    assert [e['detailed_analysis'][1]['analyse_ia'] for e in entries] == [f'Analyse {m % 7}' for m in range(20)]
+
+
+def test_legacy_json_is_imported_once(tmp_path):
+    legacy = tmp_path / 'network_stats.json'
+    legacy.write_text(json.dumps([_stats(1), _stats(2)]))
+
+    store = StatsStore(str(tmp_path / 'network_stats.db'), legacy_json=str(legacy))
+    store.append(_stats(3))
+    store.close()
+    reopened = StatsStore(str(tmp_path / 'network_stats.db'), legacy_json=str(legacy))
+
+    assert [e['timestamp'] for e in reopened.query()] == [
+        '2025-02-24T14:01:00', '2025-02-24T14:02:00', '2025-02-24T14:03:00']
+
+
+def test_concurrent_writers(tmp_path):
+    path = str(tmp_path / 'stats.db')
+    stores = [StatsStore(path, max_entries=1000) for _ in range(4)]
+
+    def write(store, base):
+        for minute in range(25):
+            store.append(_stats(minute, analysis=f'Analyse {base}'))
+
+    threads = [threading.Thread(target=write, args=(s, i)) for i, s in enumerate(stores)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert stores[0].count() == 100
+
+
+def test_predictor_uses_store(tmp_path, monkeypatch):
+    from ai_predictor import NetworkAIPredictor
+
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    predictor = NetworkAIPredictor()
+    predictor.stats_file = str(tmp_path / 'network_stats.json')
+
+    predictor.analyze_networks([{'ssid': 'A', 'signal': '-60', 'encryption': 'WPA2'}])
+    predictor.analyze_networks([{'ssid': 'B', 'signal': '-70'}])
+
+    history = predictor.get_network_stats()
+    assert [e['detailed_analysis'][0]['details']['ssid'] for e in history] == ['A', 'B']
+    assert len(predictor.get_network_stats(limit=1, offset=1)) == 1
+    assert not (tmp_path / 'network_stats.json').exists()
@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+
+import pytest
+
+import server
+from status_stream import DELETED_KEY, FileWatcher, StatusBroadcaster, apply_delta, diff, format_event
+
+
+def _write(path, data):
+    tmp = str(path) + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+class FakeSource:
+    """Source d'états versionnés pilotée par le test"""
+
+    def __init__(self, state):
+        self.version, self.state = 1, state
+
+    def set(self, state):
+        self.version, self.state = self.version + 1, state
+
+    def __call__(self):
+        return str(self.version), self.state
+
+
+class IdleWatcher:
+    path = None
+    mode = 'test'
+
+    def wait(self, timeout=None):
+        threading.Event().wait(timeout)
+        return False
+
+    def close(self):
+        pass
+
+
+STATUS = {'wifi': {'actif': True, 'nombre_reseaux': 3, 'meilleur_reseau': {'nom': 'A', 'puissance': -40}},
+          'esim': {'actif': False, 'message': 'Non configuré'}}
+
+
+def test_diff_is_compact_and_reversible():
+    new = {'wifi': {'actif': True, 'nombre_reseaux': 4, 'meilleur_reseau': {'nom': 'B', 'puissance': -40}},
+           'lte': {'actif': True}}
+    delta = diff(STATUS, new)
+    assert delta == {'wifi': {'nombre_reseaux': 4, 'meilleur_reseau': {'nom': 'B'}},
+                     'lte': {'actif': True}, DELETED_KEY: ['esim']}
+    assert apply_delta(STATUS, delta) == new
+    assert diff(new, new) == {}
+
+
+def test_null_value_is_not_a_deletion():
+    new = {'wifi': {'actif': False, 'nombre_reseaux': 0, 'meilleur_reseau': None}, 'esim': STATUS['esim']}
+    delta = diff(STATUS, new)
+    assert delta == {'wifi': {'actif': False, 'nombre_reseaux': 0, 'meilleur_reseau': None}}
+    patched = apply_delta(STATUS, json.loads(json.dumps(delta)))
+    assert patched == new and patched['wifi']['meilleur_reseau'] is None
+    assert apply_delta(new, diff(new, STATUS)) == STATUS
+
+
+@pytest.mark.parametrize('use_inotify', [True, False])
+def test_watcher_detects_atomic_replace(tmp_path, use_inotify):
+    path = tmp_path / 'wifi_results.json'
+    watcher = FileWatcher(str(path), poll_interval=0.05, use_inotify=use_inotify)
+    try:
+        assert watcher.wait(timeout=0.05) is False
+        _write(path, [])
+        assert watcher.wait(timeout=2) is True
+        (tmp_path / 'autre.json').write_text('{}')
+        assert watcher.wait(timeout=0.1) is False
+    finally:
+        watcher.close()
+
+
+def test_subscribers_get_snapshot_then_deltas():
+    source = FakeSource(STATUS)
+    broadcaster = StatusBroadcaster(source, IdleWatcher())
+    first, second = broadcaster.subscribe(), broadcaster.subscribe()
+    assert first.get(0) == ('1', 'snapshot', STATUS)
+
+    source.set(dict(STATUS, esim={'actif': True, 'message': 'Non configuré'}))
+    assert broadcaster.refresh() is True
+    assert broadcaster.refresh() is False
+    assert second.get(0)[1] == 'snapshot'
+    for subscription in (first, second):
+        assert subscription.get(0) == ('2', 'delta', {'esim': {'actif': True}})
+        assert subscription.get(0) is None
+
+    broadcaster.unsubscribe(second)
+    assert broadcaster.subscribers == 1
+
+
+def test_since_version():
+    source = FakeSource(STATUS)
+    broadcaster = StatusBroadcaster(source, IdleWatcher(), history=2)
+    for count in (4, 5, 6):
+        source.set(dict(STATUS, wifi=dict(STATUS['wifi'], nombre_reseaux=count)))
+        broadcaster.refresh()
+
+    assert broadcaster.changes_since('3') == ('4', 'delta', {'wifi': {'nombre_reseaux': 6}})
+    assert broadcaster.changes_since('4') == ('4', 'delta', {})
+    # Version sortie de l'historique ou inconnue: snapshot complet
+    assert broadcaster.changes_since('1')[1] == 'snapshot'
+    assert broadcaster.changes_since(None)[1] == 'snapshot'
+    assert broadcaster.subscribe('4').get(0) is None
+    assert broadcaster.subscribe('3').get(0)[1] == 'delta'
+
+
+def test_slow_subscriber_is_resynchronised():
+    source = FakeSource(STATUS)
+    broadcaster = StatusBroadcaster(source, IdleWatcher(), max_queue=2)
+    subscription = broadcaster.subscribe()
+    for count in range(5):
+        source.set(dict(STATUS, wifi=dict(STATUS['wifi'], nombre_reseaux=count)))
+        broadcaster.refresh()
+    # File pleine: les deltas en attente sont remplacés par l'état courant
+    (_, kind, state), (version, _, delta) = subscription.get(0), subscription.get(0)
+    assert kind == 'snapshot' and version == '6'
+    assert apply_delta(state, delta) == source.state
+    assert subscription.get(0) is None
+
+
+def test_format_event():
+    assert format_event('v1', 'delta', {'a': 'é'}) == 'id: v1\nevent: delta\ndata: {"a": "é"}\n\n'
+
+
+def test_server_stream_and_delta(tmp_path, monkeypatch):
+    path = tmp_path / 'wifi_results.json'
+    _write(path, [{'ssid': 'Maison', 'rssi': -40}])
+    monkeypatch.setattr(server, 'WIFI_RESULTS_FILE', str(path))
+    monkeypatch.setattr(server, '_status_broadcaster', None)
+    client = server.app.test_client()
+
+    response = client.get('/api/network_status/stream')
+    assert response.mimetype == 'text/event-stream'
+    chunks = iter(response.response)
+    assert next(chunks) == b'retry: 3000\n\n'
+    snapshot = next(chunks).decode()
+    version = snapshot.split('\n', 1)[0][len('id: '):]
+    assert 'event: snapshot' in snapshot and '"nombre_reseaux": 1' in snapshot
+
+    _write(path, [{'ssid': 'Maison', 'rssi': -40}, {'ssid': 'Voisin', 'rssi': -70}])
+    delta = next(chunks).decode()
+    assert 'event: delta' in delta
+    data = json.loads(delta.split('data: ', 1)[1])
+    assert data['wifi']['nombre_reseaux'] == 2 and 'esim' not in data
+    response.close()
+
+    body = client.get('/api/network_status/delta', query_string={'since': version}).get_json()
+    assert body['type'] == 'delta' and body['donnees'] == data
+    assert client.get('/api/network_status/delta').get_json()['type'] == 'snapshot'
+    server.get_status_broadcaster().stop()
@@ -0,0 +1,67 @@
+import json
+from collections import Counter
+
+import pytest
+
+import server
+from bench_scaling import compare, main
+from synthetic_env import generate_environment
+from wifi_scan import write_results
+
+
+def test_environment_is_reproducible_and_sized():
+    env = generate_environment(1000, 400, 3, seed=7)
+    assert env == generate_environment(1000, 400, 3, seed=7)
+    assert len(env['wifi_results']) == 1000
+    types = Counter('bluetooth' if d.get('device_type') else 'cell' if 'operator' in d else 'wifi'
+                    for d in env['devices'])
+    hidden = sum(1 for r in env['wifi_results'] if r['ssid'] is None)
+    assert types == {'wifi': 1000 - hidden, 'bluetooth': 400, 'cell': 3}
+
+
+def test_realistic_distributions():
+    wifi = generate_environment(5000, 0, 0)['wifi_results']
+    encryption = Counter(r['encryption'] for r in wifi)
+    assert encryption.most_common(1)[0][0] == 'WPA2'
+    assert 0.1 < encryption['none'] / len(wifi) < 0.2
+    rssi = sorted(r['rssi'] for r in wifi)
+    assert -100 <= rssi[0] and rssi[-1] <= -20
+    # La plupart des points d'accès sont lointains: médiane nettement sous -60 dBm
+    assert -90 < rssi[len(rssi) // 2] < -60
+    assert len({r['ssid'] for r in wifi}) < len(wifi) / 3
+    assert all(r['channel'] for r in wifi)
+
+
+def test_wifi_results_are_served(tmp_path, monkeypatch):
+    env = generate_environment(200, 0, 0)
+    path = tmp_path / 'wifi_results.json'
+    write_results(env['wifi_results'], str(path))
+    monkeypatch.setattr(server, 'WIFI_RESULTS_FILE', str(path))
+    total = server.app.test_client().get('/api/wifi').get_json()['reseaux']['total']
+    assert total == sum(1 for r in env['wifi_results'] if r['ssid'])
+
+
+def _report(**metrics):
+    return {'results': [{'env': 'bureau', 'metrics': metrics}]}
+
+
+def test_compare_flags_only_significant_regressions():
+    baseline = _report(analyze_networks_s=0.1, status_warm_ms=0.2, analyze_peak_mb=10.0)
+    assert compare(_report(analyze_networks_s=0.11, status_warm_ms=0.5, analyze_peak_mb=11.0), baseline) == []
+    regressions = compare(_report(analyze_networks_s=0.2, status_warm_ms=0.2, analyze_peak_mb=20.0), baseline)
+    assert [line.split(':')[0] for line in regressions] == ['bureau/analyze_networks_s', 'bureau/analyze_peak_mb']
+
+
+def test_harness_writes_comparable_results(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, 'WIFI_RESULTS_FILE', server.WIFI_RESULTS_FILE)
+    output = tmp_path / 'resultats.json'
+    assert main(['--envs', 'maison', '--repeat', '2', '--no-memory', '-o', str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert report['meta']['seed'] == 0
+    [entry] = report['results']
+    assert entry['env'] == 'maison' and entry['aps'] == 30
+    assert {'analyze_networks_s', 'save_stats_s', 'wifi_topk_ms', 'wifi_304_ms'} <= set(entry['metrics'])
+    assert main(['--envs', 'maison', '--repeat', '2', '--no-memory', '-o', str(output),
+                 '--compare', str(output), '--tolerance', '100']) == 0
+    with pytest.raises(SystemExit):
+        main(['--envs', 'inconnu'])
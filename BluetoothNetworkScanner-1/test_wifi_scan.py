@@ -0,0 +1,131 @@
+import io
+import json
+import os
+
+import pytest
+
+from wifi_scan import channel_from_frequency, main, parse_iw, parse_iwlist, parse_scan, summary_line, write_results
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read().splitlines(True)
+
+
+def test_iwlist_fixture():
+    records = list(parse_iwlist(_fixture('iwlist_scan.txt')))
+    assert [r['bssid'] for r in records] == ['00:11:22:33:44:55', 'F0:D5:BF:AA:BB:CC',
+                                             '12:34:56:78:90:AB', '02:00:00:00:00:01']
+    maison = records[0]
+    assert maison['ssid'] == 'Maison'
+    assert (maison['rssi'], maison['frequency_mhz'], maison['channel']) == (-40.0, 2437, 6)
+    assert maison['encryption'] == 'WPA2'
+    assert maison['ciphers'] == ['CCMP', 'TKIP'] and maison['auth_suites'] == ['PSK']
+    assert maison['quality'] == 1.0
+    assert [r['encryption'] for r in records] == ['WPA2', 'WPA3', 'none', 'WEP']
+    # Canal déduit de la fréquence quand il est absent, SSID caché -> None
+    assert records[3]['channel'] == 1 and records[3]['ssid'] is None
+
+
+def test_iw_fixture_matches_iwlist():
+    iwlist = list(parse_iwlist(_fixture('iwlist_scan.txt')))
+    iw = list(parse_iw(_fixture('iw_scan.txt')))
+    for record in iwlist:
+        record['quality'] = None
+    assert iw == iwlist
+
+
+def test_format_detection():
+    assert len(list(parse_scan(_fixture('iw_scan.txt')))) == 4
+    assert len(list(parse_scan(_fixture('iwlist_scan.txt')))) == 4
+
+
+def test_parser_is_streaming():
+    def lines():
+        yield 'Cell 01 - Address: 00:11:22:33:44:55\n'
+        yield '    ESSID:"A"\n'
+        yield 'Cell 02 - Address: 00:11:22:33:44:56\n'
+        raise AssertionError("lecture au-delà du nécessaire")
+
+    assert next(parse_iwlist(lines()))['ssid'] == 'A'
+
+
+def test_test_mode_capture():
+    capture = ['Cell 01 - Address: 00:11:22:33:44:55\n', '    ESSID:"WiFi-Test-1"\n',
+               '    Signal level=-65 dBm\n', '    Encryption: None\n']
+    record = next(parse_scan(capture))
+    assert (record['rssi'], record['encryption']) == (-65.0, 'none')
+
+
+@pytest.mark.parametrize('mhz, channel', [(2412, 1), (2484, 14), (5180, 36), (5955, 1), (900, None)])
+def test_channel_from_frequency(mhz, channel):
+    assert channel_from_frequency(mhz) == channel
+
+
+def test_atomic_write_and_cli(tmp_path):
+    output = tmp_path / 'wifi_results.json'
+    output.write_text('[{"ssid": "ancien"}]')
+    stdout = io.StringIO()
+
+    assert main([os.path.join(FIXTURES, 'iwlist_scan.txt'), '-o', str(output), '--summary'], stdout=stdout) == 0
+
+    data = json.loads(output.read_text())
+    assert [d['ssid'] for d in data] == ['Maison', 'Bureau 5G', 'Gare-WiFi-Gratuit', None]
+    assert {'ssid', 'rssi', 'frequency_mhz'} <= set(data[0])
+    assert os.listdir(tmp_path) == ['wifi_results.json']
+    lines = stdout.getvalue().splitlines()
+    assert lines[0] == r'Adresse MAC : 00:11:22:33:44:55\nNom : Maison\nSignal : -40 dBm\nCanal : 6\nChiffrement : WPA2'
+
+
+def test_failed_write_keeps_previous_file(tmp_path):
+    output = tmp_path / 'wifi_results.json'
+    output.write_text('[]')
+    with pytest.raises(TypeError):
+        write_results([{'ssid': object()}], str(output))
+    assert output.read_text() == '[]'
+    assert os.listdir(tmp_path) == ['wifi_results.json']
+
+
+def test_server_reads_parser_output(tmp_path, monkeypatch):
+    import server
+
+    output = tmp_path / 'wifi_results.json'
+    write_results(parse_scan(_fixture('iw_scan.txt')), str(output))
+    monkeypatch.setattr(server, 'WIFI_RESULTS_FILE', str(output))
+
+    response = server.app.test_client().get('/api/wifi')
+    reseaux = response.get_json()['reseaux']
+    assert response.status_code == 200
+    # Le réseau caché (sans SSID) est ignoré par le serveur
+    assert reseaux['total'] == 3
+    assert reseaux['meilleur_reseau']['frequence'] in (2437, 5180, 2462)
+
+
+def test_relative_signal_level_has_no_rssi(tmp_path, monkeypatch):
+    import server
+
+    # Pilotes qui ne donnent qu'un niveau relatif: pas de clé rssi à null
+    records = list(parse_scan(_fixture('iwlist_scan_relative.txt')))
+    assert [r['ssid'] for r in records] == ['Atelier', 'Atelier-Invites']
+    assert all('rssi' not in r for r in records)
+    assert [r['quality'] for r in records] == [0.45, 0.8]
+    assert 'Signal' not in summary_line(records[0])
+
+    output = tmp_path / 'wifi_results.json'
+    write_results(records, str(output))
+    monkeypatch.setattr(server, 'WIFI_RESULTS_FILE', str(output))
+    client = server.app.test_client()
+    for url in ('/api/network_status', '/api/wifi', '/api/wifi?sort=score', '/api/wifi?limit=1'):
+        assert client.get(url).status_code == 200, url
+
+    # Un null écrit par un autre scanner ne fait pas échouer le serveur non plus
+    output.write_text(json.dumps([{'ssid': 'Atelier', 'bssid': 'A', 'rssi': None}]))
+    for url in ('/api/network_status', '/api/wifi', '/api/wifi?sort=score', '/api/wifi?limit=1'):
+        assert client.get(url).status_code == 200, url
+
+
+def test_summary_escapes_backslashes():
+    record = next(parse_scan(['Cell 01 - Address: 00:11:22:33:44:55\n', '  ESSID:"a\\b"\n']))
+    assert r'Nom : a\\b' in summary_line(record)
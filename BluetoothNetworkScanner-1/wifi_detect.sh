@@ -25,7 +25,8 @@ send_notification() {
             log_wifi "${JAUNE}Aucun numéro de téléphone configuré pour les notifications${NEUTRE}"
             return
         fi
-        python3 notify.py "$network_info" "${NOTIFICATION_PHONE}"
+        # Le démon regroupe les envois; à défaut, envoi direct
+        enqueue_notification wifi "$network_info" || python3 notify.py "$network_info" "${NOTIFICATION_PHONE}"
     fi
 }
 
@@ -132,36 +133,14 @@ detect_wifi_network() {
         return 1
     fi
 
-    # Traitement et affichage des résultats
+    # Analyse de la capture (iwlist ou iw) en un seul processus: écriture
+    # atomique de wifi_results.json et un résumé par réseau
     log_wifi "${VERT}Réseaux détectés :${NEUTRE}"
-    current_network=""
-    while IFS= read -r line; do
-        if [[ $line =~ "Cell" ]]; then
-            # Envoyer le réseau précédent s'il existe
-            if [ ! -z "$current_network" ]; then
-                echo -e "  ${current_network}"
-                log_wifi "Réseau détecté - ${current_network}"
-                send_notification "${current_network}"
-            fi
-            current_network="Adresse MAC : $(echo $line | grep -o '[0-9A-F]\{2\}:[0-9A-F]\{2\}:[0-9A-F]\{2\}:[0-9A-F]\{2\}:[0-9A-F]\{2\}:[0-9A-F]\{2\}')"
-        elif [[ $line =~ "ESSID" ]]; then
-            essid=$(echo $line | cut -d'"' -f2)
-            current_network="${current_network}\nNom : ${essid}"
-        elif [[ $line =~ "Signal level" ]]; then
-            signal=$(echo $line | grep -o "Signal level=.*" | cut -d'=' -f2)
-            current_network="${current_network}\nSignal : ${signal}"
-        elif [[ $line =~ "Encryption" ]]; then
-            encryption=$(echo $line | cut -d':' -f2 | tr -d ' ')
-            current_network="${current_network}\nChiffrement : ${encryption}"
-        fi
-    done < "$temp_file"
-
-    # Envoyer le dernier réseau
-    if [ ! -z "$current_network" ]; then
+    while IFS= read -r current_network; do
         echo -e "  ${current_network}"
         log_wifi "Réseau détecté - ${current_network}"
         send_notification "${current_network}"
-    fi
+    done < <(python3 wifi_scan.py "$temp_file" --summary -o "${INSTALL_DIR}/wifi_results.json")
 
     rm "$temp_file"
     return 0
@@ -0,0 +1,269 @@
+import os
+import re
+import sys
+import json
+import argparse
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+# Fichier lu par server.py et network_manager.py
+DEFAULT_RESULTS_FILE = os.path.join(os.path.expanduser('~/.network_detect'), 'wifi_results.json')
+
+_MAC = r'([0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5})'
+_IWLIST_CELL = re.compile(r'Cell \d+ - Address: ' + _MAC)
+_IW_BSS = re.compile(r'BSS ' + _MAC)
+_SIGNAL_DBM = re.compile(r'Signal level[=:]\s*(-?\d+(?:\.\d+)?)\s*dBm')
+_QUALITY = re.compile(r'Quality[=:]\s*(\d+)/(\d+)')
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+
+
+def channel_from_frequency(mhz: Optional[float]) -> Optional[int]:
+    """Numéro de canal IEEE 802.11 pour une fréquence en MHz (2,4, 5 et 6 GHz)"""
+    if mhz is None:
+        return None
+    mhz = int(round(mhz))
+    if mhz == 2484:
+        return 14
+    if 2412 <= mhz <= 2472:
+        return (mhz - 2407) // 5
+    if 5955 <= mhz <= 7115:
+        return (mhz - 5950) // 5
+    if 5000 <= mhz <= 5900:
+        return (mhz - 5000) // 5
+    return None
+
+
+def _new_record(bssid: str) -> Dict[str, Any]:
+    return {
+        'bssid': bssid.upper(),
+        'ssid': None,
+        'rssi': None,
+        'frequency_mhz': None,
+        'channel': None,
+        'encryption': 'none',
+        'security': [],
+        'ciphers': [],
+        'auth_suites': [],
+        'quality': None,
+    }
+
+
+def _finish(record: Dict[str, Any], privacy: bool) -> Dict[str, Any]:
+    """Déduire le chiffrement et le canal une fois le bloc complet"""
+    security = record['security']
+    if 'SAE' in record['auth_suites']:
+        record['encryption'] = 'WPA3'
+    elif 'WPA2' in security:
+        record['encryption'] = 'WPA2'
+    elif 'WPA' in security:
+        record['encryption'] = 'WPA'
+    elif record['encryption'] == 'none' and privacy:
+        record['encryption'] = 'WEP'
+    if record['channel'] is None:
+        record['channel'] = channel_from_frequency(record['frequency_mhz'])
+    # Niveau relatif seulement ("Signal level=45/100"): pas de RSSI plutôt qu'un null
+    if record['rssi'] is None:
+        del record['rssi']
+    return record
+
+
+def _add_unique(values: List[str], items: Iterable[str]) -> None:
+    for item in items:
+        item = item.strip()
+        if item and item not in values:
+            values.append(item)
+
+
+def parse_iwlist(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Analyse en flux de la sortie de `iwlist <if> scan`, un enregistrement par cellule"""
+    record = None
+    privacy = False
+    for raw in lines:
+        line = raw.strip()
+        if not line:
+            continue
+        if line.startswith('Cell '):
+            match = _IWLIST_CELL.match(line)
+            if match:
+                if record is not None:
+                    yield _finish(record, privacy)
+                record, privacy = _new_record(match.group(1)), False
+            continue
+        if record is None:
+            continue
+
+        if line.startswith('ESSID:'):
+            value = line[6:]
+            if value.startswith('"') and value.endswith('"'):
+                value = value[1:-1]
+            record['ssid'] = value or None
+        elif line.startswith('Frequency:'):
+            number = _NUMBER.search(line)
+            if number:
+                value = float(number.group())
+                record['frequency_mhz'] = int(round(value * 1000 if value < 100 else value))
+            if '(Channel ' in line:
+                record['channel'] = int(line.rsplit('(Channel ', 1)[1].rstrip(')'))
+        elif line.startswith('Channel:'):
+            record['channel'] = int(line[8:])
+        elif line.startswith('Quality') or line.startswith('Signal level'):
+            quality = _QUALITY.search(line)
+            if quality and int(quality.group(2)):
+                record['quality'] = round(int(quality.group(1)) / int(quality.group(2)), 3)
+            signal = _SIGNAL_DBM.search(line)
+            if signal:
+                record['rssi'] = float(signal.group(1))
+        elif line.startswith('Encryption key:'):
+            privacy = line.endswith('on')
+        elif line.startswith('Encryption:'):
+            # Format simplifié du mode test: "Encryption: WPA2"
+            value = line[11:].strip()
+            if value and value.lower() not in ('none', 'off'):
+                _add_unique(record['security'], [value.upper()])
+                privacy = True
+        elif line.startswith('IE: '):
+            if '802.11i/WPA2' in line:
+                _add_unique(record['security'], ['WPA2'])
+            elif line.startswith('IE: WPA Version'):
+                _add_unique(record['security'], ['WPA'])
+        elif line.startswith('Group Cipher'):
+            _add_unique(record['ciphers'], [line.split(':', 1)[1]])
+        elif line.startswith('Pairwise Ciphers'):
+            _add_unique(record['ciphers'], line.split(':', 1)[1].split())
+        elif line.startswith('Authentication Suites'):
+            _add_unique(record['auth_suites'], line.split(':', 1)[1].split())
+    if record is not None:
+        yield _finish(record, privacy)
+
+
+def parse_iw(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Analyse en flux de la sortie de `iw dev <if> scan`, un enregistrement par BSS"""
+    record = None
+    privacy = False
+    section = None
+    for raw in lines:
+        if raw.startswith('BSS '):
+            match = _IW_BSS.match(raw)
+            if match:
+                if record is not None:
+                    yield _finish(record, privacy)
+                record, privacy, section = _new_record(match.group(1)), False, None
+            continue
+        if record is None:
+            continue
+        line = raw.strip()
+        if not line:
+            continue
+
+        if not line.startswith('*'):
+            section = None
+        if line.startswith('SSID:'):
+            record['ssid'] = line[5:].strip() or None
+        elif line.startswith('freq:'):
+            record['frequency_mhz'] = int(round(float(line[5:].split()[0])))
+        elif line.startswith('signal:'):
+            record['rssi'] = float(line[7:].split()[0])
+        elif line.startswith('capability:'):
+            privacy = ' Privacy' in line
+        elif line.startswith('DS Parameter set: channel'):
+            record['channel'] = int(line.rsplit(' ', 1)[1])
+        elif line.startswith('* primary channel:') and record['channel'] is None:
+            record['channel'] = int(line.rsplit(' ', 1)[1])
+        elif line.startswith('RSN:') or line.startswith('WPA:'):
+            section = 'WPA2' if line.startswith('RSN:') else 'WPA'
+            _add_unique(record['security'], [section])
+            line = line[4:].strip()
+
+        # Détails RSN/WPA: "* Group cipher: CCMP", "* Authentication suites: PSK SAE"
+        if section and line.startswith('*'):
+            key, _, value = line[1:].partition(':')
+            key = key.strip().lower()
+            if key in ('group cipher', 'pairwise ciphers'):
+                _add_unique(record['ciphers'], value.split())
+            elif key == 'authentication suites':
+                _add_unique(record['auth_suites'], value.split())
+    if record is not None:
+        yield _finish(record, privacy)
+
+
+def parse_scan(lines: Iterable[str], fmt: str = 'auto') -> Iterator[Dict[str, Any]]:
+    """Analyse d'une sortie iwlist ou iw, format détecté sur la première ligne utile"""
+    lines = iter(lines)
+    if fmt == 'auto':
+        head = []
+        for line in lines:
+            head.append(line)
+            stripped = line.strip()
+            if stripped.startswith('Cell ') or 'Scan completed' in stripped:
+                fmt = 'iwlist'
+                break
+            if line.startswith('BSS '):
+                fmt = 'iw'
+                break
+        lines = _chain(head, lines)
+    parser = parse_iw if fmt == 'iw' else parse_iwlist
+    return parser(lines)
+
+
+def _chain(head: List[str], rest: Iterator[str]) -> Iterator[str]:
+    yield from head
+    yield from rest
+
+
+def write_results(records: Iterable[Dict[str, Any]], path: str = DEFAULT_RESULTS_FILE) -> int:
+    """Écrire les réseaux de façon atomique (fichier temporaire puis rename)"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    records = list(records)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.wifi_results.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    return len(records)
+
+
+def summary_line(record: Dict[str, Any]) -> str:
+    """Résumé d'un réseau sur une ligne, champs séparés par '\\n' littéraux (pour echo -e)"""
+    parts = [f"Adresse MAC : {record['bssid']}"]
+    if record['ssid'] is not None:
+        parts.append(f"Nom : {record['ssid']}")
+    if record.get('rssi') is not None:
+        parts.append(f"Signal : {record['rssi']:g} dBm")
+    if record['channel'] is not None:
+        parts.append(f"Canal : {record['channel']}")
+    parts.append(f"Chiffrement : {record['encryption']}")
+    return '\\n'.join(part.replace('\\', '\\\\').replace('\n', ' ') for part in parts)
+
+
+def main(argv: Optional[List[str]] = None, stdin: Optional[TextIO] = None,
+         stdout: Optional[TextIO] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analyse de la sortie de iwlist/iw et écriture de wifi_results.json")
+    parser.add_argument('input', nargs='?', default='-', help="capture à analyser ('-' pour l'entrée standard)")
+    parser.add_argument('--format', choices=('auto', 'iwlist', 'iw'), default='auto')
+    parser.add_argument('-o', '--output', default=DEFAULT_RESULTS_FILE)
+    parser.add_argument('--summary', action='store_true', help="afficher un résumé par réseau")
+    args = parser.parse_args(argv)
+    stdout = stdout or sys.stdout
+
+    if args.input == '-':
+        records = list(parse_scan(stdin or sys.stdin, args.format))
+    else:
+        with open(args.input, encoding='utf-8', errors='replace') as f:
+            records = list(parse_scan(f, args.format))
+    write_results(records, args.output)
+    if args.summary:
+        stdout.writelines(summary_line(record) + '\n' for record in records)
+    return 0 if records else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
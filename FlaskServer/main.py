@@ -2,12 +2,56 @@ from flask import Flask, request, jsonify, render_template, redirect, url_for
 from flask_cors import CORS
 import os
 import json
+import queue
+import atexit
+import logging
 import requests
+from logging.handlers import QueueHandler, QueueListener
 from dotenv import load_dotenv
 
 # Chargement des variables d'environnement
 load_dotenv()
 
+
+class _BoundedQueueHandler(QueueHandler):
+    """QueueHandler non bloquant: les messages sont abandonnés (et comptés) si la file est pleine"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+# Logging hors du thread de requête: écriture par un QueueListener depuis une
+# file bornée (LOG_QUEUE_SIZE), pour ne jamais bloquer une requête sur stderr
+_log_queue = queue.Queue(int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+_log_writer = logging.StreamHandler()
+_log_writer.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_log_handler = _BoundedQueueHandler(_log_queue)
+# prepare() formate déjà le message: le format complet est appliqué par _log_writer
+_log_handler.setFormatter(logging.Formatter('%(message)s'))
+_log_listener = QueueListener(_log_queue, _log_writer)
+_log_listener.start()
+
+
+def _stop_logging() -> None:
+    _log_listener.stop()
+    if _log_handler.dropped:
+        _log_writer.handle(logging.makeLogRecord({
+            'name': __name__, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+            'msg': f"{_log_handler.dropped} message(s) de log abandonné(s) (file pleine)",
+        }))
+
+
+atexit.register(_stop_logging)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), handlers=[_log_handler])
+logger = logging.getLogger(__name__)
+
 # Récupération de la clé API OpenAI depuis les variables d'environnement
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
@@ -94,7 +138,7 @@ def openai_sentiment_analysis(text):
         else:
             return None
     except Exception as e:
-        print(f"Erreur OpenAI: {str(e)}")
+        logger.error("Erreur OpenAI: %s", e)
         return None
 
 def openai_summarize(text):
@@ -132,7 +176,7 @@ def openai_summarize(text):
         else:
             return None
     except Exception as e:
-        print(f"Erreur OpenAI: {str(e)}")
+        logger.error("Erreur OpenAI: %s", e)
         return None
 
 def openai_recommendations(description):
@@ -181,7 +225,7 @@ def openai_recommendations(description):
         else:
             return None
     except Exception as e:
-        print(f"Erreur OpenAI: {str(e)}")
+        logger.error("Erreur OpenAI: %s", e)
         return None
 
 def local_sentiment_analysis(text):